@@ -59,6 +59,7 @@ import sendgrid
 import os
 from sendgrid.helpers.mail import Mail, Email, To, Content
 import asyncio
+from sales_agent.mail import build_mail, get_mail_transport
 
 
 
@@ -108,17 +109,20 @@ send_test_email()
 # ## Step 1: Agent workflow
 
 # %%
-instructions1 = "You are a sales agent working for ComplAI, \
-a company that provides a SaaS tool for ensuring SOC2 compliance and preparing for audits, powered by AI. \
-You write professional, serious cold emails."
-
-instructions2 = "You are a humorous, engaging sales agent working for ComplAI, \
-a company that provides a SaaS tool for ensuring SOC2 compliance and preparing for audits, powered by AI. \
-You write witty, engaging cold emails that are likely to get a response."
+# The ComplAI context is shared by the three sales agents, so it comes first, byte for byte, and the persona goes last.
+# Providers cache the longest prompt prefix they've seen, so the drafters reuse the same cached prefix.
+from sales_agent.prompts import (
+    EMAILER_INSTRUCTIONS,
+    HTML_INSTRUCTIONS,
+    PICKER_INSTRUCTIONS,
+    SALES_MANAGER_INSTRUCTIONS,
+    SUBJECT_INSTRUCTIONS,
+    sales_instructions,
+)
 
-instructions3 = "You are a busy sales agent working for ComplAI, \
-a company that provides a SaaS tool for ensuring SOC2 compliance and preparing for audits, powered by AI. \
-You write concise, to the point cold emails."
+instructions1 = sales_instructions("professional")
+instructions2 = sales_instructions("engaging")
+instructions3 = sales_instructions("busy")
 
 # %%
 sales_agent1 = Agent(
@@ -163,12 +167,30 @@ for output in outputs:
     print(output + "\n\n")
 
 
+# %% [markdown]
+# ### Not waiting for the slowest agent
+#
+# `asyncio.gather` waits for all three, so the slowest provider sets the pace. `first_drafts` starts all three,
+# returns as soon as `k` drafts are in (or a deadline has passed) and cancels the rest.
+# `SalesPipeline(..., k=2, deadline=...)` does the same before picking. `python -m benchmarks.drafts` compares tail latencies.
+
+# %%
+from sales_agent.pipeline import DraftStats, first_drafts
+
+draft_stats = DraftStats()
+
+with trace("First two cold emails"):
+    outputs = await first_drafts([sales_agent1, sales_agent2, sales_agent3], message, k=2, deadline=10, stats=draft_stats)
+
+for output in outputs:
+    print(output + "\n\n")
+print(f"Stragglers cancelled: {draft_stats.cancelled}")
+
+
 # %%
 sales_picker = Agent(
     name="sales_picker",
-    instructions="You pick the best cold sales email from the given options. \
-Imagine you are a customer and pick the one you are most likely to respond to. \
-Do not give an explanation; reply with the selected email only.",
+    instructions=PICKER_INSTRUCTIONS,
     model="gpt-4o-mini"
 )
 
@@ -190,6 +212,63 @@ with trace("Selection from sales people"):
     print(f"Best sales email:\n{best.final_output}")
 
 
+# %% [markdown]
+# ### Picking without the LLM
+#
+# The picker's prompt grows with every extra draft and costs a round-trip per prospect. `LocalPicker` scores drafts
+# locally (length, readability, call to action, spam words, shouting, focus on the reader) and only asks `sales_picker`
+# when the top two are too close to call, showing it just those two. Needs `pip install "sales-agent[scoring]"`.
+# `python -m benchmarks.scoring` compares the two with 3, 10 and 50 candidates.
+
+# %%
+from sales_agent.scoring import LocalPicker
+
+local_picker = LocalPicker(picker=sales_picker)
+best_email = await local_picker.pick(outputs)
+
+print(f"Best sales email:\n{best_email}")
+print(f"Decided locally: {local_picker.local_picks}, by the LLM: {local_picker.llm_picks}")
+
+
+# %% [markdown]
+# ### Caching repeated prompts
+#
+# Every rerun sends exactly the same instructions and "Write a cold sales email" again.
+# `with_cache` wraps an agent's model so identical calls are answered from a local cache (here a SQLite file, so it survives restarts).
+# Entries expire after the TTL, and the least recently used go first once the cache is full.
+
+# %%
+from sales_agent.cache import SQLiteCache, with_cache
+
+response_cache = SQLiteCache(".agent_cache.sqlite3", ttl=24 * 60 * 60)
+cached_sales_agents = [with_cache(agent, response_cache) for agent in (sales_agent1, sales_agent2, sales_agent3)]
+
+for attempt in range(2):
+    results = await asyncio.gather(*(Runner.run(agent, message) for agent in cached_sales_agents))
+
+print(f"Cache hit rate: {response_cache.hit_rate:.0%}")
+
+
+# %% [markdown]
+# ### Provider-side prompt caching
+#
+# Providers also cache prompt prefixes themselves and bill cached input tokens at a discount, which is why the
+# sales agents' instructions start with the same ComplAI context. `PromptCacheMeter` shows cached against uncached input
+# tokens per agent. OpenAI only caches prompts of 1024 tokens or more, so expect 0% until the shared context grows;
+# `python -m benchmarks.prompt_cache` shows the effect with a longer company brief.
+
+# %%
+from sales_agent.prompts import PromptCacheMeter
+
+prompt_meter = PromptCacheMeter()
+metered_sales_agents = [prompt_meter.wrap(agent) for agent in (sales_agent1, sales_agent2, sales_agent3)]
+
+results = await asyncio.gather(*(Runner.run(agent, message) for agent in metered_sales_agents))
+
+for row in prompt_meter.report():
+    print(row)
+
+
 # %% [markdown]
 # Now go and check out the trace:
 #
@@ -233,15 +312,13 @@ sales_agent1
 # Simply wrap your function with the decorator `@function_tool`
 
 # %%
+# The tool shares one pooled, async SendGrid transport, so sending doesn't block the event loop
+
 @function_tool
-def send_email(body: str):
+async def send_email(body: str):
     """ Send out an email with the given body to all sales prospects """
-    sg = sendgrid.SendGridAPIClient(api_key=os.environ.get('SENDGRID_API_KEY'))
-    from_email = Email("ed@edwarddonner.com")  # Change to your verified sender
-    to_email = To("ed.donner@gmail.com")  # Change to your recipient
-    content = Content("text/plain", body)
-    mail = Mail(from_email, to_email, "Sales email", content).get()
-    sg.client.mail.send.post(request_body=mail)
+    mail = build_mail("Sales email", body, content_type="text/plain")
+    await get_mail_transport().send(mail)
     return {"status": "success"}
 
 
@@ -361,12 +438,8 @@ with trace("Sales manager"):
 
 # %%
 
-subject_instructions = "You can write a subject for a cold sales email. \
-You are given a message and you need to write a subject for an email that is likely to get a response."
-
-html_instructions = "You can convert a text email body to an HTML email body. \
-You are given a text email body which might have some markdown \
-and you need to convert it to an HTML email body with simple, clear, compelling layout and design."
+subject_instructions = SUBJECT_INSTRUCTIONS
+html_instructions = HTML_INSTRUCTIONS
 
 subject_writer = Agent(name="Email subject writer", instructions=subject_instructions, model="gpt-4o-mini")
 subject_tool = subject_writer.as_tool(tool_name="subject_writer", tool_description="Write a subject for a cold sales email")
@@ -377,14 +450,10 @@ html_tool = html_converter.as_tool(tool_name="html_converter",tool_description="
 
 # %%
 @function_tool
-def send_html_email(subject: str, html_body: str) -> Dict[str, str]:
+async def send_html_email(subject: str, html_body: str) -> Dict[str, str]:
     """ Send out an email with the given subject and HTML body to all sales prospects """
-    sg = sendgrid.SendGridAPIClient(api_key=os.environ.get('SENDGRID_API_KEY'))
-    from_email = Email("ed@edwarddonner.com")  # Change to your verified sender
-    to_email = To("ed.donner@gmail.com")  # Change to your recipient
-    content = Content("text/html", html_body)
-    mail = Mail(from_email, to_email, subject, content).get()
-    sg.client.mail.send.post(request_body=mail)
+    mail = build_mail(subject, html_body, content_type="text/html")
+    await get_mail_transport().send(mail)
     return {"status": "success"}
 
 
@@ -395,9 +464,7 @@ tools = [subject_tool, html_tool, send_html_email]
 tools
 
 # %%
-instructions ="You are an email formatter and sender. You receive the body of an email to be sent. \
-You first use the subject_writer tool to write a subject for the email, then use the html_converter tool to convert the body to HTML. \
-Finally, you use the send_html_email tool to send the email with the subject and HTML body."
+instructions = EMAILER_INSTRUCTIONS
 
 
 emailer_agent = Agent(
@@ -418,23 +485,8 @@ print(tools)
 print(handoffs)
 
 # %%
-# Improved instructions thanks to student Guillermo F.
-
-sales_manager_instructions = """
-You are a Sales Manager at ComplAI. Your goal is to find the single best cold sales email using the sales_agent tools.
- 
-Follow these steps carefully:
-1. Generate Drafts: Use all three sales_agent tools to generate three different email drafts. Do not proceed until all three drafts are ready.
- 
-2. Evaluate and Select: Review the drafts and choose the single best email using your judgment of which one is most effective.
-You can use the tools multiple times if you're not satisfied with the results from the first try.
- 
-3. Handoff for Sending: Pass ONLY the winning email draft to the 'Email Manager' agent. The Email Manager will take care of formatting and sending.
- 
-Crucial Rules:
-- You must use the sales agent tools to generate the drafts — do not write them yourself.
-- You must hand off exactly ONE email to the Email Manager — never more than one.
-"""
+# Improved instructions thanks to student Guillermo F., now in sales_agent.prompts
+sales_manager_instructions = SALES_MANAGER_INSTRUCTIONS
 
 
 sales_manager = Agent(
@@ -449,6 +501,46 @@ message = "Send out a cold sales email addressed to Dear CEO from Alice"
 with trace("Automated SDR"):
     result = await Runner.run(sales_manager, message)
 
+# %% [markdown]
+# ### The same result as a fixed pipeline
+#
+# The Sales Manager spends model turns deciding which tools to call, and may call them one at a time.
+# `SalesPipeline` hard-wires the shape from "Selection from sales people": all three drafts at once, one pick, then the handoff.
+# That's always 3 + 1 model calls before the Email Manager takes over. Compare the two with `python -m benchmarks.pipeline`.
+
+# %%
+from sales_agent.pipeline import SalesPipeline
+
+sales_pipeline = SalesPipeline([sales_agent1, sales_agent2, sales_agent3], sales_picker, emailer_agent)
+
+with trace("Automated SDR pipeline"):
+    pipeline_result = await sales_pipeline.run(message)
+
+print(pipeline_result.best)
+print(f"{pipeline_result.usage.requests} model calls, {pipeline_result.usage.total_tokens} tokens")
+
+# %% [markdown]
+# ### Streaming the pipeline
+#
+# Each stage above waits for the previous one to finish completely. `StreamingPipeline` streams every stage instead:
+# the subject writer starts on each draft's opening paragraphs while it's still being written, the picker is stopped
+# as soon as its reply can only be one of the drafts, and the HTML is rendered locally.
+# `python -m benchmarks.streaming` compares time to email sent.
+
+# %%
+from sales_agent.emailer import StructuredEmailer
+from sales_agent.streaming import StreamingPipeline
+
+streaming_pipeline = StreamingPipeline(
+    [sales_agent1, sales_agent2, sales_agent3], sales_picker, StructuredEmailer(subject_writer=subject_writer)
+)
+
+with trace("Streaming SDR pipeline"):
+    streamed_result = await streaming_pipeline.run(message)
+
+print(streamed_result.output.subject)
+print({stage: round(seconds, 2) for stage, seconds in streamed_result.timings.items()})
+
 # %% [markdown]
 # ### Remember to check the trace
 #
@@ -474,6 +566,26 @@ with trace("Automated SDR"):
 #     </tr>
 # </table>
 
+# %% [markdown]
+# ### Mail merge to a prospect list
+#
+# `send_email` only reaches one hard-coded address. This tool streams a CSV of prospects (an `email` column, an optional `name` column and any other fields you like)
+# and packs up to 1000 recipients into each SendGrid request, filling in tags like `-first_name-` for each recipient.
+#
+# Set `PROSPECTS_CSV` in your .env file to the path of your list.
+
+# %%
+from sales_agent.mailmerge import read_prospects, send_mail_merge
+
+@function_tool
+async def send_mail_merge_email(subject: str, html_body: str) -> Dict[str, str]:
+    """ Send an email with the given subject and HTML body to every prospect on the list.
+    Tags such as -first_name- or -company- are filled in for each recipient. """
+    prospects = read_prospects(os.environ.get("PROSPECTS_CSV", "prospects.csv"))
+    report = await send_mail_merge(prospects, subject, html_body, content_type="text/html")
+    print(f"Sent to {report.recipients} prospects at {report.recipients_per_second:.0f} recipients/s")
+    return {"status": "success", "recipients": str(report.recipients)}
+
 # %% [markdown]
 # <table style="margin: 0; text-align: left; width:100%">
 #     <tr>
@@ -25,17 +25,28 @@
 
 # %%
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 from agents import Agent, Runner, trace, function_tool, OpenAIChatCompletionsModel, input_guardrail, GuardrailFunctionOutput
 from typing import Dict
-import sendgrid
 import os
-from sendgrid.helpers.mail import Mail, Email, To, Content
 from pydantic import BaseModel
+from sales_agent.guardrails import gated_tool
+from sales_agent.mail import build_mail, get_mail_transport
+from sales_agent.render import build_html_tool
 
 # %%
 load_dotenv(override=True)
 
+# %% [markdown]
+# A tracing processor that sees the same spans as the traces page and keeps time, tokens and cost per agent locally.
+# It is registered before the first run, so the summary further down covers every run in this lab.
+
+# %%
+from agents import add_trace_processor
+from sales_agent.metrics import MetricsProcessor
+
+metrics = MetricsProcessor(jsonl_path="spans.jsonl")
+add_trace_processor(metrics)
+
 # %%
 openai_api_key = os.getenv('OPENAI_API_KEY')
 google_api_key = os.getenv('GOOGLE_API_KEY')
@@ -63,17 +74,20 @@ else:
     print("Groq API Key not set (and this is optional)")
 
 # %%
-instructions1 = "You are a sales agent working for ComplAI, \
-a company that provides a SaaS tool for ensuring SOC2 compliance and preparing for audits, powered by AI. \
-You write professional, serious cold emails."
-
-instructions2 = "You are a humorous, engaging sales agent working for ComplAI, \
-a company that provides a SaaS tool for ensuring SOC2 compliance and preparing for audits, powered by AI. \
-You write witty, engaging cold emails that are likely to get a response."
+# The ComplAI context is shared by the three sales agents, so it comes first, byte for byte, and the persona goes last.
+# Providers cache the longest prompt prefix they've seen, so the drafters reuse the same cached prefix.
+from sales_agent.prompts import (
+    EMAILER_INSTRUCTIONS,
+    HTML_INSTRUCTIONS,
+    PICKER_INSTRUCTIONS,
+    SALES_MANAGER_INSTRUCTIONS,
+    SUBJECT_INSTRUCTIONS,
+    sales_instructions,
+)
 
-instructions3 = "You are a busy sales agent working for ComplAI, \
-a company that provides a SaaS tool for ensuring SOC2 compliance and preparing for audits, powered by AI. \
-You write concise, to the point cold emails."
+instructions1 = sales_instructions("professional")
+instructions2 = sales_instructions("engaging")
+instructions3 = sales_instructions("busy")
 
 # %% [markdown]
 # ### It's easy to use any models with OpenAI compatible endpoints
@@ -84,10 +98,21 @@ DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
 GROQ_BASE_URL = "https://api.groq.com/openai/v1"
 
 # %%
+# One pooled, keep-alive client per provider, shared by every agent; "gpt-4o-mini" agents use the OpenAI one
+from sales_agent.clients import get_client_pool
 
-deepseek_client = AsyncOpenAI(base_url=DEEPSEEK_BASE_URL, api_key=deepseek_api_key)
-gemini_client = AsyncOpenAI(base_url=GEMINI_BASE_URL, api_key=google_api_key)
-groq_client = AsyncOpenAI(base_url=GROQ_BASE_URL, api_key=groq_api_key)
+client_pool = get_client_pool()
+client_pool.install()
+
+deepseek_client = client_pool.client(DEEPSEEK_BASE_URL, deepseek_api_key)
+gemini_client = client_pool.client(GEMINI_BASE_URL, google_api_key)
+groq_client = client_pool.client(GROQ_BASE_URL, groq_api_key)
+
+# Requests per minute for each provider. The pool's scheduler holds every call until the quota has room,
+# and adjusts to the providers' rate-limit headers and 429s
+client_pool.scheduler.set_limits(DEEPSEEK_BASE_URL, requests_per_minute=60)
+client_pool.scheduler.set_limits(GEMINI_BASE_URL, requests_per_minute=300)
+client_pool.scheduler.set_limits(GROQ_BASE_URL, requests_per_minute=30)
 
 deepseek_model = OpenAIChatCompletionsModel(model="deepseek-chat", openai_client=deepseek_client)
 gemini_model = OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=gemini_client)
@@ -98,6 +123,47 @@ sales_agent1 = Agent(name="DeepSeek Sales Agent", instructions=instructions1, mo
 sales_agent2 =  Agent(name="Gemini Sales Agent", instructions=instructions2, model=gemini_model)
 sales_agent3  = Agent(name="Llama3.3 Sales Agent",instructions=instructions3,model=llama3_3_model)
 
+# %% [markdown]
+# ### Routing around slow providers
+#
+# With each agent pinned to one provider, a slow or failing provider holds up every `asyncio.gather` of drafts.
+# A `ModelRouter` sends each call to whichever provider is currently fastest and healthy, hedges calls that run
+# slower than usual on a second provider, and fails over when one errors. The personas live in the instructions,
+# so the drafts keep their style. Skip this cell to keep one provider per agent.
+# `python -m benchmarks.router` shows the effect against fake providers.
+
+# %%
+from sales_agent.router import ModelRouter
+
+model_router = ModelRouter({"deepseek": deepseek_model, "gemini": gemini_model, "groq": llama3_3_model})
+
+sales_agent1 = sales_agent1.clone(model=model_router)
+sales_agent2 = sales_agent2.clone(model=model_router)
+sales_agent3 = sales_agent3.clone(model=model_router)
+
+# %% [markdown]
+# ### Cheap model first
+#
+# Most drafts from a small, fast model are fine. A `CascadeModel` asks the cheapest model first, checks the reply locally
+# (length, leftover placeholders, names that weren't in the message, and for agents with an `output_type` that it parses),
+# and asks the stronger model only when a check fails. Each agent's current model is kept as the cheap one, so after
+# the cell above the first attempt still goes through the `ModelRouter`. `sales_agent1.model.stats` reports the
+# escalation rate and the seconds and dollars saved per call against always using the stronger model (the cheap model
+# counts as free unless it is named after an entry in `sales_agent.metrics.PRICES`). Skip this cell to keep the models
+# above. `python -m benchmarks.cascade` compares it with a strong model alone.
+
+# %%
+from sales_agent.cascade import CascadeModel, no_invented_names, no_placeholders, word_range
+
+drafter_checks = [word_range(40, 250), no_placeholders(), no_invented_names()]
+
+def cheap_first(agent):
+    return agent.clone(model=CascadeModel({"cheap": agent.model, "gpt-4o": "gpt-4o"}, checks=drafter_checks))
+
+sales_agent1 = cheap_first(sales_agent1)
+sales_agent2 = cheap_first(sales_agent2)
+sales_agent3 = cheap_first(sales_agent3)
+
 # %%
 description = "Write a cold sales email"
 
@@ -108,24 +174,19 @@ tool3 = sales_agent3.as_tool(tool_name="sales_agent3", tool_description=descript
 
 # %%
 @function_tool
-def send_html_email(subject: str, html_body: str) -> Dict[str, str]:
+async def send_html_email(subject: str, html_body: str) -> Dict[str, str]:
     """ Send out an email with the given subject and HTML body to all sales prospects """
-    sg = sendgrid.SendGridAPIClient(api_key=os.environ.get('SENDGRID_API_KEY'))
-    from_email = Email("ed@edwarddonner.com")  # Change to your verified sender
-    to_email = To("ed.donner@gmail.com")  # Change to your recipient
-    content = Content("text/html", html_body)
-    mail = Mail(from_email, to_email, subject, content).get()
-    sg.client.mail.send.post(request_body=mail)
+    mail = build_mail(subject, html_body, content_type="text/html")
+    await get_mail_transport().send(mail)
     return {"status": "success"}
 
+# Sending waits for the input guardrails when the run is started with run_optimistic below.
+send_html_email = gated_tool(send_html_email)
 
-# %%
-subject_instructions = "You can write a subject for a cold sales email. \
-You are given a message and you need to write a subject for an email that is likely to get a response."
 
-html_instructions = "You can convert a text email body to an HTML email body. \
-You are given a text email body which might have some markdown \
-and you need to convert it to an HTML email body with simple, clear, compelling layout and design."
+# %%
+subject_instructions = SUBJECT_INSTRUCTIONS
+html_instructions = HTML_INSTRUCTIONS
 
 subject_writer = Agent(name="Email subject writer", instructions=subject_instructions, model="gpt-4o-mini")
 subject_tool = subject_writer.as_tool(tool_name="subject_writer", tool_description="Write a subject for a cold sales email")
@@ -134,12 +195,14 @@ html_converter = Agent(name="HTML email body converter", instructions=html_instr
 html_tool = html_converter.as_tool(tool_name="html_converter",tool_description="Convert a text email body to an HTML email body")
 
 # %%
+# Converting to HTML is mechanical, so render it locally: no model call and no tokens.
+# Use build_html_tool(llm_converter=html_converter) to go back to the LLM converter.
+html_tool = build_html_tool(layout="simple")
+
 email_tools = [subject_tool, html_tool, send_html_email]
 
 # %%
-instructions ="You are an email formatter and sender. You receive the body of an email to be sent. \
-You first use the subject_writer tool to write a subject for the email, then use the html_converter tool to convert the body to HTML. \
-Finally, you use the send_html_email tool to send the email with the subject and HTML body."
+instructions = EMAILER_INSTRUCTIONS
 
 
 emailer_agent = Agent(
@@ -149,26 +212,31 @@ emailer_agent = Agent(
     model="gpt-4o-mini",
     handoff_description="Convert an email to HTML and send it")
 
+# %% [markdown]
+# ### A faster Email Manager
+#
+# The Email Manager makes a planning turn and then calls `subject_writer`, `html_converter` and `send_html_email` one after another.
+# The subject and the HTML only depend on the body, so with a Pydantic `output_type` one call can produce both.
+# `python -m benchmarks.emailer` measures the latency saved per email.
+
+# %%
+from sales_agent.emailer import FormattedEmail, StructuredEmailer, build_email_formatter
+
+email_formatter = build_email_formatter(model="gpt-4o-mini")
+fast_emailer = StructuredEmailer(formatter=email_formatter)
+
+# Or write only the subject with a model and render the HTML locally:
+# fast_emailer = StructuredEmailer(subject_writer=subject_writer)
+# Or keep both agents and run them at the same time:
+# fast_emailer = StructuredEmailer(subject_writer=subject_writer, html_converter=html_converter)
+
 # %%
 tools = [tool1, tool2, tool3]
 handoffs = [emailer_agent]
 
 # %%
-sales_manager_instructions = """
-You are a Sales Manager at ComplAI. Your goal is to find the single best cold sales email using the sales_agent tools.
- 
-Follow these steps carefully:
-1. Generate Drafts: Use all three sales_agent tools to generate three different email drafts. Do not proceed until all three drafts are ready.
- 
-2. Evaluate and Select: Review the drafts and choose the single best email using your judgment of which one is most effective.
-You can use the tools multiple times if you're not satisfied with the results from the first try.
- 
-3. Handoff for Sending: Pass ONLY the winning email draft to the 'Email Manager' agent. The Email Manager will take care of formatting and sending.
- 
-Crucial Rules:
-- You must use the sales agent tools to generate the drafts — do not write them yourself.
-- You must hand off exactly ONE email to the Email Manager — never more than one.
-"""
+# Improved instructions thanks to student Guillermo F., now in sales_agent.prompts
+sales_manager_instructions = SALES_MANAGER_INSTRUCTIONS
 
 
 sales_manager = Agent(
@@ -183,12 +251,68 @@ message = "Send out a cold sales email addressed to Dear CEO from Alice"
 with trace("Automated SDR"):
     result = await Runner.run(sales_manager, message)
 
+# %% [markdown]
+# ### Or as a fixed pipeline
+#
+# All three providers draft at once, a picker chooses once, and only the winner goes to the Email Manager.
+
+# %%
+from sales_agent.pipeline import SalesPipeline
+
+sales_picker = Agent(
+    name="sales_picker",
+    instructions=PICKER_INSTRUCTIONS,
+    model="gpt-4o-mini"
+)
+
+# For the picker, check that the cheap model repeated one of the drafts:
+# from sales_agent.cascade import repeats_draft
+# sales_picker = sales_picker.clone(model=CascadeModel({"gpt-4o-mini": "gpt-4o-mini", "gpt-4o": "gpt-4o"}, checks=[repeats_draft()]))
+
+# Swap emailer_agent for fast_emailer to format and send in a single model call
+sales_pipeline = SalesPipeline([sales_agent1, sales_agent2, sales_agent3], sales_picker, fast_emailer)
+
+with trace("Automated SDR pipeline"):
+    pipeline_result = await sales_pipeline.run(message)
+
+# %% [markdown]
+# ### Drafts as fields
+#
+# The picker reads every draft and writes the winner out again, and the subject writer reads it once more.
+# With a Pydantic `output_type`, as for `NameCheckOutput` below, each sales agent returns an `EmailDraft`:
+# subject, greeting, paragraphs, call to action, sign-off and a self-score. The picker then reads short digests
+# and answers with a number, and the HTML is rendered locally from the paragraphs.
+# `python -m benchmarks.structured` compares calls, tokens and cost per run.
+
+# %%
+from sales_agent.structured import StructuredPipeline, build_digest_picker, structured_drafter
+
+structured_agents = [structured_drafter(agent) for agent in (sales_agent1, sales_agent2, sales_agent3)]
+structured_pipeline = StructuredPipeline(structured_agents, build_digest_picker("gpt-4o-mini"), send=True)
+
+with trace("Structured SDR pipeline"):
+    structured_result = await structured_pipeline.run(message)
+
+structured_result.draft
+
 
 # %% [markdown]
 # ## Check out the trace:
 #
 # https://platform.openai.com/traces
 
+# %% [markdown]
+# ### Time, tokens and cost per agent, locally
+#
+# The `MetricsProcessor` registered at the top has seen the spans of every run so far and keeps histograms you can
+# query or export, without running anything again. Rate-limit waits appear as `queue` time.
+
+# %%
+metrics.summary()
+
+# %%
+print(metrics.prometheus())
+
 # %%
 class NameCheckOutput(BaseModel):
     is_name_in_message: bool
@@ -210,6 +334,21 @@ async def guardrail_against_name(ctx, agent, message):
     return GuardrailFunctionOutput(output_info={"found_name": result.final_output},tripwire_triggered=is_name_in_message)
 
 
+# %% [markdown]
+# ### A cheaper name check
+#
+# The guardrail above spends a whole LLM call on every message. Most messages are easy: "from Alice" is a well-known first name,
+# and "from Head of Business Development" is only a role. `TieredNameCheck` settles those locally in microseconds
+# and only asks `guardrail_agent` about messages it can't place, remembering every verdict.
+# `python -m benchmarks.guardrail` compares accuracy and latency with the LLM-only check.
+
+# %%
+from sales_agent.guardrails import TieredNameCheck
+
+name_check = TieredNameCheck(guardrail_agent)
+guardrail_against_name = name_check.guardrail()
+
+
 # %%
 careful_sales_manager = Agent(
     name="Sales Manager",
@@ -237,6 +376,79 @@ message = "Send out a cold sales email addressed to Dear CEO from Head of Busine
 with trace("Protected Automated SDR"):
     result = await Runner.run(careful_sales_manager, message)
 
+# %% [markdown]
+# ### Not waiting for the guardrail
+#
+# `run_optimistic` starts the Sales Manager at the same time as its guardrails instead of after them.
+# `send_html_email` is gated, so nothing is sent until every guardrail has passed,
+# and if a tripwire fires the run is cancelled and `InputGuardrailTripwireTriggered` is raised as usual.
+# `python -m benchmarks.optimistic` measures the saving.
+
+# %%
+from sales_agent.guardrails import run_optimistic
+
+with trace("Optimistic Protected Automated SDR"):
+    result = await run_optimistic(careful_sales_manager, message)
+
+# %% [markdown]
+# ## Running a whole campaign
+#
+# A `Campaign` runs the Sales Manager once per prospect, with a fixed number of prospects in flight.
+# The prospect list is read only as fast as workers free up, and the rate-limited models above keep each provider under its quota.
+# Each prospect's email goes to the address in its `email` column; a prospect without one is reported as a failure.
+
+# %%
+from sales_agent.campaign import Campaign
+from sales_agent.mailmerge import read_prospects
+
+campaign = Campaign(sales_manager, concurrency=20, message="Send out a cold sales email addressed to Dear {name} from {sender}")
+
+with trace("Campaign"):
+    report = await campaign.run(read_prospects(os.environ.get("PROSPECTS_CSV", "prospects.csv")))
+
+print(f"{report.succeeded} sent, {len(report.failures)} failed, {report.prospects_per_second:.2f} prospects/s")
+
+# %% [markdown]
+# ### Queueing the emails instead of sending them mid-run
+#
+# With an `Outbox` as the mail transport, `send_html_email` stores the email in a local SQLite queue and returns at once.
+# A `Dispatcher` sends the queue in the background under a rate limit, retrying SendGrid errors with backoff, so a mail-provider hiccup no longer fails the run.
+
+# %%
+from sales_agent.mail import SENDGRID_API_URL, MailTransport, set_mail_transport
+from sales_agent.outbox import Dispatcher, Outbox
+from sales_agent.tokenbucket import TokenBucket
+
+outbox = Outbox("outbox.db")
+sendgrid = MailTransport(base_url=os.environ.get("SENDGRID_BASE_URL", SENDGRID_API_URL))
+dispatcher = Dispatcher(outbox, sendgrid, bucket=TokenBucket(5))
+set_mail_transport(outbox)
+dispatcher.start()
+
+with trace("Campaign with outbox"):
+    report = await campaign.run(read_prospects(os.environ.get("PROSPECTS_CSV", "prospects.csv")))
+
+await dispatcher.drain()
+print(outbox.counts(), outbox.failures())
+
+# %% [markdown]
+# ### Resuming after a crash
+#
+# A `Checkpointer` journals every model response and tool result of each prospect's run to SQLite.
+# If the kernel dies mid-campaign, running this cell again replays the finished steps for free, skips prospects that already finished, and never sends an email twice.
+# Runs are keyed by the `campaign_id` and each prospect's `id` or `email`, so keep the id the same when resuming.
+
+# %%
+from sales_agent.checkpoint import Checkpointer
+
+checkpointer = Checkpointer("checkpoints.sqlite3")
+resumable_campaign = Campaign(checkpointer.pipeline(sales_manager), concurrency=20, message="Send out a cold sales email addressed to Dear {name} from {sender}", campaign_id="lab3")
+
+with trace("Resumable campaign"):
+    report = await resumable_campaign.run(read_prospects(os.environ.get("PROSPECTS_CSV", "prospects.csv")))
+
+print(f"{report.succeeded} done, {checkpointer.replayed} steps replayed, {checkpointer.recorded} new")
+
 # %% [markdown]
 # <table style="margin: 0; text-align: left; width:100%">
 #     <tr>
@@ -0,0 +1 @@
+"""Offline benchmarks; run each one with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,158 @@
+"""Drafting and picking on one strong model, one cheap model, or a cascade.
+
+Three drafters and ``sales_picker`` run on :class:`sales_agent.fakes.FakeModel`
+stand-ins priced as gemini-2.0-flash and gpt-4o-mini (cheap and fast) and
+gpt-4o (strong and three times slower). The cheap drafter now and then writes
+a stub, leaves a ``[Company]`` placeholder or greets an invented name, and the
+cheap picker sometimes explains its choice instead of repeating the draft. The
+cascade tries the cheap model and escalates when :mod:`sales_agent.cascade`'s
+local checks fail; "defective" counts winning emails that would fail them::
+
+    python -m benchmarks.cascade --prospects 100 --defects 0.15
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List
+
+from agents import Agent, Model, set_tracing_disabled
+
+from benchmarks.common import lognormal, print_table, summarize
+from benchmarks.fixtures import INSTRUCTIONS, PICKER_INSTRUCTIONS
+from sales_agent.cascade import (
+    CascadeModel,
+    no_invented_names,
+    no_placeholders,
+    repeats_draft,
+    word_range,
+)
+from sales_agent.fakes import FakeModel
+from sales_agent.metrics import cost
+from sales_agent.pipeline import PICKER_SEPARATOR, SalesPipeline
+
+DRAFTER_CHECKS = [word_range(40, 250), no_placeholders(), no_invented_names()]
+
+BODY = (
+    "Dear {name},\n\nComplAI helps {company} pass SOC2 audits in weeks, not "
+    "months. Our AI maps your controls to the framework and collects evidence "
+    "from your cloud accounts automatically, so your engineers stay focused on "
+    "shipping product instead of screenshots.\n\nTeams like yours cut audit "
+    "preparation by 70% in the first quarter. Would you be open to a "
+    "15-minute call next week?\n\nBest,\nAlice"
+)
+DEFECTS = [
+    "Hi {name}, SOC2 made easy with ComplAI. Call me?",
+    BODY.replace("{company} pass", "[Company] pass"),
+    BODY.replace("Dear {name}", "Dear John"),
+]
+_PROSPECT = re.compile(r"Dear (\w+) at (\w+)")
+
+
+def drafter_reply(defects: float, rng: random.Random) -> Callable[[str], str]:
+    def reply(prompt: str) -> str:
+        match = _PROSPECT.search(prompt)
+        name, company = match.groups() if match else ("CEO", "your company")
+        body = rng.choice(DEFECTS) if rng.random() < defects else BODY
+        return body.format(name=name, company=company)
+
+    return reply
+
+
+def picker_reply(defects: float, rng: random.Random) -> Callable[[str], str]:
+    def reply(prompt: str) -> str:
+        if rng.random() < defects:
+            return "The second email is the most likely to get a reply."
+        return prompt.split(PICKER_SEPARATOR)[-1]
+
+    return reply
+
+
+def fake(name: str, latency: float, reply: Any, rng: random.Random) -> FakeModel:
+    return FakeModel(lognormal(latency, rng, 0.3), reply=reply, name=name)
+
+
+async def run(
+    mode: str, prospects: int, latency: float, defects: float, seed: int
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    fakes: List[FakeModel] = []
+
+    def model(cheap: str, reply: Callable[[float, random.Random], Any]) -> Model:
+        """One model for ``mode``; the strong one is three times slower."""
+        cheap_model = fake(cheap, latency, reply(defects, rng), rng)
+        strong = fake("gpt-4o", 3 * latency, reply(0.0, rng), rng)
+        if mode == "gpt-4o":
+            fakes.append(strong)
+            return strong
+        fakes.append(cheap_model)
+        if mode == "cheap":
+            return cheap_model
+        fakes.append(strong)
+        checks = DRAFTER_CHECKS if reply is drafter_reply else [repeats_draft()]
+        return CascadeModel({cheap: cheap_model, "gpt-4o": strong}, checks)
+
+    # One model shared by the three drafters, as with the lab's ModelRouter.
+    drafter_model = model("gemini-2.0-flash", drafter_reply)
+    picker_model = model("gpt-4o-mini", picker_reply)
+    drafters = [
+        Agent(name=f"Sales agent {i}", instructions=instructions, model=drafter_model)
+        for i, instructions in enumerate(INSTRUCTIONS)
+    ]
+    picker = Agent(
+        name="sales_picker", instructions=PICKER_INSTRUCTIONS, model=picker_model
+    )
+    pipeline = SalesPipeline(drafters, picker)
+    latencies: List[float] = []
+    defective = 0
+    for i in range(prospects):
+        prompt = (
+            f"Write a cold sales email addressed to Dear Prospect{i} at Company{i} "
+            "from Alice"
+        )
+        start = time.perf_counter()
+        result = await pipeline.run(prompt)
+        latencies.append(time.perf_counter() - start)
+        defective += any(check(result.best, prompt) for check in DRAFTER_CHECKS)
+    dollars = sum(
+        cost(m.name, m.usage.input_tokens, 0, m.usage.output_tokens) for m in fakes
+    )
+    stats = summarize(latencies)
+    row: Dict[str, Any] = {
+        "mode": mode,
+        "p50 (s)": stats["p50"],
+        "p95 (s)": stats["p95"],
+        "$/1k emails": dollars * 1000 / prospects,
+        "defective": defective,
+    }
+    for name, used in (("drafter", drafter_model), ("picker", picker_model)):
+        if isinstance(used, CascadeModel):
+            row[f"{name} escalated"] = f"{used.stats.escalation_rate:.0%}"
+            print(
+                f"{name} cascade: {dict(used.stats.reasons)}; saved "
+                f"{used.stats.seconds_saved_per_call or 0.0:.3f} s and "
+                f"${used.stats.dollars_saved_per_call * 1000:.4f} per 1k calls "
+                "against gpt-4o"
+            )
+    return row
+
+
+async def main(prospects: int, latency: float, defects: float, seed: int) -> None:
+    set_tracing_disabled(True)
+    rows = [
+        await run(mode, prospects, latency, defects, seed)
+        for mode in ("gpt-4o", "cheap", "cascade")
+    ]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prospects", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.08)
+    parser.add_argument("--defects", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main(args.prospects, args.latency, args.defects, args.seed))
@@ -0,0 +1,93 @@
+"""Model calls and emails after a crash: rerun from scratch or resume.
+
+The Lab 3 Sales Manager runs on :class:`sales_agent.fakes.FakeModel` and is
+killed right after the Email Manager has sent the email, just before the run
+would have finished. "rerun" starts it again as the labs would; "resume"
+reruns the same run id through :class:`sales_agent.checkpoint.Checkpointer`
+with a fresh instance on the same journal, as a restarted process would::
+
+    python -m benchmarks.checkpoint --prospects 10
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from agents import Runner, set_tracing_disabled
+
+from benchmarks.common import print_table
+from benchmarks.fixtures import build_agents
+from sales_agent.checkpoint import Checkpointer
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import MailTransport, set_mail_transport
+
+MESSAGE = "Send out a cold sales email addressed to Dear {name} from Alice"
+
+
+async def crash_when(crashed: Callable[[], bool], run: Awaitable[Any]) -> None:
+    """Cancel ``run`` as soon as ``crashed()`` is true, like a killed process."""
+    task = asyncio.ensure_future(run)
+    while not task.done() and not crashed():
+        await asyncio.sleep(0.001)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def main(prospects: int, latency: float) -> None:
+    set_tracing_disabled(True)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        async with FakeSendGridServer() as server:
+            async with MailTransport(api_key="test", base_url=server.url) as mail:
+                set_mail_transport(mail)
+                for mode in ("rerun", "resume"):
+                    model = FakeModel(latency)
+                    agents = build_agents(model)
+                    path = os.path.join(tmp, f"{mode}.sqlite3")
+                    totals: Dict[str, float] = {"calls": 0, "tokens": 0, "emails": 0}
+                    seconds = 0.0
+                    for i in range(prospects):
+                        message = MESSAGE.format(name=f"CEO {i}")
+
+                        def attempt() -> Awaitable[Any]:
+                            if mode == "rerun":
+                                return Runner.run(agents.sales_manager, message)
+                            checkpointer = Checkpointer(path)
+                            return checkpointer.run(
+                                agents.sales_manager, message, run_id=str(i)
+                            )
+
+                        sent = len(server.mails)
+                        await crash_when(lambda: len(server.mails) > sent, attempt())
+                        requests, tokens = (
+                            model.usage.requests,
+                            model.usage.total_tokens,
+                        )
+                        start = time.perf_counter()
+                        await attempt()
+                        seconds += time.perf_counter() - start
+                        totals["calls"] += model.usage.requests - requests
+                        totals["tokens"] += model.usage.total_tokens - tokens
+                        totals["emails"] += len(server.mails) - sent
+                    rows.append(
+                        {
+                            "mode": mode,
+                            "model calls after crash": totals["calls"] / prospects,
+                            "tokens after crash": totals["tokens"] / prospects,
+                            "seconds after crash": seconds / prospects,
+                            "emails per prospect": totals["emails"] / prospects,
+                        }
+                    )
+                set_mail_transport(None)
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prospects", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.prospects, args.latency))
@@ -0,0 +1,104 @@
+"""Connections opened by the lab's per-provider clients against a shared pool.
+
+Three fake OpenAI-compatible servers stand in for DeepSeek, Gemini and Groq.
+Each round sends one chat completion per prospect to every provider at once,
+the way a large campaign's drafters do. The lab builds one ``AsyncOpenAI`` per
+provider with the SDK's connection defaults, which keep 100 idle connections;
+:class:`sales_agent.clients.ClientPool` keeps enough alive for the campaign's
+concurrency, so later rounds reuse the first round's connections::
+
+    python -m benchmarks.clients --prospects 500 --rounds 5
+
+The requests go straight through the clients, without the agents SDK, so the
+numbers reflect the HTTP layer only.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Mapping
+
+from openai import AsyncOpenAI
+
+from benchmarks.common import print_table, summarize
+from sales_agent.clients import ClientPool
+from sales_agent.fakes import FakeOpenAIServer
+
+PROVIDERS = {
+    "deepseek": "deepseek-chat",
+    "gemini": "gemini-2.0-flash",
+    "groq": "llama-3.3-70b-versatile",
+}
+
+
+async def run_campaign(
+    clients: Mapping[str, AsyncOpenAI],
+    servers: Mapping[str, FakeOpenAIServer],
+    prospects: int,
+    rounds: int,
+) -> Dict[str, Any]:
+    connections = sum(server.connections for server in servers.values())
+    requests = sum(server.requests for server in servers.values())
+
+    async def draft(name: str) -> float:
+        start = time.perf_counter()
+        await clients[name].chat.completions.create(
+            model=PROVIDERS[name],
+            messages=[{"role": "user", "content": "Write a cold sales email"}],
+        )
+        return time.perf_counter() - start
+
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        latencies += await asyncio.gather(
+            *(draft(name) for _ in range(prospects) for name in PROVIDERS)
+        )
+    elapsed = time.perf_counter() - start
+    stats = summarize(latencies)
+    sent = sum(server.requests for server in servers.values()) - requests
+    return {
+        "requests": len(latencies),
+        "retries": sent - len(latencies),
+        "connections": sum(s.connections for s in servers.values()) - connections,
+        "requests/s": len(latencies) / elapsed,
+        "p50 (s)": stats["p50"],
+        "p95 (s)": stats["p95"],
+    }
+
+
+async def main(prospects: int, rounds: int, latency: float) -> None:
+    servers = {name: FakeOpenAIServer(latency=latency) for name in PROVIDERS}
+    for server in servers.values():
+        await server.start()
+    rows = []
+    try:
+        lab_clients = {
+            name: AsyncOpenAI(base_url=server.url + "/v1", api_key="test")
+            for name, server in servers.items()
+        }
+        outcome = await run_campaign(lab_clients, servers, prospects, rounds)
+        rows.append({"clients": "one per provider", **outcome})
+        for client in lab_clients.values():
+            await client.close()
+
+        async with ClientPool(max_keepalive_connections=prospects) as pool:
+            pooled = {
+                name: pool.client(server.url + "/v1", "test")
+                for name, server in servers.items()
+            }
+            outcome = await run_campaign(pooled, servers, prospects, rounds)
+            rows.append({"clients": "client pool", **outcome})
+    finally:
+        for server in servers.values():
+            await server.stop()
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prospects", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.prospects, args.rounds, args.latency))
@@ -0,0 +1,66 @@
+"""Small helpers shared by the benchmark scripts."""
+
+import math
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (``pct`` in 0-100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Mean and tail latencies of ``samples``."""
+    return {
+        "n": float(len(samples)),
+        "mean": sum(samples) / len(samples) if samples else 0.0,
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+    }
+
+
+def lognormal(
+    median: float, rng: random.Random, sigma: float = 0.5
+) -> Callable[[], float]:
+    """A latency sampler with a long right tail, like real API calls."""
+    return lambda: median * rng.lognormvariate(0, sigma)
+
+
+@contextmanager
+def stopwatch() -> Iterator[List[float]]:
+    """Yield a one-element list that holds the elapsed seconds on exit."""
+    elapsed = [0.0]
+    start = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed[0] = time.perf_counter() - start
+
+
+def print_table(rows: Sequence[Mapping[str, Any]]) -> None:
+    """Print dictionaries with identical keys as an aligned text table."""
+    if not rows:
+        return
+    columns = list(rows[0])
+    cells = [[_fmt(row[col]) for col in columns] for row in rows]
+    widths = [
+        max(len(col), *(len(line[i]) for line in cells))
+        for i, col in enumerate(columns)
+    ]
+    print("  ".join(col.ljust(w) for col, w in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(cell.ljust(w) for cell, w in zip(line, widths)))
+
+
+def _fmt(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    return str(value)
@@ -0,0 +1,155 @@
+"""Picker and formatter work with and without near-duplicate detection.
+
+Every prospect is drafted by three :class:`sales_agent.fakes.FakeModel`
+personas. They often write the same email in slightly different words, and
+each addresses the prospect by name, so winners differ between prospects
+only in a few words. The winner is formatted by an LLM subject writer and
+HTML converter through :class:`sales_agent.emailer.StructuredEmailer`. With
+a :class:`sales_agent.dedup.DuplicateIndex`, duplicate drafts skip the
+picker and near-identical winners reuse earlier formatting; "misaddressed"
+counts emails naming anyone but their prospect. Hit rates are read back
+from :class:`sales_agent.metrics.MetricsProcessor`::
+
+    python -m benchmarks.dedup --prospects 100
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from agents import Agent, set_trace_processors
+
+from benchmarks.common import print_table, summarize
+from sales_agent.dedup import DuplicateIndex
+from sales_agent.emailer import StructuredEmailer
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import MailTransport
+from sales_agent.metrics import MetricsProcessor
+from sales_agent.pipeline import PICKER_SEPARATOR, SalesPipeline
+from sales_agent.render import render_email
+
+PITCH = (
+    "ComplAI helps {company} pass SOC2 audits in weeks, not months. Our AI maps "
+    "your controls and collects evidence automatically, so your engineers stay "
+    "focused on shipping product instead of screenshots.\n\n"
+    "Teams like yours cut audit prep by 70% in the first quarter. {ask}\n\n"
+    "Best,\nAlice"
+)
+ASKS = [
+    "Would you be open to a 15-minute call next week?",
+    "Are you free for a quick 15-minute chat next week?",
+]
+WITTY = (
+    "Hi {name}! Tired of spreadsheets? SOC2 doesn't have to hurt. Let ComplAI's "
+    "robots do the boring bits while {company} sips coffee. Reply and I'll show "
+    "you how.\n\nCheers,\nAlice"
+)
+_PROSPECT = re.compile(r"Dear (\w+) at (\w+)")
+_NAME = re.compile(r"Prospect\d+")
+
+
+def drafter_reply(persona: int, rng: random.Random) -> Any:
+    def reply(prompt: str) -> str:
+        match = _PROSPECT.search(prompt)
+        name, company = match.groups() if match else ("CEO", "your company")
+        if persona == 2 and rng.random() < 0.5:
+            return WITTY.format(name=name, company=company)
+        # The serious pitch, with the same or a reworded ask.
+        ask = ASKS[rng.random() < 0.3] if persona else ASKS[0]
+        return f"Dear {name},\n\n" + PITCH.format(company=company, ask=ask)
+
+    return reply
+
+
+def subject(body: str) -> str:
+    name = body.split(",", 1)[0].split()[-1]
+    return f"{name}, SOC2 audits in weeks"
+
+
+async def run(
+    prospects: int, latency: float, dedup: Optional[DuplicateIndex]
+) -> Dict[str, Any]:
+    rng = random.Random(1)
+    drafters = [
+        Agent(
+            name=f"Sales agent {i}",
+            instructions="Write a cold sales email",
+            model=FakeModel(latency, reply=drafter_reply(i, rng)),
+        )
+        for i in range(3)
+    ]
+    picker_model = FakeModel(latency, reply=lambda t: t.split(PICKER_SEPARATOR)[-1])
+    picker = Agent(name="sales_picker", instructions="Pick", model=picker_model)
+    formatter_model = FakeModel(latency, reply=subject)
+    html_model = FakeModel(latency, reply=lambda body: render_email(body))
+    async with FakeSendGridServer() as server:
+        async with MailTransport(api_key="test", base_url=server.url) as transport:
+            emailer = StructuredEmailer(
+                subject_writer=Agent(
+                    name="Email subject writer",
+                    instructions="Write a subject",
+                    model=formatter_model,
+                ),
+                html_converter=Agent(
+                    name="HTML email body converter",
+                    instructions="Convert to HTML",
+                    model=html_model,
+                ),
+                transport=transport,
+                dedup=dedup,
+            )
+            pipeline = SalesPipeline(drafters, picker, emailer, dedup=dedup)
+            latencies: List[float] = []
+            tokens = 0
+            misaddressed = 0
+            for i in range(prospects):
+                start = time.perf_counter()
+                result = await pipeline.run(
+                    f"Write a cold sales email addressed to Dear Prospect{i} "
+                    f"at Company{i}"
+                )
+                latencies.append(time.perf_counter() - start)
+                tokens += result.usage.total_tokens
+                email = result.output
+                names = set(_NAME.findall(email.subject + email.html_body))
+                misaddressed += names != {f"Prospect{i}"}
+    return {
+        "mode": "dedup" if dedup else "no dedup",
+        "p50 (s)": summarize(latencies)["p50"],
+        "picker calls": picker_model.usage.requests,
+        "formatter calls": formatter_model.usage.requests + html_model.usage.requests,
+        "tokens/prospect": tokens / prospects,
+        "misaddressed": misaddressed,
+    }
+
+
+async def main(prospects: int, latency: float) -> None:
+    metrics = MetricsProcessor()
+    set_trace_processors([metrics])
+    rows = [
+        await run(prospects, latency, None),
+        await run(prospects, latency, DuplicateIndex()),
+    ]
+    print_table(rows)
+    print(
+        f"duplicate drafts: {metrics.duplicate_hit_rate('picker'):.0%}, "
+        f"formatting reused: {metrics.duplicate_hit_rate('formatter'):.0%}"
+    )
+    print(
+        "\n".join(
+            line
+            for line in metrics.prometheus().splitlines()
+            if line.startswith("sales_agent_duplicates_total{")
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prospects", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.prospects, args.latency))
@@ -0,0 +1,136 @@
+"""Drafting live for every prospect against a precomputed draft pool.
+
+Prospects are spread over role x industry x company size segments, a few
+segments holding most of them, as in a real list. Drafters run on
+:class:`sales_agent.fakes.FakeModel` with the DeepSeek/Gemini/Groq latency mix
+of ``benchmarks.drafts``. The pool is precomputed for the ``--top`` commonest
+segments; the rest are drafted the first time they come up. Precompute time
+is reported separately, as it is paid before the campaign::
+
+    python -m benchmarks.draftpool --prospects 1000 --top 40
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import zlib
+from typing import Any, Dict, List, Mapping, Optional
+
+from agents import Agent, set_tracing_disabled
+
+from benchmarks.common import lognormal, print_table, summarize
+from benchmarks.fixtures import INSTRUCTIONS, PICKER_INSTRUCTIONS
+from sales_agent.campaign import Campaign
+from sales_agent.draftpool import DraftPool, PooledPipeline, precompute, top_segments
+from sales_agent.fakes import FakeModel
+from sales_agent.pipeline import SalesPipeline
+
+PROVIDERS = [("deepseek", 0.6, 0.8), ("gemini", 0.3, 0.5), ("groq", 0.15, 0.5)]
+
+ROLES = ["ceo", "cto", "ciso", "head of compliance", "vp engineering"]
+INDUSTRIES = ["fintech", "healthcare", "saas", "insurance", "retail", "logistics"]
+SIZES = ["8", "40", "150", "800", "5000"]
+
+
+def make_prospects(count: int, rng: random.Random) -> List[Dict[str, str]]:
+    # Zipf-like weights: the first few values of each field dominate.
+    def pick(values: List[str]) -> str:
+        weights = [1 / (i + 1) for i in range(len(values))]
+        return rng.choices(values, weights=weights)[0]
+
+    return [
+        {
+            "name": f"Prospect {i}",
+            "email": f"prospect{i}@example.com",
+            "company": f"Company {i}",
+            "role": pick(ROLES),
+            "industry": pick(INDUSTRIES),
+            "company_size": pick(SIZES),
+        }
+        for i in range(count)
+    ]
+
+
+def premium_share(share: float) -> Any:
+    def premium(prospect: Mapping[str, str]) -> bool:
+        return zlib.crc32(prospect["email"].encode()) % 1000 < share * 1000
+
+    return premium
+
+
+async def main(
+    prospects: int, top: int, concurrency: int, premium: float, seed: int
+) -> None:
+    set_tracing_disabled(True)
+    rng = random.Random(seed)
+    models = [
+        FakeModel(lognormal(median, rng, sigma)) for _, median, sigma in PROVIDERS
+    ]
+    drafters = [
+        Agent(name=f"{name} sales agent", instructions=instructions, model=model)
+        for (name, _, _), instructions, model in zip(PROVIDERS, INSTRUCTIONS, models)
+    ]
+    picker_model = FakeModel(0.1)
+    picker = Agent(
+        name="sales_picker", instructions=PICKER_INSTRUCTIONS, model=picker_model
+    )
+    people = make_prospects(prospects, rng)
+    print(f"{len(top_segments(people))} segments among {prospects} prospects")
+
+    def calls() -> int:
+        return sum(m.usage.requests for m in models) + picker_model.usage.requests
+
+    rows = []
+    for mode in ("live", "pool", f"pool, {premium:.0%} premium"):
+        pipeline: Any = SalesPipeline(drafters, picker)
+        seconds = 0.0
+        before = calls()
+        pooled: Optional[float] = None
+        if mode != "live":
+            pool = DraftPool(":memory:")
+            start = time.perf_counter()
+            await precompute(pool, drafters, top_segments(people, top), variants=1)
+            seconds = time.perf_counter() - start
+            pipeline = PooledPipeline(
+                pool,
+                drafters,
+                picker,
+                premium=premium_share(premium) if "premium" in mode else None,
+            )
+        precompute_calls = calls() - before
+        before = calls()
+        latencies: List[float] = []
+        start = time.perf_counter()
+        async for result in Campaign(pipeline, concurrency).stream(people):
+            latencies.append(result.seconds * 1000)
+        elapsed = time.perf_counter() - start
+        if isinstance(pipeline, PooledPipeline):
+            pooled = pipeline.pool_stats.pooled_rate
+        stats = summarize(latencies)
+        rows.append(
+            {
+                "mode": mode,
+                "precompute (s)": seconds,
+                "campaign (s)": elapsed,
+                "p50 (ms)": stats["p50"],
+                "p95 (ms)": stats["p95"],
+                "model calls": f"{precompute_calls} + {calls() - before}",
+                "served from pool": "-" if pooled is None else f"{pooled:.0%}",
+            }
+        )
+    print_table(rows)
+    print("model calls: precompute + campaign")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prospects", type=int, default=1000)
+    parser.add_argument("--top", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--premium", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.prospects, args.top, args.concurrency, args.premium, args.seed)
+    )
@@ -0,0 +1,80 @@
+"""Wait-for-all drafting against first-k-of-n with straggler cancellation.
+
+Each drafter gets its own :class:`sales_agent.fakes.FakeModel` with a
+different latency distribution, like the DeepSeek/Gemini/Groq mix in Lab 3.
+Only the draft-and-pick step is timed::
+
+    python -m benchmarks.drafts --rounds 50
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from agents import Agent, Usage, set_tracing_disabled
+
+from benchmarks.common import lognormal, print_table, summarize
+from benchmarks.fixtures import INSTRUCTIONS, PICKER_INSTRUCTIONS
+from sales_agent.fakes import FakeModel
+from sales_agent.pipeline import DraftStats, draft_and_pick
+
+# Median seconds per provider: slow with a heavy tail, medium, fast.
+PROVIDERS = [("deepseek", 0.6, 0.8), ("gemini", 0.3, 0.5), ("groq", 0.15, 0.5)]
+
+MODES: List[Tuple[str, Optional[int], Optional[float]]] = [
+    ("all 3 (gather)", None, None),
+    ("first 2 of 3", 2, None),
+    ("first 2 of 3, 0.5s deadline", 2, 0.5),
+    ("first 1 of 3", 1, None),
+]
+
+
+async def main(rounds: int, picker_latency: float, seed: int) -> None:
+    set_tracing_disabled(True)
+    rng = random.Random(seed)
+    drafters = [
+        Agent(
+            name=f"{name} sales agent",
+            instructions=instructions,
+            model=FakeModel(lognormal(median, rng, sigma)),
+        )
+        for (name, median, sigma), instructions in zip(PROVIDERS, INSTRUCTIONS)
+    ]
+    picker = Agent(
+        name="sales_picker",
+        instructions=PICKER_INSTRUCTIONS,
+        model=FakeModel(picker_latency),
+    )
+    message = "Write a cold sales email"
+    rows = []
+    for mode, k, deadline in MODES:
+        stats = DraftStats()
+        usage = Usage()
+        latencies = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await draft_and_pick(drafters, picker, message, usage, k, deadline, stats)
+            latencies.append(time.perf_counter() - start)
+        summary = summarize(latencies)
+        row: Dict[str, object] = {
+            "mode": mode,
+            "p50 (s)": summary["p50"],
+            "p95 (s)": summary["p95"],
+            "p99 (s)": summary["p99"],
+            "drafts used/round": (stats.used / stats.rounds if stats.rounds else 3.0),
+            "rounds with drops": f"{stats.drop_rate:.0%}",
+            "tokens used/round": usage.total_tokens / rounds,
+        }
+        rows.append(row)
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--picker-latency", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.picker_latency, args.seed))
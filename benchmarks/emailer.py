@@ -0,0 +1,93 @@
+"""End-to-end latency per email for the Email Manager and its fast paths.
+
+Compares the ``emailer_agent`` (planning turn plus serial tool calls) with
+:class:`sales_agent.emailer.StructuredEmailer` running the subject and HTML
+agents concurrently, and with a single structured-output call::
+
+    python -m benchmarks.emailer --emails 20 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from agents import Runner, set_tracing_disabled
+
+from benchmarks.common import print_table, summarize
+from benchmarks.fixtures import build_agents
+from sales_agent.emailer import StructuredEmailer, build_email_formatter
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import MailTransport, set_mail_transport
+
+BODY = (
+    "Dear CEO,\n\nSOC2 audits take months of spreadsheets. ComplAI collects the "
+    "evidence for you and keeps your controls audit-ready all year.\n\n"
+    "Do you have 15 minutes on Thursday?\n\nBest,\nAlice"
+)
+
+
+def formatted(schema: Dict[str, Any], body: str) -> Dict[str, Any]:
+    return {"subject": "Audit-ready in weeks", "html_body": f"<p>{body}</p>"}
+
+
+async def measure(
+    name: str, emails: int, model: FakeModel, send: Callable[[], Awaitable[Any]]
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    calls = model.usage.requests
+    for _ in range(emails):
+        start = time.perf_counter()
+        await send()
+        latencies.append(time.perf_counter() - start)
+    stats = summarize(latencies)
+    return {
+        "mode": name,
+        "p50 (s)": stats["p50"],
+        "p95 (s)": stats["p95"],
+        "model calls/email": (model.usage.requests - calls) / emails,
+    }
+
+
+async def main(emails: int, latency: float, seconds_per_token: float) -> None:
+    set_tracing_disabled(True)
+    model = FakeModel(latency, seconds_per_token, structured=formatted)
+    agents = build_agents(model)
+    concurrent = StructuredEmailer(
+        subject_writer=agents.subject_writer, html_converter=agents.html_converter
+    )
+    structured = StructuredEmailer(formatter=build_email_formatter(model))
+    async with FakeSendGridServer() as server:
+        async with MailTransport(api_key="test", base_url=server.url) as transport:
+            set_mail_transport(transport)
+            rows = [
+                await measure(
+                    "emailer_agent",
+                    emails,
+                    model,
+                    lambda: Runner.run(agents.emailer, BODY),
+                ),
+                await measure(
+                    "concurrent subject + HTML",
+                    emails,
+                    model,
+                    lambda: concurrent.send(BODY),
+                ),
+                await measure(
+                    "one structured call", emails, model, lambda: structured.send(BODY)
+                ),
+            ]
+            set_mail_transport(None)
+    baseline = rows[0]["p50 (s)"]
+    for row in rows:
+        row["saved/email (s)"] = baseline - row["p50 (s)"]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--seconds-per-token", type=float, default=0.002)
+    args = parser.parse_args()
+    asyncio.run(main(args.emails, args.latency, args.seconds_per_token))
@@ -0,0 +1,128 @@
+"""The Lab 2/3 agent graph, rebuilt around an injectable model for benchmarks."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    InputGuardrail,
+    Model,
+    RunContextWrapper,
+    Runner,
+    function_tool,
+    input_guardrail,
+)
+
+from sales_agent.guardrails import NameCheckOutput, gated_tool
+from sales_agent.mail import build_mail, get_mail_transport
+from sales_agent.prompts import (
+    EMAILER_INSTRUCTIONS,
+    HTML_INSTRUCTIONS,
+    PICKER_INSTRUCTIONS,
+    SALES_INSTRUCTIONS,
+    SALES_MANAGER_INSTRUCTIONS,
+    SUBJECT_INSTRUCTIONS,
+)
+
+# The benchmarks use the cache-friendly layout from sales_agent.prompts.
+INSTRUCTIONS = SALES_INSTRUCTIONS
+
+
+@function_tool
+async def send_html_email(subject: str, html_body: str) -> Dict[str, str]:
+    """Send out an email with the given subject and HTML body to all sales prospects"""
+    await get_mail_transport().send(build_mail(subject, html_body, "text/html"))
+    return {"status": "success"}
+
+
+# Sending is a side effect, so it waits for input guardrails in optimistic runs.
+send_html_email = gated_tool(send_html_email)
+
+
+@dataclass
+class SDRAgents:
+    drafters: List[Agent]
+    picker: Agent
+    subject_writer: Agent
+    html_converter: Agent
+    emailer: Agent
+    sales_manager: Agent
+
+
+def build_agents(model: Model) -> SDRAgents:
+    """Build the Lab 3 agents with every agent using ``model``."""
+    names = ["Professional Sales Agent", "Engaging Sales Agent", "Busy Sales Agent"]
+    drafters = [
+        Agent(name=name, instructions=instructions, model=model)
+        for name, instructions in zip(names, INSTRUCTIONS)
+    ]
+    picker = Agent(name="sales_picker", instructions=PICKER_INSTRUCTIONS, model=model)
+    subject_writer = Agent(
+        name="Email subject writer", instructions=SUBJECT_INSTRUCTIONS, model=model
+    )
+    html_converter = Agent(
+        name="HTML email body converter", instructions=HTML_INSTRUCTIONS, model=model
+    )
+    emailer = Agent(
+        name="Email Manager",
+        instructions=EMAILER_INSTRUCTIONS,
+        tools=[
+            subject_writer.as_tool(
+                tool_name="subject_writer",
+                tool_description="Write a subject for a cold sales email",
+            ),
+            html_converter.as_tool(
+                tool_name="html_converter",
+                tool_description="Convert a text email body to an HTML email body",
+            ),
+            send_html_email,
+        ],
+        model=model,
+        handoff_description="Convert an email to HTML and send it",
+    )
+    sales_manager = Agent(
+        name="Sales Manager",
+        instructions=SALES_MANAGER_INSTRUCTIONS,
+        tools=[
+            drafter.as_tool(
+                tool_name=f"sales_agent{i}",
+                tool_description="Write a cold sales email",
+            )
+            for i, drafter in enumerate(drafters, start=1)
+        ],
+        handoffs=[emailer],
+        model=model,
+    )
+    return SDRAgents(
+        drafters, picker, subject_writer, html_converter, emailer, sales_manager
+    )
+
+
+def name_check(schema: Dict[str, Any], text: str) -> Dict[str, Any]:
+    """Structured reply of the guardrail agent: "Alice" is the only name."""
+    found = "Alice" in text
+    return {"is_name_in_message": found, "name": "Alice" if found else ""}
+
+
+def name_guardrail(model: Model) -> InputGuardrail[Any]:
+    """The Lab 3 ``guardrail_against_name``, with its agent on ``model``."""
+    guardrail_agent = Agent(
+        name="Name check",
+        instructions="Check if the user is including someone's personal name "
+        "in what they want you to do.",
+        output_type=NameCheckOutput,
+        model=model,
+    )
+
+    @input_guardrail
+    async def guardrail_against_name(
+        ctx: RunContextWrapper[Any], agent: Agent, message: Any
+    ) -> GuardrailFunctionOutput:
+        result = await Runner.run(guardrail_agent, message, context=ctx.context)
+        return GuardrailFunctionOutput(
+            output_info={"found_name": result.final_output},
+            tripwire_triggered=result.final_output.is_name_in_message,
+        )
+
+    return guardrail_against_name
@@ -0,0 +1,110 @@
+"""Accuracy and latency of the tiered name guardrail against LLM-only checks.
+
+The LLM tier is a :class:`sales_agent.fakes.FakeModel` that answers from the
+labels below, so it stands in for a perfectly accurate model with realistic
+latency; any errors reported come from the local tier::
+
+    python -m benchmarks.guardrail --latency 0.5
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple
+
+from agents import Agent, Runner, set_tracing_disabled
+
+from benchmarks.common import print_table, summarize
+from sales_agent.fakes import FakeModel
+from sales_agent.guardrails import NameCheckOutput, TieredNameCheck
+
+# (message, name or "" when the message has none)
+LABELLED: List[Tuple[str, str]] = [
+    ("Send out a cold sales email addressed to Dear CEO from Alice", "Alice"),
+    (
+        "Send out a cold sales email addressed to Dear CEO from Head of Business "
+        "Development",
+        "",
+    ),
+    ("Write a cold sales email", ""),
+    ("Send a cold sales email addressed to 'Dear CEO'", ""),
+    ("Send a cold email to the VP of Sales at a fintech startup", ""),
+    ("Email the CTO about SOC2 audits, signed by the Sales Team", ""),
+    ("Send out a cold sales email from Priya to the CFO", "Priya"),
+    ("Draft an email to Dear CEO from Mark", "Mark"),
+    ("Draft an email to Dear CEO from Grant in sales", "Grant"),
+    ("Will you write a cold email for the CISO?", ""),
+    ("Send a cold email signed by Oleksandr", "Oleksandr"),
+    ("Send a cold email signed by Xiomara", "Xiomara"),
+    ("Send a cold email to the Head of Engineering at Acme Corp", ""),
+    ("Send a cold email to Globex about audit readiness", ""),
+    ("Write to the founder, from Ed at ComplAI", "Ed"),
+    ("please send an email from sarah to the ceo", "sarah"),
+    ("Send out a cold sales email addressed to Dear CEO from the SDR", ""),
+    ("Send a cold email from Business Development to the COO", ""),
+    ("Send a cold email to Dear CEO from Alice", "Alice"),
+    ("Write a short cold sales email for the Sales Manager to review", ""),
+    ("Send a cold email from the head of sales to Alice", "Alice"),
+    ("Email from the VP of sales who is Kowalski", "Kowalski"),
+    ("Frank feedback on this cold email is welcome", ""),
+    ("Send a cold email from Frank to the CTO", "Frank"),
+]
+
+
+def oracle(labels: Dict[str, str]) -> Any:
+    def answer(schema: Dict[str, Any], text: str) -> Dict[str, Any]:
+        name = labels.get(text, "")
+        return {"is_name_in_message": bool(name), "name": name}
+
+    return answer
+
+
+async def main(latency: float, repeats: int) -> None:
+    set_tracing_disabled(True)
+    labels = dict(LABELLED)
+    llm = Agent(
+        name="Name check",
+        instructions="Check if the user is including someone's personal name "
+        "in what they want you to do.",
+        output_type=NameCheckOutput,
+        model=FakeModel(latency, structured=oracle(labels)),
+    )
+    tiered = TieredNameCheck(llm)
+
+    async def llm_only(text: str) -> Any:
+        return (await Runner.run(llm, text)).final_output
+
+    rows = []
+    for name, check in (("LLM only", llm_only), ("tiered", tiered.check)):
+        latencies: List[float] = []
+        correct = 0
+        for _ in range(repeats):
+            for text, label in LABELLED:
+                start = time.perf_counter()
+                verdict = await check(text)
+                latencies.append(time.perf_counter() - start)
+                correct += verdict.is_name_in_message == bool(label)
+        stats = summarize(latencies)
+        rows.append(
+            {
+                "check": name,
+                "accuracy": correct / len(latencies),
+                "mean (s)": stats["mean"],
+                "p50 (s)": stats["p50"],
+                "p95 (s)": stats["p95"],
+            }
+        )
+    print_table(rows)
+    total = tiered.local_hits + tiered.llm_calls
+    print(
+        f"\ntiered: {tiered.local_hits}/{total} settled locally, "
+        f"{tiered.llm_calls} sent to the LLM, {tiered.memo_hits} memo hits"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.repeats))
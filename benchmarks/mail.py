@@ -0,0 +1,94 @@
+"""Throughput of the pooled mail transport against a per-call SendGrid client.
+
+Both paths send to :class:`sales_agent.fakes.FakeSendGridServer`, so no account
+is needed::
+
+    python -m benchmarks.mail --emails 200 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict
+
+import sendgrid
+
+from benchmarks.common import print_table
+from sales_agent.fakes import FakeSendGridServer, StubHTTPServer
+from sales_agent.mail import MailTransport, build_mail
+
+
+async def per_call_client(server: StubHTTPServer, emails: int) -> float:
+    """The original lab pattern: new client and a blocking post per email."""
+    start = time.perf_counter()
+    for i in range(emails):
+        sg = sendgrid.SendGridAPIClient(api_key="test", host=server.url)
+        sg.client.mail.send.post(request_body=build_mail(f"Email {i}", "Hello"))
+    return time.perf_counter() - start
+
+
+async def pooled_transport(
+    server: StubHTTPServer, emails: int, concurrency: int
+) -> float:
+    start = time.perf_counter()
+    async with MailTransport(
+        api_key="test", base_url=server.url, max_concurrency=concurrency
+    ) as transport:
+        await asyncio.gather(
+            *(transport.send(build_mail(f"Email {i}", "Hello")) for i in range(emails))
+        )
+    return time.perf_counter() - start
+
+
+async def loop_stall(server: StubHTTPServer, pooled: bool) -> float:
+    """Longest gap seen by a 1ms ticker while ten emails are sent."""
+    gaps = []
+
+    async def ticker(stop: asyncio.Event) -> None:
+        last = time.perf_counter()
+        while not stop.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    stop = asyncio.Event()
+    task = asyncio.ensure_future(ticker(stop))
+    await asyncio.sleep(0.005)
+    if pooled:
+        await pooled_transport(server, 10, 10)
+    else:
+        await per_call_client(server, 10)
+    stop.set()
+    await task
+    return max(gaps)
+
+
+async def main(emails: int, latency: float, concurrency: int) -> None:
+    rows = []
+    with FakeSendGridServer(latency=latency).running_in_thread() as server:
+        for name, pooled in (("per-call client", False), ("pooled transport", True)):
+            before = server.connections
+            if pooled:
+                elapsed = await pooled_transport(server, emails, concurrency)
+            else:
+                elapsed = await per_call_client(server, emails)
+            row: Dict[str, object] = {
+                "mode": name,
+                "emails": emails,
+                "seconds": elapsed,
+                "emails/s": emails / elapsed,
+                "connections": server.connections - before,
+                "max loop stall (s)": await loop_stall(server, pooled),
+            }
+            rows.append(row)
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.emails, args.latency, args.concurrency))
@@ -0,0 +1,99 @@
+"""Recipients per second for the mail merge against one request per email.
+
+A synthetic prospect CSV is written to a temporary file and streamed to
+:class:`sales_agent.fakes.FakeSendGridServer`::
+
+    python -m benchmarks.mailmerge --prospects 20000 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import tempfile
+import time
+
+from benchmarks.common import print_table
+from sales_agent.fakes import FakeSendGridServer
+from sales_agent.mail import MailTransport, build_mail
+from sales_agent.mailmerge import read_prospects, send_mail_merge
+
+SUBJECT = "-first_name-, is -company- audit-ready?"
+BODY = "<p>Dear -first_name-,</p><p>ComplAI gets -company- SOC2-ready.</p>"
+
+
+def write_prospects(path: str, count: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["email", "name", "first_name", "company"])
+        for i in range(count):
+            writer.writerow(
+                [f"ceo{i}@example.com", f"Prospect {i}", f"Alex{i}", f"Corp {i}"]
+            )
+
+
+async def one_per_email(transport: MailTransport, path: str) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            transport.send(
+                build_mail(
+                    SUBJECT.replace("-first_name-", row["first_name"]),
+                    BODY.replace("-first_name-", row["first_name"]),
+                    content_type="text/html",
+                    to_email=row["email"],
+                )
+            )
+            for row in read_prospects(path)
+        )
+    )
+    return time.perf_counter() - start
+
+
+async def main(prospects: int, latency: float, baseline_limit: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "prospects.csv")
+        write_prospects(path, prospects)
+        async with FakeSendGridServer(latency=latency) as server:
+            async with MailTransport(api_key="test", base_url=server.url) as transport:
+                report = await send_mail_merge(
+                    read_prospects(path), SUBJECT, BODY, transport=transport
+                )
+                rows = [
+                    {
+                        "mode": "mail merge",
+                        "recipients": report.recipients,
+                        "requests": report.requests,
+                        "seconds": report.seconds,
+                        "recipients/s": report.recipients_per_second,
+                    }
+                ]
+                baseline_path = os.path.join(tmp, "baseline.csv")
+                write_prospects(baseline_path, min(prospects, baseline_limit))
+                before = server.requests
+                elapsed = await one_per_email(transport, baseline_path)
+                sent = server.requests - before
+                rows.append(
+                    {
+                        "mode": "one request per email",
+                        "recipients": sent,
+                        "requests": sent,
+                        "seconds": elapsed,
+                        "recipients/s": sent / elapsed,
+                    }
+                )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prospects", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument(
+        "--baseline-limit",
+        type=int,
+        default=2000,
+        help="cap on emails sent one at a time, which is much slower",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.prospects, args.latency, args.baseline_limit))
@@ -0,0 +1,82 @@
+"""Time, queue wait, tokens and cost per agent, tool and handoff of the SDR flow.
+
+Runs the Lab 2 Sales Manager (three drafting tools, then a handoff to the
+Email Manager) against :class:`sales_agent.fakes.FakeOpenAIServer` through a
+:class:`sales_agent.clients.ClientPool` whose
+:class:`sales_agent.scheduler.RateScheduler` enforces ``--rpm``, with
+:class:`sales_agent.metrics.MetricsProcessor` as the only trace processor, so
+nothing leaves the machine. Prints the spans by total time, then the cost of
+each agent::
+
+    python -m benchmarks.metrics --runs 20 --rpm 600 --prometheus metrics.prom
+"""
+
+import argparse
+import asyncio
+import random
+from typing import Dict, Optional
+
+from agents import Runner, set_trace_processors, set_tracing_disabled
+
+from benchmarks.common import lognormal, print_table
+from benchmarks.fixtures import build_agents
+from sales_agent.clients import ClientPool
+from sales_agent.fakes import FakeOpenAIServer, FakeSendGridServer
+from sales_agent.mail import MailTransport, set_mail_transport
+from sales_agent.metrics import MetricsProcessor
+from sales_agent.scheduler import RateScheduler
+
+MESSAGE = "Send a cold sales email addressed to 'Dear CEO'"
+
+
+async def main(
+    runs: int,
+    latency: float,
+    rpm: float,
+    prometheus: Optional[str],
+    jsonl: Optional[str],
+) -> None:
+    rng = random.Random(7)
+    metrics = MetricsProcessor(jsonl_path=jsonl)
+    set_trace_processors([metrics])
+    set_tracing_disabled(False)
+
+    llm = FakeOpenAIServer(lognormal(latency, rng))
+    sendgrid = FakeSendGridServer()
+    async with llm, sendgrid:
+        base_url = llm.url + "/v1"
+        scheduler = RateScheduler({base_url: (rpm, None)}, adaptive=False)
+        async with ClientPool(scheduler=scheduler) as pool:
+            agents = build_agents(pool.model("gpt-4o-mini", base_url, "test"))
+            async with MailTransport(api_key="test", base_url=sendgrid.url) as mail:
+                set_mail_transport(mail)
+                for _ in range(runs):
+                    await Runner.run(agents.sales_manager, MESSAGE)
+                set_mail_transport(None)
+    metrics.shutdown()
+
+    print_table(metrics.summary())
+    print()
+    totals: Dict[str, float] = {}
+    for labels, dollars in metrics.costs.items():
+        agent = dict(labels)["agent"]
+        totals[agent] = totals.get(agent, 0.0) + dollars
+    print_table(
+        [
+            {"agent": agent, "cost per run ($)": dollars / runs}
+            for agent, dollars in sorted(totals.items(), key=lambda kv: -kv[1])
+        ]
+    )
+    if prometheus:
+        metrics.write_prometheus(prometheus)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rpm", type=float, default=1200.0)
+    parser.add_argument("--prometheus", help="write Prometheus text here")
+    parser.add_argument("--jsonl", help="append one JSON line per span here")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.latency, args.rpm, args.prometheus, args.jsonl))
@@ -0,0 +1,92 @@
+"""p50/p95 latency of the careful Sales Manager with and without run_optimistic.
+
+"Runner.run" is ``Runner.run(careful_sales_manager, ...)`` exactly as Lab 3
+calls it, so the installed SDK decides when the input guardrail runs.
+"optimistic" is :func:`sales_agent.guardrails.run_optimistic`. Model latency
+is log-normal, the difference in p50 and p95 is printed after the table, and
+a tripped run is checked to have sent no email::
+
+    python -m benchmarks.optimistic --runs 30 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List
+
+from agents import Agent, InputGuardrailTripwireTriggered, Runner, set_tracing_disabled
+
+from benchmarks.common import lognormal, print_table, summarize
+from benchmarks.fixtures import build_agents, name_check, name_guardrail
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.guardrails import run_optimistic
+from sales_agent.mail import MailTransport, set_mail_transport
+
+SAFE = (
+    "Send out a cold sales email addressed to Dear CEO from Head of Business "
+    "Development"
+)
+NAMED = "Send out a cold sales email addressed to Dear CEO from Alice"
+
+
+async def runner_run(agent: Agent, message: str) -> Any:
+    return await Runner.run(agent, message)
+
+
+async def main(runs: int, latency: float, guardrail_latency: float) -> None:
+    set_tracing_disabled(True)
+    rng = random.Random(7)
+    agents = build_agents(FakeModel(lognormal(latency, rng)))
+    guardrail_model = FakeModel(
+        lognormal(guardrail_latency, rng), structured=name_check
+    )
+    careful = agents.sales_manager.clone(
+        input_guardrails=[name_guardrail(guardrail_model)]
+    )
+
+    rows: List[Dict[str, Any]] = []
+    async with FakeSendGridServer() as server:
+        async with MailTransport(api_key="test", base_url=server.url) as transport:
+            set_mail_transport(transport)
+            for name, run in (
+                ("Runner.run", runner_run),
+                ("optimistic", run_optimistic),
+            ):
+                latencies: List[float] = []
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    await run(careful, SAFE)
+                    latencies.append(time.perf_counter() - start)
+                before = len(server.mails)
+                try:
+                    await run(careful, NAMED)
+                except InputGuardrailTripwireTriggered:
+                    pass
+                await asyncio.sleep(latency * 5)
+                stats = summarize(latencies)
+                rows.append(
+                    {
+                        "mode": name,
+                        "p50 (s)": stats["p50"],
+                        "p95 (s)": stats["p95"],
+                        "emails sent after tripwire": len(server.mails) - before,
+                    }
+                )
+            set_mail_transport(None)
+    print_table(rows)
+    baseline, optimistic = rows
+    print(
+        f"\noptimistic vs Runner.run: p50 "
+        f"{optimistic['p50 (s)'] - baseline['p50 (s)']:+.3f} s, p95 "
+        f"{optimistic['p95 (s)'] - baseline['p95 (s)']:+.3f} s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--guardrail-latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.latency, args.guardrail_latency))
@@ -0,0 +1,116 @@
+"""Sales Manager latency with email sent inline or queued in the outbox.
+
+SendGrid is a :class:`sales_agent.fakes.FakeSendGridServer` that is slow and
+fails a share of requests. "inline" sends from the ``send_html_email`` tool,
+as the labs do, so every run waits for the mail API, and a failed send is
+only reported to the model as a tool error: the email is lost.
+"outbox" queues the mail in :class:`sales_agent.outbox.Outbox`, and a
+:class:`sales_agent.outbox.Dispatcher` delivers it with retries::
+
+    python -m benchmarks.outbox --runs 20 --mail-latency 0.5 --mail-error-rate 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from agents import Runner, set_tracing_disabled
+
+from benchmarks.common import lognormal, print_table, summarize
+from benchmarks.fixtures import build_agents
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import (
+    MailSender,
+    MailTransport,
+    recipient,
+    set_mail_transport,
+)
+from sales_agent.outbox import Dispatcher, Outbox
+from sales_agent.tokenbucket import TokenBucket
+
+MESSAGE = "Send out a cold sales email addressed to Dear CEO"
+
+
+async def run_manager(
+    runs: int, latency: float, sender: MailSender, seed: int
+) -> Dict[str, Any]:
+    set_mail_transport(sender)
+    agents = build_agents(FakeModel(lognormal(latency, random.Random(seed))))
+    latencies: List[float] = []
+    failed = 0
+    for i in range(runs):
+        start = time.perf_counter()
+        try:
+            # A different prospect each run, so each mail has its own key.
+            with recipient(f"prospect{i}@example.com", f"benchmark:{i}"):
+                await Runner.run(agents.sales_manager, MESSAGE)
+        except Exception:
+            failed += 1
+        latencies.append(time.perf_counter() - start)
+    set_mail_transport(None)
+    return {"latencies": latencies, "failed": failed}
+
+
+async def main(
+    runs: int, latency: float, mail_latency: float, mail_error_rate: float
+) -> None:
+    set_tracing_disabled(True)
+    rows = []
+    async with FakeSendGridServer(
+        latency=mail_latency, error_rate=mail_error_rate, seed=7
+    ) as server:
+        async with MailTransport(api_key="test", base_url=server.url) as transport:
+            outcome = await run_manager(runs, latency, transport, seed=1)
+            stats = summarize(outcome["latencies"])
+            rows.append(
+                {
+                    "mode": "inline",
+                    "p50 (s)": stats["p50"],
+                    "p95 (s)": stats["p95"],
+                    "failed runs": outcome["failed"],
+                    "delivered": len(server.mails),
+                    "drain (s)": 0.0,
+                }
+            )
+
+            server.mails.clear()
+            with tempfile.TemporaryDirectory() as tmp:
+                outbox = Outbox(os.path.join(tmp, "outbox.db"))
+                dispatcher = Dispatcher(
+                    outbox, transport, bucket=TokenBucket(20), backoff=0.05
+                )
+                dispatcher.start()
+                outcome = await run_manager(runs, latency, outbox, seed=1)
+                start = time.perf_counter()
+                await dispatcher.drain()
+                await dispatcher.stop()
+                drain = time.perf_counter() - start
+                outbox.close()
+            stats = summarize(outcome["latencies"])
+            rows.append(
+                {
+                    "mode": "outbox",
+                    "p50 (s)": stats["p50"],
+                    "p95 (s)": stats["p95"],
+                    "failed runs": outcome["failed"],
+                    "delivered": len(server.mails),
+                    "drain (s)": drain,
+                }
+            )
+    print_table(rows)
+    print()
+    print(f"outbox: {dispatcher.retries} retries, {dispatcher.failed} failed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--mail-latency", type=float, default=0.5)
+    parser.add_argument("--mail-error-rate", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.latency, args.mail_latency, args.mail_error_rate))
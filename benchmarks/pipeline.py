@@ -0,0 +1,85 @@
+"""Latency and token use of the agentic Sales Manager against SalesPipeline.
+
+Every agent runs on :class:`sales_agent.fakes.FakeModel` and emails go to
+:class:`sales_agent.fakes.FakeSendGridServer`, so the numbers reflect the
+number and size of model round-trips rather than any provider. Usage is read
+from the shared model, so nested ``as_tool`` runs are counted too::
+
+    python -m benchmarks.pipeline --runs 20 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from agents import Runner, set_tracing_disabled
+
+from benchmarks.common import print_table, summarize
+from benchmarks.fixtures import build_agents
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import MailTransport, set_mail_transport
+from sales_agent.pipeline import SalesPipeline
+
+MESSAGE = "Send out a cold sales email addressed to Dear CEO from Alice"
+
+
+async def measure(
+    name: str, runs: int, model: FakeModel, once: Callable[[], Awaitable[Any]]
+) -> Dict[str, object]:
+    latencies: List[float] = []
+    before = model.usage.requests, model.usage.input_tokens, model.usage.output_tokens
+    for _ in range(runs):
+        start = time.perf_counter()
+        await once()
+        latencies.append(time.perf_counter() - start)
+    stats = summarize(latencies)
+    return {
+        "mode": name,
+        "p50 (s)": stats["p50"],
+        "p95 (s)": stats["p95"],
+        "model calls/run": (model.usage.requests - before[0]) / runs,
+        "input tokens/run": (model.usage.input_tokens - before[1]) / runs,
+        "output tokens/run": (model.usage.output_tokens - before[2]) / runs,
+    }
+
+
+async def main(runs: int, latency: float, seconds_per_token: float) -> None:
+    set_tracing_disabled(True)
+    rows = []
+    async with FakeSendGridServer() as server:
+        async with MailTransport(api_key="test", base_url=server.url) as transport:
+            set_mail_transport(transport)
+            for parallel in (False, True):
+                model = FakeModel(
+                    latency, seconds_per_token, parallel_tool_calls=parallel
+                )
+                agents = build_agents(model)
+
+                async def agentic() -> None:
+                    await Runner.run(agents.sales_manager, MESSAGE)
+
+                label = "parallel" if parallel else "sequential"
+                rows.append(
+                    await measure(
+                        f"agentic manager ({label} tools)", runs, model, agentic
+                    )
+                )
+
+            pipeline = SalesPipeline(agents.drafters, agents.picker, agents.emailer)
+            rows.append(
+                await measure(
+                    "SalesPipeline", runs, model, lambda: pipeline.run(MESSAGE)
+                )
+            )
+            set_mail_transport(None)
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--seconds-per-token", type=float, default=0.002)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.latency, args.seconds_per_token))
@@ -0,0 +1,118 @@
+"""Provider prompt-cache hits for the lab prompt layout and the shared prefix.
+
+The lab layout puts each drafter's persona first and the company context
+after it; :mod:`sales_agent.prompts` puts one byte-stable context first. Both
+are measured with a long company brief (synthetic product facts, as a
+production prompt would carry) on :class:`sales_agent.fakes.FakeModel`, which
+mimics OpenAI's prompt caching (1024-token minimum, 128-token blocks). The
+picker and subject writer carry no brief in either layout::
+
+    python -m benchmarks.prompt_cache --runs 10
+"""
+
+import argparse
+import asyncio
+from typing import Callable, Dict, List
+
+from agents import Agent, set_tracing_disabled
+
+from benchmarks.common import print_table
+from sales_agent.emailer import StructuredEmailer
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import MailTransport
+from sales_agent.pipeline import SalesPipeline
+from sales_agent.prompts import (
+    COMPANY_CONTEXT,
+    PERSONAS,
+    PICKER_INSTRUCTIONS,
+    SUBJECT_INSTRUCTIONS,
+    PromptCacheMeter,
+    with_context,
+)
+
+# gpt-4o-mini list prices in dollars per million input tokens.
+INPUT_PRICE = 0.15
+CACHED_PRICE = 0.075
+
+FACTS = [
+    "ComplAI maps every policy to the SOC2 trust services criteria it covers.",
+    "Evidence is collected automatically from cloud, HR and ticketing tools.",
+    "Auditors get read-only access to a single, always current evidence room.",
+    "Controls are monitored continuously and drift raises an alert the same day.",
+    "Typical customers reach audit readiness in weeks rather than months.",
+]
+BRIEF = COMPANY_CONTEXT + "".join(
+    f"Fact {i + 1}: {FACTS[i % len(FACTS)]}\n" for i in range(80)
+)
+
+
+def lab_layout(role: str) -> str:
+    return role + "\n\n" + BRIEF
+
+
+def shared_prefix(role: str) -> str:
+    return with_context(role, BRIEF)
+
+
+async def measure(
+    layout: Callable[[str], str], runs: int, transport: MailTransport
+) -> List[Dict[str, object]]:
+    model = FakeModel(prompt_cache_min_tokens=1024, reply_tokens=120)
+    meter = PromptCacheMeter()
+    drafters = [
+        meter.wrap(
+            Agent(name=f"{persona} drafter", instructions=layout(text), model=model)
+        )
+        for persona, text in PERSONAS.items()
+    ]
+    picker = meter.wrap(
+        Agent(name="sales_picker", instructions=PICKER_INSTRUCTIONS, model=model)
+    )
+    subject_writer = meter.wrap(
+        Agent(
+            name="Email subject writer", instructions=SUBJECT_INSTRUCTIONS, model=model
+        )
+    )
+    emailer = StructuredEmailer(subject_writer=subject_writer, transport=transport)
+    pipeline = SalesPipeline(drafters, picker, emailer)
+    rows = []
+    for run in range(runs):
+        await pipeline.run(f"Write a cold sales email to prospect {run}")
+        if run == 0 or run == runs - 1:
+            total = meter.report()[-1]
+            uncached = int(str(total["uncached"]))
+            cached = int(str(total["cached"]))
+            rows.append(
+                {
+                    "after runs": run + 1,
+                    "input tokens": total["input tokens"],
+                    "cached": cached,
+                    "hit rate": total["hit rate"],
+                    "input $/1k runs": (uncached * INPUT_PRICE + cached * CACHED_PRICE)
+                    / 1e6
+                    * 1000
+                    / (run + 1),
+                }
+            )
+    return rows
+
+
+async def main(runs: int) -> None:
+    set_tracing_disabled(True)
+    rows = []
+    async with FakeSendGridServer() as server:
+        async with MailTransport(api_key="test", base_url=server.url) as transport:
+            for name, layout in (
+                ("role first (labs)", lab_layout),
+                ("shared prefix", shared_prefix),
+            ):
+                for row in await measure(layout, runs, transport):
+                    rows.append({"layout": name, **row})
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs))
@@ -0,0 +1,57 @@
+"""Local HTML rendering against the ``html_converter`` model call.
+
+python -m benchmarks.render --renders 10000 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import time
+
+from agents import Runner, set_tracing_disabled
+
+from benchmarks.common import print_table
+from benchmarks.emailer import BODY
+from benchmarks.fixtures import build_agents
+from sales_agent.fakes import FakeModel
+from sales_agent.render import LAYOUTS, render_email
+
+
+async def main(renders: int, calls: int, latency: float, per_token: float) -> None:
+    set_tracing_disabled(True)
+    rows = []
+    for layout in LAYOUTS:
+        start = time.perf_counter()
+        for _ in range(renders):
+            render_email(BODY, layout)
+        elapsed = (time.perf_counter() - start) / renders
+        rows.append(
+            {
+                "converter": f"render_email ({layout})",
+                "per email (ms)": elapsed * 1000,
+                "tokens/email": 0,
+            }
+        )
+
+    model = FakeModel(latency, per_token)
+    converter = build_agents(model).html_converter
+    start = time.perf_counter()
+    for _ in range(calls):
+        await Runner.run(converter, BODY)
+    rows.append(
+        {
+            "converter": "html_converter agent (FakeModel)",
+            "per email (ms)": (time.perf_counter() - start) / calls * 1000,
+            "tokens/email": model.usage.total_tokens // calls,
+        }
+    )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--seconds-per-token", type=float, default=0.002)
+    args = parser.parse_args()
+    asyncio.run(main(args.renders, args.calls, args.latency, args.seconds_per_token))
@@ -0,0 +1,139 @@
+"""Pinned providers against :class:`sales_agent.router.ModelRouter`.
+
+Three fake OpenAI-compatible servers stand in for DeepSeek, Gemini and Groq.
+Each round drafts three emails with ``asyncio.gather``, as the Sales Manager's
+tools do. Halfway through, one provider slows down sharply; one fails a share
+of its requests throughout::
+
+    python -m benchmarks.router --rounds 60
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Mapping
+
+from agents import (
+    Agent,
+    Model,
+    OpenAIChatCompletionsModel,
+    Runner,
+    set_tracing_disabled,
+)
+from openai import AsyncOpenAI
+
+from benchmarks.common import lognormal, print_table, summarize
+from benchmarks.fixtures import INSTRUCTIONS
+from sales_agent.fakes import FakeOpenAIServer
+from sales_agent.router import ModelRouter
+
+PROVIDERS = {
+    "deepseek": ("deepseek-chat", 0.25),
+    "gemini": ("gemini-2.0-flash", 0.15),
+    "groq": ("llama-3.3-70b-versatile", 0.1),
+}
+
+
+async def run_rounds(
+    drafters: List[Agent],
+    rounds: int,
+    servers: Mapping[str, FakeOpenAIServer],
+    slow: str,
+    slow_latency: float,
+) -> Dict[str, Any]:
+    latencies = []
+    failed = 0
+    original = servers[slow].latency
+    try:
+        for i in range(rounds):
+            if i == rounds // 2:
+                servers[slow].latency = slow_latency
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(Runner.run(d, "Write a cold sales email") for d in drafters),
+                return_exceptions=True,
+            )
+            latencies.append(time.perf_counter() - start)
+            failed += any(isinstance(r, BaseException) for r in results)
+    finally:
+        servers[slow].latency = original
+    return {"latencies": latencies, "failed": failed}
+
+
+async def main(rounds: int, error_rate: float, slow_latency: float, seed: int) -> None:
+    set_tracing_disabled(True)
+    rng = random.Random(seed)
+    servers = {
+        name: FakeOpenAIServer(
+            latency=lognormal(median, rng),
+            error_rate=error_rate if name == "groq" else 0.0,
+            error_status=503,
+            seed=seed,
+        )
+        for name, (_, median) in PROVIDERS.items()
+    }
+    clients = []
+    try:
+        models: Dict[str, Model] = {}
+        for name, (model_name, _) in PROVIDERS.items():
+            await servers[name].start()
+            client = AsyncOpenAI(
+                base_url=servers[name].url + "/v1", api_key="test", max_retries=0
+            )
+            clients.append(client)
+            models[name] = OpenAIChatCompletionsModel(model_name, client)
+
+        pinned = [
+            Agent(name=f"Sales Agent {i}", instructions=instructions, model=model)
+            for i, (instructions, model) in enumerate(
+                zip(INSTRUCTIONS, models.values()), start=1
+            )
+        ]
+        router = ModelRouter(models, cooldown=5.0)
+        routed = [agent.clone(model=router) for agent in pinned]
+
+        rows = []
+        for mode, drafters in (("pinned", pinned), ("router", routed)):
+            outcome = await run_rounds(
+                drafters, rounds, servers, "deepseek", slow_latency
+            )
+            stats = summarize(outcome["latencies"])
+            rows.append(
+                {
+                    "mode": mode,
+                    "p50 (s)": stats["p50"],
+                    "p95 (s)": stats["p95"],
+                    "p99 (s)": stats["p99"],
+                    "failed rounds": outcome["failed"],
+                }
+            )
+        print_table(rows)
+        print()
+        print(f"router: {router.hedges} hedges, {router.failovers} failovers")
+        print_table(
+            [
+                {
+                    "backend": name,
+                    "requests": stats.requests,
+                    "failures": stats.failures,
+                    "median (s)": stats.latency or 0.0,
+                }
+                for name, stats in router.stats.items()
+            ]
+        )
+    finally:
+        for client in clients:
+            await client.close()
+        for server in servers.values():
+            await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.error_rate, args.slow_latency, args.seed))
@@ -0,0 +1,124 @@
+"""Drafting under provider quotas: SDK retries, fixed buckets, adaptive scheduler.
+
+Three fake providers enforce request and token quotas the way OpenAI does. As
+with the real services, only Groq reports its limits in ``x-ratelimit-*``
+headers. Every prospect drafts with all three at once, and a few interactive
+requests, a guardrail check a user is waiting on say, arrive while the
+campaign is running. The quotas the campaign is configured with are guesses:
+DeepSeek's is four times what the provider allows and Groq's token quota is not
+configured at all::
+
+    python -m benchmarks.scheduler --prospects 120
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.common import print_table, summarize
+from sales_agent.clients import ClientPool
+from sales_agent.fakes import FakeOpenAIServer
+from sales_agent.scheduler import INTERACTIVE, RateScheduler, priority
+
+# Provider: (requests/min, tokens/min, sends rate-limit headers).
+QUOTAS: Dict[str, Tuple[float, Optional[float], bool]] = {
+    "deepseek": (60, None, False),
+    "gemini": (300, None, False),
+    "groq": (300, 30_000, True),
+}
+# What the campaign believes: (requests/min, tokens/min).
+GUESSES: Dict[str, Tuple[Optional[float], Optional[float]]] = {
+    "deepseek": (240, None),
+    "gemini": (300, None),
+    "groq": (300, None),
+}
+MAX_TOKENS = 200
+
+
+async def run(
+    mode: str,
+    servers: Dict[str, FakeOpenAIServer],
+    prospects: int,
+    interactive: int,
+) -> Dict[str, Any]:
+    limits = {servers[name].url + "/v1": guess for name, guess in GUESSES.items()}
+    scheduler = None
+    if mode != "SDK retries":
+        scheduler = RateScheduler(limits, adaptive=mode == "adaptive")
+    rate_limited = sum(s.rate_limited for s in servers.values())
+    async with ClientPool(scheduler=scheduler) as pool:
+        clients = {
+            name: pool.client(server.url + "/v1", "test")
+            for name, server in servers.items()
+        }
+
+        async def draft(name: str) -> Optional[float]:
+            start = time.perf_counter()
+            try:
+                await clients[name].chat.completions.create(
+                    model=name,
+                    messages=[{"role": "user", "content": "Write a cold sales email"}],
+                    max_tokens=MAX_TOKENS,
+                )
+            except Exception:
+                return None
+            return time.perf_counter() - start
+
+        async def urgent() -> List[Optional[float]]:
+            await asyncio.sleep(2.0)
+            with priority(INTERACTIVE):
+                return await asyncio.gather(
+                    *(draft("groq") for _ in range(interactive))
+                )
+
+        start = time.perf_counter()
+        bulk, checks = await asyncio.gather(
+            asyncio.gather(
+                *(draft(name) for _ in range(prospects) for name in servers)
+            ),
+            urgent(),
+        )
+        elapsed = time.perf_counter() - start
+    done = [seconds for seconds in bulk if seconds is not None]
+    checked = [seconds for seconds in checks if seconds is not None]
+    return {
+        "mode": mode,
+        "drafts": len(done),
+        "failed": len(bulk) - len(done) + len(checks) - len(checked),
+        "429s": sum(s.rate_limited for s in servers.values()) - rate_limited,
+        "drafts/s": len(done) / elapsed,
+        "p95 (s)": summarize(done)["p95"],
+        "interactive p50 (s)": summarize(checked)["p50"],
+    }
+
+
+async def main(prospects: int, interactive: int) -> None:
+    rows = []
+    for mode in ("SDK retries", "fixed buckets", "adaptive"):
+        # Fresh servers, so every mode starts with full quotas.
+        servers = {
+            name: FakeOpenAIServer(
+                latency=0.2,
+                requests_per_minute=rpm,
+                tokens_per_minute=tpm,
+                rate_limit_headers=headers,
+            )
+            for name, (rpm, tpm, headers) in QUOTAS.items()
+        }
+        for server in servers.values():
+            await server.start()
+        try:
+            rows.append(await run(mode, servers, prospects, interactive))
+        finally:
+            for server in servers.values():
+                await server.stop()
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prospects", type=int, default=120)
+    parser.add_argument("--interactive", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.prospects, args.interactive))
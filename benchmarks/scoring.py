@@ -0,0 +1,95 @@
+"""Local draft scoring against the ``sales_picker`` LLM judge.
+
+Candidates are synthetic drafts that vary in length, calls to action, spam
+words and shouting. The LLM picker runs on :class:`sales_agent.fakes.FakeModel`
+with a fixed latency; its prompt, and so its input tokens, grows with the
+number of candidates::
+
+    python -m benchmarks.scoring --candidates 3 10 50
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import List, Sequence
+
+from agents import Agent, Runner, Usage, set_tracing_disabled
+
+from benchmarks.common import print_table
+from benchmarks.fixtures import PICKER_INSTRUCTIONS
+from sales_agent.fakes import FakeModel
+from sales_agent.pipeline import PICKER_SEPARATOR, picker_prompt
+from sales_agent.scoring import HeuristicScorer, LocalPicker
+
+SENTENCES = [
+    "Audits eat weeks of your team's time.",
+    "ComplAI collects SOC2 evidence for you automatically.",
+    "Your controls are monitored continuously, so audit prep is a non-event.",
+    "Customers like yours cut audit preparation from months to days.",
+    "We map your policies to every SOC2 control in one place.",
+    "Our platform leverages synergistic paradigms for holistic compliance "
+    "transformation across heterogeneous infrastructural ecosystems.",
+]
+CTAS = [
+    "Would you be open to a 15-minute call next week?",
+    "Reply to this email and I'll send over a short demo.",
+]
+SPAM = ["This is a LIMITED TIME offer, act now!!!", "100% guaranteed, risk-free!"]
+
+
+def candidate(rng: random.Random) -> str:
+    body = [rng.choice(SENTENCES) for _ in range(rng.randint(2, 12))]
+    if rng.random() < 0.6:
+        body.append(rng.choice(CTAS))
+    if rng.random() < 0.3:
+        body.insert(rng.randrange(len(body)), rng.choice(SPAM))
+    return "Dear CEO,\n\n" + " ".join(body) + "\n\nBest,\nHead of Business Development"
+
+
+async def main(
+    counts: Sequence[int], prospects: int, latency: float, seed: int
+) -> None:
+    set_tracing_disabled(True)
+    rng = random.Random(seed)
+    rows = []
+    for n in counts:
+        pools: List[List[str]] = [
+            [candidate(rng) for _ in range(n)] for _ in range(prospects)
+        ]
+        model = FakeModel(latency, reply=lambda text: text.split(PICKER_SEPARATOR)[-1])
+        picker = Agent(
+            name="sales_picker", instructions=PICKER_INSTRUCTIONS, model=model
+        )
+        local = LocalPicker(HeuristicScorer(), picker=picker)
+        for name, judge in (("sales_picker (LLM)", picker), ("LocalPicker", local)):
+            usage = Usage()
+            start = time.perf_counter()
+            for drafts in pools:
+                if isinstance(judge, LocalPicker):
+                    await judge.pick(drafts, usage)
+                else:
+                    result = await Runner.run(judge, picker_prompt(drafts))
+                    usage.add(result.context_wrapper.usage)
+            elapsed = time.perf_counter() - start
+            rows.append(
+                {
+                    "candidates": n,
+                    "picker": name,
+                    "ms/prospect": elapsed / prospects * 1000,
+                    "LLM calls/prospect": usage.requests / prospects,
+                    "input tokens/prospect": usage.input_tokens / prospects,
+                }
+            )
+        print(f"{n} candidates: {local.llm_picks}/{prospects} close calls sent to LLM")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[3, 10, 50])
+    parser.add_argument("--prospects", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.candidates, args.prospects, args.latency, args.seed))
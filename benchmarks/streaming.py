@@ -0,0 +1,109 @@
+"""Time to email sent: stage-by-stage SalesPipeline against StreamingPipeline.
+
+Drafters and the picker stream their replies a word at a time from
+:class:`sales_agent.fakes.FakeModel`; the picker repeats one of the drafts,
+as ``sales_picker`` is told to. Emails go to
+:class:`sales_agent.fakes.FakeSendGridServer`::
+
+    python -m benchmarks.streaming --runs 10
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from agents import Agent, set_tracing_disabled
+
+from benchmarks.common import print_table, summarize
+from benchmarks.fixtures import INSTRUCTIONS, PICKER_INSTRUCTIONS, SUBJECT_INSTRUCTIONS
+from sales_agent.emailer import StructuredEmailer
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import MailTransport
+from sales_agent.pipeline import PICKER_HEADER, PICKER_SEPARATOR, SalesPipeline
+from sales_agent.streaming import StreamingPipeline
+
+MESSAGE = "Write a cold sales email"
+
+
+def pick_shortest(prompt: str) -> str:
+    """Stand-in picker: repeats the shortest draft."""
+    drafts = prompt[len(PICKER_HEADER) :].split(PICKER_SEPARATOR)
+    return min(drafts, key=len)
+
+
+async def measure(
+    runs: int, once: Callable[[], Awaitable[Any]], models: List[FakeModel]
+) -> Dict[str, float]:
+    latencies = []
+    before = sum(model.usage.requests for model in models)
+    for _ in range(runs):
+        start = time.perf_counter()
+        await once()
+        latencies.append(time.perf_counter() - start)
+    calls = sum(model.usage.requests for model in models) - before
+    return dict(summarize(latencies), calls=calls / runs)
+
+
+async def main(runs: int, latency: float, seconds_per_token: float) -> None:
+    set_tracing_disabled(True)
+    drafter_model = FakeModel(latency, seconds_per_token, reply_tokens=200)
+    picker_model = FakeModel(latency, seconds_per_token, reply=pick_shortest)
+    subject_model = FakeModel(latency, seconds_per_token, reply_tokens=12)
+    models = [drafter_model, picker_model, subject_model]
+    drafters = [
+        Agent(name=f"Sales Agent {i}", instructions=text, model=drafter_model)
+        for i, text in enumerate(INSTRUCTIONS, start=1)
+    ]
+    picker = Agent(
+        name="sales_picker", instructions=PICKER_INSTRUCTIONS, model=picker_model
+    )
+    subject_writer = Agent(
+        name="Email subject writer",
+        instructions=SUBJECT_INSTRUCTIONS,
+        model=subject_model,
+    )
+    rows = []
+    async with FakeSendGridServer() as server:
+        async with MailTransport(api_key="test", base_url=server.url) as transport:
+            emailer = StructuredEmailer(
+                subject_writer=subject_writer, transport=transport
+            )
+            pipelines = [
+                ("SalesPipeline", SalesPipeline(drafters, picker, emailer)),
+                (
+                    "StreamingPipeline (winner's subject only)",
+                    StreamingPipeline(
+                        drafters, picker, emailer, speculative_subjects=False
+                    ),
+                ),
+                (
+                    "StreamingPipeline (speculative subjects)",
+                    StreamingPipeline(drafters, picker, emailer),
+                ),
+                (
+                    "StreamingPipeline (speculative subjects, k=2)",
+                    StreamingPipeline(drafters, picker, emailer, k=2),
+                ),
+            ]
+            for name, pipeline in pipelines:
+                stats = await measure(runs, lambda: pipeline.run(MESSAGE), models)
+                rows.append(
+                    {
+                        "mode": name,
+                        "p50 to sent (s)": stats["p50"],
+                        "p95 to sent (s)": stats["p95"],
+                        "model calls/run": stats["calls"],
+                    }
+                )
+        print_table(rows)
+        print(f"\n{len(server.mails)} emails sent")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--seconds-per-token", type=float, default=0.005)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.latency, args.seconds_per_token))
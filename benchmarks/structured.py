@@ -0,0 +1,211 @@
+"""Tokens per run with free-text drafts and with drafts returned as fields.
+
+Three :class:`sales_agent.fakes.FakeModel` drafters write the same emails
+either as text or as :class:`sales_agent.structured.EmailDraft` fields. With
+text, ``sales_picker`` reads every draft and repeats the winner, which is then
+formatted by the subject writer and HTML converter, or by the one-call
+formatter of :class:`sales_agent.emailer.StructuredEmailer`. With fields, the
+picker reads digests and replies with a number, and the subject and HTML come
+from the fields. The fakes do not count the JSON schema of an ``output_type``
+as input, which providers do, so it is added here; cost is at gpt-4o-mini
+prices::
+
+    python -m benchmarks.structured --runs 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Type
+
+from agents import Agent, set_tracing_disabled
+from agents.agent_output import AgentOutputSchema
+
+from benchmarks.common import print_table, summarize
+from benchmarks.fixtures import INSTRUCTIONS, PICKER_INSTRUCTIONS
+from sales_agent.emailer import (
+    FormattedEmail,
+    StructuredEmailer,
+    build_email_formatter,
+)
+from sales_agent.fakes import FakeModel, FakeSendGridServer, count_tokens
+from sales_agent.mail import MailTransport
+from sales_agent.metrics import cost
+from sales_agent.pipeline import PICKER_SEPARATOR, SalesPipeline
+from sales_agent.prompts import HTML_INSTRUCTIONS, SUBJECT_INSTRUCTIONS
+from sales_agent.render import render_email
+from sales_agent.structured import (
+    EmailDraft,
+    StructuredPipeline,
+    build_digest_picker,
+    structured_drafter,
+)
+
+PARAGRAPHS = [
+    [
+        "ComplAI helps {company} pass SOC2 audits in weeks, not months. Our AI "
+        "maps your controls to the framework and collects evidence from your "
+        "cloud accounts automatically.",
+        "Your engineers stay focused on shipping product instead of "
+        "screenshots, and your auditors get a complete, organised evidence "
+        "trail on day one.",
+        "Teams like yours cut audit preparation by 70% in the first quarter, "
+        "and keep their controls monitored continuously between audits, so "
+        "the next renewal is a formality rather than a fire drill.",
+        "I would be glad to walk you through how a company of your size "
+        "typically gets from kickoff to a clean report, and what it costs.",
+    ],
+    [
+        "Does SOC2 season at {company} feel like a never-ending scavenger hunt "
+        "for screenshots? ComplAI's robots do the boring bits for you.",
+        "They map every control, chase evidence from your cloud and HR tools, "
+        "and keep it all audit-ready while your team gets back to building.",
+        "Picture your next audit: no late nights, no spreadsheet archaeology, "
+        "just a dashboard that is already green. Our customers say the "
+        "hardest part is remembering what they used to complain about.",
+    ],
+    [
+        "ComplAI automates SOC2 evidence collection for {company}, so audits "
+        "take weeks instead of months.",
+        "Controls are mapped for you and evidence is collected continuously, "
+        "so your team spends hours on the audit, not weeks.",
+    ],
+]
+CTAS = [
+    "Would you be open to a 15-minute call next week?",
+    "Fancy a quick demo on Thursday?",
+    "Worth a 10-minute chat?",
+]
+_PROSPECT = re.compile(r"Dear (\w+) at (\w+)")
+
+
+def email_draft(persona: int, prompt: str, rng: random.Random) -> EmailDraft:
+    match = _PROSPECT.search(prompt)
+    name, company = match.groups() if match else ("CEO", "your company")
+    return EmailDraft(
+        subject=f"{name}, SOC2 audits in weeks",
+        greeting=f"Dear {name},",
+        paragraphs=[p.format(company=company) for p in PARAGRAPHS[persona]],
+        cta=CTAS[persona],
+        sign_off="Best,\nAlice",
+        self_score=rng.randint(5, 9),
+    )
+
+
+def schema_tokens(output_type: Type[Any]) -> int:
+    return count_tokens(json.dumps(AgentOutputSchema(output_type).json_schema()))
+
+
+def text_reply(persona: int, rng: random.Random) -> Callable[[str], str]:
+    return lambda prompt: email_draft(persona, prompt, rng).body()
+
+
+def fields_reply(persona: int, rng: random.Random) -> Any:
+    def structured(schema: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+        return email_draft(persona, prompt, rng).model_dump()
+
+    return structured
+
+
+async def run(mode: str, runs: int, latency: float) -> Dict[str, Any]:
+    rng = random.Random(1)
+    fields = mode == "fields"
+    models = [
+        FakeModel(
+            latency,
+            reply=text_reply(i, rng),
+            structured=fields_reply(i, rng) if fields else None,
+        )
+        for i in range(3)
+    ]
+    drafters = [
+        Agent(name=f"Sales agent {i}", instructions=instructions, model=model)
+        for i, (instructions, model) in enumerate(zip(INSTRUCTIONS, models))
+    ]
+    picker_model = FakeModel(
+        latency,
+        reply=(lambda t: "2") if fields else lambda t: t.split(PICKER_SEPARATOR)[-1],
+    )
+    formatter_model = FakeModel(latency, reply=lambda body: body.split(",")[0])
+    html_model = FakeModel(latency, reply=render_email)
+    models += [picker_model, formatter_model, html_model]
+    async with FakeSendGridServer() as server:
+        async with MailTransport(api_key="test", base_url=server.url) as transport:
+            pipeline: Any
+            if fields:
+                pipeline = StructuredPipeline(
+                    [structured_drafter(d) for d in drafters],
+                    build_digest_picker(picker_model),
+                    send=True,
+                    transport=transport,
+                )
+            else:
+                if mode == "text, formatter":
+                    emailer = StructuredEmailer(
+                        formatter=build_email_formatter(formatter_model),
+                        transport=transport,
+                    )
+                else:
+                    emailer = StructuredEmailer(
+                        subject_writer=Agent(
+                            name="Email subject writer",
+                            instructions=SUBJECT_INSTRUCTIONS,
+                            model=formatter_model,
+                        ),
+                        html_converter=Agent(
+                            name="HTML email body converter",
+                            instructions=HTML_INSTRUCTIONS,
+                            model=html_model,
+                        ),
+                        transport=transport,
+                    )
+                picker = Agent(
+                    name="sales_picker",
+                    instructions=PICKER_INSTRUCTIONS,
+                    model=picker_model,
+                )
+                pipeline = SalesPipeline(drafters, picker, emailer)
+            latencies: List[float] = []
+            for i in range(runs):
+                start = time.perf_counter()
+                await pipeline.run(
+                    f"Write a cold sales email addressed to Dear Prospect{i} "
+                    f"at Company{i}"
+                )
+                latencies.append(time.perf_counter() - start)
+    schema = 0
+    if fields:
+        schema = sum(m.usage.requests for m in models[:3]) * schema_tokens(EmailDraft)
+    elif mode == "text, formatter":
+        schema = formatter_model.usage.requests * schema_tokens(FormattedEmail)
+    input_tokens = sum(m.usage.input_tokens for m in models) + schema
+    output_tokens = sum(m.usage.output_tokens for m in models)
+    return {
+        "mode": mode,
+        "p50 (s)": summarize(latencies)["p50"],
+        "calls/run": sum(m.usage.requests for m in models) / runs,
+        "input tokens/run": input_tokens / runs,
+        "picker input": picker_model.usage.input_tokens / runs,
+        "output tokens/run": output_tokens / runs,
+        "$/1k runs": cost("gpt-4o-mini", input_tokens, 0, output_tokens) * 1000 / runs,
+    }
+
+
+async def main(runs: int, latency: float) -> None:
+    set_tracing_disabled(True)
+    rows = [
+        await run(mode, runs, latency)
+        for mode in ("text, subject + HTML agents", "text, formatter", "fields")
+    ]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.latency))
@@ -0,0 +1,198 @@
+"""Throughput and p50/p95/p99 latency of every lab flow against local stand-ins.
+
+The agents talk to :class:`sales_agent.fakes.FakeOpenAIServer` through the
+real ``AsyncOpenAI`` client and chat-completions model, and email goes to
+:class:`sales_agent.fakes.FakeSendGridServer`, so the whole stack except the
+LLM is exercised. Latency is log-normal (``--sigma 0`` makes it fixed),
+generation runs at ``--tokens-per-second``, and ``--error-rate`` injects
+failures that the client retries. Flows:
+
+* ``drafts``: the three sales agents with ``asyncio.gather``;
+* ``sales_picker``: picking from three drafts;
+* ``emailer_agent``: subject, HTML and send tools, the handoff target;
+* ``sales_manager``: drafting tools, then the handoff to ``emailer_agent``;
+* ``careful_sales_manager``: the same behind the name guardrail.
+
+For CI, save a baseline once and compare later runs against it; the exit
+status is 1 when a flow's p95 or throughput is worse by more than
+``--tolerance``::
+
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --baseline baseline.json --tolerance 0.25
+
+CI compares against ``benchmarks/baseline.json``, saved with the defaults;
+save it again when a change is meant to move the numbers.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from agents import OpenAIChatCompletionsModel, Runner, set_tracing_disabled
+from openai import AsyncOpenAI
+
+from benchmarks.common import lognormal, print_table, summarize
+from benchmarks.fixtures import build_agents, name_check, name_guardrail
+from sales_agent.fakes import FakeOpenAIServer, FakeSendGridServer
+from sales_agent.mail import MailTransport, set_mail_transport
+from sales_agent.pipeline import picker_prompt
+
+MESSAGE = (
+    "Send out a cold sales email addressed to Dear CEO from Head of Business "
+    "Development"
+)
+
+
+async def measure(
+    name: str,
+    flow: Callable[[], Awaitable[Any]],
+    runs: int,
+    concurrency: int,
+    server: FakeOpenAIServer,
+) -> Dict[str, Any]:
+    """Run ``flow`` ``runs`` times, at most ``concurrency`` at once."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def once() -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await flow()
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    calls = server.completions
+    start = time.perf_counter()
+    await asyncio.gather(*(once() for _ in range(runs)))
+    elapsed = time.perf_counter() - start
+    stats = summarize(latencies)
+    return {
+        "flow": name,
+        "runs/s": runs / elapsed,
+        "p50 (s)": stats["p50"],
+        "p95 (s)": stats["p95"],
+        "p99 (s)": stats["p99"],
+        "model calls/run": (server.completions - calls) / runs,
+        "errors": errors,
+    }
+
+
+def regressions(
+    rows: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float
+) -> List[str]:
+    """Flows whose p95 rose, or throughput fell, by more than ``tolerance``."""
+    found = []
+    for row in rows:
+        before = baseline.get(row["flow"])
+        if before is None:
+            continue
+        if row["p95 (s)"] > before["p95 (s)"] * (1 + tolerance):
+            found.append(
+                f"{row['flow']}: p95 {before['p95 (s)']:.3f}s -> {row['p95 (s)']:.3f}s"
+            )
+        if row["runs/s"] < before["runs/s"] * (1 - tolerance):
+            found.append(
+                f"{row['flow']}: {before['runs/s']:.2f} -> {row['runs/s']:.2f} runs/s"
+            )
+    return found
+
+
+async def main(args: argparse.Namespace) -> int:
+    set_tracing_disabled(True)
+    rng = random.Random(args.seed)
+    latency = lognormal(args.latency, rng, args.sigma) if args.sigma else args.latency
+    llm = FakeOpenAIServer(
+        latency=latency,
+        seconds_per_token=1 / args.tokens_per_second if args.tokens_per_second else 0,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+        structured=name_check,
+    )
+    rows = []
+    async with llm, FakeSendGridServer() as sendgrid:
+        client = AsyncOpenAI(
+            base_url=llm.url + "/v1", api_key="test", max_retries=args.retries
+        )
+        try:
+            model = OpenAIChatCompletionsModel("gpt-4o-mini", client)
+            agents = build_agents(model)
+            careful = agents.sales_manager.clone(
+                input_guardrails=[name_guardrail(model)]
+            )
+            async with MailTransport(api_key="test", base_url=sendgrid.url) as mail:
+                set_mail_transport(mail)
+
+                async def drafts() -> List[str]:
+                    results = await asyncio.gather(
+                        *(Runner.run(d, MESSAGE) for d in agents.drafters)
+                    )
+                    return [str(result.final_output) for result in results]
+
+                sample = await drafts()
+                flows: Dict[str, Callable[[], Awaitable[Any]]] = {
+                    "drafts": drafts,
+                    "sales_picker": lambda: Runner.run(
+                        agents.picker, picker_prompt(sample)
+                    ),
+                    "emailer_agent": lambda: Runner.run(agents.emailer, sample[0]),
+                    "sales_manager": lambda: Runner.run(agents.sales_manager, MESSAGE),
+                    "careful_sales_manager": lambda: Runner.run(careful, MESSAGE),
+                }
+                for name, flow in flows.items():
+                    if args.flows and name not in args.flows:
+                        continue
+                    rows.append(
+                        await measure(name, flow, args.runs, args.concurrency, llm)
+                    )
+                set_mail_transport(None)
+            print_table(rows)
+            print()
+            print(
+                f"{llm.completions} completions, {llm.errors} injected errors, "
+                f"{len(sendgrid.mails)} emails sent"
+            )
+        finally:
+            await client.close()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({row["flow"]: row for row in rows}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(rows, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="median")
+    parser.add_argument("--sigma", type=float, default=0.5, help="log-normal spread")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--flows", nargs="*", help="run only these flows")
+    parser.add_argument("--save", help="write the results here as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,90 @@
+"""Building blocks for the ComplAI automated SDR labs.
+
+The main classes can be imported from the package itself, but each is only
+loaded on first access, so ``import sales_agent`` stays cheap and a worker
+that never touches the agents SDK never imports it.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
+
+__version__ = "0.1.0"
+
+# Public name -> submodule that defines it.
+_EXPORTS: Dict[str, str] = {
+    "Campaign": "campaign",
+    "CascadeModel": "cascade",
+    "CheckpointStore": "checkpoint",
+    "Checkpointer": "checkpoint",
+    "ClientPool": "clients",
+    "Dispatcher": "outbox",
+    "DraftPool": "draftpool",
+    "DuplicateIndex": "dedup",
+    "EmailDraft": "structured",
+    "LocalPicker": "scoring",
+    "MailTransport": "mail",
+    "MetricsProcessor": "metrics",
+    "ModelRouter": "router",
+    "Outbox": "outbox",
+    "PooledPipeline": "draftpool",
+    "PriorityModel": "ratelimit",
+    "PromptCacheMeter": "prompts",
+    "RateScheduler": "scheduler",
+    "SalesPipeline": "pipeline",
+    "StreamingPipeline": "streaming",
+    "StructuredEmailer": "emailer",
+    "StructuredPipeline": "structured",
+    "TieredNameCheck": "guardrails",
+    "TokenBucket": "tokenbucket",
+    "build_mail": "mail",
+    "get_client_pool": "clients",
+    "get_mail_transport": "mail",
+    "priority": "scheduler",
+    "read_prospects": "mailmerge",
+    "recipient": "mail",
+    "run_optimistic": "guardrails",
+    "set_client_pool": "clients",
+    "set_mail_transport": "mail",
+}
+
+if TYPE_CHECKING:
+    from sales_agent.campaign import Campaign
+    from sales_agent.cascade import CascadeModel
+    from sales_agent.checkpoint import Checkpointer, CheckpointStore
+    from sales_agent.clients import ClientPool, get_client_pool, set_client_pool
+    from sales_agent.dedup import DuplicateIndex
+    from sales_agent.draftpool import DraftPool, PooledPipeline
+    from sales_agent.emailer import StructuredEmailer
+    from sales_agent.guardrails import TieredNameCheck, run_optimistic
+    from sales_agent.mail import (
+        MailTransport,
+        build_mail,
+        get_mail_transport,
+        recipient,
+        set_mail_transport,
+    )
+    from sales_agent.mailmerge import read_prospects
+    from sales_agent.metrics import MetricsProcessor
+    from sales_agent.outbox import Dispatcher, Outbox
+    from sales_agent.pipeline import SalesPipeline
+    from sales_agent.prompts import PromptCacheMeter
+    from sales_agent.ratelimit import PriorityModel
+    from sales_agent.router import ModelRouter
+    from sales_agent.scheduler import RateScheduler, priority
+    from sales_agent.scoring import LocalPicker
+    from sales_agent.streaming import StreamingPipeline
+    from sales_agent.structured import EmailDraft, StructuredPipeline
+    from sales_agent.tokenbucket import TokenBucket
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted([*globals(), *_EXPORTS])
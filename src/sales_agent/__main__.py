@@ -0,0 +1,7 @@
+"""``python -m sales_agent``; see :mod:`sales_agent.cli`."""
+
+import sys
+
+from sales_agent.cli import main
+
+sys.exit(main())
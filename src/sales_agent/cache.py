@@ -0,0 +1,300 @@
+"""Response cache for agent model calls.
+
+The labs call ``sales_agent1/2/3``, ``subject_writer`` and ``guardrail_agent``
+over and over with identical instructions and input, such as the constant
+``"Write a cold sales email"``. :class:`CachedModel` wraps any agents-SDK
+``Model`` and answers repeated calls from a cache keyed on the model name,
+instructions, input, tools, handoffs, output schema and settings. Entries
+expire after a TTL and the least recently used are evicted first. Two
+backends are provided: :class:`MemoryCache` for a single process and
+:class:`SQLiteCache`, which survives restarts and so helps development reruns.
+
+Cache hits report zero usage, so run usage reflects what was actually spent.
+"""
+
+import abc
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Mapping, Optional, Tuple
+
+from agents import Agent, Model, ModelResponse, ModelSettings, Usage
+from openai.types.responses import ResponseOutputItem
+from pydantic import TypeAdapter
+
+from sales_agent.clients import get_client_pool
+
+_OUTPUT_ITEM = TypeAdapter(ResponseOutputItem)
+
+# Positional parameters of ``Model.get_response``, for wrappers that read them.
+MODEL_ARG_NAMES = (
+    "system_instructions",
+    "input",
+    "model_settings",
+    "tools",
+    "output_schema",
+    "handoffs",
+)
+
+
+class CacheBackend(abc.ABC):
+    """Stores serialized responses with a TTL and LRU eviction.
+
+    Args:
+        max_entries: Entries kept before the least recently used is evicted.
+        ttl: Seconds an entry stays valid, or ``None`` to keep it until evicted.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = None) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._set(key, value)
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Optional[str]: ...
+
+    @abc.abstractmethod
+    def _set(self, key: str, value: str) -> None: ...
+
+    @abc.abstractmethod
+    def clear(self) -> None: ...
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache."""
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = None) -> None:
+        super().__init__(max_entries, ttl)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry[0]):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk cache in a single SQLite file, shared across runs.
+
+    Args:
+        path: Database file, created if missing.
+    """
+
+    def __init__(
+        self,
+        path: str = ".agent_cache.sqlite3",
+        max_entries: int = 10000,
+        ttl: Optional[float] = None,
+    ) -> None:
+        super().__init__(max_entries, ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)"
+            )
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            return str(row[0])
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def model_name(model: Model) -> str:
+    """Best-effort model name, e.g. ``"gpt-4o-mini"`` or ``"deepseek-chat"``.
+
+    Wrappers over several models, such as :class:`~sales_agent.router.ModelRouter`
+    and :class:`~sales_agent.cascade.CascadeModel`, are named after the models
+    they wrap, e.g. ``"CascadeModel(cheap=gpt-4o-mini,strong=gpt-4o)"``, so two
+    differently configured wrappers never share cache entries.
+    """
+    inner = getattr(model, "model", None)
+    if isinstance(inner, str):
+        return inner
+    if isinstance(inner, Model):
+        return model_name(inner)
+    for attribute in ("models", "backends"):
+        wrapped = getattr(model, attribute, None)
+        if isinstance(wrapped, Mapping):
+            names = ",".join(
+                f"{key}={model_name(value)}" for key, value in wrapped.items()
+            )
+            return f"{type(model).__name__}({names})"
+    name = getattr(model, "name", None)
+    return name if isinstance(name, str) else type(model).__name__
+
+
+def cache_key(name: str, call: Dict[str, Any]) -> str:
+    """Hash of everything that determines a model's reply to ``call``."""
+    schema = call.get("output_schema")
+    settings = call.get("model_settings")
+    material = {
+        "model": name,
+        "instructions": call.get("system_instructions"),
+        "input": call.get("input"),
+        "tools": [
+            [tool.name, getattr(tool, "params_json_schema", None)]
+            for tool in call.get("tools") or []
+        ],
+        "handoffs": [
+            [handoff.tool_name, handoff.input_json_schema]
+            for handoff in call.get("handoffs") or []
+        ],
+        "output_schema": (
+            None if schema is None or schema.is_plain_text() else schema.json_schema()
+        ),
+        "settings": settings.to_json_dict() if settings is not None else None,
+    }
+    encoded = json.dumps(material, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def dump_response(response: ModelResponse) -> str:
+    """Serialize the output items; the response id is per-call and not kept.
+
+    Only fields that were set are kept, so a reloaded item feeds the next turn
+    the same input as the original did, whatever fields the SDK adds.
+    """
+    return json.dumps(
+        [item.model_dump(mode="json", exclude_unset=True) for item in response.output]
+    )
+
+
+def load_response(value: str) -> ModelResponse:
+    output = [_OUTPUT_ITEM.validate_python(item) for item in json.loads(value)]
+    return ModelResponse(output=output, usage=Usage(), response_id=None)
+
+
+class CachedModel(Model):
+    """Serves repeated calls to ``model`` from ``cache``.
+
+    Args:
+        model: The model to wrap.
+        cache: Where responses are stored.
+        bypass_above_temperature: When set, calls whose ``temperature`` is
+            above this are always sent to the model, since a sampled reply is
+            expected to differ each time.
+        name: Model name for the cache key; read from ``model`` if omitted.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        cache: CacheBackend,
+        bypass_above_temperature: Optional[float] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        self.model = model
+        self.cache = cache
+        self.bypass_above_temperature = bypass_above_temperature
+        self.name = name or model_name(model)
+
+    def _bypass(self, settings: Optional[ModelSettings]) -> bool:
+        threshold = self.bypass_above_temperature
+        temperature = settings.temperature if settings is not None else None
+        return threshold is not None and (temperature or 0.0) > threshold
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        call = dict(zip(MODEL_ARG_NAMES, args))
+        call.update(kwargs)
+        if self._bypass(call.get("model_settings")):
+            return await self.model.get_response(*args, **kwargs)
+        key = cache_key(self.name, call)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return load_response(cached)
+        response = await self.model.get_response(*args, **kwargs)
+        self.cache.set(key, dump_response(response))
+        return response
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Streams are passed through uncached."""
+        async for event in self.model.stream_response(*args, **kwargs):
+            yield event
+
+
+def with_cache(
+    agent: Agent,
+    cache: CacheBackend,
+    bypass_above_temperature: Optional[float] = None,
+) -> Agent:
+    """A copy of ``agent`` whose model calls go through ``cache``.
+
+    String model names such as ``"gpt-4o-mini"`` are resolved on the shared
+    client pool first, see :meth:`sales_agent.clients.ClientPool.resolve`.
+    """
+    model = get_client_pool().resolve(agent.model)
+    return agent.clone(model=CachedModel(model, cache, bypass_above_temperature))
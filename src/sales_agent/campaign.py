@@ -0,0 +1,214 @@
+"""Run the SDR pipeline over a stream of prospects with bounded concurrency.
+
+A :class:`Campaign` pulls prospect records from any iterable (for example
+:func:`sales_agent.mailmerge.read_prospects`) into a bounded queue, and a fixed
+pool of workers runs one pipeline per prospect. The queue bound is the
+backpressure: the prospect list is only read as fast as workers free up.
+Per-provider request and token quotas are enforced one level down, by the
+:class:`sales_agent.scheduler.RateScheduler` of the shared
+:class:`sales_agent.clients.ClientPool`.
+
+Each prospect's pipeline runs inside :func:`sales_agent.mail.recipient`, so
+its email goes to the prospect's ``email`` field; a prospect without one
+fails. The recipient's key, ``"<campaign_id>:<id or email>"``, identifies the
+prospect's email to an outbox and its run to a checkpointer.
+
+A pipeline with a ``for_prospect`` method, such as
+:class:`sales_agent.draftpool.PooledPipeline`, is given the prospect's fields
+along with the prompt.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Union,
+)
+
+from agents import Agent, Runner
+
+from sales_agent.mail import recipient
+
+Prospect = Dict[str, str]
+Pipeline = Callable[[str], Awaitable[Any]]
+
+
+class ProspectPipeline(Protocol):
+    """A pipeline that uses the prospect's fields, not just the prompt."""
+
+    async def for_prospect(self, prospect: Prospect, message: str) -> Any: ...
+
+
+DEFAULT_MESSAGE = "Send out a cold sales email addressed to Dear {name} from {sender}"
+
+_DONE = object()
+
+
+@dataclass
+class ProspectResult:
+    """What happened for one prospect."""
+
+    prospect: Prospect
+    output: Any = None
+    error: Optional[BaseException] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class CampaignReport:
+    """Totals for a finished campaign; only failures are kept in full."""
+
+    succeeded: int = 0
+    failures: List[ProspectResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def prospects(self) -> int:
+        return self.succeeded + len(self.failures)
+
+    @property
+    def prospects_per_second(self) -> float:
+        return self.prospects / self.seconds if self.seconds else 0.0
+
+
+def agent_pipeline(agent: Agent, max_turns: int = 10) -> Pipeline:
+    """Adapt an agent, such as ``sales_manager``, to the pipeline signature."""
+
+    async def run(message: str) -> Any:
+        result = await Runner.run(agent, message, max_turns=max_turns)
+        return result.final_output
+
+    return run
+
+
+class Campaign:
+    """Fan a pipeline out over many prospects.
+
+    Args:
+        pipeline: An ``Agent``, an async callable taking the prompt, or a
+            :class:`ProspectPipeline`.
+        concurrency: Number of prospects in flight at once.
+        message: Prompt template, formatted with each prospect's fields.
+        queue_size: Prospects read ahead of the workers. Defaults to
+            ``2 * concurrency``.
+        defaults: Fallback values for fields missing from a prospect.
+        campaign_id: Names the campaign in each prospect's key. Give the
+            same id when re-running a campaign so an outbox or checkpointer
+            recognises its prospects; defaults to a random one.
+    """
+
+    def __init__(
+        self,
+        pipeline: Union[Agent, Pipeline, ProspectPipeline],
+        concurrency: int = 10,
+        message: str = DEFAULT_MESSAGE,
+        queue_size: Optional[int] = None,
+        defaults: Optional[Prospect] = None,
+        campaign_id: Optional[str] = None,
+    ) -> None:
+        self.for_prospect = getattr(pipeline, "for_prospect", None)
+        self.pipeline: Any = (
+            agent_pipeline(pipeline) if isinstance(pipeline, Agent) else pipeline
+        )
+        self.concurrency = concurrency
+        self.message = message
+        self.queue_size = queue_size or 2 * concurrency
+        self.defaults = {"name": "CEO", "sender": "Alice", **(defaults or {})}
+        self.campaign_id = campaign_id or uuid.uuid4().hex
+
+    def prompt(self, prospect: Prospect) -> str:
+        return self.message.format_map({**self.defaults, **prospect})
+
+    def key(self, prospect: Prospect) -> str:
+        """The prospect's identity in this campaign: its ``id``, or else its
+        email address, after the campaign id."""
+        return f"{self.campaign_id}:{prospect.get('id') or prospect['email']}"
+
+    async def stream(
+        self, prospects: Union[Iterable[Prospect], AsyncIterable[Prospect]]
+    ) -> AsyncIterator[ProspectResult]:
+        """Yield a :class:`ProspectResult` per prospect as each one finishes."""
+        todo: "asyncio.Queue[Any]" = asyncio.Queue(self.queue_size)
+        done: "asyncio.Queue[Any]" = asyncio.Queue()
+
+        async def produce() -> None:
+            try:
+                if isinstance(prospects, AsyncIterable):
+                    async for prospect in prospects:
+                        await todo.put(prospect)
+                else:
+                    for prospect in prospects:
+                        await todo.put(prospect)
+            finally:
+                for _ in range(self.concurrency):
+                    await todo.put(_DONE)
+
+        async def work() -> None:
+            while True:
+                prospect = await todo.get()
+                if prospect is _DONE:
+                    await done.put(_DONE)
+                    return
+                await done.put(await self._run_one(prospect))
+
+        tasks = [asyncio.ensure_future(produce())]
+        tasks += [asyncio.ensure_future(work()) for _ in range(self.concurrency)]
+        try:
+            finished = 0
+            while finished < self.concurrency:
+                item = await done.get()
+                if item is _DONE:
+                    finished += 1
+                else:
+                    yield item
+            await tasks[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run(
+        self, prospects: Union[Iterable[Prospect], AsyncIterable[Prospect]]
+    ) -> CampaignReport:
+        report = CampaignReport()
+        start = time.perf_counter()
+        async for result in self.stream(prospects):
+            if result.ok:
+                report.succeeded += 1
+            else:
+                report.failures.append(result)
+        report.seconds = time.perf_counter() - start
+        return report
+
+    async def _run_one(self, prospect: Prospect) -> ProspectResult:
+        start = time.perf_counter()
+        try:
+            email = prospect.get("email")
+            if not email:
+                raise ValueError("Prospect has no email address")
+            with recipient(email, self.key(prospect)):
+                if self.for_prospect is not None:
+                    output = await self.for_prospect(prospect, self.prompt(prospect))
+                else:
+                    output = await self.pipeline(self.prompt(prospect))
+        except Exception as error:  # pylint: disable=broad-except
+            return ProspectResult(prospect, error=error, seconds=_since(start))
+        return ProspectResult(prospect, output=output, seconds=_since(start))
+
+
+def _since(start: float) -> float:
+    return time.perf_counter() - start
@@ -0,0 +1,359 @@
+"""Cheap model first, escalating to a stronger one only when needed.
+
+Every agent in the labs is pinned to one model however easy its task is, yet
+most drafts from a small, fast model are fine. :class:`CascadeModel` is an
+agents-SDK ``Model`` over an ordered list of models, cheapest first. Each
+reply is given to cheap local checks, and only a reply that fails one is
+asked again of the next model; the last model's reply is always accepted::
+
+    drafter_model = CascadeModel(
+        {"gemini-2.0-flash": gemini_model, "gpt-4o": "gpt-4o"},
+        checks=[word_range(40, 250), no_placeholders(), no_invented_names()],
+    )
+    picker_model = CascadeModel(
+        {"gpt-4o-mini": "gpt-4o-mini", "gpt-4o": "gpt-4o"}, checks=[repeats_draft()]
+    )
+
+A check takes the reply text and the prompt text and returns why the reply
+is not good enough, or None. Replies to agents with an ``output_type`` must
+also parse into it. Turns that call tools or hand off are not checked.
+
+:class:`CascadeStats` counts escalations and why they happened, and
+estimates the seconds and dollars saved per call against always using the
+last model: its observed mean latency, and its price (from
+:data:`sales_agent.metrics.PRICES`, keyed by the names given to the models)
+for the tokens of the accepted reply.
+"""
+
+import collections
+import re
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Counter,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from agents import Model, ModelResponse, Usage
+from openai.types.responses import (
+    ResponseCompletedEvent,
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+
+from sales_agent.cache import MODEL_ARG_NAMES
+from sales_agent.clients import get_client_pool
+from sales_agent.guardrails import FIRST_NAMES, message_text
+from sales_agent.metrics import PRICES, cost
+from sales_agent.pipeline import PICKER_HEADER, PICKER_SEPARATOR
+
+# Returns why a reply fails, or None; given the reply and the prompt text.
+Check = Callable[[str, str], Optional[str]]
+
+_WORD = re.compile(r"\w+")
+_CAPITALISED = re.compile(r"\b[A-Z][a-z]+\b")
+_DIGEST = re.compile(r"^Email (\d+):", re.MULTILINE)
+_PLACEHOLDER = re.compile(
+    r"\[[^\]\n]{1,40}\]|\{\{?\s*\w+\s*\}?\}|<(?:your |recipient'?s? )?name>|"
+    r"\b(?:lorem ipsum|insert \w+)\b",
+    re.IGNORECASE,
+)
+
+
+def word_range(low: int, high: Optional[int] = None) -> Check:
+    """Replies of ``low`` to ``high`` words pass."""
+
+    def check(reply: str, prompt: str) -> Optional[str]:
+        words = len(_WORD.findall(reply))
+        if words < low or (high is not None and words > high):
+            return "length"
+        return None
+
+    return check
+
+
+def contains(*patterns: str) -> Check:
+    """Replies matching every regular expression in ``patterns`` pass, e.g.
+    ``r"\\?"`` for a question to answer."""
+    compiled = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+
+    def check(reply: str, prompt: str) -> Optional[str]:
+        if all(pattern.search(reply) for pattern in compiled):
+            return None
+        return "missing"
+
+    return check
+
+
+def no_placeholders() -> Check:
+    """Replies without template leftovers such as ``[Your Name]`` pass."""
+
+    def check(reply: str, prompt: str) -> Optional[str]:
+        return "placeholder" if _PLACEHOLDER.search(reply) else None
+
+    return check
+
+
+def no_invented_names() -> Check:
+    """A local output guardrail: first names in the reply (see
+    :data:`sales_agent.guardrails.FIRST_NAMES`) must appear in the prompt,
+    so a draft never greets a made-up "Dear John"."""
+
+    def check(reply: str, prompt: str) -> Optional[str]:
+        known = {word.lower() for word in _WORD.findall(prompt)}
+        for word in _CAPITALISED.findall(reply):
+            lower = word.lower()
+            if lower in FIRST_NAMES and lower not in known:
+                return "invented name"
+        return None
+
+    return check
+
+
+def repeats_draft(
+    separator: str = PICKER_SEPARATOR, header: str = PICKER_HEADER
+) -> Check:
+    """For ``sales_picker``: the reply must be one of the drafts in the
+    prompt, word for word, or the number of a draft in a digest prompt
+    (see :func:`sales_agent.structured.digest_prompt`)."""
+
+    def check(reply: str, prompt: str) -> Optional[str]:
+        text = " ".join(reply.split())
+        if not text:
+            return "empty"
+        parts = prompt.split(separator)
+        # The first draft follows the header, not a separator.
+        parts[0] = parts[0][len(header) :] if parts[0].startswith(header) else ""
+        drafts = {" ".join(part.split()) for part in parts}
+        if text in drafts or text in _DIGEST.findall(prompt):
+            return None
+        return "not a draft"
+
+    return check
+
+
+def response_text(response: ModelResponse) -> Optional[str]:
+    """The reply text, or None when the turn calls tools or hands off."""
+    parts: List[str] = []
+    for item in response.output:
+        if isinstance(item, ResponseOutputMessage):
+            parts += [p.text for p in item.content if isinstance(p, ResponseOutputText)]
+        elif getattr(item, "type", None) != "reasoning":
+            return None
+    return "".join(parts)
+
+
+@dataclass
+class CascadeStats:
+    """Which model answered, and what the cascade saved over the last one.
+
+    ``seconds`` and ``dollars`` hold every attempt's cost per model, failed
+    attempts included; ``baseline_dollars`` what the last model would have
+    charged for the accepted replies.
+    """
+
+    calls: int = 0
+    escalations: int = 0
+    answered: Counter[str] = field(default_factory=collections.Counter)
+    reasons: Counter[str] = field(default_factory=collections.Counter)
+    attempts: Counter[str] = field(default_factory=collections.Counter)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    dollars: Dict[str, float] = field(default_factory=dict)
+    baseline_dollars: float = 0.0
+    strongest: str = ""
+
+    @property
+    def escalation_rate(self) -> float:
+        """Fraction of calls the first model did not settle."""
+        return self.escalations / self.calls if self.calls else 0.0
+
+    def mean_seconds(self, name: str) -> Optional[float]:
+        attempts = self.attempts[name]
+        return self.seconds.get(name, 0.0) / attempts if attempts else None
+
+    @property
+    def seconds_saved_per_call(self) -> Optional[float]:
+        """Mean latency of the last model minus the cascade's, or None until
+        the last model has been called."""
+        baseline = self.mean_seconds(self.strongest)
+        if baseline is None or not self.calls:
+            return None
+        return baseline - sum(self.seconds.values()) / self.calls
+
+    @property
+    def dollars_saved_per_call(self) -> float:
+        if not self.calls:
+            return 0.0
+        return (self.baseline_dollars - sum(self.dollars.values())) / self.calls
+
+    def add(
+        self, name: str, seconds: float, usage: Optional[Usage], prices: Any
+    ) -> None:
+        """Record one attempt on ``name``."""
+        self.attempts[name] += 1
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        if usage is not None:
+            spent = cost(
+                name,
+                usage.input_tokens,
+                usage.input_tokens_details.cached_tokens,
+                usage.output_tokens,
+                prices,
+            )
+            self.dollars[name] = self.dollars.get(name, 0.0) + spent
+
+
+class CascadeModel(Model):
+    """A ``Model`` that asks ``models`` in order until a reply passes ``checks``.
+
+    Args:
+        models: Name to model, cheapest first. String models are resolved
+            on the shared client pool. Names are looked up in
+            ``prices``, so use the provider's model name, e.g.
+            ``"gemini-2.0-flash"``.
+        checks: Local checks every reply but the last model's must pass.
+        escalate_on_error: Ask the next model when one raises, rather than
+            raising.
+        prices: Dollars per million tokens by name, see
+            :data:`sales_agent.metrics.PRICES`.
+    """
+
+    def __init__(
+        self,
+        models: Mapping[str, Union[str, Model]],
+        checks: Sequence[Check] = (),
+        escalate_on_error: bool = True,
+        prices: Mapping[str, Tuple[float, float, float]] = PRICES,
+    ) -> None:
+        if not models:
+            raise ValueError("CascadeModel needs at least one model")
+        pool = get_client_pool()
+        self.models: Dict[str, Model] = {
+            name: pool.resolve(model) for name, model in models.items()
+        }
+        self.checks = list(checks)
+        self.escalate_on_error = escalate_on_error
+        self.prices = prices
+        self.stats = CascadeStats(strongest=list(self.models)[-1])
+
+    def verdict(self, response: ModelResponse, call: Dict[str, Any]) -> Optional[str]:
+        """Why ``response`` should be escalated, or None to accept it."""
+        text = response_text(response)
+        if text is None:
+            return None
+        schema = call.get("output_schema")
+        if schema is not None and not schema.is_plain_text():
+            try:
+                schema.validate_json(text)
+            except Exception:
+                return "invalid output"
+        prompt = message_text(call.get("input") or "")
+        for check in self.checks:
+            reason = check(text, prompt)
+            if reason is not None:
+                return reason
+        return None
+
+    def _accept(self, name: str, usage: Usage, escalated: bool) -> None:
+        stats = self.stats
+        stats.calls += 1
+        stats.escalations += escalated
+        stats.answered[name] += 1
+        stats.baseline_dollars += cost(
+            stats.strongest,
+            usage.input_tokens,
+            usage.input_tokens_details.cached_tokens,
+            usage.output_tokens,
+            self.prices,
+        )
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        call = dict(zip(MODEL_ARG_NAMES, args))
+        call.update(kwargs)
+        last = len(self.models) - 1
+        for position, (name, model) in enumerate(self.models.items()):
+            start = time.monotonic()
+            try:
+                response = await model.get_response(*args, **kwargs)
+            except Exception:
+                self.stats.add(name, time.monotonic() - start, None, self.prices)
+                if position == last or not self.escalate_on_error:
+                    raise
+                self.stats.reasons["error"] += 1
+                continue
+            self.stats.add(name, time.monotonic() - start, response.usage, self.prices)
+            reason = None if position == last else self.verdict(response, call)
+            if reason is None:
+                self._accept(name, response.usage, position > 0)
+                return response
+            self.stats.reasons[reason] += 1
+        raise AssertionError("unreachable")
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Streams from all but the last model are held back until complete
+        and checked, so only the last model streams as it generates."""
+        call = dict(zip(MODEL_ARG_NAMES, args))
+        call.update(kwargs)
+        last = len(self.models) - 1
+        for position, (name, model) in enumerate(self.models.items()):
+            stream = model.stream_response(*args, **kwargs)
+            start = time.monotonic()
+            if position == last:
+                usage = Usage()
+                async for event in stream:
+                    if isinstance(event, ResponseCompletedEvent):
+                        usage = _usage(event)
+                    yield event
+                self.stats.add(name, time.monotonic() - start, usage, self.prices)
+                self._accept(name, usage, position > 0)
+                return
+            events: List[Any] = []
+            try:
+                async for event in stream:
+                    events.append(event)
+            except Exception:
+                self.stats.add(name, time.monotonic() - start, None, self.prices)
+                if not self.escalate_on_error:
+                    raise
+                self.stats.reasons["error"] += 1
+                continue
+            completed = [e for e in events if isinstance(e, ResponseCompletedEvent)]
+            usage = _usage(completed[-1]) if completed else Usage()
+            self.stats.add(name, time.monotonic() - start, usage, self.prices)
+            reason: Optional[str] = "incomplete"
+            if completed:
+                response = ModelResponse(
+                    output=completed[-1].response.output,
+                    usage=usage,
+                    response_id=None,
+                )
+                reason = self.verdict(response, call)
+            if reason is None:
+                self._accept(name, usage, position > 0)
+                for event in events:
+                    yield event
+                return
+            self.stats.reasons[reason] += 1
+
+
+def _usage(event: ResponseCompletedEvent) -> Usage:
+    usage = event.response.usage
+    if usage is None:
+        return Usage()
+    return Usage(
+        requests=1,
+        input_tokens=usage.input_tokens,
+        input_tokens_details=usage.input_tokens_details,
+        output_tokens=usage.output_tokens,
+        output_tokens_details=usage.output_tokens_details,
+        total_tokens=usage.total_tokens,
+    )
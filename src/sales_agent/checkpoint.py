@@ -0,0 +1,349 @@
+"""Checkpoint and resume for multi-agent runs.
+
+A ``sales_manager`` run makes several model calls, three drafting tool calls
+and a handoff to the Email Manager. If the process dies partway through, a
+plain rerun pays for all of it again, and may send the email twice.
+
+:class:`Checkpointer` journals every completed model response and function
+tool result of a run to SQLite, keyed by a run id. Rerunning the same run id
+replays the journal: each step whose inputs match a journaled one returns the
+stored result without calling the model or the tool, so the run reaches the
+point where it stopped at no cost and carries on from there. Handoffs are
+replayed as the model turns that requested them, and the handed-off agent is
+journaled too. Once a run finishes, its final output is kept and its steps
+are dropped::
+
+    checkpointer = Checkpointer("checkpoints.sqlite3")
+    result = await checkpointer.run(sales_manager, message, run_id="prospect-42")
+
+For a :class:`sales_agent.campaign.Campaign`, ``checkpointer.pipeline(agent)``
+runs each prospect under its campaign key, the campaign id and the prospect's
+id or email, and skips prospects that already finished; give the campaign a
+fixed ``campaign_id`` so a restart finds them.
+
+Agents used as tools are journaled as a whole: a crash inside one repeats
+that tool call. Streamed model calls are passed through without journaling.
+"""
+
+import contextvars
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from agents import (
+    Agent,
+    FunctionTool,
+    Handoff,
+    Model,
+    ModelResponse,
+    Runner,
+    RunResult,
+    TResponseInputItem,
+)
+
+from sales_agent.cache import (
+    MODEL_ARG_NAMES,
+    cache_key,
+    dump_response,
+    load_response,
+)
+from sales_agent.campaign import Prospect
+from sales_agent.clients import get_client_pool
+from sales_agent.mail import current_recipient
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS steps (
+    run_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (run_id, key)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL,
+    output TEXT
+);
+"""
+
+
+class CheckpointStore:
+    """SQLite journal of run steps.
+
+    Args:
+        path: Database file, created if missing.
+    """
+
+    def __init__(self, path: str = "checkpoints.sqlite3") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+
+    def get(self, run_id: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM steps WHERE run_id = ? AND key = ?", (run_id, key)
+            ).fetchone()
+        return None if row is None else str(row[0])
+
+    def put(self, run_id: str, key: str, kind: str, value: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO steps VALUES (?, ?, ?, ?, ?)",
+                (run_id, key, kind, value, time.time()),
+            )
+
+    def start(self, run_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO runs (run_id, started) VALUES (?, ?)",
+                (run_id, time.time()),
+            )
+
+    def finish(self, run_id: str, output: str, keep_steps: bool = False) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE runs SET finished = ?, output = ? WHERE run_id = ?",
+                (time.time(), output, run_id),
+            )
+            if not keep_steps:
+                self._db.execute("DELETE FROM steps WHERE run_id = ?", (run_id,))
+
+    def output(self, run_id: str) -> Optional[str]:
+        """The final output of a finished run, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output FROM runs WHERE run_id = ? AND finished IS NOT NULL",
+                (run_id,),
+            ).fetchone()
+        return None if row is None else str(row[0])
+
+    def unfinished(self) -> List[str]:
+        """Run ids that were started and never finished."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT run_id FROM runs WHERE finished IS NULL ORDER BY started"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def steps(self, run_id: str) -> int:
+        with self._lock:
+            (count,) = self._db.execute(
+                "SELECT COUNT(*) FROM steps WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return int(count)
+
+    def clear(self, run_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM steps WHERE run_id = ?", (run_id,))
+            self._db.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class _Journal:
+    """The run being journaled, and how often each step has been seen in it.
+
+    Identical steps (the same tool with the same arguments, say) are told
+    apart by occurrence, so a rerun gets back each result in turn.
+    """
+
+    def __init__(self, store: CheckpointStore, run_id: str) -> None:
+        self.store = store
+        self.run_id = run_id
+        self.replayed = 0
+        self.recorded = 0
+        self._seen: Dict[str, int] = {}
+
+    def key(self, digest: str) -> str:
+        n = self._seen.get(digest, 0)
+        self._seen[digest] = n + 1
+        return f"{digest}#{n}"
+
+
+_journal: "contextvars.ContextVar[Optional[_Journal]]" = contextvars.ContextVar(
+    "sales_agent_checkpoint_journal", default=None
+)
+
+
+class CheckpointModel(Model):
+    """Journals ``model``'s responses in the current checkpointed run."""
+
+    def __init__(self, model: Model, name: str) -> None:
+        self.model = model
+        self.name = name
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        journal = _journal.get()
+        if journal is None:
+            return await self.model.get_response(*args, **kwargs)
+        call = dict(zip(MODEL_ARG_NAMES, args))
+        call.update(kwargs)
+        key = journal.key(cache_key(self.name, call))
+        stored = journal.store.get(journal.run_id, key)
+        if stored is not None:
+            journal.replayed += 1
+            return load_response(stored)
+        response = await self.model.get_response(*args, **kwargs)
+        journal.store.put(journal.run_id, key, "model", dump_response(response))
+        journal.recorded += 1
+        return response
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        async for event in self.model.stream_response(*args, **kwargs):
+            yield event
+
+
+def _checkpoint_tool(tool: FunctionTool, agent_name: str) -> FunctionTool:
+    invoke = tool.on_invoke_tool
+
+    async def on_invoke_tool(ctx: Any, arguments: str) -> Any:
+        journal = _journal.get()
+        if journal is None:
+            return await invoke(ctx, arguments)
+        material = json.dumps([agent_name, tool.name, arguments])
+        key = journal.key(hashlib.sha256(material.encode()).hexdigest())
+        stored = journal.store.get(journal.run_id, key)
+        if stored is not None:
+            journal.replayed += 1
+            return json.loads(stored)
+        result = await invoke(ctx, arguments)
+        try:
+            value = json.dumps(result)
+        except TypeError:
+            value = json.dumps(str(result))
+        journal.store.put(journal.run_id, key, "tool", value)
+        journal.recorded += 1
+        return result
+
+    return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+
+class Checkpointer:
+    """Runs agents with every model response and tool result journaled.
+
+    Args:
+        path: SQLite file for the journal; see :class:`CheckpointStore`.
+        keep_steps: Keep the steps of finished runs, e.g. for inspection.
+    """
+
+    def __init__(
+        self, path: str = "checkpoints.sqlite3", keep_steps: bool = False
+    ) -> None:
+        self.store = CheckpointStore(path)
+        self.keep_steps = keep_steps
+        self.replayed = 0
+        self.recorded = 0
+        self._wrapped: Dict[int, Agent] = {}
+        self._originals: List[Agent] = []
+
+    def wrap(self, agent: Agent) -> Agent:
+        """A copy of ``agent``, its tools and its handoff targets, journaled.
+
+        String model names are resolved on the shared client pool.
+        """
+        if id(agent) in self._wrapped:
+            return self._wrapped[id(agent)]
+        model = get_client_pool().resolve(agent.model)
+        name = getattr(model, "model", None)
+        clone = agent.clone(
+            model=CheckpointModel(model, name if isinstance(name, str) else agent.name)
+        )
+        # Register before recursing, so agents that hand off to each other work.
+        self._wrapped[id(agent)] = clone
+        self._originals.append(agent)
+        clone.tools = [
+            (
+                _checkpoint_tool(tool, agent.name)
+                if isinstance(tool, FunctionTool)
+                else tool
+            )
+            for tool in agent.tools
+        ]
+        clone.handoffs = [self._wrap_handoff(h) for h in agent.handoffs]
+        return clone
+
+    def _wrap_handoff(
+        self, target: Union[Agent[Any], Handoff[Any, Any]]
+    ) -> Union[Agent[Any], Handoff[Any, Any]]:
+        if isinstance(target, Agent):
+            return self.wrap(target)
+        invoke = target.on_invoke_handoff
+
+        async def on_invoke_handoff(ctx: Any, arguments: str) -> Any:
+            return self.wrap(await invoke(ctx, arguments))
+
+        return dataclasses.replace(target, on_invoke_handoff=on_invoke_handoff)
+
+    async def run(
+        self,
+        agent: Agent,
+        input: Union[str, List[TResponseInputItem]],
+        run_id: str,
+        **run_kwargs: Any,
+    ) -> RunResult:
+        """``Runner.run`` under ``run_id``, resuming it if it was interrupted."""
+        journal = _Journal(self.store, run_id)
+        self.store.start(run_id)
+        token = _journal.set(journal)
+        try:
+            result = await Runner.run(self.wrap(agent), input, **run_kwargs)
+        finally:
+            _journal.reset(token)
+            self.replayed += journal.replayed
+            self.recorded += journal.recorded
+        self.store.finish(run_id, json.dumps(str(result.final_output)), self.keep_steps)
+        return result
+
+    def pipeline(self, agent: Agent, max_turns: int = 10) -> "CheckpointPipeline":
+        """A :class:`sales_agent.campaign.Campaign` pipeline with checkpoints.
+
+        Each prospect is its own run, so a restarted campaign skips finished
+        prospects and resumes interrupted ones.
+        """
+        return CheckpointPipeline(self, agent, max_turns)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+class CheckpointPipeline:
+    """Runs ``agent`` once per prospect, checkpointed under the prospect's key.
+
+    In a :class:`sales_agent.campaign.Campaign` the run id is the key of the
+    current :func:`sales_agent.mail.recipient`, i.e. the campaign id and the
+    prospect's id or email; otherwise it is the prospect's id or email.
+    """
+
+    def __init__(
+        self, checkpointer: Checkpointer, agent: Agent, max_turns: int
+    ) -> None:
+        self.checkpointer = checkpointer
+        self.agent = agent
+        self.max_turns = max_turns
+
+    def run_id(self, prospect: Prospect) -> str:
+        current = current_recipient()
+        if current is not None and current.key:
+            return current.key
+        return prospect.get("id") or prospect["email"]
+
+    async def for_prospect(self, prospect: Prospect, message: str) -> Any:
+        run_id = self.run_id(prospect)
+        done = self.checkpointer.store.output(run_id)
+        if done is not None:
+            return json.loads(done)
+        result = await self.checkpointer.run(
+            self.agent, message, run_id, max_turns=self.max_turns
+        )
+        return result.final_output
@@ -0,0 +1,187 @@
+"""Command line and worker entry point: ``sales-agent`` or ``python -m sales_agent``.
+
+Only ``argparse`` is imported up front; each command imports what it needs::
+
+    sales-agent send "Send out a cold sales email addressed to Dear CEO"
+    sales-agent campaign prospects.csv --concurrency 20 --outbox outbox.db
+    sales-agent worker --outbox outbox.db --rate 5
+
+``campaign --outbox`` queues the emails instead of sending them, and any
+number of ``worker`` processes deliver the queue. ``precompute`` drafts
+templates for a prospect list's commonest segments ahead of time, and
+``campaign --pool`` drafts from them.
+"""
+
+import argparse
+import asyncio
+import os
+from typing import Any, List, Optional
+
+
+async def _send(args: argparse.Namespace) -> int:
+    from agents import Runner
+
+    from sales_agent import sdr
+    from sales_agent.guardrails import run_optimistic
+
+    if args.careful:
+        result = await run_optimistic(sdr.careful_sales_manager(), args.message)
+    else:
+        result = await Runner.run(sdr.sales_manager(), args.message)
+    print(result.final_output)
+    return 0
+
+
+async def _campaign(args: argparse.Namespace) -> int:
+    from sales_agent import sdr
+    from sales_agent.campaign import Campaign, agent_pipeline
+    from sales_agent.mail import set_mail_transport
+    from sales_agent.mailmerge import read_prospects
+
+    agent = sdr.careful_sales_manager() if args.careful else sdr.sales_manager()
+    outbox = None
+    if args.outbox:
+        from sales_agent.outbox import Outbox
+
+        outbox = Outbox(args.outbox)
+        set_mail_transport(outbox)
+    try:
+        pipeline: Any
+        if args.pool:
+            from sales_agent.draftpool import DraftPool, PooledPipeline
+
+            pipeline = PooledPipeline(
+                DraftPool(args.pool),
+                sdr.drafters(),
+                sdr.sales_picker(),
+                sdr.emailer_agent(),
+            )
+        elif args.checkpoints:
+            from sales_agent.checkpoint import Checkpointer
+
+            pipeline = Checkpointer(args.checkpoints).pipeline(agent)
+        else:
+            pipeline = agent_pipeline(agent)
+        campaign = Campaign(
+            pipeline,
+            concurrency=args.concurrency,
+            campaign_id=args.campaign_id or os.path.basename(args.prospects),
+        )
+        if args.message:
+            campaign.message = args.message
+        report = await campaign.run(read_prospects(args.prospects))
+    finally:
+        if outbox is not None:
+            set_mail_transport(None)
+            outbox.close()
+    print(
+        f"{report.succeeded} succeeded, {len(report.failures)} failed, "
+        f"{report.prospects_per_second:.2f} prospects/s"
+    )
+    return 1 if report.failures else 0
+
+
+async def _precompute(args: argparse.Namespace) -> int:
+    from sales_agent import sdr
+    from sales_agent.draftpool import DraftPool, precompute, top_segments
+    from sales_agent.mailmerge import read_prospects
+
+    pool = DraftPool(args.pool)
+    segments = top_segments(read_prospects(args.prospects), args.top)
+    added = await precompute(
+        pool, sdr.drafters(), segments, args.variants, args.concurrency
+    )
+    print(f"{added} drafts added, {len(pool)} in {len(pool.segments())} segments")
+    return 0
+
+
+async def _worker(args: argparse.Namespace) -> int:
+    from sales_agent.mail import SENDGRID_API_URL, MailTransport
+    from sales_agent.outbox import Dispatcher, Outbox
+    from sales_agent.tokenbucket import TokenBucket
+
+    outbox = Outbox(args.outbox)
+    base_url = os.environ.get("SENDGRID_BASE_URL", SENDGRID_API_URL)
+    try:
+        async with MailTransport(base_url=base_url) as transport:
+            dispatcher = Dispatcher(
+                outbox,
+                transport,
+                workers=args.workers,
+                batch_size=args.batch_size,
+                bucket=TokenBucket(args.rate) if args.rate else None,
+            )
+            if args.once:
+                await dispatcher.drain()
+            else:
+                dispatcher.start()
+                try:
+                    await asyncio.Event().wait()
+                finally:
+                    await dispatcher.stop()
+        print(outbox.counts())
+        return 1 if outbox.failures() else 0
+    finally:
+        outbox.close()
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="sales-agent", description="ComplAI automated SDR"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    send = commands.add_parser("send", help="run the Sales Manager once")
+    send.add_argument("message")
+    send.add_argument("--careful", action="store_true", help="check for names first")
+    send.set_defaults(run=_send)
+
+    campaign = commands.add_parser("campaign", help="email every prospect in a CSV")
+    campaign.add_argument("prospects", help="CSV with email and name columns")
+    campaign.add_argument("--concurrency", type=int, default=10)
+    campaign.add_argument("--message", help="prompt template, e.g. 'Dear {name}'")
+    campaign.add_argument("--careful", action="store_true")
+    campaign.add_argument("--outbox", help="queue emails in this outbox")
+    campaign.add_argument("--checkpoints", help="journal runs here to resume")
+    campaign.add_argument(
+        "--pool",
+        help="draft from this precomputed draft pool; not with --careful or "
+        "--checkpoints",
+    )
+    campaign.add_argument(
+        "--campaign-id", help="keys emails and runs; defaults to the CSV's name"
+    )
+    campaign.set_defaults(run=_campaign)
+
+    precompute = commands.add_parser(
+        "precompute", help="draft templates per segment ahead of a campaign"
+    )
+    precompute.add_argument(
+        "prospects", help="CSV with role, industry and company_size columns"
+    )
+    precompute.add_argument("--pool", default="drafts.sqlite3")
+    precompute.add_argument("--top", type=int, help="only the commonest segments")
+    precompute.add_argument("--variants", type=int, default=2)
+    precompute.add_argument("--concurrency", type=int, default=10)
+    precompute.set_defaults(run=_precompute)
+
+    worker = commands.add_parser("worker", help="deliver queued emails")
+    worker.add_argument("--outbox", default="outbox.db")
+    worker.add_argument("--workers", type=int, default=4)
+    worker.add_argument("--batch-size", type=int, default=20)
+    worker.add_argument("--rate", type=float, help="emails per second")
+    worker.add_argument("--once", action="store_true", help="exit when drained")
+    worker.set_defaults(run=_worker)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    cli = parser()
+    args = cli.parse_args(argv)
+    if args.command == "campaign" and args.pool and (args.careful or args.checkpoints):
+        # The pooled pipeline has no name guardrail and no journal.
+        cli.error("--pool cannot be combined with --careful or --checkpoints")
+    try:
+        return int(asyncio.run(args.run(args)))
+    except KeyboardInterrupt:
+        return 130
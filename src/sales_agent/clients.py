@@ -0,0 +1,328 @@
+"""Shared, tuned ``AsyncOpenAI`` clients, one per provider base URL.
+
+Each ``AsyncOpenAI`` the labs build opens its own connection pool, and agents
+with a string model such as ``"gpt-4o-mini"`` use yet another client that the
+agents SDK creates with its defaults. Those defaults keep only 100 idle
+connections, so a campaign running hundreds of prospects at once opens new
+TCP and TLS connections on every wave of requests and throws most of them
+away again. :class:`ClientPool` hands out one client per base URL, backed by
+an ``httpx.AsyncClient`` sized for the campaign, with keep-alive, HTTP/2 when
+``h2`` is installed, and a timeout per provider::
+
+    pool = get_client_pool()
+    pool.install()                    # string models use the pooled client
+    gemini = pool.model("gemini-2.0-flash", GEMINI_BASE_URL, google_api_key)
+
+The library's own wrappers (caching, checkpoints, cascades, prompt metering)
+resolve string model names with :meth:`ClientPool.resolve`, so they share
+the pool as well.
+
+HTTP/2 needs ``pip install "sales-agent[http2]"``. It multiplexes up to 100
+concurrent requests over each connection, so an ``https://`` base URL gets a
+single pool that a campaign fills with only a handful of connections. Over
+HTTP/1.1 every request in flight holds a connection of its own, and simply
+raising the SDK's limits does not scale: httpcore scans every connection in
+a pool for every waiting request whenever a connection changes state, which
+costs more CPU than the requests themselves once a pool holds hundreds of
+connections. HTTP/1.1 connections are therefore split over small pools, and
+requests waiting for a connection queue in front of them instead of inside
+them. HTTP/2 is only negotiated over TLS, so plain ``http://`` base URLs,
+such as local servers, are always sharded.
+"""
+
+import asyncio
+import importlib.util
+import math
+import os
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import httpx
+from openai import AsyncOpenAI
+
+from sales_agent.scheduler import RateScheduler
+
+if TYPE_CHECKING:
+    from agents import Model, OpenAIChatCompletionsModel
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """A response body that calls ``release`` once it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class ShardedTransport(httpx.AsyncBaseTransport):
+    """Spreads requests over several small connection pools.
+
+    Each request goes to the pool with the fewest requests in flight, and
+    requests beyond ``max_in_flight`` wait here, in a semaphore, rather than
+    in httpcore's queue, which is scanned on every connection state change.
+
+    Args:
+        shards: The pools, typically ``httpx.AsyncHTTPTransport`` instances.
+        max_in_flight: Requests sent at once, usually the pools' combined
+            connection limit.
+    """
+
+    def __init__(
+        self, shards: List[httpx.AsyncBaseTransport], max_in_flight: int
+    ) -> None:
+        self.shards = shards
+        self.max_in_flight = max_in_flight
+        self.in_flight = [0] * len(shards)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphore
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        semaphore = self.semaphore
+        await semaphore.acquire()
+        shard = min(range(len(self.shards)), key=self.in_flight.__getitem__)
+        self.in_flight[shard] += 1
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.in_flight[shard] -= 1
+                semaphore.release()
+
+        try:
+            response = await self.shards[shard].handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        # The connection stays busy until the body has been read and closed.
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        for shard in self.shards:
+            await shard.aclose()
+
+
+class ClientPool:
+    """One ``AsyncOpenAI`` per base URL and API key, sharing tuned HTTP pools.
+
+    Args:
+        max_connections: Upper bound on open connections per base URL.
+        max_keepalive_connections: Idle connections kept warm per base URL.
+            Match this to the campaign's concurrency to avoid reconnecting.
+        keepalive_expiry: Seconds an idle connection is kept before closing.
+        connections_per_shard: Size of each of the pools a base URL's
+            HTTP/1.1 connections are split over.
+        timeout: Default per-request timeout in seconds.
+        connect_timeout: Timeout for opening a connection.
+        timeouts: Per-request timeout by base URL, for slower providers.
+        http2: Use HTTP/2. Defaults to whether ``h2`` is installed.
+        max_retries: Retries the OpenAI client makes; None keeps its default.
+        scheduler: Request and token quotas applied in front of every base
+            URL's connections.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 500,
+        max_keepalive_connections: int = 500,
+        keepalive_expiry: float = 60.0,
+        connections_per_shard: int = 10,
+        timeout: float = 60.0,
+        connect_timeout: float = 5.0,
+        timeouts: Optional[Mapping[str, float]] = None,
+        http2: Optional[bool] = None,
+        max_retries: Optional[int] = None,
+        scheduler: Optional[RateScheduler] = None,
+    ) -> None:
+        self.shards = max(1, math.ceil(max_connections / connections_per_shard))
+        # Connections each shard may open.
+        self.shard_connections = math.ceil(max_connections / self.shards)
+        self.limits = httpx.Limits(
+            max_connections=self.shard_connections,
+            max_keepalive_connections=math.ceil(
+                max_keepalive_connections / self.shards
+            ),
+            keepalive_expiry=keepalive_expiry,
+        )
+        # The single pool of a base URL that speaks HTTP/2.
+        self.http2_limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.timeouts = {
+            url.rstrip("/"): seconds for url, seconds in (timeouts or {}).items()
+        }
+        self.http2 = _http2_available() if http2 is None else http2
+        self.max_retries = max_retries
+        self.scheduler = scheduler
+        self._http: Dict[str, httpx.AsyncClient] = {}
+        self._clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+
+    def multiplexed(self, base_url: str) -> bool:
+        """Whether ``base_url`` gets one HTTP/2 pool rather than shards."""
+        return self.http2 and httpx.URL(base_url).scheme == "https"
+
+    def http_client(self, base_url: str) -> httpx.AsyncClient:
+        """The pooled HTTP client for ``base_url``, created on first use."""
+        base_url = base_url.rstrip("/")
+        http = self._http.get(base_url)
+        if http is None or http.is_closed:
+            timeout = self.timeouts.get(base_url, self.timeout)
+            transport: httpx.AsyncBaseTransport
+            if self.multiplexed(base_url):
+                transport = httpx.AsyncHTTPTransport(
+                    limits=self.http2_limits, http2=True
+                )
+            else:
+                transport = ShardedTransport(
+                    [
+                        httpx.AsyncHTTPTransport(limits=self.limits)
+                        for _ in range(self.shards)
+                    ],
+                    max_in_flight=self.shards * self.shard_connections,
+                )
+            if self.scheduler is not None:
+                transport = self.scheduler.transport(transport, base_url)
+            http = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(timeout, connect=self.connect_timeout),
+                follow_redirects=True,
+            )
+            self._http[base_url] = http
+            # Clients built on a closed pool must not be handed out again.
+            for key in [key for key in self._clients if key[0] == base_url]:
+                del self._clients[key]
+        return http
+
+    def client(
+        self, base_url: Optional[str] = None, api_key: Optional[str] = None
+    ) -> AsyncOpenAI:
+        """The shared client for ``base_url``, OpenAI's by default.
+
+        ``base_url`` and ``api_key`` default to ``OPENAI_BASE_URL`` and
+        ``OPENAI_API_KEY`` as for ``AsyncOpenAI``.
+        """
+        base_url = (
+            base_url or os.environ.get("OPENAI_BASE_URL") or OPENAI_BASE_URL
+        ).rstrip("/")
+        api_key = api_key or os.environ.get("OPENAI_API_KEY", "")
+        http = self.http_client(base_url)
+        client = self._clients.get((base_url, api_key))
+        if client is None:
+            options: Dict[str, Any] = {}
+            if self.max_retries is not None:
+                options["max_retries"] = self.max_retries
+            client = AsyncOpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                timeout=http.timeout,
+                http_client=http,
+                **options,
+            )
+            self._clients[(base_url, api_key)] = client
+        return client
+
+    def model(
+        self,
+        model: str,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> "OpenAIChatCompletionsModel":
+        """A chat completions model on the shared client for ``base_url``."""
+        from agents import OpenAIChatCompletionsModel
+
+        return OpenAIChatCompletionsModel(
+            model=model, openai_client=self.client(base_url, api_key)
+        )
+
+    def resolve(self, model: Union[str, "Model", None]) -> "Model":
+        """``model`` as the agents SDK would resolve it, on the pooled client.
+
+        A :class:`agents.Model` is returned as is; a model name, or None for
+        the SDK default, gets the OpenAI provider's usual model class.
+        """
+        from agents import Model, OpenAIProvider
+
+        if isinstance(model, Model):
+            return model
+        return OpenAIProvider(openai_client=self.client()).get_model(model)
+
+    def install(self, api_key: Optional[str] = None) -> AsyncOpenAI:
+        """Make the OpenAI client the agents SDK default, so agents with a
+        string model share it, and return it."""
+        from agents import set_default_openai_client
+
+        client = self.client(api_key=api_key)
+        set_default_openai_client(client)
+        return client
+
+    async def aclose(self) -> None:
+        for http in self._http.values():
+            await http.aclose()
+        self._http.clear()
+        self._clients.clear()
+
+    async def __aenter__(self) -> "ClientPool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+_pool: Optional[ClientPool] = None
+
+
+def get_client_pool() -> ClientPool:
+    """Return the process-wide pool, creating it with the defaults and an
+    adaptive :class:`sales_agent.scheduler.RateScheduler`."""
+    global _pool
+    if _pool is None:
+        _pool = ClientPool(scheduler=RateScheduler())
+    return _pool
+
+
+def set_client_pool(pool: Optional[ClientPool]) -> None:
+    """Replace the process-wide pool, e.g. with one sized for a benchmark."""
+    global _pool
+    _pool = pool
@@ -0,0 +1,253 @@
+"""Near-duplicate drafts, found with MinHash over word shingles.
+
+The three personas often write much the same email, and reruns for similar
+prospects write near-identical ones, yet every copy is read by
+``sales_picker`` and every winner is formatted again by ``subject_writer``
+and ``html_converter``. :class:`DuplicateIndex` gives each draft a MinHash
+signature of its word pairs, which estimates how many of them two drafts
+share (their Jaccard similarity); drafts above ``threshold`` are near
+duplicates. Signatures are banded, so a lookup only compares against drafts
+that agree on a whole band, not against every draft seen. It is used in two
+places::
+
+    index = DuplicateIndex()
+    emailer = StructuredEmailer(subject_writer=subject_writer, dedup=index)
+    pipeline = SalesPipeline(drafters, picker, emailer, dedup=index)
+
+Before picking, near duplicates of an earlier draft are dropped, and a lone
+survivor needs no picker at all. Before formatting, a winner close to one
+formatted earlier reuses that subject and HTML, with the words that differ,
+such as the prospect's name, patched in; when a difference cannot be patched
+unambiguously the email is formatted as usual.
+
+Lookups are counted on the index (``duplicate_rate`` and ``hit_rate``) and,
+inside a trace, recorded as ``dedup`` spans, which
+:class:`sales_agent.metrics.MetricsProcessor` exports as
+``sales_agent_duplicates_total``.
+"""
+
+import contextlib
+import difflib
+import hashlib
+import html
+import random
+import re
+from collections import OrderedDict
+from typing import Any, ContextManager, Dict, List, Optional, Sequence, Tuple
+
+from agents.tracing import custom_span, get_current_trace
+
+Signature = Tuple[int, ...]
+
+# Unchanged words a patched phrase may be widened by to make it unique.
+CONTEXT_WORDS = 3
+
+_WORD = re.compile(r"\w+")
+_TOKEN = re.compile(r"\S+|\n")
+_MASK = (1 << 64) - 1
+
+# Odd multipliers and offsets of the multiply-shift hashes, one per
+# permutation; fixed so signatures are comparable across processes.
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(256)]
+
+
+def shingles(text: str, size: int = 2) -> List[str]:
+    """Overlapping runs of ``size`` lower-cased words."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)]
+    return [" ".join(words[i : i + size]) for i in range(len(words) - size + 1)]
+
+
+def minhash(text: str, permutations: int = 64, size: int = 2) -> Signature:
+    """MinHash signature of ``text``'s shingles."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in set(shingles(text, size))
+    ]
+    return tuple(
+        min(((a * h + b) & _MASK) >> 32 for h in hashes)
+        for a, b in _PERMUTATIONS[:permutations]
+    )
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def patch(
+    text: str, old: str, new: str, required: bool = True, markup: bool = True
+) -> Optional[str]:
+    """Carry the word changes from ``old`` to ``new`` over to ``text``.
+
+    ``text`` is derived from ``old``, e.g. its subject or HTML. Each changed
+    run of words, widened by up to :data:`CONTEXT_WORDS` unchanged words of
+    the same line until it is unique, must occur exactly once in ``text``, or
+    not at all if not ``required``; otherwise None is returned. New words are
+    HTML-escaped if ``markup``.
+    """
+    before, after = _TOKEN.findall(old), _TOKEN.findall(new)
+    matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+    changes = [op[1:] for op in matcher.get_opcodes() if op[0] != "equal"]
+    for k, (i1, i2, j1, j2) in enumerate(changes):
+        if "\n" in before[i1:i2] or "\n" in after[j1:j2]:
+            return None
+        # Widen only over unchanged words of the line, never into the next
+        # change.
+        first = changes[k - 1][1] if k else 0
+        last = changes[k + 1][0] if k + 1 < len(changes) else len(before)
+        while first < i1 and "\n" in before[first:i1]:
+            first += before[first:i1].index("\n") + 1
+        if "\n" in before[i2:last]:
+            last = i2 + before[i2:last].index("\n")
+        count, found = 0, None
+        for pad in range(CONTEXT_WORDS + 1):
+            lo, hi = max(first, i1 - pad), min(last, i2 + pad)
+            # An insertion has no words of its own to find; widen it first.
+            count = text.count(" ".join(before[lo:hi])) if lo < hi else 2
+            if count == 1:
+                found = lo, hi
+            if count < 2:
+                break
+        if found is None:
+            changed = " ".join(before[i1:i2])
+            if count == 0 and not required and not (changed and changed in text):
+                continue
+            return None
+        lo, hi = found
+        replacement = " ".join(after[j1 - (i1 - lo) : j2 + (hi - i2)])
+        if markup:
+            replacement = html.escape(replacement, quote=False)
+        text = text.replace(" ".join(before[lo:hi]), replacement)
+    return text
+
+
+def _dedup_span(stage: str, hit: bool) -> ContextManager[Any]:
+    """A ``dedup`` span for :mod:`sales_agent.metrics`, inside agent runs."""
+    if get_current_trace() is None:
+        return contextlib.nullcontext()
+    return custom_span("dedup", {"stage": stage, "hit": hit})
+
+
+class DuplicateIndex:
+    """MinHash signatures of drafts and the formatting of earlier winners.
+
+    Args:
+        threshold: Estimated share of word pairs two drafts must have in
+            common to be near duplicates. Another name in a 60-word email
+            keeps about 0.8 of them, a reworded sentence about 0.7, and a
+            different draft on the same product under 0.2.
+        permutations: Signature length; longer is more accurate and slower.
+        bands: Bands the signature is split into for lookups. Drafts are
+            compared when a whole band matches, so more bands find less
+            similar drafts.
+        max_entries: Formatted winners kept, least recently used dropped.
+        shingle_size: Words per shingle.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.6,
+        permutations: int = 64,
+        bands: int = 16,
+        max_entries: int = 10000,
+        shingle_size: int = 2,
+    ) -> None:
+        if not 0 < permutations <= len(_PERMUTATIONS):
+            raise ValueError(f"permutations must be 1 to {len(_PERMUTATIONS)}")
+        if permutations % bands:
+            raise ValueError("bands must divide permutations")
+        self.threshold = threshold
+        self.permutations = permutations
+        self.bands = bands
+        self.max_entries = max_entries
+        self.shingle_size = shingle_size
+        self._rows = permutations // bands
+        self._buckets: List[Dict[Signature, List[Signature]]] = [
+            {} for _ in range(bands)
+        ]
+        self._formatted: "OrderedDict[Signature, Tuple[str, str, str]]" = OrderedDict()
+        self.drafts = 0
+        self.duplicate_drafts = 0
+        self.lookups = 0
+        self.hits = 0
+
+    @property
+    def duplicate_rate(self) -> float:
+        """Fraction of drafts dropped before picking."""
+        return self.duplicate_drafts / self.drafts if self.drafts else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of winners whose formatting was reused."""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def signature(self, text: str) -> Signature:
+        return minhash(text, self.permutations, self.shingle_size)
+
+    def unique(self, drafts: Sequence[str]) -> List[str]:
+        """``drafts`` without near duplicates of an earlier one, in order."""
+        kept: List[Tuple[Signature, str]] = []
+        for draft in drafts:
+            signature = self.signature(draft)
+            duplicate = any(
+                similarity(signature, seen) >= self.threshold for seen, _ in kept
+            )
+            with _dedup_span("picker", duplicate):
+                self.drafts += 1
+                self.duplicate_drafts += duplicate
+            if not duplicate:
+                kept.append((signature, draft))
+        return [draft for _, draft in kept]
+
+    def reuse(self, body: str) -> Optional[Tuple[str, str]]:
+        """The subject and HTML of an earlier near-identical winner, patched
+        for ``body``, or None."""
+        reused = None
+        for candidate in self._nearest(self.signature(body)):
+            old, subject, html_body = self._formatted[candidate]
+            patched_html = patch(html_body, old, body)
+            patched_subject = patch(subject, old, body, False, markup=False)
+            if patched_html is not None and patched_subject is not None:
+                self._formatted.move_to_end(candidate)
+                reused = patched_subject, patched_html
+                break
+        with _dedup_span("formatter", reused is not None):
+            self.lookups += 1
+            self.hits += reused is not None
+        return reused
+
+    def remember(self, body: str, subject: str, html_body: str) -> None:
+        """Keep the formatting of ``body`` for later near duplicates."""
+        signature = self.signature(body)
+        if signature not in self._formatted:
+            for band, bucket in zip(self._bands(signature), self._buckets):
+                bucket.setdefault(band, []).append(signature)
+        self._formatted[signature] = (body, subject, html_body)
+        self._formatted.move_to_end(signature)
+        while len(self._formatted) > self.max_entries:
+            evicted, _ = self._formatted.popitem(last=False)
+            for band, bucket in zip(self._bands(evicted), self._buckets):
+                bucket[band].remove(evicted)
+                if not bucket[band]:
+                    del bucket[band]
+
+    def _bands(self, signature: Signature) -> List[Signature]:
+        rows = self._rows
+        return [signature[i * rows : (i + 1) * rows] for i in range(self.bands)]
+
+    def _nearest(self, signature: Signature) -> List[Signature]:
+        """Stored signatures above ``threshold``, most similar first."""
+        candidates = {
+            stored
+            for band, bucket in zip(self._bands(signature), self._buckets)
+            for stored in bucket.get(band, ())
+        }
+        scored = [(similarity(signature, stored), stored) for stored in candidates]
+        return [
+            stored
+            for score, stored in sorted(scored, reverse=True)
+            if score >= self.threshold
+        ]
@@ -0,0 +1,411 @@
+"""Draft pools precomputed per persona and prospect segment.
+
+Most prospects in a segment, the same role in the same industry at a company
+of similar size, get nearly the same cold email, yet the pipeline drafts each
+one live with every ``sales_agent``. :func:`precompute` drafts a few variants
+per drafter persona and segment ahead of time, as templates with SendGrid
+style ``-name-``, ``-company-`` and ``-sender-`` tags (see
+:mod:`sales_agent.mailmerge`), and stores them in a :class:`DraftPool`, a
+single SQLite file loaded into memory on open::
+
+    pool = DraftPool("drafts.sqlite3")
+    await precompute(pool, drafters, top_segments(read_prospects(path), 50))
+    campaign = Campaign(PooledPipeline(pool, drafters, LocalPicker()))
+
+:class:`PooledPipeline` picks the best template of a prospect's segment once
+and fills in the prospect's fields, which takes microseconds. A segment
+missing from the pool is drafted live the first time it is seen and added to
+the pool; prospects ``premium`` selects are always drafted live, for them.
+
+Templates with tags other than :data:`TEMPLATE_TAGS`, or with leftovers such
+as ``[Company]`` (see :func:`sales_agent.cascade.no_placeholders`), are never
+added to the pool, and a prospect whose template would still have a tag left
+after filling in is drafted live instead.
+"""
+
+import asyncio
+import collections
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from agents import Agent, Runner, Usage
+
+from sales_agent.cascade import no_placeholders
+from sales_agent.emailer import StructuredEmailer
+from sales_agent.pipeline import (
+    Picker,
+    PipelineResult,
+    SalesPipeline,
+    add_usage,
+    draft_and_pick,
+    pick_best,
+)
+
+Prospect = Dict[str, str]
+
+SEGMENT_FIELDS = ("role", "industry", "company_size")
+
+# Upper bound of each company size band, in employees.
+SIZE_BANDS = ((10, "1-10"), (50, "11-50"), (200, "51-200"), (1000, "201-1000"))
+
+ANY = "*"
+
+DEFAULTS: Prospect = {"name": "CEO", "company": "your company", "sender": "Alice"}
+
+# Tags a template may use; each has a default, so it can always be filled in.
+TEMPLATE_TAGS = tuple(DEFAULTS)
+
+_TAG = re.compile(r"(?<![\w-])-([a-z_]+)-(?![\w-])")
+_NUMBER = re.compile(r"\d+")
+_PLACEHOLDERS = no_placeholders()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    segment TEXT NOT NULL,
+    persona TEXT NOT NULL,
+    variant INTEGER NOT NULL,
+    draft BLOB NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (segment, persona, variant)
+) WITHOUT ROWID
+"""
+
+
+def size_band(value: str) -> str:
+    """The band of a company size such as ``"120"`` or ``"51-200"``."""
+    numbers = _NUMBER.findall(value.replace(",", ""))
+    if not numbers:
+        return value.strip().lower() or ANY
+    employees = int(numbers[-1])
+    for limit, band in SIZE_BANDS:
+        if employees <= limit:
+            return band
+    return f"{SIZE_BANDS[-1][0]}+"
+
+
+def segment_of(
+    prospect: Mapping[str, str], fields: Sequence[str] = SEGMENT_FIELDS
+) -> str:
+    """The segment key of ``prospect``, e.g. ``"cto|fintech|51-200"``.
+
+    Values are lower-cased and company sizes banded; missing fields are
+    ``"*"``.
+    """
+    values = []
+    for field in fields:
+        value = " ".join((prospect.get(field) or "").split()).lower()
+        if field == "company_size" and value:
+            value = size_band(value)
+        values.append(value or ANY)
+    return "|".join(values)
+
+
+def top_segments(
+    prospects: Iterable[Mapping[str, str]],
+    limit: Optional[int] = None,
+    fields: Sequence[str] = SEGMENT_FIELDS,
+) -> List[str]:
+    """The ``limit`` most common segments among ``prospects``."""
+    counts = collections.Counter(segment_of(p, fields) for p in prospects)
+    return [segment for segment, _ in counts.most_common(limit)]
+
+
+def segment_prompt(
+    segment: str, variant: int = 0, fields: Sequence[str] = SEGMENT_FIELDS
+) -> str:
+    """The drafting prompt for a segment's template."""
+    values = dict(zip(fields, segment.split("|")))
+    role = values.get("role", ANY)
+    reader = "a decision maker" if role == ANY else f"the {role}"
+    company = "a company"
+    if values.get("company_size", ANY) != ANY:
+        company = f"a {values['company_size']} employee company"
+    if values.get("industry", ANY) != ANY:
+        company += f" in {values['industry']}"
+    prompt = (
+        f"Write a cold sales email to {reader} at {company}. Write -name- for the "
+        "recipient's name, -company- for their company and -sender- for yours; "
+        "they are filled in for each prospect."
+    )
+    if variant:
+        prompt += f" This is version {variant + 1}: take a different angle."
+    return prompt
+
+
+def personalize(template: str, prospect: Mapping[str, str]) -> str:
+    """Fill ``-field-`` tags from ``prospect``, then :data:`DEFAULTS`.
+
+    Unknown tags are left as they are.
+    """
+
+    def fill(match: "re.Match[str]") -> str:
+        field = match.group(1)
+        return prospect.get(field) or DEFAULTS.get(field) or match.group(0)
+
+    return _TAG.sub(fill, template)
+
+
+def unfilled(template: str, prospect: Mapping[str, str]) -> List[str]:
+    """Tags of ``template`` that :func:`personalize` would leave in place."""
+    return [
+        tag
+        for tag in _TAG.findall(template)
+        if not (prospect.get(tag) or DEFAULTS.get(tag))
+    ]
+
+
+def template_problem(template: str) -> Optional[str]:
+    """Why ``template`` should not be pooled, or None if it is usable."""
+    unknown = sorted(set(_TAG.findall(template)) - set(TEMPLATE_TAGS))
+    if unknown:
+        return "unknown tags " + ", ".join(f"-{tag}-" for tag in unknown)
+    return _PLACEHOLDERS(template, "")
+
+
+class DraftPool:
+    """Draft templates by segment and persona, in one SQLite file.
+
+    Every draft is held in memory after opening, so lookups never touch the
+    disk; drafts are stored zlib-compressed.
+
+    Args:
+        path: Database file, created if missing; ``":memory:"`` for none.
+    """
+
+    def __init__(self, path: str = "drafts.sqlite3") -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._drafts: Dict[str, Dict[Tuple[str, int], str]] = {}
+        with self._lock, self._db:
+            self._db.execute(_SCHEMA)
+            rows = self._db.execute(
+                "SELECT segment, persona, variant, draft FROM drafts"
+            ).fetchall()
+        for segment, persona, variant, draft in rows:
+            drafts = self._drafts.setdefault(segment, {})
+            drafts[(persona, variant)] = zlib.decompress(draft).decode()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, segment: str) -> List[str]:
+        """The segment's templates, every persona's variants, or ``[]``."""
+        drafts = self._drafts.get(segment)
+        if not drafts:
+            self.misses += 1
+            return []
+        self.hits += 1
+        return [drafts[key] for key in sorted(drafts)]
+
+    def add(self, segment: str, persona: str, variant: int, draft: str) -> None:
+        self._drafts.setdefault(segment, {})[(persona, variant)] = draft
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO drafts VALUES (?, ?, ?, ?, ?)",
+                (segment, persona, variant, zlib.compress(draft.encode()), time.time()),
+            )
+
+    def segments(self) -> List[str]:
+        return sorted(self._drafts)
+
+    def __contains__(self, segment: object) -> bool:
+        return isinstance(segment, str) and bool(self._drafts.get(segment))
+
+    def __len__(self) -> int:
+        return sum(len(drafts) for drafts in self._drafts.values())
+
+    def clear(self) -> None:
+        self._drafts.clear()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM drafts")
+
+    def close(self) -> None:
+        self._db.close()
+
+
+async def precompute(
+    pool: DraftPool,
+    drafters: Sequence[Agent],
+    segments: Iterable[str],
+    variants: int = 2,
+    concurrency: int = 10,
+    usage: Optional[Usage] = None,
+    fields: Sequence[str] = SEGMENT_FIELDS,
+) -> int:
+    """Draft ``variants`` templates per drafter for every segment not yet in
+    ``pool``, at most ``concurrency`` at a time, and return how many were added.
+
+    The drafter's name is the persona the drafts are stored under. Drafts
+    with a :func:`template_problem` are dropped.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def draft(segment: str, drafter: Agent, variant: int) -> bool:
+        async with semaphore:
+            result = await Runner.run(drafter, segment_prompt(segment, variant, fields))
+        if usage is not None:
+            add_usage(usage, result)
+        template = str(result.final_output)
+        if template_problem(template) is not None:
+            return False
+        pool.add(segment, drafter.name, variant, template)
+        return True
+
+    jobs = [
+        draft(segment, drafter, variant)
+        for segment in dict.fromkeys(segments)
+        if segment not in pool
+        for drafter in drafters
+        for variant in range(variants)
+    ]
+    return sum(await asyncio.gather(*jobs))
+
+
+@dataclass
+class PoolStats:
+    """How :class:`PooledPipeline` drafted for its prospects: from the pool,
+    by drafting the prospect's segment first, or live for the prospect."""
+
+    pooled: int = 0
+    filled: int = 0
+    live: int = 0
+
+    @property
+    def prospects(self) -> int:
+        return self.pooled + self.filled + self.live
+
+    @property
+    def pooled_rate(self) -> float:
+        """Fraction of prospects served without drafting for them."""
+        return self.pooled / self.prospects if self.prospects else 0.0
+
+
+class PooledPipeline(SalesPipeline):
+    """:class:`sales_agent.pipeline.SalesPipeline` drafting from a pool.
+
+    Pass it to :class:`sales_agent.campaign.Campaign`, which calls
+    :meth:`for_prospect` with each prospect's fields.
+
+    Args:
+        pool: The precomputed templates.
+        drafters: The ``sales_agent`` agents, for segments missing from the
+            pool and premium prospects.
+        picker: Chooses a segment's template once, and premium prospects'
+            drafts each time.
+        emailer: As for ``SalesPipeline``.
+        premium: Selects prospects that are always drafted live.
+        variants: Templates per drafter drafted for a missing segment.
+        fields: Prospect fields that define a segment.
+    """
+
+    def __init__(
+        self,
+        pool: DraftPool,
+        drafters: Sequence[Agent],
+        picker: Picker,
+        emailer: Optional[Union[Agent, StructuredEmailer]] = None,
+        premium: Optional[Callable[[Mapping[str, str]], bool]] = None,
+        variants: int = 1,
+        fields: Sequence[str] = SEGMENT_FIELDS,
+        trace_name: str = "Sales pipeline",
+    ) -> None:
+        super().__init__(drafters, picker, emailer, trace_name)
+        self.pool = pool
+        self.premium = premium
+        self.variants = variants
+        self.fields = tuple(fields)
+        self.pool_stats = PoolStats()
+        self._best: Dict[str, "asyncio.Future[Tuple[str, List[str]]]"] = {}
+
+    async def template(
+        self, segment: str, usage: Optional[Usage] = None
+    ) -> Tuple[str, List[str]]:
+        """The best template of ``segment`` and all of its templates.
+
+        A segment missing from the pool is drafted first. Concurrent calls for
+        the same segment share one pick. Templates with a
+        :func:`template_problem` are skipped; with none left, the template is
+        ``""``.
+        """
+        future = self._best.get(segment)
+        if future is None or (future.done() and future.exception() is not None):
+            future = asyncio.ensure_future(self._template(segment, usage))
+            self._best[segment] = future
+        return await asyncio.shield(future)
+
+    async def _template(
+        self, segment: str, usage: Optional[Usage]
+    ) -> Tuple[str, List[str]]:
+        templates = self.pool.get(segment)
+        if not templates:
+            await precompute(
+                self.pool,
+                self.drafters,
+                [segment],
+                self.variants,
+                usage=usage,
+                fields=self.fields,
+            )
+            templates = self.pool.get(segment)
+        templates = [t for t in templates if template_problem(t) is None]
+        if not templates:
+            return "", []
+        return await pick_best(self.picker, templates, usage), templates
+
+    async def run_prospect(self, prospect: Prospect, message: str) -> PipelineResult:
+        """Draft for ``prospect`` from the pool, or live with ``message`` if
+        it is premium or its segment has no template that can be filled in
+        for it, then pick and deliver."""
+        usage = Usage()
+        with self._trace():
+            live = self.premium is not None and self.premium(prospect)
+            if not live:
+                segment = segment_of(prospect, self.fields)
+                pooled = segment in self.pool or segment in self._best
+                template, templates = await self.template(segment, usage)
+                live = not template or bool(unfilled(template, prospect))
+            if live:
+                self.pool_stats.live += 1
+                best, drafts = await draft_and_pick(
+                    self.drafters, self.picker, message, usage
+                )
+            else:
+                if pooled:
+                    self.pool_stats.pooled += 1
+                else:
+                    self.pool_stats.filled += 1
+                best = personalize(template, prospect)
+                drafts = [
+                    personalize(draft, prospect)
+                    for draft in templates
+                    if not unfilled(draft, prospect)
+                ]
+            result = await self.deliver(
+                PipelineResult(drafts=drafts, best=best, usage=usage)
+            )
+        return result
+
+    async def for_prospect(self, prospect: Prospect, message: str) -> Any:
+        result = await self.run_prospect(prospect, message)
+        return result.output if self.emailer is not None else result.best
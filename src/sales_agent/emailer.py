@@ -0,0 +1,136 @@
+"""Fast paths for the Email Manager.
+
+The ``emailer_agent`` spends a planning turn, then calls ``subject_writer``,
+``html_converter`` and ``send_html_email`` one after another, each a separate
+model round-trip. Both the subject and the HTML depend only on the email body,
+so :class:`StructuredEmailer` either produces them together in one call with a
+Pydantic ``output_type`` (the same pattern as ``NameCheckOutput`` in Lab 3),
+or runs the two existing agents concurrently, and then sends directly. Without
+an ``html_converter`` the HTML is rendered locally by
+:func:`sales_agent.render.render_email`. With a
+:class:`sales_agent.dedup.DuplicateIndex`, a body close to one formatted
+before reuses its subject and HTML without any model call.
+"""
+
+import asyncio
+from typing import Any, Optional, Union
+
+from agents import Agent, Model, Runner, Usage
+from pydantic import BaseModel
+
+from sales_agent.dedup import DuplicateIndex
+from sales_agent.guardrails import wait_for_guardrails
+from sales_agent.mail import MailSender, build_mail, get_mail_transport
+from sales_agent.render import render_email
+
+FORMATTER_INSTRUCTIONS = (
+    "You format cold sales emails for sending. You are given a text email body "
+    "which might have some markdown. Write a subject for the email that is likely "
+    "to get a response, and convert the body to an HTML email body with simple, "
+    "clear, compelling layout and design."
+)
+
+
+class FormattedEmail(BaseModel):
+    subject: str
+    html_body: str
+
+
+def build_email_formatter(model: Union[str, Model] = "gpt-4o-mini") -> Agent:
+    """An agent that returns a :class:`FormattedEmail` in a single call."""
+    return Agent(
+        name="Email formatter",
+        instructions=FORMATTER_INSTRUCTIONS,
+        output_type=FormattedEmail,
+        model=model,
+    )
+
+
+async def send_email(
+    email: FormattedEmail, transport: Optional[MailSender] = None
+) -> None:
+    """Send ``email`` as HTML, once any pending guardrails have passed."""
+    await wait_for_guardrails()
+    transport = transport or get_mail_transport()
+    await transport.send(build_mail(email.subject, email.html_body, "text/html"))
+
+
+class StructuredEmailer:
+    """Format an email body without the Email Manager's serial tool turns.
+
+    Pass ``formatter`` (see :func:`build_email_formatter`) for one structured
+    call, or ``subject_writer`` and ``html_converter`` to run the existing
+    agents at the same time. With ``subject_writer`` alone, only the subject
+    costs a model call and the HTML is rendered locally.
+
+    Args:
+        formatter: Agent with ``output_type=FormattedEmail``.
+        subject_writer: The Lab 2/3 subject writer agent.
+        html_converter: The Lab 2/3 HTML converter agent, as an opt-in
+            alternative to local rendering.
+        layout: Layout for local rendering, see :data:`sales_agent.render.LAYOUTS`.
+        transport: Mail transport or outbox; defaults to the shared one.
+        dedup: Reuses the formatting of earlier near-identical bodies.
+    """
+
+    def __init__(
+        self,
+        formatter: Optional[Agent] = None,
+        subject_writer: Optional[Agent] = None,
+        html_converter: Optional[Agent] = None,
+        layout: str = "simple",
+        transport: Optional[MailSender] = None,
+        dedup: Optional[DuplicateIndex] = None,
+    ) -> None:
+        if formatter is None and subject_writer is None:
+            raise ValueError("Give either a formatter or a subject_writer")
+        self.formatter = formatter
+        self.subject_writer = subject_writer
+        self.html_converter = html_converter
+        self.layout = layout
+        self.transport = transport
+        self.dedup = dedup
+
+    async def format(self, body: str, usage: Optional[Usage] = None) -> FormattedEmail:
+        """Return the subject and HTML for ``body``, adding token use to ``usage``."""
+        if self.dedup is not None:
+            reused = self.dedup.reuse(body)
+            if reused is not None:
+                return FormattedEmail(subject=reused[0], html_body=reused[1])
+        if self.formatter is not None:
+            results = [await Runner.run(self.formatter, body)]
+            email = results[0].final_output_as(FormattedEmail)
+        elif self.html_converter is None:
+            assert self.subject_writer is not None
+            results = [await Runner.run(self.subject_writer, body)]
+            email = FormattedEmail(
+                subject=str(results[0].final_output),
+                html_body=render_email(body, self.layout),
+            )
+        else:
+            assert self.subject_writer is not None
+            results = list(
+                await asyncio.gather(
+                    Runner.run(self.subject_writer, body),
+                    Runner.run(self.html_converter, body),
+                )
+            )
+            email = FormattedEmail(
+                subject=str(results[0].final_output),
+                html_body=str(results[1].final_output),
+            )
+        if usage is not None:
+            for result in results:
+                usage.add(result.context_wrapper.usage)
+        if self.dedup is not None:
+            self.dedup.remember(body, email.subject, email.html_body)
+        return email
+
+    async def send(self, body: str, usage: Optional[Usage] = None) -> FormattedEmail:
+        """Format ``body`` and send it, once any pending guardrails have passed."""
+        email = await self.format(body, usage)
+        await send_email(email, self.transport)
+        return email
+
+    async def __call__(self, body: str) -> Any:
+        return await self.send(body)
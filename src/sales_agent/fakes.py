@@ -0,0 +1,840 @@
+"""Local stand-ins for the services the labs call.
+
+The HTTP servers speak just enough HTTP/1.1 (keep-alive, ``Content-Length``
+bodies, chunked streams) for ``httpx``, the SendGrid SDK and the OpenAI SDK to
+talk to them, and
+:class:`FakeModel` plays the part of an LLM inside the agents SDK, so
+throughput and token use can be measured offline without a real account.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from agents import Model, ModelResponse, Usage
+from agents.tracing import GenerationSpanData, Span, generation_span
+from openai.types.responses import Response as OpenAIResponse
+from openai.types.responses import (
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import (
+    InputTokensDetails,
+    OutputTokensDetails,
+)
+
+# An async iterable payload is sent with chunked transfer encoding.
+Response = Tuple[int, Dict[str, str], Union[bytes, AsyncIterable[bytes]]]
+
+# Lets start() and friends return the subclass, e.g. a FakeSendGridServer.
+_Server = TypeVar("_Server", bound="StubHTTPServer")
+
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class StubHTTPServer:
+    """Minimal asyncio HTTP/1.1 server; subclasses implement :meth:`handle`."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def handle(
+        self, method: str, path: str, headers: Dict[str, str], body: bytes
+    ) -> Response:
+        raise NotImplementedError
+
+    async def start(self: _Server) -> _Server:
+        # A deep accept queue, as real APIs have, so bursts of new connections
+        # are not dropped and retried by the kernel.
+        self._server = await asyncio.start_server(
+            self._serve, self.host, self.port, backlog=1024
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self: _Server) -> _Server:
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    @contextmanager
+    def running_in_thread(self: _Server) -> Iterator[_Server]:
+        """Serve from a background thread with its own event loop.
+
+        Needed when the caller blocks its own loop, as the synchronous SendGrid
+        client does, since an in-loop server could then never answer.
+        """
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), loop).result()
+        try:
+            yield self
+        finally:
+            asyncio.run_coroutine_threadsafe(self.stop(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+                status, response_headers, payload = await self.handle(
+                    method, path, headers, body
+                )
+                await self._write(writer, status, response_headers, payload)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # The client hung up or the server is shutting down.
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _write(
+        writer: asyncio.StreamWriter,
+        status: int,
+        headers: Dict[str, str],
+        payload: Union[bytes, AsyncIterable[bytes]],
+    ) -> None:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if isinstance(payload, bytes):
+            lines.append(f"Content-Length: {len(payload)}")
+            head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+            writer.write(head + payload)
+            await writer.drain()
+            return
+        lines.append("Transfer-Encoding: chunked")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        async for chunk in payload:
+            if chunk:
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+class FakeSendGridServer(StubHTTPServer):
+    """Accepts ``POST /v3/mail/send`` and records every payload it receives.
+
+    Args:
+        latency: Seconds to wait before answering each request.
+        status: Status code to answer with; SendGrid uses 202 on success.
+        error_rate: Fraction of requests answered with 503 and not recorded.
+        seed: Seeds the error injection.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        status: int = 202,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        super().__init__(host, port)
+        self.latency = latency
+        self.status = status
+        self.error_rate = error_rate
+        self.errors = 0
+        self.mails: List[Dict[str, Any]] = []
+        self._rng = random.Random(seed)
+
+    async def handle(
+        self, method: str, path: str, headers: Dict[str, str], body: bytes
+    ) -> Response:
+        if method != "POST" or path != "/v3/mail/send":
+            return 404, {}, b""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            return 503, {}, b""
+        self.mails.append(json.loads(body or b"{}"))
+        return self.status, {}, b""
+
+
+class FakeOpenAIServer(StubHTTPServer):
+    """OpenAI-compatible ``POST /v1/chat/completions`` with tunable behaviour.
+
+    Stands in for OpenAI, DeepSeek, Gemini or Groq behind an ``AsyncOpenAI``
+    client with ``base_url=server.url + "/v1"``. It follows the labs' agent
+    patterns the way :class:`FakeModel` does: every tool without a result yet
+    is called, then the first handoff (``transfer_to_...``) is taken, then a
+    pseudo-email seeded from the request is the reply, or JSON matching a
+    ``response_format`` schema. ``"stream": true`` is answered with
+    server-sent events, and failures can be injected at a given rate.
+    ``latency`` and ``error_rate`` may be changed while the server runs.
+
+    With ``requests_per_minute`` or ``tokens_per_minute`` set, it enforces the
+    quota the way OpenAI does: continuously refilled buckets, a request's
+    prompt plus ``max_tokens`` charged up front, 429 with ``Retry-After``
+    once a bucket runs dry, and ``x-ratelimit-*`` headers on every answer.
+
+    Args:
+        latency: Seconds before the first token, or a callable sampling them.
+        seconds_per_token: Time per output token.
+        reply_tokens: Approximate length of replies.
+        error_rate: Fraction of requests answered with ``error_status``.
+        error_status: Status for injected failures, e.g. 429 or 503.
+        seed: Seeds the error injection.
+        structured: Builds the JSON reply for a ``response_format`` schema;
+            defaults to filling the schema with placeholder values.
+        reply: Builds text replies from the latest input text.
+        requests_per_minute: Request quota; None for no limit.
+        tokens_per_minute: Token quota; None for no limit.
+        rate_limit_headers: Send ``x-ratelimit-*`` headers. Some providers,
+            DeepSeek and Gemini among them, do not.
+    """
+
+    def __init__(
+        self,
+        latency: "Latency" = 0.0,
+        seconds_per_token: float = 0.0,
+        reply_tokens: int = 150,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: int = 0,
+        structured: Optional[Callable[[Dict[str, Any], str], Dict[str, Any]]] = None,
+        reply: Optional[Callable[[str], str]] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        rate_limit_headers: bool = True,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        super().__init__(host, port)
+        self.latency = latency
+        self.seconds_per_token = seconds_per_token
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.structured = structured
+        self.reply = reply
+        self.completions = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.usage = Usage()
+        self._rng = random.Random(seed)
+        self.rate_limit_headers = rate_limit_headers
+        self._quotas = {
+            kind: _Quota(limit)
+            for kind, limit in (
+                ("requests", requests_per_minute),
+                ("tokens", tokens_per_minute),
+            )
+            if limit is not None
+        }
+
+    def _admit(
+        self, request: Dict[str, Any], body: bytes
+    ) -> Tuple[bool, Dict[str, str]]:
+        """Charge the quotas; whether the request is admitted, and the headers
+        to answer with."""
+        cost = {
+            "requests": 1.0,
+            "tokens": float(
+                count_tokens(body.decode("utf-8", "replace"))
+                + (request.get("max_tokens") or self.reply_tokens)
+            ),
+        }
+        for quota in self._quotas.values():
+            quota.refill()
+        short = [k for k, q in self._quotas.items() if q.available < cost[k]]
+        if not short:
+            for kind, quota in self._quotas.items():
+                quota.available -= cost[kind]
+        headers: Dict[str, str] = {}
+        if self.rate_limit_headers:
+            for kind, quota in self._quotas.items():
+                headers[f"x-ratelimit-limit-{kind}"] = str(int(quota.limit))
+                headers[f"x-ratelimit-remaining-{kind}"] = str(int(quota.available))
+                headers[f"x-ratelimit-reset-{kind}"] = _duration(quota.reset())
+            if short:
+                wait = max(self._quotas[k].wait(cost[k]) for k in short)
+                headers["Retry-After"] = f"{wait:.3f}"
+        return not short, headers
+
+    async def handle(
+        self, method: str, path: str, headers: Dict[str, str], body: bytes
+    ) -> Response:
+        if method != "POST" or not path.endswith("/chat/completions"):
+            return 404, {}, b""
+        request = json.loads(body or b"{}")
+        admitted, limit_headers = (
+            self._admit(request, body) if self._quotas else (True, {})
+        )
+        if not admitted:
+            self.rate_limited += 1
+            error = {"error": {"message": "Rate limit reached", "type": "requests"}}
+            return 429, {**_JSON, **limit_headers}, json.dumps(error).encode()
+        delay = self.latency() if callable(self.latency) else self.latency
+        await asyncio.sleep(delay)
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            error = {"error": {"message": "Injected failure", "type": "server_error"}}
+            return self.error_status, _JSON, json.dumps(error).encode()
+        messages = request.get("messages", [])
+        text, tool_calls = self._respond(request)
+        prompt = json.dumps(messages) + json.dumps(request.get("tools", []))
+        usage = {
+            "prompt_tokens": count_tokens(prompt),
+            "completion_tokens": count_tokens(
+                (text or "") + "".join(c["function"]["arguments"] for c in tool_calls)
+            ),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        self.usage.add(
+            Usage(
+                requests=1,
+                input_tokens=usage["prompt_tokens"],
+                output_tokens=usage["completion_tokens"],
+                total_tokens=usage["total_tokens"],
+            )
+        )
+        self.completions += 1
+        completion = {
+            "id": f"chatcmpl-{self.completions}",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+        }
+        if request.get("stream"):
+            events = self._stream(completion, text, tool_calls, usage)
+            return 200, {"Content-Type": "text/event-stream", **limit_headers}, events
+        await asyncio.sleep(usage["completion_tokens"] * self.seconds_per_token)
+        message: Dict[str, Any] = {"role": "assistant", "content": text}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        completion.update(
+            object="chat.completion",
+            choices=[
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if tool_calls else "stop",
+                }
+            ],
+            usage=usage,
+        )
+        return 200, {**_JSON, **limit_headers}, json.dumps(completion).encode()
+
+    def _respond(
+        self, request: Dict[str, Any]
+    ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """The reply text, or the tool calls to make instead."""
+        messages = request.get("messages", [])
+        called = {
+            call["function"]["name"]
+            for message in messages
+            for call in message.get("tool_calls") or []
+        }
+        functions = [
+            tool["function"]
+            for tool in request.get("tools", [])
+            if tool["function"]["name"] not in called
+        ]
+        pending = [f for f in functions if not f["name"].startswith("transfer_to_")]
+        handoffs = [f for f in functions if f["name"].startswith("transfer_to_")]
+        latest = _latest_chat_text(messages)
+        if pending:
+            if not request.get("parallel_tool_calls", True):
+                pending = pending[:1]
+            return None, [_chat_tool_call(f, latest) for f in pending]
+        if handoffs:
+            return None, [_chat_tool_call(handoffs[0], latest)]
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"].get("schema", {})
+            reply = (
+                self.structured(schema, latest)
+                if self.structured
+                else _fill_schema(schema, latest)
+            )
+            return json.dumps(reply), []
+        if self.reply is not None:
+            return self.reply(latest), []
+        return _pseudo_email(json.dumps(messages), self.reply_tokens), []
+
+    async def _stream(
+        self,
+        completion: Dict[str, Any],
+        text: Optional[str],
+        tool_calls: List[Dict[str, Any]],
+        usage: Dict[str, int],
+    ) -> AsyncIterator[bytes]:
+        def event(delta: Dict[str, Any], **extra: Any) -> bytes:
+            chunk = dict(completion, object="chat.completion.chunk")
+            chunk["choices"] = [
+                {"index": 0, "delta": delta, "finish_reason": extra.get("finish")}
+            ]
+            if "usage" in extra:
+                chunk["usage"] = extra["usage"]
+            return b"data: " + json.dumps(chunk).encode() + b"\n\n"
+
+        for i, call in enumerate(tool_calls):
+            tokens = count_tokens(call["function"]["arguments"])
+            await asyncio.sleep(tokens * self.seconds_per_token)
+            yield event({"role": "assistant", "tool_calls": [dict(call, index=i)]})
+        words = text.split(" ") if text is not None else []
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.seconds_per_token)
+            delta = {"content": word if i == len(words) - 1 else word + " "}
+            if i == 0:
+                delta["role"] = "assistant"
+            yield event(delta)
+        finish = "tool_calls" if tool_calls else "stop"
+        yield event({}, finish=finish, usage=usage)
+        yield b"data: [DONE]\n\n"
+
+
+_JSON = {"Content-Type": "application/json"}
+
+
+class _Quota:
+    """A per-minute server-side quota, refilled continuously."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.limit = per_minute
+        self.available = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(
+            self.limit, self.available + (now - self.updated) * self.limit / 60
+        )
+        self.updated = now
+
+    def wait(self, amount: float) -> float:
+        """Seconds until ``amount`` is available."""
+        return max(0.0, amount - self.available) * 60 / self.limit
+
+    def reset(self) -> float:
+        """Seconds until the quota is full again."""
+        return self.wait(self.limit)
+
+
+def _duration(seconds: float) -> str:
+    """Format like OpenAI's reset headers: ``"20ms"``, ``"1.5s"``, ``"6m0s"``."""
+    if seconds < 1:
+        return f"{int(seconds * 1000)}ms"
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes)}m{seconds:.0f}s" if minutes else f"{seconds:.3g}s"
+
+
+_WORDS = (
+    "compliance audit SOC2 ready evidence controls automate team weeks save "
+    "risk policy customers trust security review quick call demo ComplAI "
+    "effortless continuous monitoring reports your time focus growth"
+).split()
+
+Latency = Union[float, Callable[[], float]]
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (four characters per token) used by the fakes."""
+    return max(1, len(text) // 4)
+
+
+class FakeModel(Model):
+    """Deterministic stand-in for an LLM that follows the labs' agent patterns.
+
+    Each turn it calls every tool that has not produced an output yet (all at
+    once, or one per turn when ``parallel_tool_calls`` is off), then takes the
+    first handoff, then answers with text. Text is a pseudo-email seeded from
+    the instructions and input, so identical prompts give identical replies.
+    Usage is estimated with :func:`count_tokens` and totalled in ``usage``
+    across every agent sharing the model, nested ``as_tool`` runs included.
+
+    Args:
+        latency: Seconds per call, or a callable sampling them.
+        seconds_per_token: Extra time per output token, to mimic generation.
+        reply_tokens: Approximate length of text replies.
+        parallel_tool_calls: Default when the agent's settings leave it unset.
+        structured: Builds the JSON reply for agents with an ``output_type``;
+            defaults to filling the schema with placeholder values.
+        reply: Builds text replies from the latest input text, e.g. to make
+            a picker repeat one of its drafts; defaults to a pseudo-email.
+        prompt_cache_min_tokens: Mimic provider prompt caching: prompts at
+            least this long report the longest previously seen prefix, in
+            128-token blocks, as cached tokens. ``None`` disables it; OpenAI
+            uses 1024.
+        name: Model name on the ``generation`` span each call records, e.g.
+            ``"gpt-4o-mini"`` to have :mod:`sales_agent.metrics` price it.
+    """
+
+    def __init__(
+        self,
+        latency: Latency = 0.0,
+        seconds_per_token: float = 0.0,
+        reply_tokens: int = 150,
+        parallel_tool_calls: bool = True,
+        structured: Optional[Callable[[Dict[str, Any], str], Dict[str, Any]]] = None,
+        reply: Optional[Callable[[str], str]] = None,
+        prompt_cache_min_tokens: Optional[int] = None,
+        name: str = "fake",
+    ) -> None:
+        self.latency = latency
+        self.seconds_per_token = seconds_per_token
+        self.reply_tokens = reply_tokens
+        self.parallel_tool_calls = parallel_tool_calls
+        self.structured = structured
+        self.reply = reply
+        self.prompt_cache_min_tokens = prompt_cache_min_tokens
+        self.name = name
+        self.usage = Usage()
+        self._prefixes: Set[bytes] = set()
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        call = _bind_call(*args, **kwargs)
+        output, usage = self._turn(call)
+        delay = self.latency() if callable(self.latency) else self.latency
+        with self._span(call, usage):
+            await asyncio.sleep(delay + usage.output_tokens * self.seconds_per_token)
+        return ModelResponse(output=output, usage=usage, response_id=None)
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Emit text a word at a time after ``latency``, like a token stream."""
+        call = _bind_call(*args, **kwargs)
+        output, usage = self._turn(call)
+        delay = self.latency() if callable(self.latency) else self.latency
+        with self._span(call, usage):
+            await asyncio.sleep(delay)
+            sequence = 0
+            for index, item in enumerate(output):
+                if not isinstance(item, ResponseOutputMessage):
+                    continue
+                text = "".join(
+                    part.text
+                    for part in item.content
+                    if isinstance(part, ResponseOutputText)
+                )
+                words = text.split(" ")
+                for i, word in enumerate(words):
+                    piece = word if i == len(words) - 1 else word + " "
+                    await asyncio.sleep(count_tokens(piece) * self.seconds_per_token)
+                    yield ResponseTextDeltaEvent(
+                        content_index=0,
+                        delta=piece,
+                        item_id=item.id,
+                        output_index=index,
+                        sequence_number=sequence,
+                        type="response.output_text.delta",
+                        logprobs=[],
+                    )
+                    sequence += 1
+            response = OpenAIResponse(
+                id="resp_fake",
+                created_at=time.time(),
+                model=self.name,
+                object="response",
+                output=output,
+                tool_choice="auto",
+                tools=[],
+                parallel_tool_calls=False,
+                usage=ResponseUsage(
+                    input_tokens=usage.input_tokens,
+                    output_tokens=usage.output_tokens,
+                    total_tokens=usage.total_tokens,
+                    input_tokens_details=usage.input_tokens_details,
+                    output_tokens_details=_details(OutputTokensDetails),
+                ),
+            )
+            yield ResponseCompletedEvent(
+                response=response, type="response.completed", sequence_number=sequence
+            )
+
+    def _span(self, call: Dict[str, Any], usage: Usage) -> Span[GenerationSpanData]:
+        tracing = call.get("tracing")
+        return generation_span(
+            model=self.name,
+            usage={
+                "input_tokens": usage.input_tokens,
+                "cached_tokens": usage.input_tokens_details.cached_tokens,
+                "output_tokens": usage.output_tokens,
+            },
+            disabled=tracing is None or tracing.is_disabled(),
+        )
+
+    def _turn(self, call: Dict[str, Any]) -> Tuple[List[Any], Usage]:
+        output = self._respond(call)
+        text = "".join(
+            part.text
+            for item in output
+            if isinstance(item, ResponseOutputMessage)
+            for part in item.content
+            if isinstance(part, ResponseOutputText)
+        )
+        calls_text = "".join(
+            item.arguments
+            for item in output
+            if isinstance(item, ResponseFunctionToolCall)
+        )
+        prompt = (
+            (call["system_instructions"] or "")
+            + json.dumps(call["input"], default=str)
+            + json.dumps([_tool_schema(tool) for tool in call["tools"]])
+        )
+        usage = Usage(
+            requests=1,
+            input_tokens=count_tokens(prompt),
+            input_tokens_details=_details(
+                InputTokensDetails, cached_tokens=self._cached_tokens(prompt)
+            ),
+            output_tokens=count_tokens(text + calls_text),
+        )
+        usage.total_tokens = usage.input_tokens + usage.output_tokens
+        self.usage.add(usage)
+        return output, usage
+
+    def _cached_tokens(self, prompt: str) -> int:
+        if self.prompt_cache_min_tokens is None:
+            return 0
+        block = 128 * 4  # count_tokens uses four characters per token
+        cached = 0
+        for end in range(block, len(prompt) + 1, block):
+            key = hashlib.sha1(prompt[:end].encode()).digest()
+            if key in self._prefixes and cached == end - block:
+                cached = end
+            self._prefixes.add(key)
+        tokens = cached // 4
+        return tokens if tokens >= self.prompt_cache_min_tokens else 0
+
+    def _respond(self, call: Dict[str, Any]) -> List[Any]:
+        items = call["input"]
+        if isinstance(items, str):
+            items = [{"role": "user", "content": items}]
+        called = {
+            item.get("name")
+            for item in items
+            if isinstance(item, dict) and item.get("type") == "function_call"
+        }
+        pending = [tool for tool in call["tools"] if tool.name not in called]
+        latest = _latest_text(items)
+        if pending:
+            parallel = call["model_settings"].parallel_tool_calls
+            if parallel is None:
+                parallel = self.parallel_tool_calls
+            return [
+                _function_call(tool.name, _tool_schema(tool), latest)
+                for tool in (pending if parallel else pending[:1])
+            ]
+        handoffs = [h for h in call["handoffs"] if h.tool_name not in called]
+        if handoffs:
+            return [
+                _function_call(
+                    handoffs[0].tool_name, handoffs[0].input_json_schema, latest
+                )
+            ]
+        seed = (call["system_instructions"] or "") + json.dumps(items, default=str)
+        schema = call["output_schema"]
+        if schema is not None and not schema.is_plain_text():
+            json_schema = schema.json_schema()
+            reply = (
+                self.structured(json_schema, latest)
+                if self.structured
+                else _fill_schema(json_schema, latest)
+            )
+            return [_message(json.dumps(reply))]
+        if self.reply is not None:
+            return [_message(self.reply(latest))]
+        return [_message(_pseudo_email(seed, self.reply_tokens))]
+
+
+_Details = TypeVar("_Details", InputTokensDetails, OutputTokensDetails)
+
+
+def _details(cls: Type[_Details], **counts: int) -> _Details:
+    """Token details with every counter the installed ``openai`` knows.
+
+    Newer releases add required fields (``cache_write_tokens``), so unnamed
+    counters are zero rather than spelled out for one version.
+    """
+    fields = {name: 0 for name in cls.model_fields}
+    fields.update(counts)
+    return cls.model_validate(fields)
+
+
+def _bind_call(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+    names = [
+        "system_instructions",
+        "input",
+        "model_settings",
+        "tools",
+        "output_schema",
+        "handoffs",
+        "tracing",
+    ]
+    call = dict(zip(names, args))
+    call.update(kwargs)
+    return call
+
+
+def _tool_schema(tool: Any) -> Dict[str, Any]:
+    return getattr(tool, "params_json_schema", {}) or {}
+
+
+def _latest_text(items: List[Any]) -> str:
+    """The newest user message or tool output, skipping handoff bookkeeping."""
+    handoff_calls = {
+        item.get("call_id")
+        for item in items
+        if isinstance(item, dict)
+        and item.get("type") == "function_call"
+        and str(item.get("name", "")).startswith("transfer_to_")
+    }
+    for item in reversed(items):
+        if not isinstance(item, dict) or item.get("call_id") in handoff_calls:
+            continue
+        if item.get("type") == "function_call_output":
+            return str(item.get("output", ""))
+        if item.get("role") == "user":
+            content = item.get("content", "")
+            return content if isinstance(content, str) else json.dumps(content)
+    return ""
+
+
+def _latest_chat_text(messages: List[Dict[str, Any]]) -> str:
+    """:func:`_latest_text` for chat-completions messages."""
+    handoff_calls = {
+        call["id"]
+        for message in messages
+        for call in message.get("tool_calls") or []
+        if call["function"]["name"].startswith("transfer_to_")
+    }
+    for message in reversed(messages):
+        if message.get("role") == "tool":
+            if message.get("tool_call_id") not in handoff_calls:
+                return str(message.get("content", ""))
+        elif message.get("role") == "user":
+            content = message.get("content", "")
+            return content if isinstance(content, str) else json.dumps(content)
+    return ""
+
+
+def _fill_schema(schema: Dict[str, Any], text: str) -> Any:
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: _fill_schema(prop, text)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [_fill_schema(schema.get("items", {}), text)]
+    if kind == "boolean":
+        return False
+    if kind in ("integer", "number"):
+        return 0
+    return text
+
+
+def _function_call(name: str, schema: Dict[str, Any], text: str) -> Any:
+    arguments = _fill_schema(schema, text) if schema.get("properties") else {}
+    call_id = "call_" + hashlib.sha1(f"{name}:{text}".encode()).hexdigest()[:16]
+    return ResponseFunctionToolCall(
+        id=call_id,
+        call_id=call_id,
+        name=name,
+        arguments=json.dumps(arguments),
+        type="function_call",
+        status="completed",
+    )
+
+
+def _chat_tool_call(function: Dict[str, Any], text: str) -> Dict[str, Any]:
+    schema = function.get("parameters") or {}
+    arguments = _fill_schema(schema, text) if schema.get("properties") else {}
+    name = function["name"]
+    call_id = "call_" + hashlib.sha1(f"{name}:{text}".encode()).hexdigest()[:16]
+    return {
+        "id": call_id,
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(arguments)},
+    }
+
+
+def _message(text: str) -> Any:
+    return ResponseOutputMessage(
+        id="msg_fake",
+        role="assistant",
+        status="completed",
+        type="message",
+        content=[ResponseOutputText(text=text, type="output_text", annotations=[])],
+    )
+
+
+def _pseudo_email(seed: str, tokens: int) -> str:
+    rng = random.Random(hashlib.sha1(seed.encode()).hexdigest())
+    words = [rng.choice(_WORDS) for _ in range(max(1, tokens * 3 // 4))]
+    paragraphs = [" ".join(words[i : i + 30]) for i in range(0, len(words), 30)]
+    return "Dear CEO,\n\n" + ".\n\n".join(paragraphs) + ".\n\nBest,\nAlice"
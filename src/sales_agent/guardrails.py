@@ -0,0 +1,335 @@
+"""Tiered input guardrail against personal names.
+
+``guardrail_against_name`` in Lab 3 spends a full ``guardrail_agent`` call on
+every message before the Sales Manager can start. Most messages are easy to
+settle locally: "Dear CEO from Alice" contains a well-known first name, and
+"Dear CEO from Head of Business Development" contains only a role.
+:class:`TieredNameCheck` runs a gazetteer and compiled-regex detector first
+and asks the LLM only when a message has capitalised words it cannot place.
+Verdicts are memoised, so repeated messages cost nothing at all.
+
+:func:`run_optimistic` takes guardrail latency off the critical path: the
+guardrails and the agent's first model call start together, tools wrapped
+with :func:`gated_tool` (such as ``send_html_email``) wait until every
+guardrail has passed, and the run is cancelled if a tripwire fires.
+"""
+
+import asyncio
+import dataclasses
+import re
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Union
+
+from agents import (
+    Agent,
+    FunctionTool,
+    GuardrailFunctionOutput,
+    InputGuardrail,
+    InputGuardrailTripwireTriggered,
+    RunContextWrapper,
+    Runner,
+    RunResult,
+    TResponseInputItem,
+    input_guardrail,
+)
+from pydantic import BaseModel
+
+
+class NameCheckOutput(BaseModel):
+    is_name_in_message: bool
+    name: str
+
+
+FIRST_NAMES = frozenset("""
+    aaron adam adrian ahmed aisha alan albert alex alexander alexandra alice
+    alicia amanda amelia amir amy ana andrea andrew angela anna anne anthony
+    antonio arjun ava barbara ben benjamin beth brian carlos caroline
+    catherine charles charlie chen chris christina christopher claire
+    daniel david deborah diana diego dmitri donna dorothy ed edward elena eli
+    elizabeth ella emily emma eric ethan fatima fiona francesca gabriel
+    george hannah helen henry ian isabella jacob james jane
+    janet jason jennifer jessica jim joan joe john jonathan jose joseph joshua
+    julia karen kate katherine kelly kenji kevin kim laura lauren leo liam
+    linda lisa lucas lucy luis maria marie martin mary matthew maya megan
+    mei michael michelle mike mohammed nancy natalie nathan nicholas nicole
+    noah oleksandr oliver olivia omar oscar patricia paul peter priya rachel
+    raj rebecca richard robert ryan sam samantha sandra sara sarah scott sean
+    sofia sophia stephen steven susan thomas tim timothy tom william
+    yuki zoe
+    """.split())
+
+# First names that are also ordinary words or places; these always go to the
+# LLM, even at the start of a sentence.
+AMBIGUOUS_NAMES = frozenset(
+    "april august bill carol charlotte dawn faith frank grace grant harry "
+    "hope iris ivy jack june mark may max pat rose sky summer victoria "
+    "will".split()
+)
+
+ROLES = (
+    "head of business development",
+    "business development manager",
+    "business development",
+    "account executive",
+    "sales development representative",
+    "sales manager",
+    "email manager",
+    "sales team",
+    "co-founder",
+    "founder",
+    "ceo",
+    "cto",
+    "cfo",
+    "coo",
+    "cmo",
+    "ciso",
+    "sdr",
+)
+
+# Capitalised words that are neither names nor suspicious.
+KNOWN_WORDS = frozenset("""
+    a an and at audit audits best cold complai compliance dear do email
+    for from hello hi i in is it me my of on our please regards sales send
+    so soc soc2 team the to us we write you your
+    """.split())
+
+# Departments a "head of ..." role may name; anything else after "of" is left
+# for the word checks below, so a role never swallows a name after it.
+DEPARTMENTS = (
+    "business development",
+    "compliance",
+    "customer success",
+    "engineering",
+    "finance",
+    "growth",
+    "it",
+    "marketing",
+    "operations",
+    "partnerships",
+    "people",
+    "product",
+    "sales",
+    "security",
+    "technology",
+)
+
+_DEPARTMENT = "|".join(re.escape(d) for d in sorted(DEPARTMENTS, key=len, reverse=True))
+_ROLE = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(role) for role in sorted(ROLES, key=len, reverse=True))
+    + r"|(?:head|director|vp|vice president|chief \w+ officer|manager|lead) of "
+    + rf"(?:{_DEPARTMENT})(?:(?:,| and| &) (?:{_DEPARTMENT})){{0,2}}"
+    + r")\b",
+    re.IGNORECASE,
+)
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]*")
+_SENTENCE_END = re.compile(r"[.!?:\n]\s*$")
+
+
+@dataclass
+class LocalVerdict:
+    """Result of the local tier; ``decided`` is False when the LLM must judge."""
+
+    decided: bool
+    output: Optional[NameCheckOutput] = None
+
+
+def message_text(message: Union[str, Sequence[TResponseInputItem]]) -> str:
+    """The text of the user messages in a guardrail input."""
+    if isinstance(message, str):
+        return message
+    parts: List[str] = []
+    for item in message:
+        if isinstance(item, dict) and item.get("role") == "user":
+            content = item.get("content")
+            if isinstance(content, str):
+                parts.append(content)
+            elif isinstance(content, list):
+                parts += [
+                    str(c.get("text", "")) for c in content if isinstance(c, dict)
+                ]
+    return "\n".join(parts)
+
+
+def local_name_check(text: str) -> LocalVerdict:
+    """Settle clear cases without a model call.
+
+    Known roles, and "head of ..." roles naming one to three
+    :data:`DEPARTMENTS`, are removed first. A remaining capitalised word from
+    :data:`FIRST_NAMES` is a name. Words from :data:`AMBIGUOUS_NAMES`,
+    capitalised unknown words other than at the start of a sentence, and
+    lower-case first names leave the case undecided.
+    """
+    stripped = _ROLE.sub(" ", text)
+    undecided = False
+    for match in _WORD.finditer(stripped):
+        word = match.group()
+        lower = word.lower()
+        if not word[0].isupper():
+            # A lower-cased first name is unusual enough to need a second look.
+            undecided = undecided or lower in FIRST_NAMES
+            continue
+        if lower in FIRST_NAMES:
+            return LocalVerdict(
+                True, NameCheckOutput(is_name_in_message=True, name=word)
+            )
+        sentence_start = not stripped[: match.start()].strip() or bool(
+            _SENTENCE_END.search(stripped[: match.start()])
+        )
+        if lower in AMBIGUOUS_NAMES:
+            undecided = True
+        elif lower not in KNOWN_WORDS and not sentence_start and not word.isupper():
+            undecided = True
+    if undecided:
+        return LocalVerdict(False)
+    return LocalVerdict(True, NameCheckOutput(is_name_in_message=False, name=""))
+
+
+class TieredNameCheck:
+    """Local detector first, ``guardrail_agent`` only for ambiguous input.
+
+    Args:
+        llm_agent: The Lab 3 ``guardrail_agent`` (``output_type`` with
+            ``is_name_in_message`` and ``name``).
+        memo_size: Verdicts remembered, keyed on the message text.
+    """
+
+    def __init__(self, llm_agent: Agent, memo_size: int = 10000) -> None:
+        self.llm_agent = llm_agent
+        self.memo_size = memo_size
+        self.local_hits = 0
+        self.llm_calls = 0
+        self.memo_hits = 0
+        self._memo: "OrderedDict[str, Any]" = OrderedDict()
+
+    async def check(self, text: str, context: Any = None) -> Any:
+        """Return a ``NameCheckOutput``-like verdict for ``text``."""
+        key = " ".join(text.split())
+        if key in self._memo:
+            self.memo_hits += 1
+            self._memo.move_to_end(key)
+            return self._memo[key]
+        verdict = local_name_check(text)
+        if verdict.decided:
+            self.local_hits += 1
+            output: Any = verdict.output
+        else:
+            self.llm_calls += 1
+            result = await Runner.run(self.llm_agent, text, context=context)
+            output = result.final_output
+        self._memo[key] = output
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        return output
+
+    def guardrail(self, name: str = "guardrail_against_name") -> InputGuardrail:
+        """An input guardrail that trips when the message names a person."""
+
+        @input_guardrail(name=name)
+        async def guardrail_against_name(
+            ctx: RunContextWrapper[Any],
+            agent: Agent,
+            message: Union[str, List[TResponseInputItem]],
+        ) -> GuardrailFunctionOutput:
+            output = await self.check(message_text(message), ctx.context)
+            return GuardrailFunctionOutput(
+                output_info={"found_name": output},
+                tripwire_triggered=output.is_name_in_message,
+            )
+
+        return guardrail_against_name
+
+
+class GuardrailTripped(Exception):
+    """Raised inside a gated tool when the guardrails rejected the input."""
+
+
+class GuardrailGate:
+    """Opens once every input guardrail has passed; trips if one fails."""
+
+    def __init__(self) -> None:
+        self.tripped = False
+        self._event = asyncio.Event()
+
+    def open(self) -> None:
+        self._event.set()
+
+    def trip(self) -> None:
+        self.tripped = True
+        self._event.set()
+
+    async def wait(self) -> None:
+        await self._event.wait()
+        if self.tripped:
+            raise GuardrailTripped("Input guardrail tripwire triggered")
+
+
+_gate: ContextVar[Optional[GuardrailGate]] = ContextVar("guardrail_gate", default=None)
+
+
+async def wait_for_guardrails() -> None:
+    """Block until the current optimistic run's guardrails have passed.
+
+    Outside :func:`run_optimistic` there is nothing to wait for.
+    """
+    gate = _gate.get()
+    if gate is not None:
+        await gate.wait()
+
+
+def gated_tool(tool: FunctionTool) -> FunctionTool:
+    """A copy of ``tool`` that waits for the guardrails before it runs.
+
+    Use it for tools with side effects, such as sending email.
+    """
+    invoke = tool.on_invoke_tool
+
+    async def on_invoke_tool(ctx: Any, arguments: str) -> Any:
+        await wait_for_guardrails()
+        return await invoke(ctx, arguments)
+
+    return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+
+async def run_optimistic(
+    agent: Agent,
+    input: Union[str, List[TResponseInputItem]],
+    context: Any = None,
+    **run_kwargs: Any,
+) -> RunResult:
+    """``Runner.run`` with ``agent``'s input guardrails run alongside it.
+
+    The agent starts immediately instead of after its guardrails. Gated tools
+    anywhere in the run, including handed-off agents and agents used as tools,
+    hold until the guardrails pass. If a tripwire fires the run is cancelled
+    and ``InputGuardrailTripwireTriggered`` is raised, as ``Runner.run`` would.
+    """
+    gate = GuardrailGate()
+    token = _gate.set(gate)
+    try:
+        run = asyncio.ensure_future(
+            Runner.run(
+                agent.clone(input_guardrails=[]), input, context=context, **run_kwargs
+            )
+        )
+    finally:
+        _gate.reset(token)
+    wrapper = RunContextWrapper(context=context)
+    checks = [
+        asyncio.ensure_future(guardrail.run(agent, input, wrapper))
+        for guardrail in agent.input_guardrails
+    ]
+    try:
+        for next_done in asyncio.as_completed(checks):
+            result = await next_done
+            if result.output.tripwire_triggered:
+                gate.trip()
+                raise InputGuardrailTripwireTriggered(result)
+        gate.open()
+        return await run
+    finally:
+        for task in (run, *checks):
+            task.cancel()
+        await asyncio.gather(run, *checks, return_exceptions=True)
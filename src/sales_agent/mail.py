@@ -0,0 +1,200 @@
+"""Pooled, asynchronous SendGrid mail transport.
+
+The labs used to build a new ``sendgrid.SendGridAPIClient`` for every email and
+call its blocking ``post`` from inside the agent's event loop. ``MailTransport``
+keeps one ``httpx.AsyncClient`` with keep-alive connections open to the SendGrid
+v3 API, caps the number of requests in flight, and exposes awaitable sends so
+the other ``Runner.run`` calls keep making progress while an email goes out.
+
+Inside :func:`recipient`, :func:`build_mail` addresses mail to that recipient,
+so the ``send_html_email`` tool of a run started for one prospect mails that
+prospect rather than :data:`DEFAULT_TO_EMAIL`.
+"""
+
+import asyncio
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Protocol, Union
+
+import httpx
+
+if TYPE_CHECKING:
+    from sendgrid.helpers.mail import Mail
+
+SENDGRID_API_URL = "https://api.sendgrid.com"
+MAIL_SEND_PATH = "/v3/mail/send"
+
+DEFAULT_FROM_EMAIL = "ed@edwarddonner.com"  # Change to your verified sender
+DEFAULT_TO_EMAIL = "ed.donner@gmail.com"  # Change to your recipient
+
+
+@dataclass(frozen=True)
+class Recipient:
+    """Who the mail built in the current context is for.
+
+    ``key`` identifies the prospect within a campaign, e.g.
+    ``"spring-launch:jane@example.com"``; an outbox uses it as the
+    idempotency key.
+    """
+
+    email: str
+    key: Optional[str] = None
+
+
+_recipient: ContextVar[Optional[Recipient]] = ContextVar(
+    "sales_agent_recipient", default=None
+)
+
+
+@contextmanager
+def recipient(email: str, key: Optional[str] = None) -> Iterator[Recipient]:
+    """Address mail built inside the block, including by tools of agent runs
+    started inside it, to ``email``."""
+    current = Recipient(email, key)
+    token = _recipient.set(current)
+    try:
+        yield current
+    finally:
+        _recipient.reset(token)
+
+
+def current_recipient() -> Optional[Recipient]:
+    """The innermost :func:`recipient`, or None outside one."""
+    return _recipient.get()
+
+
+def build_mail(
+    subject: str,
+    body: str,
+    content_type: str = "text/plain",
+    from_email: str = DEFAULT_FROM_EMAIL,
+    to_email: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build a SendGrid v3 ``mail/send`` request body for a single recipient.
+
+    Without ``to_email`` the mail goes to the :func:`current_recipient`, or
+    else to :data:`DEFAULT_TO_EMAIL`.
+    """
+    # The SendGrid SDK is only needed here, so importing this module skips it.
+    from sendgrid.helpers.mail import Content, Email, Mail, To
+
+    if to_email is None:
+        current = _recipient.get()
+        to_email = current.email if current is not None else DEFAULT_TO_EMAIL
+    content = Content(content_type, body)
+    mail = Mail(Email(from_email), To(to_email), subject, content)
+    payload: Dict[str, Any] = mail.get()
+    return payload
+
+
+class MailSender(Protocol):
+    """Anything with :meth:`MailTransport.send`, such as
+    :class:`sales_agent.outbox.Outbox`, which queues the mail instead."""
+
+    async def send(self, mail: Union["Mail", Dict[str, Any]]) -> int: ...
+
+
+class MailTransport:
+    """Shared SendGrid client with connection pooling and bounded concurrency.
+
+    Args:
+        api_key: SendGrid API key. Defaults to ``SENDGRID_API_KEY``.
+        base_url: API host. Point this at a local stand-in for offline runs.
+        max_connections: Upper bound on open connections in the pool.
+        max_keepalive_connections: Idle connections kept warm for reuse.
+        keepalive_expiry: Seconds an idle connection is kept before closing.
+        max_concurrency: Requests allowed in flight at once.
+        timeout: Per-request timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = SENDGRID_API_URL,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        max_concurrency: int = 10,
+        timeout: float = 10.0,
+    ) -> None:
+        self.api_key = api_key or os.environ.get("SENDGRID_API_KEY", "")
+        self.base_url = base_url.rstrip("/")
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self.max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled HTTP client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                limits=self.limits,
+                timeout=self.timeout,
+            )
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def send(self, mail: Union["Mail", Dict[str, Any]]) -> int:
+        """Post one ``mail/send`` payload and return the HTTP status code.
+
+        Raises:
+            httpx.HTTPStatusError: If SendGrid rejects the request.
+        """
+        payload = mail if isinstance(mail, dict) else mail.get()
+        async with self.semaphore:
+            response = await self.client.post(MAIL_SEND_PATH, json=payload)
+        response.raise_for_status()
+        return response.status_code
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "MailTransport":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+_transport: Optional[MailSender] = None
+
+
+def get_mail_transport() -> MailSender:
+    """Return the process-wide transport, creating it from the environment.
+
+    ``SENDGRID_BASE_URL`` overrides the API host, which is how the labs are
+    pointed at :class:`sales_agent.fakes.FakeSendGridServer`.
+    """
+    global _transport
+    if _transport is None:
+        _transport = MailTransport(
+            base_url=os.environ.get("SENDGRID_BASE_URL", SENDGRID_API_URL)
+        )
+    return _transport
+
+
+def set_mail_transport(transport: Optional[MailSender]) -> None:
+    """Replace the process-wide transport, e.g. with one tuned for a benchmark,
+    or with an :class:`sales_agent.outbox.Outbox` so sends return at once."""
+    global _transport
+    _transport = transport
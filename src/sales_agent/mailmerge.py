@@ -0,0 +1,160 @@
+"""Bulk mail merge over SendGrid personalizations.
+
+A prospect list is streamed (from a CSV file or any iterator of dicts) in
+chunks of up to :data:`MAX_PERSONALIZATIONS` recipients. Each chunk becomes a
+single ``mail/send`` request whose personalizations carry the per-recipient
+substitutions, so tens of thousands of prospects need tens of requests rather
+than tens of thousands.
+
+Templates use SendGrid's substitution tags: a ``-first_name-`` in the subject
+or body is replaced with that recipient's ``first_name`` column.
+"""
+
+import asyncio
+import csv
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from sendgrid.helpers.mail import (
+    Content,
+    Email,
+    Mail,
+    Personalization,
+    Substitution,
+    To,
+)
+
+from sales_agent.mail import DEFAULT_FROM_EMAIL, MailSender, get_mail_transport
+
+# SendGrid accepts at most 1000 personalizations per mail/send request.
+MAX_PERSONALIZATIONS = 1000
+
+EMAIL_FIELD = "email"
+NAME_FIELD = "name"
+
+Prospect = Dict[str, str]
+
+
+@dataclass
+class MergeReport:
+    """Outcome of one :func:`send_mail_merge` run."""
+
+    recipients: int = 0
+    requests: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def recipients_per_second(self) -> float:
+        return self.recipients / self.seconds if self.seconds else 0.0
+
+
+def read_prospects(path: str, encoding: str = "utf-8") -> Iterator[Prospect]:
+    """Yield prospect rows from a CSV file with a header row, one at a time."""
+    with open(path, newline="", encoding=encoding) as handle:
+        for row in csv.DictReader(handle):
+            yield {key.strip(): (value or "").strip() for key, value in row.items()}
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split ``items`` into lists of at most ``size`` without reading ahead."""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def build_merge_mail(
+    prospects: Sequence[Prospect],
+    subject: str,
+    body: str,
+    content_type: str = "text/html",
+    from_email: str = DEFAULT_FROM_EMAIL,
+    fields: Optional[Sequence[str]] = None,
+) -> Mail:
+    """Pack ``prospects`` into one ``Mail`` with a personalization each.
+
+    Args:
+        prospects: Rows with at least an ``email`` key; ``name`` is optional.
+        subject: Subject line, may contain ``-field-`` substitution tags.
+        body: Email body, may contain ``-field-`` substitution tags.
+        content_type: MIME type of ``body``.
+        from_email: Verified sender address.
+        fields: Columns to substitute. Defaults to every column in each row.
+    """
+    if len(prospects) > MAX_PERSONALIZATIONS:
+        raise ValueError(
+            f"At most {MAX_PERSONALIZATIONS} recipients fit in one request, "
+            f"got {len(prospects)}"
+        )
+    mail = Mail(from_email=Email(from_email), subject=subject)
+    mail.add_content(Content(content_type, body))
+    for index, prospect in enumerate(prospects):
+        personalization = Personalization()
+        personalization.add_to(To(prospect[EMAIL_FIELD], prospect.get(NAME_FIELD)))
+        for field in fields if fields is not None else prospect:
+            personalization.add_substitution(
+                Substitution(f"-{field}-", prospect.get(field, ""))
+            )
+        mail.add_personalization(personalization, index=index)
+    return mail
+
+
+async def send_mail_merge(
+    prospects: Iterable[Prospect],
+    subject: str,
+    body: str,
+    content_type: str = "text/html",
+    from_email: str = DEFAULT_FROM_EMAIL,
+    fields: Optional[Sequence[str]] = None,
+    batch_size: int = MAX_PERSONALIZATIONS,
+    transport: Optional[MailSender] = None,
+) -> MergeReport:
+    """Send a merged email to every prospect, ``batch_size`` per request.
+
+    Rows without an email address, and repeats of an address already sent to
+    in this run, are skipped. At most ``transport.max_concurrency`` batches
+    are held in memory at once, so the list is never fully materialised.
+    """
+    transport = transport or get_mail_transport()
+    # An outbox returns at once, so it gets the transport's default bound.
+    max_in_flight = getattr(transport, "max_concurrency", 10)
+    batch_size = min(batch_size, MAX_PERSONALIZATIONS)
+    report = MergeReport()
+    seen: Set[str] = set()
+    in_flight: Set["asyncio.Future[int]"] = set()
+
+    def deliverable(prospect: Prospect) -> bool:
+        address = prospect.get(EMAIL_FIELD, "").lower()
+        if not address or address in seen:
+            report.skipped += 1
+            return False
+        seen.add(address)
+        return True
+
+    start = time.perf_counter()
+    try:
+        for batch in chunked(filter(deliverable, prospects), batch_size):
+            mail = build_merge_mail(
+                batch, subject, body, content_type, from_email, fields
+            )
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    task.result()
+            in_flight.add(asyncio.ensure_future(transport.send(mail)))
+            report.recipients += len(batch)
+            report.requests += 1
+        if in_flight:
+            await asyncio.gather(*in_flight)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,393 @@
+"""Local span metrics: wall time, queue time, tokens and cost.
+
+``with trace(...)`` ships spans to the hosted traces page, which cannot be
+aggregated or used offline. :class:`MetricsProcessor` is an agents-SDK
+tracing processor, so it sees every span the SDK already creates: each
+``Runner.run`` agent, every ``as_tool`` wrapper and ``function_tool`` (such
+as ``send_html_email``), handoffs to the Email Manager, guardrails and each
+model call. Rate-limit waits in :class:`sales_agent.scheduler.RateScheduler`
+show up as ``queue`` spans, and near-duplicate lookups from
+:class:`sales_agent.dedup.DuplicateIndex` as ``dedup`` spans, which are counted
+rather than timed.
+
+It keeps Prometheus-style histograms and counters, labelled by span kind and
+name and by the agent a span ran under. Tokens and cost come from model
+spans (``generation`` spans for chat-completions models, ``response`` spans
+for the Responses API). Metrics export as Prometheus text, and every span can
+be appended to a JSONL file as it ends::
+
+    metrics = MetricsProcessor(jsonl_path="spans.jsonl")
+    add_trace_processor(metrics)          # alongside the hosted exporter
+    set_trace_processors([metrics])       # or instead of it, fully offline
+    ...
+    metrics.write_prometheus("metrics.prom")
+"""
+
+import bisect
+import json
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, TextIO, Tuple
+
+from agents.tracing import Span, Trace, TracingProcessor
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# Dollars per million tokens: (input, cached input, output). List prices at
+# the time of writing; pass ``prices`` to MetricsProcessor to override.
+PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "deepseek-chat": (0.27, 0.07, 1.10),
+    "gemini-2.0-flash": (0.10, 0.025, 0.40),
+    "llama-3.3-70b-versatile": (0.59, 0.59, 0.79),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation within the bucket, as PromQL does."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                if i == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+def cost(
+    model: Optional[str],
+    input_tokens: int,
+    cached_tokens: int,
+    output_tokens: int,
+    prices: Mapping[str, Tuple[float, float, float]] = PRICES,
+) -> float:
+    """Estimated dollars for one call; 0 for models without a price."""
+    price = prices.get(model or "")
+    if price is None:
+        return 0.0
+    uncached = max(0, input_tokens - cached_tokens)
+    return (
+        uncached * price[0] + cached_tokens * price[1] + output_tokens * price[2]
+    ) / 1e6
+
+
+def _span_name(span: Span[Any]) -> str:
+    data = span.span_data
+    kind = data.type
+    if kind == "handoff":
+        return f"{data.from_agent} -> {data.to_agent}"
+    if kind == "generation":
+        return str(data.model or "unknown")
+    if kind == "response":
+        return str(getattr(data.response, "model", None) or "unknown")
+    if kind == "custom" and data.name == "queue":
+        return str(data.data.get("resource", "unknown"))
+    return str(getattr(data, "name", None) or kind)
+
+
+def _usage(span: Span[Any]) -> Tuple[int, int, int]:
+    """Input, cached input and output tokens of a model span."""
+    data = span.span_data
+    if data.type == "generation" and data.usage:
+        return (
+            int(data.usage.get("input_tokens", 0)),
+            int(data.usage.get("cached_tokens", 0)),
+            int(data.usage.get("output_tokens", 0)),
+        )
+    usage = getattr(getattr(data, "response", None), "usage", None)
+    if data.type == "response" and usage is not None:
+        details = getattr(usage, "input_tokens_details", None)
+        return (
+            usage.input_tokens,
+            getattr(details, "cached_tokens", 0) or 0,
+            usage.output_tokens,
+        )
+    return 0, 0, 0
+
+
+class MetricsProcessor(TracingProcessor):
+    """Aggregates span timings, tokens and cost in memory.
+
+    Args:
+        jsonl_path: When set, one JSON line per finished span is appended here.
+        buckets: Histogram bucket bounds in seconds.
+        prices: Per-model prices, see :data:`PRICES`.
+    """
+
+    def __init__(
+        self,
+        jsonl_path: Optional[str] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        prices: Mapping[str, Tuple[float, float, float]] = PRICES,
+    ) -> None:
+        self.buckets = buckets
+        self.prices = prices
+        self.durations: Dict[Labels, Histogram] = {}
+        self.queue: Dict[Labels, Histogram] = {}
+        self.tokens: Dict[Labels, int] = {}
+        self.costs: Dict[Labels, float] = {}
+        self.errors: Dict[Labels, int] = {}
+        self.duplicates: Dict[Labels, int] = {}
+        self._started: Dict[str, float] = {}
+        self._agents: Dict[str, str] = {}
+        self._parents: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._jsonl: Optional[TextIO] = (
+            open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+        )
+
+    def on_trace_start(self, trace: Trace) -> None:
+        pass
+
+    def on_trace_end(self, trace: Trace) -> None:
+        pass
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        with self._lock:
+            self._started[span.span_id] = time.perf_counter()
+            self._parents[span.span_id] = span.parent_id
+            if span.span_data.type == "agent":
+                self._agents[span.span_id] = span.span_data.name
+
+    def _agent_of(self, span_id: Optional[str]) -> str:
+        while span_id is not None:
+            if span_id in self._agents:
+                return self._agents[span_id]
+            span_id = self._parents.get(span_id)
+        return ""
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        ended = time.perf_counter()
+        with self._lock:
+            started = self._started.pop(span.span_id, ended)
+            if span.span_data.type == "custom" and span.span_data.name == "dedup":
+                data = span.span_data.data
+                result = "hit" if data.get("hit") else "miss"
+                key = (("stage", str(data.get("stage", ""))), ("result", result))
+                self.duplicates[key] = self.duplicates.get(key, 0) + 1
+                self._parents.pop(span.span_id, None)
+                return
+            seconds = ended - started
+            kind = span.span_data.type
+            name = _span_name(span)
+            # Agent spans are labelled by the agent that called them as a tool.
+            agent = self._agent_of(span.parent_id)
+            is_queue = kind == "custom" and span.span_data.name == "queue"
+            if is_queue:
+                labels: Labels = (("resource", name), ("agent", agent))
+                self._histogram(self.queue, labels).observe(seconds)
+            else:
+                labels = (("kind", kind), ("name", name), ("agent", agent))
+                self._histogram(self.durations, labels).observe(seconds)
+            if span.error is not None:
+                self.errors[labels] = self.errors.get(labels, 0) + 1
+            input_tokens, cached, output = _usage(span)
+            dollars = 0.0
+            if input_tokens or output:
+                owner = self._agent_of(span.span_id)
+                for token_type, count in (
+                    ("input", input_tokens),
+                    ("cached", cached),
+                    ("output", output),
+                ):
+                    token_key = (
+                        ("agent", owner),
+                        ("model", name),
+                        ("type", token_type),
+                    )
+                    self.tokens[token_key] = self.tokens.get(token_key, 0) + count
+                dollars = cost(name, input_tokens, cached, output, self.prices)
+                cost_key = (("agent", owner), ("model", name))
+                self.costs[cost_key] = self.costs.get(cost_key, 0.0) + dollars
+            self._parents.pop(span.span_id, None)
+            self._agents.pop(span.span_id, None)
+            if self._jsonl is not None:
+                record = {
+                    "trace_id": span.trace_id,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "kind": "queue" if is_queue else kind,
+                    "name": name,
+                    "agent": agent,
+                    "seconds": seconds,
+                    "input_tokens": input_tokens,
+                    "cached_tokens": cached,
+                    "output_tokens": output,
+                    "cost": dollars,
+                    "error": span.error["message"] if span.error else None,
+                }
+                self._jsonl.write(json.dumps(record) + "\n")
+
+    def _histogram(self, table: Dict[Labels, Histogram], labels: Labels) -> Histogram:
+        if labels not in table:
+            table[labels] = Histogram(self.buckets)
+        return table[labels]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One row per span kind and name, most total time first.
+
+        Rate-limit waits are rows of kind ``queue``, named by resource.
+        """
+        merged: Dict[Tuple[str, str], Histogram] = {}
+        with self._lock:
+            spans = [
+                (dict(k)["kind"], dict(k)["name"], h) for k, h in self.durations.items()
+            ]
+            waits = [("queue", dict(k)["resource"], h) for k, h in self.queue.items()]
+            for kind, name, histogram in spans + waits:
+                total = merged.setdefault((kind, name), Histogram(self.buckets))
+                for i, count in enumerate(histogram.counts):
+                    total.counts[i] += count
+                total.sum += histogram.sum
+                total.count += histogram.count
+        rows = [
+            {
+                "kind": kind,
+                "name": name,
+                "count": histogram.count,
+                "total (s)": histogram.sum,
+                "p50 (s)": histogram.quantile(0.5),
+                "p95 (s)": histogram.quantile(0.95),
+            }
+            for (kind, name), histogram in merged.items()
+        ]
+        return sorted(rows, key=lambda row: -float(row["total (s)"]))
+
+    def duplicate_hit_rate(self, stage: str) -> float:
+        """Fraction of ``dedup`` lookups at ``stage`` (``"picker"`` or
+        ``"formatter"``) that found a near duplicate."""
+        with self._lock:
+            hits = self.duplicates.get((("stage", stage), ("result", "hit")), 0)
+            misses = self.duplicates.get((("stage", stage), ("result", "miss")), 0)
+        return hits / (hits + misses) if hits + misses else 0.0
+
+    def prometheus(self, prefix: str = "sales_agent") -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            self._histogram_lines(
+                lines,
+                f"{prefix}_span_seconds",
+                "Wall time of agent, tool, handoff, guardrail and model spans.",
+                self.durations,
+            )
+            self._histogram_lines(
+                lines,
+                f"{prefix}_queue_seconds",
+                "Time spent waiting for a rate-limited resource.",
+                self.queue,
+            )
+            self._counter_lines(
+                lines, f"{prefix}_tokens_total", "Model tokens.", self.tokens
+            )
+            self._counter_lines(
+                lines,
+                f"{prefix}_cost_dollars_total",
+                "Estimated model cost in dollars.",
+                self.costs,
+            )
+            self._counter_lines(
+                lines,
+                f"{prefix}_span_errors_total",
+                "Spans ended with an error.",
+                self.errors,
+            )
+            self._counter_lines(
+                lines,
+                f"{prefix}_duplicates_total",
+                "Near-duplicate draft lookups, by stage and result.",
+                self.duplicates,
+            )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Write :meth:`prometheus` to ``path``, e.g. for a node-exporter textfile."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+
+    @staticmethod
+    def _labels(labels: Labels, extra: str = "") -> str:
+        parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def _histogram_lines(
+        self,
+        lines: List[str],
+        metric: str,
+        help_text: str,
+        table: Dict[Labels, Histogram],
+    ) -> None:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for labels, histogram in sorted(table.items()):
+            cumulative = 0
+            bounds = [*(f"{b:g}" for b in histogram.buckets), "+Inf"]
+            for bound, count in zip(bounds, histogram.counts):
+                cumulative += count
+                le = self._labels(labels, f'le="{bound}"')
+                lines.append(f"{metric}_bucket{le} {cumulative}")
+            lines.append(f"{metric}_sum{self._labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{metric}_count{self._labels(labels)} {histogram.count}")
+
+    def _counter_lines(
+        self,
+        lines: List[str],
+        metric: str,
+        help_text: str,
+        table: Mapping[Labels, float],
+    ) -> None:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for labels, value in sorted(table.items()):
+            lines.append(f"{metric}{self._labels(labels)} {value:g}")
+
+    def shutdown(self) -> None:
+        self.force_flush()
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+    def force_flush(self) -> None:
+        if self._jsonl is not None:
+            self._jsonl.flush()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,341 @@
+"""Durable outbox for outgoing email, drained by rate-limited dispatch workers.
+
+``send_html_email`` posts to SendGrid in the middle of the agent run, so a
+slow or failing mail API stalls or fails a run whose drafts are already paid
+for. :class:`Outbox` keeps a SQLite queue of ``mail/send`` payloads and has
+the same ``send`` as :class:`sales_agent.mail.MailTransport`, returning as
+soon as the mail is stored::
+
+    outbox = Outbox("outbox.db")
+    set_mail_transport(outbox)        # every send tool now enqueues
+    dispatcher = Dispatcher(outbox, MailTransport(), bucket=TokenBucket(5))
+    dispatcher.start()
+    ...
+    await dispatcher.drain()
+
+Each mail has an idempotency key, so a repeated tool call or a retried run
+queues it only once; the key is also sent as a SendGrid ``custom_args``
+value. ``send`` takes the key of the :func:`sales_agent.mail.recipient`,
+which :class:`sales_agent.campaign.Campaign` sets to the campaign id and the
+prospect's id, and otherwise gives every mail a fresh one.
+
+:class:`Dispatcher` claims due mail in batches, sends under a
+:class:`sales_agent.tokenbucket.TokenBucket`, and retries 429s, 5xx responses
+and network errors with exponential backoff. Claiming is a single write
+transaction, so any number of workers, in any number of processes, can share
+one outbox. A claim is a lease: mail whose worker died before marking it is
+claimed again once the lease runs out, so delivery is at-least-once.
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+import httpx
+
+from sales_agent.mail import MailTransport, current_recipient, get_mail_transport
+from sales_agent.tokenbucket import TokenBucket
+
+if TYPE_CHECKING:
+    from sendgrid.helpers.mail import Mail
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    created REAL NOT NULL,
+    sent REAL,
+    last_error TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt);
+"""
+
+
+@dataclass
+class OutboxJob:
+    """A claimed mail, ready to be sent."""
+
+    key: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class Outbox:
+    """SQLite-backed queue of ``mail/send`` payloads.
+
+    Args:
+        path: Database file; ``":memory:"`` keeps the queue in memory only.
+        lease: Seconds a claimed mail stays with its worker. Mail still
+            unsent after that is claimed again, so keep it well above the
+            time a batch takes to send.
+    """
+
+    def __init__(self, path: str = "outbox.db", lease: float = 300.0) -> None:
+        self.path = path
+        self.lease = lease
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(outbox)")]
+            if "lease_until" not in columns:
+                self._db.execute("ALTER TABLE outbox ADD COLUMN lease_until REAL")
+                # Mail claimed before leases existed may be claimed again now.
+                self._db.execute(
+                    "UPDATE outbox SET lease_until = 0 WHERE status = ?", (SENDING,)
+                )
+
+    def enqueue(
+        self, mail: Union["Mail", Dict[str, Any]], key: Optional[str] = None
+    ) -> bool:
+        """Store ``mail`` for sending; False if ``key`` was already queued.
+
+        Without ``key``, the current recipient's key is used, or else a new
+        random one.
+        """
+        payload = dict(mail) if isinstance(mail, dict) else mail.get()
+        if key is None:
+            current = current_recipient()
+            key = current.key if current is not None else None
+        key = key or uuid.uuid4().hex
+        payload["custom_args"] = {**payload.get("custom_args", {}), "outbox_key": key}
+        now = time.time()
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO outbox (key, payload, status, next_attempt, "
+                "created) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(payload), PENDING, now, now),
+            )
+        return cursor.rowcount == 1
+
+    async def send(self, mail: Union["Mail", Dict[str, Any]]) -> int:
+        """Queue ``mail``; returns 202 like SendGrid accepting it."""
+        self.enqueue(mail)
+        return 202
+
+    def claim(self, limit: int) -> List[OutboxJob]:
+        """Lease up to ``limit`` due mails, and mails whose lease has run out,
+        to the caller and return them.
+
+        The select and update run in one ``BEGIN IMMEDIATE`` transaction,
+        which holds the database's write lock, so no other worker, in this
+        process or another, can claim the same mail.
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            rows = self._db.execute(
+                "SELECT key, payload, attempts FROM outbox "
+                "WHERE (status = ? AND next_attempt <= ?) "
+                "OR (status = ? AND lease_until <= ?) "
+                "ORDER BY next_attempt LIMIT ?",
+                (PENDING, now, SENDING, now, limit),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE outbox SET status = ?, lease_until = ? WHERE key = ?",
+                [(SENDING, now + self.lease, key) for key, _, _ in rows],
+            )
+        return [OutboxJob(key, json.loads(payload), n) for key, payload, n in rows]
+
+    def mark_sent(self, key: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, sent = ?, "
+                "last_error = NULL WHERE key = ?",
+                (SENT, time.time(), key),
+            )
+
+    def mark_retry(self, key: str, error: str, delay: float) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, "
+                "next_attempt = ?, last_error = ? WHERE key = ?",
+                (PENDING, time.time() + delay, error, key),
+            )
+
+    def mark_failed(self, key: str, error: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, "
+                "last_error = ? WHERE key = ?",
+                (FAILED, error, key),
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """Number of mails per status."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ).fetchall()
+        counts = {PENDING: 0, SENDING: 0, SENT: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def next_due(self) -> Optional[float]:
+        """When the earliest pending mail may be sent, or a lease runs out;
+        None if no mail is pending or being sent."""
+        with self._lock:
+            (due,) = self._db.execute(
+                "SELECT MIN(CASE status WHEN ? THEN next_attempt ELSE lease_until "
+                "END) FROM outbox WHERE status IN (?, ?)",
+                (PENDING, PENDING, SENDING),
+            ).fetchone()
+        return None if due is None else float(due)
+
+    def failures(self) -> List[Dict[str, Any]]:
+        """Mails that ran out of attempts, with their last error."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, attempts, last_error FROM outbox WHERE status = ?",
+                (FAILED,),
+            ).fetchall()
+        return [{"key": k, "attempts": n, "error": e} for k, n, e in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    if isinstance(error, httpx.HTTPStatusError):
+        try:
+            return float(error.response.headers.get("Retry-After", ""))
+        except ValueError:
+            return None
+    return None
+
+
+class Dispatcher:
+    """Workers that drain an :class:`Outbox` through a mail transport.
+
+    Args:
+        outbox: The queue to drain.
+        transport: Where mail is really sent. Defaults to the shared
+            transport, which must then not be ``outbox`` itself.
+        workers: Batches sent concurrently.
+        batch_size: Mails claimed, and then sent concurrently, per batch.
+        bucket: Optional send rate limit, one token per mail.
+        max_attempts: Attempts before a mail is marked failed.
+        backoff: Delay before the first retry; it doubles per attempt.
+        max_backoff: Upper bound on the retry delay.
+        poll_interval: Longest sleep while waiting for new mail.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        transport: Optional[MailTransport] = None,
+        workers: int = 4,
+        batch_size: int = 20,
+        bucket: Optional[TokenBucket] = None,
+        max_attempts: int = 5,
+        backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        poll_interval: float = 0.5,
+    ) -> None:
+        if transport is None:
+            shared = get_mail_transport()
+            if shared is outbox or not isinstance(shared, MailTransport):
+                raise ValueError("Give the Dispatcher a MailTransport to send with")
+            transport = shared
+        self.outbox = outbox
+        self.transport = transport
+        self.workers = workers
+        self.batch_size = batch_size
+        self.bucket = bucket
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.sent = 0
+        self.retries = 0
+        self.failed = 0
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start the workers in the background on the running event loop."""
+        if self._tasks:
+            return
+        self._stopping = False
+        self._tasks = [
+            asyncio.ensure_future(self._work(until_empty=False))
+            for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers after their current batch."""
+        self._stopping = True
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self) -> None:
+        """Send everything queued, retries included, then return."""
+        running = bool(self._tasks)
+        await self.stop()
+        self._stopping = False
+        await asyncio.gather(
+            *(self._work(until_empty=True) for _ in range(self.workers))
+        )
+        if running:
+            self.start()
+
+    def _delay(self, attempts: int, error: Exception) -> float:
+        delay = _retry_after(error)
+        if delay is None:
+            delay = self.backoff * 2 ** (attempts - 1) * random.uniform(0.5, 1.0)
+        return min(delay, self.max_backoff)
+
+    async def _deliver(self, job: OutboxJob) -> None:
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        try:
+            await self.transport.send(job.payload)
+        except Exception as error:
+            attempts = job.attempts + 1
+            message = f"{type(error).__name__}: {error}"
+            if _retryable(error) and attempts < self.max_attempts:
+                self.retries += 1
+                self.outbox.mark_retry(job.key, message, self._delay(attempts, error))
+            else:
+                self.failed += 1
+                self.outbox.mark_failed(job.key, message)
+            return
+        self.sent += 1
+        self.outbox.mark_sent(job.key)
+
+    async def _work(self, until_empty: bool) -> None:
+        while not self._stopping:
+            jobs = self.outbox.claim(self.batch_size)
+            if jobs:
+                await asyncio.gather(*(self._deliver(job) for job in jobs))
+                continue
+            due = self.outbox.next_due()
+            if due is None and until_empty:
+                return
+            wait = self.poll_interval if due is None else due - time.time()
+            await asyncio.sleep(min(max(wait, 0.001), self.poll_interval))
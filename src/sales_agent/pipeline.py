@@ -0,0 +1,304 @@
+"""Deterministic draft-and-pick pipeline.
+
+The agentic ``sales_manager`` spends a model turn deciding to call each
+``sales_agent`` tool, often one at a time, another to read the drafts, and is
+allowed to call the tools again. :class:`SalesPipeline` hard-wires the shape
+from the "Selection from sales people" cell instead: every drafter runs
+concurrently, ``sales_picker`` chooses once, and only the winning draft is
+handed to the Email Manager. A run always costs ``len(drafters) + 1`` model
+calls plus the emailer's own turns, or a single call when the emailer is a
+:class:`sales_agent.emailer.StructuredEmailer`.
+
+With ``k`` set, drafting stops waiting once ``k`` drafts have arrived or a
+deadline has passed, and the stragglers are cancelled (see
+:func:`first_drafts`), so the slowest provider no longer sets the latency.
+With ``dedup`` set, near-duplicate drafts are dropped before picking (see
+:mod:`sales_agent.dedup`).
+"""
+
+import asyncio
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from agents import Agent, Runner, Usage, get_current_trace, trace
+from agents.result import RunResultBase
+
+from sales_agent.dedup import DuplicateIndex
+from sales_agent.emailer import StructuredEmailer
+
+PICKER_HEADER = "Cold sales emails:\n\n"
+PICKER_SEPARATOR = "\n\nEmail:\n\n"
+
+
+def picker_prompt(drafts: Sequence[str]) -> str:
+    """The ``sales_picker`` input used in Lab 2."""
+    return PICKER_HEADER + PICKER_SEPARATOR.join(drafts)
+
+
+def add_usage(total: Usage, result: RunResultBase) -> None:
+    """Accumulate the usage of a finished run into ``total``."""
+    total.add(result.context_wrapper.usage)
+
+
+@dataclass
+class DraftStats:
+    """How often :func:`first_drafts` left drafters behind."""
+
+    rounds: int = 0
+    launched: int = 0
+    used: int = 0
+    unused: int = 0
+    cancelled: int = 0
+    failed: int = 0
+    rounds_with_drops: int = 0
+    deadline_hits: int = 0
+
+    @property
+    def drop_rate(self) -> float:
+        """Fraction of rounds that left at least one draft out."""
+        return self.rounds_with_drops / self.rounds if self.rounds else 0.0
+
+
+async def first_drafts(
+    drafters: Sequence[Agent],
+    message: str,
+    k: Optional[int] = None,
+    deadline: Optional[float] = None,
+    usage: Optional[Usage] = None,
+    stats: Optional[DraftStats] = None,
+    run: Optional[Callable[[Agent, str], Awaitable[RunResultBase]]] = None,
+) -> List[str]:
+    """Start every drafter and return the first ``k`` drafts to arrive.
+
+    Waiting also ends once ``deadline`` seconds have passed and at least one
+    draft is in. The remaining runs are cancelled, which closes their
+    connections; a provider may still bill tokens generated before that.
+    Drafts that complete together with the ``k``-th are not returned, so at
+    most ``k`` are, but they were paid for: their usage is added and they are
+    counted as unused rather than cancelled.
+    Failed drafters are skipped unless none succeed, in which case the first
+    error is raised. Drafts are returned in arrival order.
+
+    Args:
+        drafters: The ``sales_agent`` agents.
+        message: Input for every drafter.
+        k: Drafts to wait for; all of them when omitted.
+        deadline: Seconds after which any drafts already in are enough.
+        usage: Receives the token usage of every draft that completed.
+        stats: Receives counts of used, unused, cancelled and failed drafts.
+        run: Runs one drafter; ``Runner.run`` by default. See
+            :class:`sales_agent.streaming.StreamingPipeline`.
+    """
+    wanted = len(drafters) if k is None else max(1, min(k, len(drafters)))
+    run = run or Runner.run
+    tasks = [asyncio.ensure_future(run(d, message)) for d in drafters]
+    pending = set(tasks)
+    finished: List[RunResultBase] = []
+    unused: List[RunResultBase] = []
+    errors: List[BaseException] = []
+    expires = None if deadline is None else time.monotonic() + deadline
+    hit_deadline = False
+    try:
+        while pending and len(finished) < wanted:
+            timeout = None
+            if expires is not None and finished:
+                timeout = max(0.0, expires - time.monotonic())
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                hit_deadline = True
+                break
+            for task in tasks:
+                if task in done:
+                    error = task.exception()
+                    if error is not None:
+                        errors.append(error)
+                    elif len(finished) < wanted:
+                        finished.append(task.result())
+                    else:
+                        # Finished in the same wakeup as the k-th draft.
+                        unused.append(task.result())
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    if stats is not None:
+        stats.rounds += 1
+        stats.launched += len(tasks)
+        stats.used += len(finished)
+        stats.unused += len(unused)
+        stats.cancelled += len(pending)
+        stats.failed += len(errors)
+        stats.rounds_with_drops += bool(pending or unused)
+        stats.deadline_hits += hit_deadline
+    if not finished:
+        raise errors[0]
+    if usage is not None:
+        for result in finished + unused:
+            add_usage(usage, result)
+    return [str(result.final_output) for result in finished]
+
+
+@dataclass
+class PipelineResult:
+    """Drafts, the winner and, if an emailer ran, its final output.
+
+    ``timings`` holds seconds from the start of the run to each stage, for
+    pipelines that record them.
+    """
+
+    drafts: List[str]
+    best: str
+    output: Any = None
+    usage: Usage = field(default_factory=Usage)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class DraftPicker(Protocol):
+    """Chooses among drafts without the picker agent, e.g. ``LocalPicker``."""
+
+    async def pick(
+        self, drafts: Sequence[str], usage: Optional[Usage] = None
+    ) -> str: ...
+
+
+Picker = Union[Agent, DraftPicker]
+
+
+async def draft_and_pick(
+    drafters: Sequence[Agent],
+    picker: Picker,
+    message: str,
+    usage: Optional[Usage] = None,
+    k: Optional[int] = None,
+    deadline: Optional[float] = None,
+    stats: Optional[DraftStats] = None,
+    dedup: Optional[DuplicateIndex] = None,
+) -> Tuple[str, List[str]]:
+    """Run every drafter concurrently, then ask ``picker`` for the best draft.
+
+    Returns the winning draft and the drafts considered. Token usage is added
+    to ``usage`` when one is given. ``k``, ``deadline`` and ``stats`` are
+    passed to :func:`first_drafts`; near duplicates are dropped with
+    ``dedup``, and a lone draft is returned without asking the picker.
+    ``picker`` may also be a :class:`sales_agent.scoring.LocalPicker`.
+    """
+    if k is None and deadline is None:
+        results = await asyncio.gather(
+            *(Runner.run(drafter, message) for drafter in drafters)
+        )
+        drafts = [str(result.final_output) for result in results]
+        if usage is not None:
+            for result in results:
+                add_usage(usage, result)
+    else:
+        drafts = await first_drafts(drafters, message, k, deadline, usage, stats)
+    if dedup is not None:
+        drafts = dedup.unique(drafts)
+    return await pick_best(picker, drafts, usage), drafts
+
+
+async def pick_best(
+    picker: Picker, drafts: Sequence[str], usage: Optional[Usage] = None
+) -> str:
+    """Ask ``picker`` for the best of ``drafts``; a lone draft wins outright."""
+    if len(drafts) == 1:
+        return drafts[0]
+    if not isinstance(picker, Agent):
+        return await picker.pick(drafts, usage)
+    best = await Runner.run(picker, picker_prompt(drafts))
+    if usage is not None:
+        add_usage(usage, best)
+    return str(best.final_output)
+
+
+class SalesPipeline:
+    """Draft with every agent, pick once, then hand the winner to the emailer.
+
+    Instances are async callables returning the final output, so they can be
+    passed straight to :class:`sales_agent.campaign.Campaign`.
+
+    Args:
+        drafters: The ``sales_agent`` agents, run concurrently.
+        picker: The ``sales_picker`` agent or a local picker such as
+            :class:`sales_agent.scoring.LocalPicker`.
+        emailer: The Email Manager agent or a ``StructuredEmailer``. When
+            omitted the pipeline stops at the pick.
+        trace_name: Trace to group the runs under, unless one is already open.
+        k: Pick from the first ``k`` drafts and cancel the rest.
+        deadline: Seconds after which the drafts already in are picked from.
+        dedup: Drops near-duplicate drafts before picking; give the same
+            index to a ``StructuredEmailer`` to reuse formatting too.
+    """
+
+    def __init__(
+        self,
+        drafters: Sequence[Agent],
+        picker: Picker,
+        emailer: Optional[Union[Agent, StructuredEmailer]] = None,
+        trace_name: str = "Sales pipeline",
+        k: Optional[int] = None,
+        deadline: Optional[float] = None,
+        dedup: Optional[DuplicateIndex] = None,
+    ) -> None:
+        self.drafters = list(drafters)
+        self.picker = picker
+        self.emailer = emailer
+        self.trace_name = trace_name
+        self.k = k
+        self.deadline = deadline
+        self.dedup = dedup
+        self.stats = DraftStats()
+
+    def _trace(self) -> ContextManager[Any]:
+        if get_current_trace() is None:
+            return trace(self.trace_name)
+        return nullcontext()
+
+    async def run(self, message: str) -> PipelineResult:
+        usage = Usage()
+        with self._trace():
+            best, drafts = await draft_and_pick(
+                self.drafters,
+                self.picker,
+                message,
+                usage,
+                self.k,
+                self.deadline,
+                self.stats,
+                self.dedup,
+            )
+            result = await self.deliver(
+                PipelineResult(drafts=drafts, best=best, usage=usage)
+            )
+        return result
+
+    async def deliver(self, result: PipelineResult) -> PipelineResult:
+        """Hand ``result.best`` to the emailer, if there is one."""
+        if isinstance(self.emailer, StructuredEmailer):
+            result.output = await self.emailer.send(result.best, result.usage)
+        elif self.emailer is not None:
+            sent = await Runner.run(self.emailer, result.best)
+            add_usage(result.usage, sent)
+            result.output = sent.final_output
+        return result
+
+    async def __call__(self, message: str) -> Any:
+        result = await self.run(message)
+        return result.output if self.emailer is not None else result.best
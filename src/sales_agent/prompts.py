@@ -0,0 +1,220 @@
+"""Canonical agent instructions, laid out for provider prompt caching.
+
+Providers such as OpenAI and DeepSeek cache the longest prompt prefix they
+have seen recently and bill those input tokens at a discount (OpenAI caches
+prompts of 1024 tokens or more, in 128-token steps). The labs' instructions
+start with the persona ("You are a humorous, engaging sales agent working
+for ComplAI, ...") and repeat the company description after it, so no two
+agents share a prefix, and the Sales Manager text is copied between labs.
+
+Here :data:`COMPANY_CONTEXT` is defined once and the drafters' instructions
+start with it, byte for byte, followed by the lab's persona text. The drafters
+are the agents that need the company context and are called for every
+prospect, so the longer the shared context grows (product facts, case
+studies, tone guide), the more of their prompts is served from the cache.
+The picker, subject writer, HTML converter, Email Manager and Sales Manager
+keep their short role-only instructions, which would only grow by carrying
+the context. :class:`PromptCacheMeter` reports cached and uncached input
+tokens per agent so the effect can be checked.
+"""
+
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from agents import Agent, Model, ModelResponse, Usage
+from openai.types.responses import ResponseCompletedEvent
+
+from sales_agent.clients import get_client_pool
+
+COMPANY_CONTEXT = (
+    "Company context: ComplAI is a company that provides a SaaS tool for "
+    "ensuring SOC2 compliance and preparing for audits, powered by AI.\n\n"
+)
+
+_COMPANY = (
+    "a company that provides a SaaS tool for ensuring SOC2 compliance and "
+    "preparing for audits, powered by AI."
+)
+
+PERSONAS: Dict[str, str] = {
+    "professional": f"You are a sales agent working for ComplAI, {_COMPANY} "
+    "You write professional, serious cold emails.",
+    "engaging": f"You are a humorous, engaging sales agent working for ComplAI, "
+    f"{_COMPANY} You write witty, engaging cold emails that are likely to get a "
+    "response.",
+    "busy": f"You are a busy sales agent working for ComplAI, {_COMPANY} "
+    "You write concise, to the point cold emails.",
+}
+
+PICKER_ROLE = (
+    "You pick the best cold sales email from the given options. Imagine you are a "
+    "customer and pick the one you are most likely to respond to. Do not give an "
+    "explanation; reply with the selected email only."
+)
+
+DIGEST_PICKER_ROLE = (
+    "You pick the best cold sales email from the given options, each shown by its "
+    "subject, opening, call to action and the writer's own score. Imagine you are "
+    "a customer and pick the one you are most likely to respond to. Do not give "
+    "an explanation; reply with the number of the selected email only."
+)
+
+# Appended to a drafter's instructions when it returns an EmailDraft.
+DRAFT_FIELDS_ROLE = (
+    " Also write a subject likely to get a response, and rate from 1 to 10 how "
+    "likely the recipient is to reply."
+)
+
+SUBJECT_ROLE = (
+    "You can write a subject for a cold sales email. You are given a message and "
+    "you need to write a subject for an email that is likely to get a response."
+)
+
+HTML_ROLE = (
+    "You can convert a text email body to an HTML email body. You are given a "
+    "text email body which might have some markdown and you need to convert it to "
+    "an HTML email body with simple, clear, compelling layout and design."
+)
+
+EMAILER_ROLE = (
+    "You are an email formatter and sender. You receive the body of an email to "
+    "be sent. You first use the subject_writer tool to write a subject for the "
+    "email, then use the html_converter tool to convert the body to HTML. "
+    "Finally, you use the send_html_email tool to send the email with the subject "
+    "and HTML body."
+)
+
+# Improved instructions thanks to student Guillermo F.
+SALES_MANAGER_ROLE = """\
+You are a Sales Manager at ComplAI. Your goal is to find the single best cold sales email using the sales_agent tools.
+
+Follow these steps carefully:
+1. Generate Drafts: Use all three sales_agent tools to generate three different email drafts. Do not proceed until all three drafts are ready.
+
+2. Evaluate and Select: Review the drafts and choose the single best email using your judgment of which one is most effective.
+You can use the tools multiple times if you're not satisfied with the results from the first try.
+
+3. Handoff for Sending: Pass ONLY the winning email draft to the 'Email Manager' agent. The Email Manager will take care of formatting and sending.
+
+Crucial Rules:
+- You must use the sales agent tools to generate the drafts — do not write them yourself.
+- You must hand off exactly ONE email to the Email Manager — never more than one.
+"""  # noqa: E501
+
+
+def with_context(role: str, context: str = COMPANY_CONTEXT) -> str:
+    """Instructions for ``role`` behind the shared ``context`` prefix."""
+    return context + role
+
+
+def sales_instructions(persona: str, context: str = COMPANY_CONTEXT) -> str:
+    """Instructions for a drafter; ``persona`` is a key of :data:`PERSONAS`."""
+    if persona not in PERSONAS:
+        raise ValueError(f"Unknown persona {persona!r}; pick from {list(PERSONAS)}")
+    return with_context(PERSONAS[persona], context)
+
+
+SALES_INSTRUCTIONS = [sales_instructions(persona) for persona in PERSONAS]
+PICKER_INSTRUCTIONS = PICKER_ROLE
+DIGEST_PICKER_INSTRUCTIONS = DIGEST_PICKER_ROLE
+SUBJECT_INSTRUCTIONS = SUBJECT_ROLE
+HTML_INSTRUCTIONS = HTML_ROLE
+EMAILER_INSTRUCTIONS = EMAILER_ROLE
+SALES_MANAGER_INSTRUCTIONS = SALES_MANAGER_ROLE
+
+
+class PromptCacheStats:
+    """Input tokens seen for one agent, and how many the provider cached."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.input_tokens = 0
+        self.cached_tokens = 0
+
+    def add(self, usage: Usage) -> None:
+        self.requests += usage.requests
+        self.input_tokens += usage.input_tokens
+        self.cached_tokens += usage.input_tokens_details.cached_tokens
+
+    @property
+    def uncached_tokens(self) -> int:
+        return self.input_tokens - self.cached_tokens
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+
+class MeteredModel(Model):
+    """Passes calls to ``model`` and adds their usage to ``stats``."""
+
+    def __init__(self, model: Model, stats: PromptCacheStats) -> None:
+        self.model = model
+        self.stats = stats
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        response = await self.model.get_response(*args, **kwargs)
+        self.stats.add(response.usage)
+        return response
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        async for event in self.model.stream_response(*args, **kwargs):
+            if isinstance(event, ResponseCompletedEvent) and event.response.usage:
+                usage = event.response.usage
+                self.stats.add(
+                    Usage(
+                        requests=1,
+                        input_tokens=usage.input_tokens,
+                        input_tokens_details=usage.input_tokens_details,
+                    )
+                )
+            yield event
+
+
+class PromptCacheMeter:
+    """Cached against uncached input tokens, per agent.
+
+    Wrap agents as they are defined, before they are turned into tools or
+    handoffs, so nested runs are measured too::
+
+        meter = PromptCacheMeter()
+        sales_agent1 = meter.wrap(Agent(name="Professional Sales Agent", ...))
+        ...
+        print(meter.report())
+    """
+
+    def __init__(self) -> None:
+        self.stats: "OrderedDict[str, PromptCacheStats]" = OrderedDict()
+
+    def model(self, model: Union[str, Model, None], name: str) -> Model:
+        """``model`` with its usage recorded under ``name``; model names are
+        resolved on the shared client pool."""
+        return MeteredModel(
+            get_client_pool().resolve(model),
+            self.stats.setdefault(name, PromptCacheStats()),
+        )
+
+    def wrap(self, agent: Agent, name: Optional[str] = None) -> Agent:
+        """A copy of ``agent`` whose model calls are metered."""
+        return agent.clone(model=self.model(agent.model, name or agent.name))
+
+    def report(self) -> List[Dict[str, Any]]:
+        """One row per agent, plus a total row."""
+        total = PromptCacheStats()
+        rows = []
+        for name, stats in [*self.stats.items(), ("total", total)]:
+            rows.append(
+                {
+                    "agent": name,
+                    "requests": stats.requests,
+                    "input tokens": stats.input_tokens,
+                    "cached": stats.cached_tokens,
+                    "uncached": stats.uncached_tokens,
+                    "hit rate": f"{stats.hit_rate:.0%}",
+                }
+            )
+            if stats is not total:
+                total.requests += stats.requests
+                total.input_tokens += stats.input_tokens
+                total.cached_tokens += stats.cached_tokens
+        return rows
@@ -0,0 +1,37 @@
+"""Priorities for model calls under the adaptive rate scheduler.
+
+Provider quotas are enforced underneath every model, per base URL, by
+:class:`sales_agent.scheduler.RateScheduler` in the shared
+:class:`sales_agent.clients.ClientPool`. :class:`PriorityModel` sets the
+priority its calls queue at there, so a guardrail check a user is waiting on
+goes ahead of bulk drafting.
+"""
+
+from typing import Any, AsyncIterator
+
+from agents import Model, ModelResponse
+
+from sales_agent.scheduler import priority
+
+
+class PriorityModel(Model):
+    """Delegates to ``model`` with its requests queued at ``level``.
+
+    Args:
+        model: The model to call.
+        level: Scheduler priority, e.g. ``scheduler.INTERACTIVE`` for a
+            guardrail check that a user is waiting on; lower goes first.
+    """
+
+    def __init__(self, model: Model, level: int) -> None:
+        self.model = model
+        self.level = level
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        with priority(self.level):
+            return await self.model.get_response(*args, **kwargs)
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        with priority(self.level):
+            async for event in self.model.stream_response(*args, **kwargs):
+                yield event
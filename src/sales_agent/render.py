@@ -0,0 +1,121 @@
+"""Local markdown-to-HTML rendering for email bodies.
+
+Turning a drafted email into HTML is mechanical, so it doesn't need a model
+call. :func:`render_email` converts the small subset of markdown the drafting
+agents produce (paragraphs, headings, lists, bold, italics and links) and
+places it in one of a few layout templates, in microseconds and for no tokens.
+:func:`build_html_tool` returns a drop-in replacement for ``html_tool`` in
+``email_tools``, with the ``html_converter`` agent kept as an opt-in fallback.
+"""
+
+import html
+import re
+from functools import lru_cache
+from string import Template
+from typing import Dict, List, Optional
+
+from agents import Agent, FunctionTool, function_tool
+
+HTML_TOOL_NAME = "html_converter"
+HTML_TOOL_DESCRIPTION = "Convert a text email body to an HTML email body"
+
+LAYOUTS: Dict[str, str] = {
+    "simple": (
+        '<!DOCTYPE html><html><body style="margin:0;padding:0;">'
+        '<div style="max-width:600px;margin:0 auto;padding:24px;'
+        "font-family:Arial,Helvetica,sans-serif;font-size:15px;line-height:1.6;"
+        'color:#222;">$content</div></body></html>'
+    ),
+    "card": (
+        '<!DOCTYPE html><html><body style="margin:0;padding:24px;'
+        'background:#f4f6f8;"><div style="max-width:600px;margin:0 auto;'
+        "background:#fff;border-radius:8px;padding:32px;"
+        "font-family:Arial,Helvetica,sans-serif;font-size:15px;line-height:1.6;"
+        'color:#222;box-shadow:0 1px 3px rgba(0,0,0,0.1);">$content'
+        '<p style="margin-top:32px;font-size:12px;color:#888;">ComplAI &middot; '
+        "SOC2 compliance, powered by AI</p></div></body></html>"
+    ),
+    "bare": "$content",
+}
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_BULLET = re.compile(r"^\s*[-*+]\s+(.*)$")
+_NUMBERED = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_BOLD = re.compile(r"\*\*(.+?)\*\*|__(.+?)__")
+_ITALIC = re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?!\*)|(?<!\w)_(.+?)_(?!\w)")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_BLANK = re.compile(r"\n\s*\n")
+
+
+@lru_cache(maxsize=None)
+def get_layout(name: str) -> Template:
+    """The compiled template for layout ``name``; compiled once per process."""
+    try:
+        return Template(LAYOUTS[name])
+    except KeyError:
+        raise ValueError(
+            f"Unknown layout {name!r}; choose from {sorted(LAYOUTS)}"
+        ) from None
+
+
+def _inline(text: str) -> str:
+    text = html.escape(text)
+    text = _LINK.sub(lambda m: f'<a href="{m.group(2)}">{m.group(1)}</a>', text)
+    text = _BOLD.sub(lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", text)
+    return _ITALIC.sub(lambda m: f"<em>{m.group(1) or m.group(2)}</em>", text)
+
+
+def _block(block: str) -> str:
+    lines = block.strip("\n").splitlines()
+    heading = _HEADING.match(lines[0])
+    if heading and len(lines) == 1:
+        level = len(heading.group(1))
+        return f"<h{level}>{_inline(heading.group(2))}</h{level}>"
+    for pattern, tag in ((_BULLET, "ul"), (_NUMBERED, "ol")):
+        matches = [pattern.match(line) for line in lines]
+        if all(matches):
+            items = "".join(
+                f"<li>{_inline(m.group(1))}</li>" for m in matches if m is not None
+            )
+            return f"<{tag}>{items}</{tag}>"
+    return "<p>" + "<br>".join(_inline(line.strip()) for line in lines) + "</p>"
+
+
+def markdown_to_html(text: str) -> str:
+    """Convert an email body with light markdown into an HTML fragment."""
+    blocks: List[str] = [b for b in _BLANK.split(text.strip()) if b.strip()]
+    return "".join(_block(block) for block in blocks)
+
+
+def render_email(body: str, layout: str = "simple") -> str:
+    """Render ``body`` into a complete HTML email using ``layout``."""
+    return get_layout(layout).substitute(content=markdown_to_html(body))
+
+
+def build_html_tool(
+    layout: str = "simple", llm_converter: Optional[Agent] = None
+) -> FunctionTool:
+    """A ``html_converter`` tool that renders locally.
+
+    Args:
+        layout: Name of the layout in :data:`LAYOUTS`.
+        llm_converter: Pass the ``html_converter`` agent to opt back in to
+            model-based conversion; its ``as_tool`` wrapper is returned instead.
+    """
+    if llm_converter is not None:
+        tool = llm_converter.as_tool(
+            tool_name=HTML_TOOL_NAME, tool_description=HTML_TOOL_DESCRIPTION
+        )
+        # as_tool is annotated as any Tool, but builds a FunctionTool.
+        assert isinstance(tool, FunctionTool)
+        return tool
+    get_layout(layout)  # Fail on an unknown layout now rather than mid-run
+
+    def convert(body: str) -> str:
+        return render_email(body, layout)
+
+    return function_tool(
+        convert,
+        name_override=HTML_TOOL_NAME,
+        description_override=HTML_TOOL_DESCRIPTION,
+    )
@@ -0,0 +1,236 @@
+"""Route model calls across several providers by observed latency and health.
+
+Lab 3 pins ``sales_agent1/2/3`` to DeepSeek, Gemini and Groq through three
+separate clients, so one slow or failing provider holds up the whole
+``asyncio.gather``. :class:`ModelRouter` is an agents-SDK ``Model`` over
+several backends (typically ``OpenAIChatCompletionsModel`` instances). It keeps
+a rolling window of latencies and outcomes for each, sends every request to
+the backend with the lowest expected wait, starts a hedged request on the
+next backend when the first is slower than usual, and fails over to the next
+backend when one errors. Backends that keep failing are rested for a
+cooldown period.
+
+Give the backends' ``AsyncOpenAI`` clients ``max_retries=0`` so that a
+failing provider is left quickly instead of being retried in place.
+"""
+
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Mapping, Optional
+
+from agents import Model, ModelResponse
+
+
+class BackendStats:
+    """Rolling latency and error record for one backend.
+
+    Args:
+        window: Number of recent calls remembered.
+    """
+
+    def __init__(self, window: int = 50) -> None:
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+
+    def record(self, seconds: Optional[float], ok: bool) -> None:
+        """Add a call's outcome; ``seconds`` is ``None`` when not comparable."""
+        self.outcomes.append(ok)
+        if ok:
+            if seconds is not None:
+                self.latencies.append(seconds)
+            self.consecutive_failures = 0
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Median latency of recent successful calls."""
+        return statistics.median(self.latencies) if self.latencies else None
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    def expected_wait(self) -> float:
+        """Median latency scaled by current load; zero for untried backends."""
+        return (self.latency or 0.0) * (1 + self.in_flight)
+
+
+class ModelRouter(Model):
+    """A ``Model`` that spreads calls over ``backends`` and survives failures.
+
+    Args:
+        backends: Name to model, e.g. ``{"deepseek": deepseek_model, ...}``.
+        window: Calls remembered per backend.
+        hedge_after: Seconds before a hedged request is sent to the next
+            backend. When unset, the chosen backend's ``hedge_percentile``
+            latency is used once it has ``min_samples`` calls.
+        hedge_percentile: Latency percentile that counts as slow, or ``None``
+            to hedge only with a fixed ``hedge_after``.
+        max_hedges: Extra concurrent requests allowed per call.
+        max_error_rate: Backends above this error rate are used last.
+        max_failures: Consecutive failures that put a backend in cooldown.
+        cooldown: Seconds a failing backend is skipped.
+        min_samples: Calls seen before a backend's error rate or latency
+            percentile is trusted.
+    """
+
+    def __init__(
+        self,
+        backends: Mapping[str, Model],
+        window: int = 50,
+        hedge_after: Optional[float] = None,
+        hedge_percentile: Optional[float] = 95.0,
+        max_hedges: int = 1,
+        max_error_rate: float = 0.5,
+        max_failures: int = 3,
+        cooldown: float = 30.0,
+        min_samples: int = 5,
+    ) -> None:
+        if not backends:
+            raise ValueError("ModelRouter needs at least one backend")
+        self.backends: Dict[str, Model] = dict(backends)
+        self.stats = {name: BackendStats(window) for name in self.backends}
+        self.hedge_after = hedge_after
+        self.hedge_percentile = hedge_percentile
+        self.max_hedges = max_hedges
+        self.max_error_rate = max_error_rate
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.hedges = 0
+        self.failovers = 0
+
+    def healthy(self, name: str) -> bool:
+        stats = self.stats[name]
+        if stats.down_until > time.monotonic():
+            return False
+        if len(stats.outcomes) < self.min_samples:
+            return True
+        return stats.error_rate <= self.max_error_rate
+
+    def ranked(self) -> List[str]:
+        """Backend names, healthy ones first, by expected wait."""
+        return sorted(
+            self.backends,
+            key=lambda name: (
+                not self.healthy(name),
+                self.stats[name].expected_wait(),
+            ),
+        )
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        if self.hedge_after is not None:
+            return self.hedge_after
+        stats = self.stats[name]
+        if self.hedge_percentile is None or len(stats.latencies) < self.min_samples:
+            return None
+        return stats.percentile(self.hedge_percentile)
+
+    def _record(self, name: str, seconds: Optional[float], ok: bool) -> None:
+        stats = self.stats[name]
+        stats.record(seconds, ok)
+        if stats.consecutive_failures >= self.max_failures:
+            stats.down_until = time.monotonic() + self.cooldown
+
+    async def _call(self, name: str, *args: Any, **kwargs: Any) -> ModelResponse:
+        stats = self.stats[name]
+        stats.requests += 1
+        stats.in_flight += 1
+        start = time.monotonic()
+        try:
+            response = await self.backends[name].get_response(*args, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._record(name, time.monotonic() - start, ok=False)
+            raise
+        finally:
+            stats.in_flight -= 1
+        self._record(name, time.monotonic() - start, ok=True)
+        return response
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        queue = self.ranked()
+        pending: Dict["asyncio.Future[ModelResponse]", str] = {}
+        errors: List[BaseException] = []
+        hedges = 0
+        latest = ""
+
+        def launch() -> None:
+            nonlocal latest
+            latest = queue.pop(0)
+            task = asyncio.ensure_future(self._call(latest, *args, **kwargs))
+            pending[task] = latest
+
+        launch()
+        try:
+            while pending:
+                delay = None
+                if queue and hedges < self.max_hedges:
+                    delay = self._hedge_delay(latest)
+                done, _ = await asyncio.wait(
+                    pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedges += 1
+                    self.hedges += 1
+                    launch()
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    errors.append(error)
+                    if queue:
+                        self.failovers += 1
+                        launch()
+            raise errors[-1]
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Streams fail over only until their first event; they are not hedged."""
+        queue = self.ranked()
+        for position, name in enumerate(queue):
+            stats = self.stats[name]
+            stats.requests += 1
+            stats.in_flight += 1
+            started = False
+            try:
+                async for event in self.backends[name].stream_response(*args, **kwargs):
+                    if not started:
+                        started = True
+                        # Time to first event is not comparable with full calls.
+                        self._record(name, None, ok=True)
+                    yield event
+                return
+            except Exception:
+                if started:
+                    raise
+                self._record(name, None, ok=False)
+                if position == len(queue) - 1:
+                    raise
+                self.failovers += 1
+            finally:
+                stats.in_flight -= 1
@@ -0,0 +1,448 @@
+"""Adaptive request and token quotas per provider, with priorities.
+
+Fanning ``Runner.run`` out over many prospects sends requests as fast as the
+event loop allows. Groq, Gemini and DeepSeek answer with 429s, the OpenAI
+client retries after a backoff, and the retries land on a provider that is
+still over quota. :class:`RateScheduler` sits under every model call instead:
+:class:`sales_agent.clients.ClientPool` puts it in front of each base URL's
+connections, so agents with string models, and the client's own retries, go
+through it too. Per base URL it keeps a requests-per-minute and a
+tokens-per-minute bucket, each a little under the quota (``headroom``), and
+holds a request until both have room for it. A request costs its prompt,
+estimated from the body, plus its ``max_tokens``.
+
+The buckets adapt to what the provider reports. ``x-ratelimit-*`` headers, as
+OpenAI and Groq send them, set the refill rate and cap each bucket at what the
+provider says remains. A 429 holds the provider's queue until ``Retry-After``
+and halves the rate, which then creeps back up while calls succeed; for
+providers that send no headers this is all there is to go on::
+
+    scheduler = RateScheduler()
+    scheduler.set_limits(GROQ_BASE_URL, requests_per_minute=30)
+    set_client_pool(ClientPool(scheduler=scheduler))
+
+Waiting requests are served by priority, then in arrival order. Calls made
+inside ``with priority(INTERACTIVE):``, or by a model wrapped in
+:class:`sales_agent.ratelimit.PriorityModel`, go ahead of bulk drafting.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import re
+import time
+from collections import deque
+from typing import (
+    Any,
+    ContextManager,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+import httpx
+
+INTERACTIVE = 0
+NORMAL = 10
+BACKGROUND = 20
+
+_priority: "contextvars.ContextVar[int]" = contextvars.ContextVar(
+    "sales_agent_priority", default=NORMAL
+)
+
+_MAX_TOKENS = re.compile(rb'"max_(?:completion_|output_)?tokens"\s*:\s*(\d+)')
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+@contextlib.contextmanager
+def priority(level: int) -> Iterator[None]:
+    """Queue model calls made inside the block at ``level``; lower goes first."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in a reset header such as ``"20ms"``, ``"1.5s"`` or ``"6m0s"``."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _UNITS[unit] for number, unit in parts)
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait from ``Retry-After`` or ``retry-after-ms``, if given."""
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    return parse_duration(headers.get("retry-after"))
+
+
+def estimate_tokens(body: bytes, output_tokens: int = 500) -> int:
+    """Tokens a chat request may use: about four bytes of body per prompt
+    token, plus ``max_tokens`` or ``output_tokens`` if it sets none."""
+    match = _MAX_TOKENS.search(body)
+    return len(body) // 4 + (int(match.group(1)) if match else output_tokens)
+
+
+class Quota:
+    """A per-minute quota, enforced as a continuously refilled bucket.
+
+    Args:
+        per_minute: The provider's limit per minute.
+        headroom: Fraction of the limit to use.
+        burst: Seconds' worth of a configured quota that may be used at once;
+            a limit the provider reports allows a full minute's.
+    """
+
+    def __init__(
+        self, per_minute: float, headroom: float = 0.9, burst: float = 10.0
+    ) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.limit = per_minute
+        self.headroom = headroom
+        self.burst = burst
+        self.rate = per_minute * headroom / 60
+        self.reported = False
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def capacity(self) -> float:
+        # A provider that reports its limit holds a minute's worth, as OpenAI's
+        # buckets do; a configured guess is only trusted for ``burst``.
+        return max(1.0, self.rate * (60 if self.reported else self.burst))
+
+    @property
+    def per_minute(self) -> float:
+        """The rate currently allowed, per minute."""
+        return self.rate * 60
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be taken. Requests larger than the
+        bucket go once it is full and leave it in debt."""
+        self.refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def observe(
+        self, limit: float, remaining: Optional[float], reset: Optional[float]
+    ) -> None:
+        """Adopt the provider's view from its rate-limit headers."""
+        self.limit = limit
+        self.reported = True
+        if remaining is None:
+            return
+        used = limit - remaining
+        if reset and used >= max(10.0, limit / 100):
+            # The provider refills what was used over ``reset`` seconds. Small
+            # amounts are dominated by the headers' rounding, so skip them.
+            observed = used / reset * self.headroom
+            self.rate += 0.3 * (observed - self.rate)
+        self.level = min(self.level, remaining - (1 - self.headroom) * limit)
+
+    def slow_down(self) -> None:
+        self.rate = max(self.rate / 2, self.limit / 3600)
+        self.level = min(self.level, 0.0)
+
+    def speed_up(self) -> None:
+        ceiling = self.limit * self.headroom / 60
+        self.rate = min(ceiling, self.rate + ceiling / 50)
+
+
+class ProviderGate:
+    """Quotas and the priority queue of waiting requests for one provider.
+
+    Args:
+        name: Label for stats and ``queue`` spans.
+        requests_per_minute: Known request quota, if any.
+        tokens_per_minute: Known token quota, if any.
+        headroom: Fraction of each quota to use.
+        burst: Seconds' worth of quota that may be used at once.
+        adaptive: Follow rate-limit headers and 429s.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        headroom: float = 0.9,
+        burst: float = 10.0,
+        adaptive: bool = True,
+    ) -> None:
+        self.name = name
+        self.headroom = headroom
+        self.burst = burst
+        self.adaptive = adaptive
+        self.quotas: Dict[str, Quota] = {}
+        self.set_limits(requests_per_minute, tokens_per_minute)
+        self.paused_until = 0.0
+        self.sent = 0
+        self.rate_limited = 0
+        self.queued = 0
+        self.waited = 0.0
+        self._recent: Deque[float] = deque()
+        self._queue: List[Tuple[int, int, float, "asyncio.Future[None]"]] = []
+        self._order = itertools.count()
+        self._pump: Optional["asyncio.Task[None]"] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def set_limits(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> None:
+        for kind, limit in (
+            ("requests", requests_per_minute),
+            ("tokens", tokens_per_minute),
+        ):
+            if limit is not None:
+                self.quotas[kind] = Quota(limit, self.headroom, self.burst)
+
+    def _delay(self, tokens: float) -> float:
+        now = time.monotonic()
+        delay = self.paused_until - now
+        for kind, quota in self.quotas.items():
+            delay = max(delay, quota.wait(1.0 if kind == "requests" else tokens, now))
+        return delay
+
+    def _take(self, tokens: float) -> None:
+        for kind, quota in self.quotas.items():
+            quota.take(1.0 if kind == "requests" else tokens)
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent[0] < now - 60:
+            self._recent.popleft()
+        self.sent += 1
+
+    async def acquire(self, tokens: float, level: int = NORMAL) -> float:
+        """Wait for room for one request of ``tokens``; returns seconds waited."""
+        if not self._queue and self._delay(tokens) <= 0:
+            self._take(tokens)
+            return 0.0
+        start = time.monotonic()
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (level, next(self._order), tokens, future))
+        self.queued += 1
+        self._wake()
+        await future
+        waited = time.monotonic() - start
+        self.waited += waited
+        return waited
+
+    def _wake(self) -> None:
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.ensure_future(self._serve())
+        elif self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _serve(self) -> None:
+        self._wakeup = asyncio.Event()
+        while self._queue:
+            _, _, tokens, future = self._queue[0]
+            if future.done():  # The waiter was cancelled.
+                heapq.heappop(self._queue)
+                continue
+            delay = self._delay(tokens)
+            if delay > 0:
+                # Sleep, unless a more urgent request or a 429 arrives first.
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._queue)
+            self._take(tokens)
+            future.set_result(None)
+
+    def observe(self, status: int, headers: Mapping[str, str]) -> None:
+        """Adapt to a response's status and rate-limit headers."""
+        if status == 429:
+            self.rate_limited += 1
+        if not self.adaptive:
+            return
+        reported = False
+        for kind in ("requests", "tokens"):
+            limit = _number(headers.get(f"x-ratelimit-limit-{kind}"))
+            if not limit:
+                continue
+            reported = True
+            if kind not in self.quotas:
+                self.quotas[kind] = Quota(limit, self.headroom, self.burst)
+            self.quotas[kind].observe(
+                limit,
+                _number(headers.get(f"x-ratelimit-remaining-{kind}")),
+                parse_duration(headers.get(f"x-ratelimit-reset-{kind}")),
+            )
+        if status == 429:
+            if not self.quotas:
+                # No quota known: start from the rate that just hit the limit.
+                self.quotas["requests"] = Quota(
+                    max(1.0, len(self._recent)), self.headroom, self.burst
+                )
+            if not reported:
+                for quota in self.quotas.values():
+                    quota.slow_down()
+            wait = retry_after(headers) or 1.0
+            self.paused_until = max(self.paused_until, time.monotonic() + wait)
+            self._wake()
+        elif status < 400 and not reported:
+            for quota in self.quotas.values():
+                quota.speed_up()
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.quotas.get("requests")
+        tokens = self.quotas.get("tokens")
+        return {
+            "provider": self.name,
+            "sent": self.sent,
+            "rate_limited": self.rate_limited,
+            "queued": self.queued,
+            "waited": self.waited,
+            "requests_per_minute": requests.per_minute if requests else None,
+            "tokens_per_minute": tokens.per_minute if tokens else None,
+        }
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _queue_span(resource: str) -> ContextManager[Any]:
+    """A ``queue`` span for :mod:`sales_agent.metrics`, inside agent runs."""
+    try:
+        from agents.tracing import custom_span, get_current_trace
+    except ImportError:  # pragma: no cover - only traced under the agents SDK
+        return contextlib.nullcontext()
+    if get_current_trace() is None:
+        return contextlib.nullcontext()
+    return custom_span("queue", {"resource": resource})
+
+
+class ScheduledTransport(httpx.AsyncBaseTransport):
+    """Sends each request through ``transport`` once ``gate`` has room.
+
+    Args:
+        transport: Where requests go, e.g. a :class:`ShardedTransport`.
+        gate: The provider's quotas.
+        output_tokens: Output estimate for requests without ``max_tokens``.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        gate: ProviderGate,
+        output_tokens: int = 500,
+    ) -> None:
+        self.transport = transport
+        self.gate = gate
+        self.output_tokens = output_tokens
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            body = request.content
+        except httpx.RequestNotRead:
+            body = b""
+        tokens = estimate_tokens(body, self.output_tokens)
+        with _queue_span(self.gate.name):
+            await self.gate.acquire(tokens, _priority.get())
+        response = await self.transport.handle_async_request(request)
+        self.gate.observe(response.status_code, response.headers)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class RateScheduler:
+    """A :class:`ProviderGate` per base URL, applied by ``ClientPool``.
+
+    Args:
+        limits: Base URL to ``(requests_per_minute, tokens_per_minute)``;
+            either may be None. Providers without limits are still
+            throttled once they answer with rate-limit headers or 429s.
+        headroom: Fraction of each quota to use.
+        burst: Seconds' worth of quota that may be used at once.
+        adaptive: Follow rate-limit headers and 429s; off, the limits are
+            fixed token buckets.
+        output_tokens: Output estimate for requests without ``max_tokens``.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[str, Tuple[Optional[float], Optional[float]]]] = None,
+        headroom: float = 0.9,
+        burst: float = 10.0,
+        adaptive: bool = True,
+        output_tokens: int = 500,
+    ) -> None:
+        self.headroom = headroom
+        self.burst = burst
+        self.adaptive = adaptive
+        self.output_tokens = output_tokens
+        self.gates: Dict[str, ProviderGate] = {}
+        for base_url, (rpm, tpm) in (limits or {}).items():
+            self.set_limits(base_url, rpm, tpm)
+
+    def gate(self, base_url: str) -> ProviderGate:
+        base_url = base_url.rstrip("/")
+        gate = self.gates.get(base_url)
+        if gate is None:
+            gate = ProviderGate(
+                httpx.URL(base_url).host or base_url,
+                headroom=self.headroom,
+                burst=self.burst,
+                adaptive=self.adaptive,
+            )
+            self.gates[base_url] = gate
+        return gate
+
+    def set_limits(
+        self,
+        base_url: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> None:
+        """Set the known quotas for ``base_url``."""
+        self.gate(base_url).set_limits(requests_per_minute, tokens_per_minute)
+
+    def transport(
+        self, transport: httpx.AsyncBaseTransport, base_url: str
+    ) -> ScheduledTransport:
+        """Put ``base_url``'s gate in front of ``transport``."""
+        return ScheduledTransport(transport, self.gate(base_url), self.output_tokens)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Requests sent, 429s, queueing and current limits per provider."""
+        return [gate.stats() for gate in self.gates.values()]
@@ -0,0 +1,264 @@
+"""Local scoring of cold email drafts, with the LLM picker kept for close calls.
+
+``sales_picker`` reads every draft in one prompt that grows with the number of
+candidates, and costs a round-trip per prospect. :class:`HeuristicScorer`
+ranks any number of drafts at once from a NumPy feature matrix (length,
+readability, call-to-action, spam words, shouting and reader focus).
+:class:`EmbeddingScorer` adds similarity to example emails that worked, using
+any small embedding model, and :class:`CombinedScorer` blends scorers.
+:class:`LocalPicker` picks the top draft locally and asks the LLM picker only
+when the top two are within ``margin``, showing it just the shortlist.
+
+Requires NumPy: ``pip install "sales-agent[scoring]"``.
+"""
+
+import abc
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from agents import Agent, Runner, Usage
+
+from sales_agent.pipeline import picker_prompt
+
+try:
+    import numpy as np
+
+    _HAVE_NUMPY = True
+except ImportError:  # pragma: no cover - optional dependency
+    _HAVE_NUMPY = False
+
+FEATURES = ("length", "readability", "cta", "spam", "shouting", "reader_focus")
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "length": 0.2,
+    "readability": 0.2,
+    "cta": 0.25,
+    "spam": 0.15,
+    "shouting": 0.1,
+    "reader_focus": 0.1,
+}
+
+CTA_PHRASES = (
+    "book a",
+    "schedule",
+    "demo",
+    "reply",
+    "let's chat",
+    "quick call",
+    "15 minutes",
+    "15-minute",
+    "calendar",
+    "would you be open",
+    "are you free",
+    "let me know",
+)
+
+SPAM_WORDS = (
+    "free",
+    "guarantee",
+    "guaranteed",
+    "act now",
+    "limited time",
+    "risk-free",
+    "winner",
+    "urgent",
+    "100%",
+    "click here",
+    "no obligation",
+    "cash",
+    "$$$",
+    "amazing",
+)
+
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]*")
+_SENTENCE = re.compile(r"[.!?]+(?:\s|$)")
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+_CTA = re.compile("|".join(re.escape(p) for p in CTA_PHRASES), re.IGNORECASE)
+_SPAM = re.compile(
+    r"(?<!\w)(?:" + "|".join(re.escape(w) for w in SPAM_WORDS) + r")(?!\w)",
+    re.IGNORECASE,
+)
+_READER = re.compile(r"\b(?:you|your|you're|yours)\b", re.IGNORECASE)
+
+
+def _require_numpy() -> None:
+    if not _HAVE_NUMPY:
+        raise ImportError('Scoring needs NumPy: pip install "sales-agent[scoring]"')
+
+
+def _syllables(word: str) -> int:
+    groups = len(_VOWEL_GROUPS.findall(word.lower()))
+    if word.lower().endswith("e") and groups > 1:
+        groups -= 1
+    return max(1, groups)
+
+
+class Scorer(abc.ABC):
+    """Scores drafts; higher is better. Scores are comparable across calls."""
+
+    @abc.abstractmethod
+    def score(self, drafts: Sequence[str]) -> Any:
+        """A 1-D array with one score per draft."""
+
+
+class HeuristicScorer(Scorer):
+    """Weighted sum of per-feature scores in ``[0, 1]``.
+
+    Args:
+        weights: Weight per name in :data:`FEATURES`; missing names count 0.
+            Defaults to :data:`DEFAULT_WEIGHTS`.
+        target_words: Word counts that score full marks for length.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Mapping[str, float]] = None,
+        target_words: Tuple[int, int] = (50, 150),
+    ) -> None:
+        _require_numpy()
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        unknown = set(weights) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown features: {sorted(unknown)}")
+        vector = np.array([weights.get(name, 0.0) for name in FEATURES], dtype=float)
+        self.weights = vector / vector.sum() if vector.sum() else vector
+        self.target_words = target_words
+
+    def counts(self, drafts: Sequence[str]) -> Any:
+        """Raw counts per draft: words, sentences, syllables, CTAs, spam words,
+        exclamation marks, all-caps words and reader-directed words."""
+        rows = []
+        for draft in drafts:
+            words = _WORD.findall(draft)
+            rows.append(
+                (
+                    len(words),
+                    len(_SENTENCE.findall(draft)) or 1,
+                    sum(_syllables(word) for word in words),
+                    len(_CTA.findall(draft)),
+                    len(_SPAM.findall(draft)),
+                    draft.count("!"),
+                    sum(1 for word in words if len(word) > 2 and word.isupper()),
+                    len(_READER.findall(draft)),
+                )
+            )
+        return np.array(rows, dtype=float).reshape(len(rows), 8)
+
+    def features(self, drafts: Sequence[str]) -> Any:
+        """The ``len(drafts) x len(FEATURES)`` matrix of feature scores."""
+        c = self.counts(drafts)
+        words = np.maximum(c[:, 0], 1.0)
+        low, high = self.target_words
+        overshoot = np.maximum(low - words, 0) + np.maximum(words - high, 0)
+        length = np.exp(-overshoot / max(low, 1))
+        flesch = 206.835 - 1.015 * words / c[:, 1] - 84.6 * c[:, 2] / words
+        readability = np.clip((flesch - 30.0) / 50.0, 0.0, 1.0)
+        cta = np.minimum(c[:, 3], 1.0)
+        spam = 1.0 - np.clip(c[:, 4] / words * 20.0, 0.0, 1.0)
+        shouting = 1.0 - np.clip((c[:, 5] + c[:, 6]) / words * 10.0, 0.0, 1.0)
+        reader_focus = np.clip(c[:, 7] / words * 15.0, 0.0, 1.0)
+        return np.column_stack([length, readability, cta, spam, shouting, reader_focus])
+
+    def score(self, drafts: Sequence[str]) -> Any:
+        if not drafts:
+            return np.zeros(0)
+        return self.features(drafts) @ self.weights
+
+
+class EmbeddingScorer(Scorer):
+    """Cosine similarity to the centroid of example emails.
+
+    Args:
+        embed: Turns a list of texts into a 2-D array of vectors, e.g.
+            ``SentenceTransformer("all-MiniLM-L6-v2").encode``.
+        examples: Emails that performed well; the reference for "good".
+    """
+
+    def __init__(
+        self, embed: Callable[[List[str]], Any], examples: Sequence[str]
+    ) -> None:
+        _require_numpy()
+        if not examples:
+            raise ValueError("EmbeddingScorer needs at least one example email")
+        self.embed = embed
+        centroid = self._unit(np.asarray(embed(list(examples)), dtype=float)).mean(0)
+        self.centroid = centroid / (np.linalg.norm(centroid) or 1.0)
+
+    @staticmethod
+    def _unit(vectors: Any) -> Any:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def score(self, drafts: Sequence[str]) -> Any:
+        if not drafts:
+            return np.zeros(0)
+        vectors = self._unit(np.asarray(self.embed(list(drafts)), dtype=float))
+        return vectors @ self.centroid
+
+
+class CombinedScorer(Scorer):
+    """Weighted sum of several scorers' scores.
+
+    Args:
+        scorers: ``(scorer, weight)`` pairs.
+    """
+
+    def __init__(self, scorers: Sequence[Tuple[Scorer, float]]) -> None:
+        _require_numpy()
+        if not scorers:
+            raise ValueError("CombinedScorer needs at least one scorer")
+        self.scorers = list(scorers)
+
+    def score(self, drafts: Sequence[str]) -> Any:
+        total = np.zeros(len(drafts))
+        for scorer, weight in self.scorers:
+            total += weight * np.asarray(scorer.score(drafts), dtype=float)
+        return total
+
+
+class LocalPicker:
+    """Pick the best draft locally, deferring close calls to ``picker``.
+
+    Args:
+        scorer: Ranks the drafts; :class:`HeuristicScorer` by default.
+        picker: The ``sales_picker`` agent for close calls. Without one the
+            top-scoring draft always wins.
+        margin: Score gap between the top two below which ``picker`` decides.
+        shortlist: Top drafts shown to ``picker``.
+    """
+
+    def __init__(
+        self,
+        scorer: Optional[Scorer] = None,
+        picker: Optional[Agent] = None,
+        margin: float = 0.02,
+        shortlist: int = 2,
+    ) -> None:
+        self.scorer = scorer if scorer is not None else HeuristicScorer()
+        self.picker = picker
+        self.margin = margin
+        self.shortlist = max(2, shortlist)
+        self.local_picks = 0
+        self.llm_picks = 0
+
+    def rank(self, drafts: Sequence[str]) -> List[int]:
+        """Draft indices, best first."""
+        scores = np.asarray(self.scorer.score(drafts), dtype=float)
+        return [int(i) for i in np.argsort(-scores, kind="stable")]
+
+    async def pick(self, drafts: Sequence[str], usage: Optional[Usage] = None) -> str:
+        """The best draft, adding any picker usage to ``usage``."""
+        if not drafts:
+            raise ValueError("No drafts to pick from")
+        scores = np.asarray(self.scorer.score(drafts), dtype=float)
+        order = np.argsort(-scores, kind="stable")
+        close = len(drafts) > 1 and scores[order[0]] - scores[order[1]] < self.margin
+        if self.picker is None or not close:
+            self.local_picks += 1
+            return drafts[int(order[0])]
+        self.llm_picks += 1
+        candidates = [drafts[int(i)] for i in order[: self.shortlist]]
+        result = await Runner.run(self.picker, picker_prompt(candidates))
+        if usage is not None:
+            usage.add(result.context_wrapper.usage)
+        return str(result.final_output)
@@ -0,0 +1,211 @@
+"""The Lab 3 automated SDR as a library, built on first use.
+
+The lab scripts load ``.env``, create every client and agent, and send a test
+email as they are imported, and they rely on top-level ``await``. Here each
+piece is a function that builds it the first time it is called and returns
+the same object afterwards, and the agents SDK, ``openai`` and ``dotenv`` are
+only imported then. Importing this module costs next to nothing, so a worker
+process starts fast and only pays for what its job uses::
+
+    from sales_agent import sdr
+
+    result = await Runner.run(sdr.sales_manager(), message)
+
+Drafters use DeepSeek, Gemini and Groq when the provider's API key is set,
+and :data:`DEFAULT_MODEL` otherwise. Every agent talks to its provider through
+:func:`sales_agent.clients.get_client_pool`, whose scheduler keeps each
+provider under its quota.
+"""
+
+import functools
+import os
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union
+
+if TYPE_CHECKING:
+    from agents import Agent, FunctionTool, Model
+
+    from sales_agent.clients import ClientPool
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Provider: (base URL, API key variable, model, requests per minute).
+PROVIDERS: Dict[str, Tuple[str, str, str, float]] = {
+    "deepseek": (
+        "https://api.deepseek.com/v1",
+        "DEEPSEEK_API_KEY",
+        "deepseek-chat",
+        60,
+    ),
+    "gemini": (
+        "https://generativelanguage.googleapis.com/v1beta/openai/",
+        "GOOGLE_API_KEY",
+        "gemini-2.0-flash",
+        300,
+    ),
+    "groq": (
+        "https://api.groq.com/openai/v1",
+        "GROQ_API_KEY",
+        "llama-3.3-70b-versatile",
+        30,
+    ),
+}
+
+DRAFTERS = (
+    ("DeepSeek Sales Agent", "professional", "deepseek"),
+    ("Gemini Sales Agent", "engaging", "gemini"),
+    ("Llama3.3 Sales Agent", "busy", "groq"),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def load_env() -> None:
+    """Load ``.env`` once. Variables already set in the environment win."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+@functools.lru_cache(maxsize=None)
+def client_pool() -> "ClientPool":
+    """The shared client pool, with the providers' request quotas, installed
+    as the agents SDK's OpenAI client when ``OPENAI_API_KEY`` is set."""
+    from sales_agent.clients import get_client_pool
+
+    load_env()
+    pool = get_client_pool()
+    if pool.scheduler is not None:
+        for base_url, _, _, rpm in PROVIDERS.values():
+            pool.scheduler.set_limits(base_url, requests_per_minute=rpm)
+    if os.environ.get("OPENAI_API_KEY"):
+        pool.install()
+    return pool
+
+
+@functools.lru_cache(maxsize=None)
+def provider_model(provider: str) -> Union[str, "Model"]:
+    """``provider``'s model, or :data:`DEFAULT_MODEL` when its API key is not
+    set."""
+    pool = client_pool()
+    base_url, key_variable, model, _ = PROVIDERS[provider]
+    api_key = os.environ.get(key_variable)
+    if not api_key:
+        return DEFAULT_MODEL
+    return pool.model(model, base_url, api_key)
+
+
+@functools.lru_cache(maxsize=None)
+def drafters() -> List["Agent"]:
+    """The three sales agents, one persona and provider each."""
+    from agents import Agent
+
+    from sales_agent.prompts import sales_instructions
+
+    return [
+        Agent(
+            name=name,
+            instructions=sales_instructions(persona),
+            model=provider_model(provider),
+        )
+        for name, persona, provider in DRAFTERS
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def sales_picker() -> "Agent":
+    from agents import Agent
+
+    from sales_agent.prompts import PICKER_INSTRUCTIONS
+
+    client_pool()
+    return Agent(
+        name="sales_picker", instructions=PICKER_INSTRUCTIONS, model=DEFAULT_MODEL
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def send_html_email() -> "FunctionTool":
+    """The ``send_html_email`` tool, sending through the shared transport."""
+    from agents import function_tool
+
+    from sales_agent.guardrails import gated_tool
+    from sales_agent.mail import build_mail, get_mail_transport
+
+    @function_tool
+    async def send_html_email(subject: str, html_body: str) -> Dict[str, str]:
+        """Send out an email with the given subject and HTML body to all sales
+        prospects"""
+        mail = build_mail(subject, html_body, content_type="text/html")
+        await get_mail_transport().send(mail)
+        return {"status": "success"}
+
+    return gated_tool(send_html_email)
+
+
+@functools.lru_cache(maxsize=None)
+def emailer_agent() -> "Agent":
+    """The Email Manager: subject writer, local HTML rendering, then send."""
+    from agents import Agent
+
+    from sales_agent.prompts import EMAILER_INSTRUCTIONS, SUBJECT_INSTRUCTIONS
+    from sales_agent.render import build_html_tool
+
+    client_pool()
+    subject_writer = Agent(
+        name="Email subject writer",
+        instructions=SUBJECT_INSTRUCTIONS,
+        model=DEFAULT_MODEL,
+    )
+    return Agent(
+        name="Email Manager",
+        instructions=EMAILER_INSTRUCTIONS,
+        tools=[
+            subject_writer.as_tool(
+                tool_name="subject_writer",
+                tool_description="Write a subject for a cold sales email",
+            ),
+            build_html_tool(layout="simple"),
+            send_html_email(),
+        ],
+        model=DEFAULT_MODEL,
+        handoff_description="Convert an email to HTML and send it",
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def sales_manager() -> "Agent":
+    """Drafts with the three sales agents as tools and hands off the best."""
+    from agents import Agent
+
+    from sales_agent.prompts import SALES_MANAGER_INSTRUCTIONS
+
+    return Agent(
+        name="Sales Manager",
+        instructions=SALES_MANAGER_INSTRUCTIONS,
+        tools=[
+            drafter.as_tool(
+                tool_name=f"sales_agent{i}",
+                tool_description="Write a cold sales email",
+            )
+            for i, drafter in enumerate(drafters(), start=1)
+        ],
+        handoffs=[emailer_agent()],
+        model=DEFAULT_MODEL,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def careful_sales_manager() -> "Agent":
+    """:func:`sales_manager` behind the tiered name guardrail."""
+    from agents import Agent
+
+    from sales_agent.guardrails import NameCheckOutput, TieredNameCheck
+
+    guardrail_agent = Agent(
+        name="Name check",
+        instructions="Check if the user is including someone's personal name in "
+        "what they want you to do.",
+        output_type=NameCheckOutput,
+        model=DEFAULT_MODEL,
+    )
+    guardrail = TieredNameCheck(guardrail_agent).guardrail()
+    return sales_manager().clone(input_guardrails=[guardrail])
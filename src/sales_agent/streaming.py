@@ -0,0 +1,282 @@
+"""Streaming variant of :class:`sales_agent.pipeline.SalesPipeline`.
+
+Every stage of the plain pipeline waits for complete ``final_output`` strings.
+:class:`StreamingPipeline` consumes the token streams instead, as the
+``Runner.run_streamed`` cell in Lab 2 does:
+
+* each draft is streamed, and ``subject_writer`` starts speculatively on its
+  opening paragraphs while the rest is still being generated;
+* the picker's reply is the chosen email repeated back, so it is streamed and
+  stopped as soon as its prefix matches exactly one draft;
+* the winner's subject is then usually ready, the HTML is rendered locally,
+  and the email is sent. Subjects written for the losing drafts are dropped.
+
+Drafts are collected with :func:`sales_agent.pipeline.first_drafts`, so with
+``k`` or ``deadline`` the picker starts as soon as enough drafts are in and
+the stragglers are cancelled, and ``dedup`` drops near duplicates first, as
+in :class:`sales_agent.pipeline.SalesPipeline`. Time to email sent is then
+roughly the k-th draft plus the start of the picker's reply, rather than the
+sum of every stage.
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from agents import Agent, Runner, RunResult, RunResultStreaming, Usage
+from agents.result import RunResultBase
+from openai.types.responses import ResponseTextDeltaEvent
+
+from sales_agent.dedup import DuplicateIndex
+from sales_agent.emailer import FormattedEmail, StructuredEmailer
+from sales_agent.guardrails import wait_for_guardrails
+from sales_agent.mail import build_mail, get_mail_transport
+from sales_agent.pipeline import (
+    PipelineResult,
+    SalesPipeline,
+    first_drafts,
+    picker_prompt,
+)
+from sales_agent.render import render_email
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def match_draft(
+    prefix: str, drafts: Sequence[str], min_chars: int = 40
+) -> Optional[int]:
+    """Index of the only draft starting with ``prefix``, ignoring whitespace.
+
+    Returns ``None`` while ``prefix`` is shorter than ``min_chars`` or still
+    matches several drafts (or none).
+    """
+    prefix = _normalize(prefix)
+    if len(prefix) < min_chars:
+        return None
+    matches = [
+        i for i, draft in enumerate(drafts) if _normalize(draft).startswith(prefix)
+    ]
+    return matches[0] if len(matches) == 1 else None
+
+
+def estimate_usage(agent: Agent, message: str, text: str) -> Usage:
+    """Usage of one response cut off after ``text``, at about four characters
+    per token, since a cancelled stream never reports the usage it ran up."""
+    instructions = agent.instructions if isinstance(agent.instructions, str) else ""
+    input_tokens = (len(instructions) + len(message)) // 4
+    output_tokens = len(text) // 4
+    return Usage(
+        requests=1,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens,
+    )
+
+
+async def stream_text(
+    agent: Agent,
+    message: str,
+    on_text: Optional[Callable[[str], bool]] = None,
+    usage: Optional[Usage] = None,
+) -> Tuple[str, Optional[RunResultStreaming], bool]:
+    """Run ``agent`` streamed, calling ``on_text`` with the text so far.
+
+    The run is cancelled as soon as ``on_text`` returns True, or when the
+    caller is cancelled. Returns the text, the run result (``None`` if
+    cancelled) and whether it was cancelled. When ``on_text`` cancels the
+    run, what it consumed is added to ``usage``: the turns it finished plus
+    :func:`estimate_usage` for the one cut off.
+    """
+    result = Runner.run_streamed(agent, message)
+    text = ""
+    try:
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(
+                event.data, ResponseTextDeltaEvent
+            ):
+                text += event.data.delta
+                if on_text is not None and on_text(text):
+                    result.cancel()
+                    if usage is not None:
+                        usage.add(result.context_wrapper.usage)
+                        usage.add(estimate_usage(agent, message, text))
+                    return text, None, True
+    except asyncio.CancelledError:
+        result.cancel()
+        raise
+    return str(result.final_output), result, False
+
+
+class StreamingPipeline(SalesPipeline):
+    """Draft, pick and send with every stage consuming token streams.
+
+    Args:
+        drafters: The ``sales_agent`` agents, streamed concurrently.
+        picker: The ``sales_picker`` agent.
+        emailer: A ``StructuredEmailer`` with a ``subject_writer``; its
+            ``layout``, ``html_converter`` and ``transport`` are used as usual.
+        trace_name: Trace to group the runs under, unless one is already open.
+        speculative_subjects: Write a subject for every draft while they are
+            generated. When off, only the winner's subject is written, once
+            the picker has named it.
+        subject_after_chars: Draft text to wait for before a speculative
+            subject is started.
+        min_match_chars: Picker output needed before it may name a winner.
+        k: Pick from the first ``k`` drafts and cancel the rest.
+        deadline: Seconds after which the drafts already in are picked from.
+        dedup: Drops near-duplicate drafts before picking.
+    """
+
+    picker: Agent
+    emailer: StructuredEmailer
+
+    def __init__(
+        self,
+        drafters: Sequence[Agent],
+        picker: Agent,
+        emailer: StructuredEmailer,
+        trace_name: str = "Streaming sales pipeline",
+        speculative_subjects: bool = True,
+        subject_after_chars: int = 400,
+        min_match_chars: int = 40,
+        k: Optional[int] = None,
+        deadline: Optional[float] = None,
+        dedup: Optional[DuplicateIndex] = None,
+    ) -> None:
+        if emailer.subject_writer is None:
+            raise ValueError("StreamingPipeline needs an emailer with a subject_writer")
+        super().__init__(drafters, picker, emailer, trace_name, k, deadline, dedup)
+        self.speculative_subjects = speculative_subjects
+        self.subject_after_chars = subject_after_chars
+        self.min_match_chars = min_match_chars
+        self.early_picks = 0
+        self.speculative_hits = 0
+
+    def _subject(self, text: str) -> "asyncio.Future[RunResult]":
+        assert self.emailer.subject_writer is not None
+        return asyncio.ensure_future(Runner.run(self.emailer.subject_writer, text))
+
+    async def _draft(
+        self,
+        drafter: Agent,
+        message: str,
+        subjects: Dict[str, "asyncio.Future[RunResult]"],
+        started: List["asyncio.Future[RunResult]"],
+    ) -> RunResultStreaming:
+        """Stream one draft, starting its speculative subject on the way.
+
+        Subjects are added to ``started`` as they start, and filed in
+        ``subjects`` under the finished draft's text.
+        """
+        subject: Optional["asyncio.Future[RunResult]"] = None
+
+        def on_text(text: str) -> bool:
+            nonlocal subject
+            if self.speculative_subjects and subject is None:
+                if len(text) >= self.subject_after_chars:
+                    subject = self._subject(text)
+                    started.append(subject)
+            return False
+
+        text, result, _ = await stream_text(drafter, message, on_text)
+        assert result is not None
+        if self.speculative_subjects:
+            if subject is None:
+                subject = self._subject(text)
+                started.append(subject)
+            subjects[text] = subject
+        return result
+
+    async def run(self, message: str) -> PipelineResult:
+        usage = Usage()
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        subjects: Dict[str, "asyncio.Future[RunResult]"] = {}
+        started: List["asyncio.Future[RunResult]"] = []
+        finished: List[RunResultBase] = []
+        html_task: Optional["asyncio.Future[RunResult]"] = None
+        with self._trace():
+            try:
+                # Drafts go to the picker as soon as k of them are in or the
+                # deadline passes; the stragglers are cancelled.
+                drafts = await first_drafts(
+                    self.drafters,
+                    message,
+                    self.k,
+                    self.deadline,
+                    usage,
+                    self.stats,
+                    run=lambda drafter, text: self._draft(
+                        drafter, text, subjects, started
+                    ),
+                )
+                if self.dedup is not None:
+                    drafts = self.dedup.unique(drafts)
+                timings["drafts"] = time.perf_counter() - start
+
+                def named(text: str) -> bool:
+                    return match_draft(text, drafts, self.min_match_chars) is not None
+
+                if len(drafts) == 1:
+                    winner: Optional[int] = 0
+                else:
+                    picked, picker_result, stopped = await stream_text(
+                        self.picker, picker_prompt(drafts), named, usage
+                    )
+                    if picker_result is not None:
+                        finished.append(picker_result)
+                    self.early_picks += stopped
+                    winner = match_draft(picked, drafts, self.min_match_chars)
+                best = drafts[winner] if winner is not None else picked
+                timings["winner"] = time.perf_counter() - start
+
+                if winner is None or best not in subjects:
+                    subject_task = self._subject(best)
+                else:
+                    subject_task = subjects.pop(best)
+                    self.speculative_hits += 1
+                if self.emailer.html_converter is not None:
+                    html_task = asyncio.ensure_future(
+                        Runner.run(self.emailer.html_converter, best)
+                    )
+                subject_result = await subject_task
+                finished.append(subject_result)
+                timings["subject"] = time.perf_counter() - start
+                if html_task is None:
+                    html_body = render_email(best, self.emailer.layout)
+                else:
+                    html_result = await html_task
+                    finished.append(html_result)
+                    html_body = str(html_result.final_output)
+                email = FormattedEmail(
+                    subject=str(subject_result.final_output), html_body=html_body
+                )
+                await wait_for_guardrails()
+                transport = self.emailer.transport or get_mail_transport()
+                await transport.send(
+                    build_mail(email.subject, email.html_body, "text/html")
+                )
+                timings["sent"] = time.perf_counter() - start
+            finally:
+                leftovers = [*started, *([html_task] if html_task else [])]
+                for task in leftovers:
+                    task.cancel()
+                await asyncio.gather(*leftovers, return_exceptions=True)
+
+            # Speculative subjects that completed were paid for, so count them.
+            for task in started:
+                if task is subject_task or task.cancelled():
+                    continue
+                if task.exception() is None:
+                    finished.append(task.result())
+            for result in finished:
+                usage.add(result.context_wrapper.usage)
+        return PipelineResult(
+            drafts=drafts,
+            best=best,
+            output=email,
+            usage=usage,
+            timings=timings,
+        )
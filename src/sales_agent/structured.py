@@ -0,0 +1,207 @@
+"""Drafts returned as fields rather than free text.
+
+The drafters return email bodies as text, which every later stage reads in
+full: ``sales_picker`` reads all of them and writes the winner out again,
+then ``subject_writer`` and ``html_converter`` read the winner once more.
+With :func:`structured_drafter` a drafter returns an :class:`EmailDraft`
+instead, with a Pydantic ``output_type`` as for ``NameCheckOutput`` in Lab 3:
+subject, greeting, body paragraphs, call to action, sign-off and a self-score.
+:class:`StructuredPipeline` then works on the fields::
+
+    drafters = [structured_drafter(agent) for agent in sales_agents]
+    pipeline = StructuredPipeline(drafters, build_digest_picker(), send=True)
+
+The picker (see :func:`build_digest_picker`) only reads each draft's subject,
+opening, call to action and score, and replies with a number; without a
+picker the highest self-score wins. The subject comes with the draft and the
+HTML is rendered locally from the paragraphs, so no formatting call is made
+at all. An :class:`EmailDraft` prints as its plain text body, so structured
+drafters also work in :class:`sales_agent.pipeline.SalesPipeline`.
+"""
+
+import asyncio
+import re
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, ContextManager, List, Optional, Sequence, Union
+
+from agents import Agent, Model, Runner, Usage, get_current_trace, trace
+from pydantic import BaseModel
+
+from sales_agent.emailer import FormattedEmail, send_email
+from sales_agent.mail import MailSender
+from sales_agent.pipeline import Picker, PipelineResult, add_usage
+from sales_agent.prompts import DIGEST_PICKER_INSTRUCTIONS, DRAFT_FIELDS_ROLE
+from sales_agent.render import render_email
+
+DIGEST_HEADER = "Cold sales emails:\n\n"
+
+# Words of the first paragraph the picker sees.
+OPENING_WORDS = 25
+
+_NUMBER = re.compile(r"\d+")
+
+
+class EmailDraft(BaseModel):
+    subject: str
+    greeting: str
+    paragraphs: List[str]
+    cta: str
+    sign_off: str
+    self_score: int
+
+    def body(self) -> str:
+        """The email as plain text, one blank line between parts."""
+        parts = [self.greeting, *self.paragraphs, self.cta, self.sign_off]
+        return "\n\n".join(part.strip() for part in parts if part.strip())
+
+    def digest(self, words: int = OPENING_WORDS) -> str:
+        """Subject, opening, call to action and score, for the picker."""
+        opening = " ".join(" ".join(self.paragraphs).split()[:words])
+        return (
+            f"Subject: {self.subject}\nOpening: {opening} ...\n"
+            f"Call to action: {self.cta}\nSelf-score: {self.self_score}/10"
+        )
+
+    def formatted(self, layout: str = "simple") -> FormattedEmail:
+        """The subject and locally rendered HTML, ready to send."""
+        return FormattedEmail(
+            subject=self.subject, html_body=render_email(self.body(), layout)
+        )
+
+    def __str__(self) -> str:
+        return self.body()
+
+
+def structured_drafter(agent: Agent) -> Agent:
+    """A copy of ``agent`` that returns an :class:`EmailDraft`.
+
+    String instructions get :data:`sales_agent.prompts.DRAFT_FIELDS_ROLE`
+    appended, after the shared prefix, so prompt caching is unaffected.
+    """
+    instructions = agent.instructions
+    if isinstance(instructions, str):
+        instructions += DRAFT_FIELDS_ROLE
+    return agent.clone(instructions=instructions, output_type=EmailDraft)
+
+
+def build_digest_picker(model: Union[str, Model] = "gpt-4o-mini") -> Agent:
+    """A ``sales_picker`` that reads digests and replies with a number."""
+    return Agent(
+        name="sales_picker", instructions=DIGEST_PICKER_INSTRUCTIONS, model=model
+    )
+
+
+def digest_prompt(drafts: Sequence[EmailDraft]) -> str:
+    """The digest picker's input: every draft's digest, numbered from 1."""
+    return DIGEST_HEADER + "\n\n".join(
+        f"Email {number}:\n{draft.digest()}" for number, draft in enumerate(drafts, 1)
+    )
+
+
+def best_scored(drafts: Sequence[EmailDraft]) -> EmailDraft:
+    """The draft with the highest self-score, the first on ties."""
+    return max(drafts, key=lambda draft: draft.self_score)
+
+
+async def pick_draft(
+    picker: Optional[Picker],
+    drafts: Sequence[EmailDraft],
+    usage: Optional[Usage] = None,
+) -> EmailDraft:
+    """Choose among ``drafts`` with ``picker``.
+
+    An agent is given :func:`digest_prompt` and must reply with a number; a
+    local picker such as :class:`sales_agent.scoring.LocalPicker` is given
+    the bodies. Without a picker, or when its reply names no draft, the
+    highest self-score wins.
+    """
+    if picker is None or len(drafts) == 1:
+        return best_scored(drafts)
+    if not isinstance(picker, Agent):
+        bodies = [draft.body() for draft in drafts]
+        best = await picker.pick(bodies, usage)
+        return drafts[bodies.index(best)] if best in bodies else best_scored(drafts)
+    result = await Runner.run(picker, digest_prompt(drafts))
+    if usage is not None:
+        add_usage(usage, result)
+    match = _NUMBER.search(str(result.final_output))
+    if match and 1 <= int(match.group()) <= len(drafts):
+        return drafts[int(match.group()) - 1]
+    return best_scored(drafts)
+
+
+@dataclass
+class StructuredResult(PipelineResult):
+    """A :class:`sales_agent.pipeline.PipelineResult` with the drafts' fields."""
+
+    fields: List[EmailDraft] = field(default_factory=list)
+    draft: Optional[EmailDraft] = None
+
+
+class StructuredPipeline:
+    """Draft as fields with every agent, pick from digests, render and send.
+
+    Instances are async callables returning the sent
+    :class:`sales_agent.emailer.FormattedEmail`, or the winning
+    :class:`EmailDraft` when not sending, so they can be passed to
+    :class:`sales_agent.campaign.Campaign`.
+
+    Args:
+        drafters: Agents with ``output_type=EmailDraft``, see
+            :func:`structured_drafter`; run concurrently.
+        picker: A digest picker (see :func:`build_digest_picker`), a local
+            picker, or None to go by self-score.
+        send: Send the winner; otherwise the pipeline stops at the pick.
+        layout: Layout for local rendering, see :data:`sales_agent.render.LAYOUTS`.
+        transport: Mail transport or outbox; defaults to the shared one.
+        trace_name: Trace to group the runs under, unless one is already open.
+    """
+
+    def __init__(
+        self,
+        drafters: Sequence[Agent],
+        picker: Optional[Picker] = None,
+        send: bool = False,
+        layout: str = "simple",
+        transport: Optional[MailSender] = None,
+        trace_name: str = "Sales pipeline",
+    ) -> None:
+        self.drafters = list(drafters)
+        self.picker = picker
+        self.send = send
+        self.layout = layout
+        self.transport = transport
+        self.trace_name = trace_name
+
+    def _trace(self) -> ContextManager[Any]:
+        if get_current_trace() is None:
+            return trace(self.trace_name)
+        return nullcontext()
+
+    async def run(self, message: str) -> StructuredResult:
+        usage = Usage()
+        with self._trace():
+            results = await asyncio.gather(
+                *(Runner.run(drafter, message) for drafter in self.drafters)
+            )
+            for result in results:
+                add_usage(usage, result)
+            drafts = [result.final_output_as(EmailDraft) for result in results]
+            draft = await pick_draft(self.picker, drafts, usage)
+            output = None
+            if self.send:
+                output = draft.formatted(self.layout)
+                await send_email(output, self.transport)
+        return StructuredResult(
+            drafts=[d.body() for d in drafts],
+            best=draft.body(),
+            output=output,
+            usage=usage,
+            fields=drafts,
+            draft=draft,
+        )
+
+    async def __call__(self, message: str) -> Any:
+        result = await self.run(message)
+        return result.output if self.send else result.draft
@@ -0,0 +1,54 @@
+"""Token bucket shared by the model rate limits and the email dispatcher.
+
+Kept free of the agents SDK so that :mod:`sales_agent.outbox` workers can
+throttle sends without importing it.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``capacity``.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Burst size. Defaults to one second's worth of tokens.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def per_minute(
+        cls, amount: float, capacity: Optional[float] = None
+    ) -> "TokenBucket":
+        return cls(amount / 60.0, capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until ``tokens`` are available and take them.
+
+        Waiters are served in arrival order. Returns the seconds spent waiting.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        start = time.monotonic()
+        async with self._lock:
+            self._refill()
+            while self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+        return time.monotonic() - start
@@ -0,0 +1,32 @@
+"""Shared fixtures: a local SendGrid stand-in and no trace exports."""
+
+from typing import AsyncIterator
+
+import pytest
+from agents import set_tracing_disabled
+
+from sales_agent.fakes import FakeSendGridServer
+from sales_agent.mail import MailTransport, set_mail_transport
+
+set_tracing_disabled(True)
+
+
+@pytest.fixture
+async def sendgrid() -> AsyncIterator[FakeSendGridServer]:
+    server = FakeSendGridServer()
+    await server.start()
+    try:
+        yield server
+    finally:
+        await server.stop()
+
+
+@pytest.fixture
+async def transport(sendgrid: FakeSendGridServer) -> AsyncIterator[MailTransport]:
+    """A transport to ``sendgrid``, also installed as the shared one."""
+    async with MailTransport(api_key="test", base_url=sendgrid.url) as mail:
+        set_mail_transport(mail)
+        try:
+            yield mail
+        finally:
+            set_mail_transport(None)
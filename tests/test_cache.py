@@ -0,0 +1,86 @@
+import os
+import time
+from pathlib import Path
+
+from agents import Agent, ModelSettings, Runner
+
+from sales_agent.cache import (
+    CachedModel,
+    MemoryCache,
+    SQLiteCache,
+    model_name,
+    with_cache,
+)
+from sales_agent.cascade import CascadeModel
+from sales_agent.fakes import FakeModel
+from sales_agent.router import ModelRouter
+
+
+def test_memory_cache_evicts_the_least_recently_used() -> None:
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+    assert cache.hit_rate == 0.75
+
+
+def test_entries_expire_after_the_ttl() -> None:
+    cache = MemoryCache(ttl=0.01)
+    cache.set("a", "1")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache_survives_a_restart(tmp_path: Path) -> None:
+    path = os.path.join(tmp_path, "cache.sqlite3")
+    first = SQLiteCache(path, max_entries=2)
+    for key in "abc":
+        first.set(key, key.upper())
+    first.close()
+    second = SQLiteCache(path)
+    assert second.get("a") is None
+    assert (second.get("b"), second.get("c")) == ("B", "C")
+    second.clear()
+    assert second.get("b") is None
+    second.close()
+
+
+async def test_repeated_calls_are_answered_from_the_cache() -> None:
+    model = FakeModel()
+    cache = MemoryCache()
+    agent = with_cache(Agent(name="Sales agent", instructions="Hi", model=model), cache)
+    assert isinstance(agent.model, CachedModel)
+    first = await Runner.run(agent, "Write a cold sales email")
+    second = await Runner.run(agent, "Write a cold sales email")
+    assert second.final_output == first.final_output
+    assert model.usage.requests == 1
+    assert second.context_wrapper.usage.requests == 0
+    await Runner.run(agent, "Write a warm sales email")
+    assert model.usage.requests == 2
+
+
+async def test_sampled_calls_bypass_the_cache() -> None:
+    model = FakeModel()
+    agent = Agent(
+        name="Sales agent",
+        instructions="Hi",
+        model=CachedModel(model, MemoryCache(), bypass_above_temperature=0.5),
+        model_settings=ModelSettings(temperature=0.9),
+    )
+    await Runner.run(agent, "Write a cold sales email")
+    await Runner.run(agent, "Write a cold sales email")
+    assert model.usage.requests == 2
+
+
+def test_wrappers_are_named_after_the_models_they_wrap() -> None:
+    mini, full = FakeModel(name="gpt-4o-mini"), FakeModel(name="gpt-4o")
+    assert model_name(mini) == "gpt-4o-mini"
+    cheap_first = CascadeModel({"cheap": mini, "strong": full})
+    assert model_name(cheap_first) == "CascadeModel(cheap=gpt-4o-mini,strong=gpt-4o)"
+    assert model_name(CascadeModel({"cheap": full})) != model_name(cheap_first)
+    router = ModelRouter({"a": mini, "b": CachedModel(full, MemoryCache())})
+    assert model_name(router) == "ModelRouter(a=gpt-4o-mini,b=gpt-4o)"
+    assert CachedModel(router, MemoryCache(), name="router").name == "router"
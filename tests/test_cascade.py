@@ -0,0 +1,88 @@
+from typing import Any, AsyncIterator, Tuple
+
+from agents import Agent, Model, ModelResponse, Runner
+
+from sales_agent.cascade import (
+    CascadeModel,
+    no_invented_names,
+    no_placeholders,
+    repeats_draft,
+    word_range,
+)
+from sales_agent.fakes import FakeModel
+from sales_agent.pipeline import picker_prompt
+
+GOOD = "Dear Jane, ComplAI gets Acme through SOC2 in weeks. Worth a call?"
+CHECKS = [word_range(5, 50), no_placeholders(), no_invented_names()]
+
+
+class DownModel(Model):
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        raise ConnectionError("provider down")
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        yield await self.get_response(*args, **kwargs)
+
+
+def drafter(cheap_reply: str) -> Tuple[Agent, CascadeModel]:
+    model = CascadeModel(
+        {
+            "gpt-4o-mini": FakeModel(reply=lambda _: cheap_reply),
+            "gpt-4o": FakeModel(reply=lambda _: GOOD),
+        },
+        checks=CHECKS,
+    )
+    return Agent(name="Sales agent", instructions="Write an email", model=model), model
+
+
+async def test_accepts_a_passing_cheap_reply() -> None:
+    agent, model = drafter(GOOD.replace("weeks", "days"))
+    result = await Runner.run(agent, "Write to Jane at Acme")
+    assert result.final_output == GOOD.replace("weeks", "days")
+    stats = model.stats
+    assert (stats.calls, stats.escalations) == (1, 0)
+    assert stats.answered == {"gpt-4o-mini": 1}
+    assert stats.dollars_saved_per_call > 0
+
+
+async def test_escalates_when_a_check_fails() -> None:
+    cases = {
+        "Hi Jane, call me?": "length",
+        GOOD.replace("Acme", "[Company]"): "placeholder",
+        GOOD.replace("Jane", "John"): "invented name",
+    }
+    for reply, reason in cases.items():
+        agent, model = drafter(reply)
+        result = await Runner.run(agent, "Write to Jane at Acme")
+        assert result.final_output == GOOD
+        stats = model.stats
+        assert stats.escalations == 1
+        assert stats.reasons == {reason: 1}
+        assert stats.attempts == {"gpt-4o-mini": 1, "gpt-4o": 1}
+
+
+async def test_escalates_on_error() -> None:
+    cascade = CascadeModel(
+        {"cheap": DownModel(), "strong": FakeModel(reply=lambda _: GOOD)}
+    )
+    result = await Runner.run(Agent(name="a", model=cascade), "Hi")
+    assert result.final_output == GOOD
+    assert cascade.stats.reasons == {"error": 1}
+
+
+async def test_streams_only_the_accepted_reply() -> None:
+    agent, model = drafter("Hi Jane, call me?")
+    result = Runner.run_streamed(agent, "Write to Jane at Acme")
+    async for _ in result.stream_events():
+        pass
+    assert result.final_output == GOOD
+    assert model.stats.reasons == {"length": 1}
+
+
+def test_repeats_draft() -> None:
+    check = repeats_draft()
+    prompt = picker_prompt(["First draft.", "Second  draft."])
+    assert check("First draft.", prompt) is None
+    assert check("Second draft.", prompt) is None
+    assert check("I prefer the second one.", prompt) == "not a draft"
+    assert check("", prompt) == "empty"
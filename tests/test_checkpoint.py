@@ -0,0 +1,108 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from agents import Agent, ModelResponse, Runner, function_tool
+
+from sales_agent.campaign import Campaign
+from sales_agent.checkpoint import Checkpointer
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import MailTransport, build_mail, get_mail_transport
+
+PROSPECTS = [{"email": f"ceo{i}@example.com", "name": f"CEO {i}"} for i in range(3)]
+
+
+@function_tool
+async def send_email(body: str) -> Dict[str, str]:
+    """Send out an email with the given body"""
+    await get_mail_transport().send(build_mail("Hello", body))
+    return {"status": "success"}
+
+
+def sales_manager(model: FakeModel) -> Agent:
+    """A drafting tool, then a handoff to an agent with a sending tool."""
+    drafter = Agent(name="Sales agent", instructions="Write an email", model=model)
+    emailer = Agent(
+        name="Email Manager",
+        instructions="Send the email",
+        tools=[send_email],
+        model=model,
+    )
+    return Agent(
+        name="Sales Manager",
+        instructions="Draft an email, then hand off",
+        tools=[drafter.as_tool(tool_name="sales_agent1", tool_description="Draft")],
+        handoffs=[emailer],
+        model=model,
+    )
+
+
+class CrashAfterSend(FakeModel):
+    """Fails the first model call made once an email is out, like a process
+    killed between sending and finishing."""
+
+    def __init__(self, server: FakeSendGridServer) -> None:
+        super().__init__()
+        self.server = server
+        self.crashed = False
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        if self.server.mails and not self.crashed:
+            self.crashed = True
+            raise RuntimeError("killed")
+        return await super().get_response(*args, **kwargs)
+
+
+async def test_resume_replays_instead_of_resending(
+    tmp_path: Path, sendgrid: FakeSendGridServer, transport: MailTransport
+) -> None:
+    path = os.path.join(tmp_path, "checkpoints.sqlite3")
+    model = CrashAfterSend(sendgrid)
+    agent = sales_manager(model)
+    with pytest.raises(RuntimeError):
+        await Checkpointer(path).run(agent, "Hi", "run-1")
+    assert len(sendgrid.mails) == 1
+    calls = model.usage.requests
+
+    checkpointer = Checkpointer(path)
+    result = await checkpointer.run(agent, "Hi", "run-1")
+    assert result.final_output
+    assert len(sendgrid.mails) == 1
+    assert checkpointer.replayed > 0
+    # Only the turn after the send is new.
+    assert model.usage.requests - calls == 1
+    assert checkpointer.store.unfinished() == []
+
+
+async def test_campaign_restart_skips_finished_prospects(
+    tmp_path: Path, sendgrid: FakeSendGridServer, transport: MailTransport
+) -> None:
+    path = os.path.join(tmp_path, "checkpoints.sqlite3")
+    model = FakeModel()
+    agent = sales_manager(model)
+
+    first = Campaign(Checkpointer(path).pipeline(agent), campaign_id="spring")
+    report = await first.run(PROSPECTS)
+    assert report.succeeded == 3
+    calls = model.usage.requests
+
+    restarted = Campaign(Checkpointer(path).pipeline(agent), campaign_id="spring")
+    report = await restarted.run(PROSPECTS)
+    assert report.succeeded == 3
+    assert model.usage.requests == calls
+    recipients: List[str] = sorted(
+        mail["personalizations"][0]["to"][0]["email"] for mail in sendgrid.mails
+    )
+    assert recipients == sorted(p["email"] for p in PROSPECTS)
+
+
+async def test_checkpointed_steps_match_a_plain_run(
+    tmp_path: Path, sendgrid: FakeSendGridServer, transport: MailTransport
+) -> None:
+    model = FakeModel()
+    plain = await Runner.run(sales_manager(model), "Hi")
+    checkpointer = Checkpointer(os.path.join(tmp_path, "checkpoints.sqlite3"))
+    journaled = await checkpointer.run(sales_manager(model), "Hi", "run-1")
+    assert journaled.final_output == plain.final_output
+    assert checkpointer.recorded > 0
@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+from agents import Agent, Runner
+
+from sales_agent.clients import ClientPool, ShardedTransport
+from sales_agent.fakes import FakeModel, FakeOpenAIServer
+from sales_agent.scheduler import RateScheduler
+
+
+async def test_one_client_per_base_url_and_key() -> None:
+    timeouts = {"https://slow.example.com/v1/": 120.0}
+    async with ClientPool(max_connections=20, timeouts=timeouts) as pool:
+        first = pool.client("https://api.example.com/v1", "key")
+        assert pool.client("https://api.example.com/v1/", "key") is first
+        assert pool.client("https://api.example.com/v1", "other") is not first
+        fast = pool.http_client("https://api.example.com/v1")
+        assert pool.http_client("https://slow.example.com/v1") is not fast
+        assert fast.timeout.read == 60.0
+        assert pool.http_client("https://slow.example.com/v1").timeout.read == 120.0
+
+
+async def test_clients_are_rebuilt_after_closing() -> None:
+    pool = ClientPool(max_connections=20)
+    first = pool.client("https://api.example.com/v1", "key")
+    await pool.aclose()
+    assert pool.client("https://api.example.com/v1", "key") is not first
+    await pool.aclose()
+
+
+async def test_agents_run_on_pooled_models() -> None:
+    scheduler = RateScheduler()
+    async with FakeOpenAIServer(reply=lambda text: "Hello") as server:
+        async with ClientPool(max_connections=20, scheduler=scheduler) as pool:
+            model = pool.model("gpt-4o-mini", server.url + "/v1", "test")
+            agent = Agent(name="Sales agent", instructions="Hi", model=model)
+            results = await asyncio.gather(
+                *(Runner.run(agent, "Write an email") for _ in range(5))
+            )
+    assert [result.final_output for result in results] == ["Hello"] * 5
+    assert server.completions == 5
+    (stats,) = scheduler.stats()
+    assert stats["sent"] == 5
+
+
+async def test_sharded_transport_caps_requests_in_flight() -> None:
+    in_flight = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return httpx.Response(200, text="ok")
+
+    transport = ShardedTransport(
+        [httpx.MockTransport(handler), httpx.MockTransport(handler)], max_in_flight=2
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        responses = await asyncio.gather(
+            *(client.get("https://api.example.com/") for _ in range(6))
+        )
+    assert [response.text for response in responses] == ["ok"] * 6
+    assert peak == 2
+    assert transport.in_flight == [0, 0]
+
+
+def test_http2_uses_one_pool_per_https_base_url() -> None:
+    pool = ClientPool(max_connections=40, connections_per_shard=10, http2=True)
+    assert pool.multiplexed("https://api.openai.com/v1")
+    assert pool.http2_limits.max_connections == 40
+    # HTTP/2 is only negotiated over TLS.
+    assert not pool.multiplexed("http://localhost:8000/v1")
+    assert (pool.shards, pool.limits.max_connections) == (4, 10)
+    assert not ClientPool(http2=False).multiplexed("https://api.openai.com/v1")
+
+
+async def test_resolve_puts_model_names_on_the_pooled_client(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    scheduler = RateScheduler()
+    async with FakeOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url + "/v1")
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        async with ClientPool(max_connections=20, scheduler=scheduler) as pool:
+            model = FakeModel()
+            assert pool.resolve(model) is model
+            agent = Agent(
+                name="Sales agent", instructions="Hi", model=pool.resolve("gpt-4o")
+            )
+            # The fake only speaks chat completions, so the Responses API call
+            # fails, but it has gone through the pool's scheduler.
+            with pytest.raises(Exception):
+                await Runner.run(agent, "Write an email")
+    (stats,) = scheduler.stats()
+    assert stats["sent"] >= 1
@@ -0,0 +1,53 @@
+from sales_agent.dedup import DuplicateIndex, patch
+
+OLD = (
+    "Dear Bob,\n\nComplAI helps Acme pass SOC2 audits in weeks, not months. Our "
+    "AI maps your controls and collects evidence from your cloud accounts, so "
+    "your engineers keep shipping product.\n\nBest,\nAlice"
+)
+NEW = OLD.replace("Bob", "Jane").replace("Acme", "Initech")
+
+
+def test_patch_carries_changed_words_into_html() -> None:
+    html_body = "<p>Dear Bob,</p><p>ComplAI helps Acme pass SOC2 audits</p>"
+    assert patch(html_body, OLD, NEW) == (
+        "<p>Dear Jane,</p><p>ComplAI helps Initech pass SOC2 audits</p>"
+    )
+
+
+def test_patch_escapes_new_words_in_markup() -> None:
+    assert patch("<b>Acme pass</b>", "Acme pass", "A&B pass") == "<b>A&amp;B pass</b>"
+    assert patch("Acme pass", "Acme pass", "A&B pass", markup=False) == "A&B pass"
+
+
+def test_patch_gives_up_on_missing_or_ambiguous_words() -> None:
+    assert patch("SOC2 audits in weeks", OLD, NEW) is None
+    assert patch("Acme pass, Acme pass", "Acme pass", "Initech pass") is None
+
+
+def test_patch_may_skip_words_the_text_leaves_out() -> None:
+    assert patch("SOC2 audits in weeks", OLD, NEW, required=False) == (
+        "SOC2 audits in weeks"
+    )
+
+
+def test_patch_rejects_changes_across_lines() -> None:
+    assert patch("Best, Alice", "Best,\nAlice", "Best, Alice") is None
+
+
+def test_unique_drops_near_duplicates() -> None:
+    index = DuplicateIndex()
+    other = "Does SOC2 season feel like a scavenger hunt? Our robots do it for you."
+    assert index.unique([OLD, NEW, other]) == [OLD, other]
+    assert index.duplicate_drafts == 1
+
+
+def test_reuse_patches_the_remembered_formatting() -> None:
+    index = DuplicateIndex()
+    assert index.reuse(OLD) is None
+    index.remember(OLD, "Bob, SOC2 audits in weeks", "<p>Dear Bob,</p><p>Acme pass</p>")
+    assert index.reuse(NEW) == (
+        "Jane, SOC2 audits in weeks",
+        "<p>Dear Jane,</p><p>Initech pass</p>",
+    )
+    assert index.hit_rate == 0.5
@@ -0,0 +1,130 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+import pytest
+from agents import Agent, Usage
+
+from sales_agent.draftpool import (
+    DraftPool,
+    PooledPipeline,
+    personalize,
+    precompute,
+    segment_of,
+    segment_prompt,
+    size_band,
+    template_problem,
+    top_segments,
+    unfilled,
+)
+from sales_agent.fakes import FakeModel
+
+TEMPLATE = "Dear -name-,\n\nComplAI gets -company- through SOC2.\n\nBest,\n-sender-"
+
+CTO = {"name": "Dana", "company": "Acme", "role": "CTO", "company_size": "120"}
+
+
+def replies(text: str) -> Callable[[str], str]:
+    return lambda prompt: text
+
+
+def drafter(name: str, reply: str) -> Agent:
+    return Agent(
+        name=name,
+        instructions="Write a cold sales email",
+        model=FakeModel(reply=replies(reply)),
+    )
+
+
+class FirstPicker:
+    """A local picker that takes the first draft."""
+
+    async def pick(self, drafts: Sequence[str], usage: Optional[Usage] = None) -> str:
+        return drafts[0]
+
+
+@pytest.mark.parametrize(
+    "value, band", [("8", "1-10"), ("51-200", "51-200"), ("1,500", "1000+"), ("", "*")]
+)
+def test_size_band(value: str, band: str) -> None:
+    assert size_band(value) == band
+
+
+def test_segments_group_similar_prospects() -> None:
+    assert segment_of(CTO) == "cto|*|51-200"
+    prospects = [CTO, {**CTO, "name": "Sam"}, {"role": "CEO"}]
+    assert top_segments(prospects) == ["cto|*|51-200", "ceo|*|*"]
+    prompt = segment_prompt("cto|fintech|51-200", variant=1)
+    assert "the cto at a 51-200 employee company in fintech" in prompt
+    assert "version 2" in prompt
+
+
+def test_personalize_fills_tags_with_defaults() -> None:
+    assert personalize(TEMPLATE, CTO).startswith("Dear Dana,")
+    assert personalize(TEMPLATE, {}).endswith("Alice")
+    assert personalize("Hi -title- at e-mail-address", CTO) == (
+        "Hi -title- at e-mail-address"
+    )
+    assert unfilled("Hi -title-", CTO) == ["title"]
+
+
+def test_unusable_templates_are_not_pooled() -> None:
+    assert template_problem(TEMPLATE) is None
+    problem = template_problem("Dear -title-, ...")
+    assert problem is not None and "-title-" in problem
+    assert template_problem("Dear -name- at [Company]") is not None
+
+
+def test_pool_survives_a_restart(tmp_path: Path) -> None:
+    path = os.path.join(tmp_path, "drafts.sqlite3")
+    pool = DraftPool(path)
+    pool.add("cto|*|51-200", "Busy", 0, TEMPLATE)
+    pool.close()
+    reopened = DraftPool(path)
+    assert "cto|*|51-200" in reopened and len(reopened) == 1
+    assert reopened.get("cto|*|51-200") == [TEMPLATE]
+    assert reopened.get("ceo|*|*") == []
+    assert reopened.hit_rate == 0.5
+
+
+async def test_precompute_skips_pooled_segments_and_bad_drafts() -> None:
+    pool = DraftPool(":memory:")
+    drafters = [drafter("Busy", TEMPLATE), drafter("Sloppy", "Dear [Name], ...")]
+    usage = Usage()
+    added = await precompute(pool, drafters, ["a", "b", "a"], variants=2, usage=usage)
+    assert added == 4
+    assert usage.requests == 8
+    assert await precompute(pool, drafters, ["a", "b"]) == 0
+
+
+async def test_pooled_pipeline_drafts_a_segment_once() -> None:
+    pool = DraftPool(":memory:")
+    model = FakeModel(reply=replies(TEMPLATE))
+    busy = Agent(name="Busy", instructions="Write a cold sales email", model=model)
+    pipeline = PooledPipeline(pool, [busy], FirstPicker())
+    prospects = [CTO, {**CTO, "name": "Sam", "company": "Initech"}]
+    emails: List[str] = await asyncio.gather(
+        *(pipeline.for_prospect(prospect, "Hi") for prospect in prospects)
+    )
+    assert emails[0].startswith("Dear Dana,") and "Acme" in emails[0]
+    assert emails[1].startswith("Dear Sam,") and "Initech" in emails[1]
+    # The second prospect waited for the first one's template.
+    assert model.usage.requests == 1
+    assert (pipeline.pool_stats.filled, pipeline.pool_stats.pooled) == (1, 1)
+    await pipeline.for_prospect({**CTO, "name": "Lee"}, "Hi")
+    assert pipeline.pool_stats.pooled == 2
+    assert pipeline.pool_stats.pooled_rate == 2 / 3
+
+
+async def test_premium_prospects_are_drafted_live() -> None:
+    pool = DraftPool(":memory:")
+    pool.add(segment_of(CTO), "Busy", 0, TEMPLATE)
+    pipeline = PooledPipeline(
+        pool,
+        [drafter("Live", "Dear Dana, a note just for you.")],
+        FirstPicker(),
+        premium=lambda prospect: prospect.get("name") == "Dana",
+    )
+    assert await pipeline.for_prospect(CTO, "Hi") == "Dear Dana, a note just for you."
+    assert pipeline.pool_stats.live == 1
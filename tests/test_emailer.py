@@ -0,0 +1,88 @@
+import time
+from typing import Any, Callable, Dict
+
+import pytest
+from agents import Agent, Usage
+
+from sales_agent.dedup import DuplicateIndex
+from sales_agent.emailer import StructuredEmailer, build_email_formatter
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import MailTransport
+
+BODY = (
+    "Dear Bob,\n\nComplAI helps Acme pass SOC2 audits in weeks, not months.\n\n"
+    "Best,\nAlice"
+)
+
+
+def replies(text: str) -> Callable[[str], str]:
+    return lambda prompt: text
+
+
+def formatted(schema: Dict[str, Any], text: str) -> Dict[str, Any]:
+    return {"subject": "SOC2 in weeks", "html_body": "<p>Dear Bob,</p>"}
+
+
+def agent(name: str, reply: str, latency: float = 0.0) -> Agent:
+    return Agent(
+        name=name, instructions=name, model=FakeModel(latency, reply=replies(reply))
+    )
+
+
+async def test_formatter_makes_one_call() -> None:
+    usage = Usage()
+    emailer = StructuredEmailer(
+        formatter=build_email_formatter(FakeModel(structured=formatted))
+    )
+    email = await emailer.format(BODY, usage)
+    assert (email.subject, email.html_body) == ("SOC2 in weeks", "<p>Dear Bob,</p>")
+    assert usage.requests == 1
+
+
+async def test_subject_writer_alone_renders_html_locally() -> None:
+    usage = Usage()
+    emailer = StructuredEmailer(subject_writer=agent("Subject", "SOC2 in weeks"))
+    email = await emailer.format(BODY, usage)
+    assert email.subject == "SOC2 in weeks"
+    assert email.html_body.startswith("<!DOCTYPE html>")
+    assert "<p>Dear Bob,</p>" in email.html_body
+    assert usage.requests == 1
+
+
+async def test_subject_and_html_agents_run_together() -> None:
+    usage = Usage()
+    emailer = StructuredEmailer(
+        subject_writer=agent("Subject", "SOC2 in weeks", latency=0.1),
+        html_converter=agent("HTML", "<p>Hi</p>", latency=0.1),
+    )
+    start = time.monotonic()
+    email = await emailer.format(BODY, usage)
+    assert time.monotonic() - start < 0.18
+    assert email.html_body == "<p>Hi</p>"
+    assert usage.requests == 2
+
+
+async def test_near_duplicate_bodies_reuse_the_formatting() -> None:
+    model = FakeModel(structured=formatted)
+    emailer = StructuredEmailer(
+        formatter=build_email_formatter(model), dedup=DuplicateIndex()
+    )
+    await emailer.format(BODY)
+    email = await emailer.format(BODY.replace("Bob", "Jane"))
+    assert email.html_body == "<p>Dear Jane,</p>"
+    assert model.usage.requests == 1
+
+
+async def test_send_delivers_html(
+    sendgrid: FakeSendGridServer, transport: MailTransport
+) -> None:
+    emailer = StructuredEmailer(subject_writer=agent("Subject", "SOC2 in weeks"))
+    await emailer.send(BODY)
+    (mail,) = sendgrid.mails
+    assert mail["subject"] == "SOC2 in weeks"
+    assert mail["content"][0]["type"] == "text/html"
+
+
+def test_needs_a_formatter_or_subject_writer() -> None:
+    with pytest.raises(ValueError):
+        StructuredEmailer()
@@ -0,0 +1,122 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from agents import Agent, InputGuardrailTripwireTriggered, function_tool
+
+from sales_agent.fakes import FakeModel
+from sales_agent.guardrails import (
+    NameCheckOutput,
+    TieredNameCheck,
+    gated_tool,
+    local_name_check,
+    message_text,
+    run_optimistic,
+)
+
+
+@pytest.mark.parametrize(
+    "text, name",
+    [
+        ("Send out a cold sales email addressed to Dear CEO from Alice", "Alice"),
+        ("Send a cold email from the head of sales to Alice", "Alice"),
+        ("Email from the Head of Sales Alice", "Alice"),
+        ("Send a cold email from the VP of Sales, signed Priya", "Priya"),
+    ],
+)
+def test_names_are_found_locally(text: str, name: str) -> None:
+    verdict = local_name_check(text)
+    assert verdict.decided
+    assert verdict.output == NameCheckOutput(is_name_in_message=True, name=name)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Send out a cold sales email addressed to Dear CEO from Head of "
+        "Business Development",
+        "Write a cold sales email",
+        "Send a cold email to the VP of Sales and Marketing",
+        "Email the CTO about SOC2 audits, signed by the Sales Team",
+    ],
+)
+def test_roles_are_not_names(text: str) -> None:
+    verdict = local_name_check(text)
+    assert verdict.decided
+    assert verdict.output is not None and not verdict.output.is_name_in_message
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # A role must not swallow what follows it.
+        "Email from the VP of sales who is Kowalski",
+        "Email from the Head of Sales Kowalski",
+        "Send a cold email to the Head of Acme",
+        # Names that are also ordinary words.
+        "Frank feedback is welcome",
+        "Send a cold email from Grace to the CTO",
+        "Draft an email to Dear CEO from Mark",
+        # Unknown capitalised words and lower-case names.
+        "Send a cold email signed by Xiomara",
+        "please send an email from sarah to the ceo",
+    ],
+)
+def test_unclear_messages_go_to_the_llm(text: str) -> None:
+    assert not local_name_check(text).decided
+
+
+def test_message_text_joins_user_messages() -> None:
+    items: List[Any] = [
+        {"role": "user", "content": "Dear CEO"},
+        {"role": "assistant", "content": "ignored"},
+        {"role": "user", "content": [{"type": "input_text", "text": "from Alice"}]},
+    ]
+    assert message_text(items) == "Dear CEO\nfrom Alice"
+
+
+def name_checker(latency: float = 0.0) -> Agent:
+    def answer(schema: Dict[str, Any], text: str) -> Dict[str, Any]:
+        found = "Kowalski" in text
+        return {"is_name_in_message": found, "name": "Kowalski" if found else ""}
+
+    return Agent(
+        name="Name check",
+        instructions="Check if the user is including someone's personal name",
+        output_type=NameCheckOutput,
+        model=FakeModel(latency, structured=answer),
+    )
+
+
+async def test_tiered_check_asks_the_llm_only_when_unsure() -> None:
+    check = TieredNameCheck(name_checker())
+    assert (await check.check("Dear CEO from Alice")).is_name_in_message
+    verdict = await check.check("Email from the VP of sales who is Kowalski")
+    assert verdict.is_name_in_message
+    await check.check("Email from the VP of sales  who is Kowalski")
+    assert (check.local_hits, check.llm_calls, check.memo_hits) == (1, 1, 1)
+
+
+async def test_optimistic_run_holds_gated_tools_until_the_guardrail_passes() -> None:
+    sent: List[str] = []
+
+    @function_tool
+    async def send_email(body: str) -> str:
+        """Send the email"""
+        sent.append(body)
+        return "sent"
+
+    check = TieredNameCheck(name_checker(latency=0.05))
+    agent = Agent(
+        name="Email Manager",
+        instructions="Send the email",
+        tools=[gated_tool(send_email)],
+        model=FakeModel(),
+        input_guardrails=[check.guardrail()],
+    )
+    await run_optimistic(agent, "Send a cold email to the CEO")
+    assert len(sent) == 1
+    with pytest.raises(InputGuardrailTripwireTriggered):
+        await run_optimistic(agent, "Send a cold email from Kowalski, VP of Sales")
+    await asyncio.sleep(0.1)
+    assert len(sent) == 1
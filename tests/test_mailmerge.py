@@ -0,0 +1,67 @@
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import pytest
+
+from sales_agent.fakes import FakeSendGridServer
+from sales_agent.mail import MailTransport
+from sales_agent.mailmerge import (
+    MAX_PERSONALIZATIONS,
+    build_merge_mail,
+    chunked,
+    read_prospects,
+    send_mail_merge,
+)
+
+
+def prospects(count: int) -> List[Dict[str, str]]:
+    return [{"email": f"ceo{i}@example.com", "name": f"CEO {i}"} for i in range(count)]
+
+
+def test_chunked_splits_without_padding() -> None:
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert not list(chunked([], 3))
+
+
+def test_chunked_reads_lazily() -> None:
+    read: List[int] = []
+
+    def rows() -> Iterator[int]:
+        for i in range(10):
+            read.append(i)
+            yield i
+
+    assert next(chunked(rows(), 3)) == [0, 1, 2]
+    assert read == [0, 1, 2]
+
+
+def test_build_merge_mail_caps_recipients() -> None:
+    mail = build_merge_mail(prospects(3), "Hi -name-", "Hello -name-")
+    personalizations = mail.get()["personalizations"]
+    assert [p["substitutions"]["-name-"] for p in personalizations] == [
+        "CEO 0",
+        "CEO 1",
+        "CEO 2",
+    ]
+    with pytest.raises(ValueError):
+        build_merge_mail(prospects(MAX_PERSONALIZATIONS + 1), "Hi", "Hello")
+
+
+async def test_send_mail_merge_batches_and_skips(
+    sendgrid: FakeSendGridServer, transport: MailTransport
+) -> None:
+    rows = prospects(5) + [{"email": "CEO0@example.com"}, {"name": "No address"}]
+    report = await send_mail_merge(
+        rows, "Hi -name-", "Hello", batch_size=2, transport=transport
+    )
+    assert (report.requests, report.recipients, report.skipped) == (3, 5, 2)
+    sizes = sorted(len(mail["personalizations"]) for mail in sendgrid.mails)
+    assert sizes == [1, 2, 2]
+
+
+def test_read_prospects(tmp_path: Path) -> None:
+    path = tmp_path / "prospects.csv"
+    path.write_text("email,name\njane@example.com,Jane\n", encoding="utf-8")
+    assert list(read_prospects(str(path))) == [
+        {"email": "jane@example.com", "name": "Jane"}
+    ]
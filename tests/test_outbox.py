@@ -0,0 +1,87 @@
+import os
+import time
+from pathlib import Path
+
+from sales_agent.fakes import FakeSendGridServer
+from sales_agent.mail import MailTransport, build_mail, recipient
+from sales_agent.outbox import FAILED, PENDING, SENDING, SENT, Dispatcher, Outbox
+
+
+def fill(outbox: Outbox, count: int) -> None:
+    for i in range(count):
+        outbox.enqueue(build_mail(f"Subject {i}", "Hello"), key=f"prospect-{i}")
+
+
+def test_enqueue_is_idempotent_per_key() -> None:
+    outbox = Outbox(":memory:")
+    mail = build_mail("Hi", "Hello")
+    assert outbox.enqueue(mail, key="jane")
+    assert not outbox.enqueue(mail, key="jane")
+    assert outbox.counts()[PENDING] == 1
+
+
+def test_enqueue_uses_the_recipient_key() -> None:
+    outbox = Outbox(":memory:")
+    with recipient("jane@example.com", "spring:jane@example.com"):
+        mail = build_mail("Hi", "Hello")
+        assert outbox.enqueue(mail)
+        assert not outbox.enqueue(mail)
+    (job,) = outbox.claim(10)
+    assert job.key == "spring:jane@example.com"
+    assert job.payload["personalizations"][0]["to"][0]["email"] == "jane@example.com"
+    assert job.payload["custom_args"] == {"outbox_key": job.key}
+
+
+def test_claim_hands_each_mail_to_one_worker(tmp_path: Path) -> None:
+    path = os.path.join(tmp_path, "outbox.db")
+    first, second = Outbox(path), Outbox(path)
+    fill(first, 10)
+    claimed = first.claim(4) + second.claim(4) + first.claim(4) + second.claim(4)
+    assert sorted(job.key for job in claimed) == sorted(
+        f"prospect-{i}" for i in range(10)
+    )
+    assert second.counts()[SENDING] == 10
+    assert not first.claim(4)
+
+
+def test_expired_lease_is_claimed_again(tmp_path: Path) -> None:
+    path = os.path.join(tmp_path, "outbox.db")
+    crashed = Outbox(path, lease=0.05)
+    fill(crashed, 2)
+    assert len(crashed.claim(10)) == 2
+    restarted = Outbox(path, lease=0.05)
+    assert not restarted.claim(10)
+    assert restarted.next_due() is not None
+    time.sleep(0.06)
+    assert len(restarted.claim(10)) == 2
+
+
+async def test_dispatcher_retries_until_sent() -> None:
+    outbox = Outbox(":memory:")
+    fill(outbox, 20)
+    server = FakeSendGridServer(error_rate=0.3, seed=1)
+    async with server:
+        async with MailTransport(api_key="test", base_url=server.url) as transport:
+            dispatcher = Dispatcher(
+                outbox, transport, batch_size=5, max_attempts=20, backoff=0.001
+            )
+            await dispatcher.drain()
+    assert server.errors > 0
+    assert dispatcher.retries == server.errors
+    assert dispatcher.sent == 20
+    assert outbox.counts() == {PENDING: 0, SENDING: 0, SENT: 20, FAILED: 0}
+    keys = [mail["custom_args"]["outbox_key"] for mail in server.mails]
+    assert sorted(keys) == sorted(f"prospect-{i}" for i in range(20))
+
+
+async def test_dispatcher_fails_rejected_mail_without_retrying() -> None:
+    outbox = Outbox(":memory:")
+    fill(outbox, 3)
+    server = FakeSendGridServer(status=400)
+    async with server:
+        async with MailTransport(api_key="test", base_url=server.url) as transport:
+            dispatcher = Dispatcher(outbox, transport, backoff=0.001)
+            await dispatcher.drain()
+    assert dispatcher.retries == 0
+    assert outbox.counts()[FAILED] == 3
+    assert {failure["attempts"] for failure in outbox.failures()} == {1}
@@ -0,0 +1,97 @@
+import time
+from typing import Callable, List
+
+import pytest
+from agents import Agent, Usage
+from agents.result import RunResultBase
+
+from sales_agent.fakes import FakeModel
+from sales_agent.pipeline import DraftStats, SalesPipeline, first_drafts
+
+
+def replies(text: str) -> Callable[[str], str]:
+    return lambda prompt: text
+
+
+def drafters(*latencies: float) -> List[Agent]:
+    return [
+        Agent(
+            name=f"Sales agent {i}",
+            instructions="Write a cold sales email",
+            model=FakeModel(latency, reply=replies(f"Draft {i}")),
+        )
+        for i, latency in enumerate(latencies)
+    ]
+
+
+async def test_first_drafts_returns_the_first_k() -> None:
+    stats = DraftStats()
+    usage = Usage()
+    start = time.monotonic()
+    drafts = await first_drafts(
+        drafters(0.2, 0.01, 0.02), "Hi", k=2, usage=usage, stats=stats
+    )
+    assert time.monotonic() - start < 0.15
+    assert drafts == ["Draft 1", "Draft 2"]
+    assert usage.requests == 2
+    assert (stats.launched, stats.used, stats.cancelled) == (3, 2, 1)
+    assert stats.rounds_with_drops == 1
+
+
+async def test_first_drafts_never_returns_more_than_k() -> None:
+    stats = DraftStats()
+    drafts = await first_drafts(drafters(0.01, 0.01, 0.01), "Hi", k=1, stats=stats)
+    assert len(drafts) == 1
+    assert stats.used + stats.unused + stats.cancelled == 3
+
+
+async def test_first_drafts_counts_drafts_finished_with_the_kth() -> None:
+    stats = DraftStats()
+    usage = Usage()
+    drafts = await first_drafts(
+        drafters(0.0, 0.0, 0.0), "Hi", k=1, usage=usage, stats=stats
+    )
+    assert len(drafts) == 1
+    # All three finish in the same wakeup: paid for, so counted, not cancelled.
+    assert (stats.used, stats.unused, stats.cancelled) == (1, 2, 0)
+    assert usage.requests == 3
+    assert stats.rounds_with_drops == 1
+
+
+async def test_first_drafts_stops_waiting_at_the_deadline() -> None:
+    stats = DraftStats()
+    start = time.monotonic()
+    drafts = await first_drafts(
+        drafters(0.01, 5.0, 0.02), "Hi", deadline=0.1, stats=stats
+    )
+    assert time.monotonic() - start < 1.0
+    assert drafts == ["Draft 0", "Draft 2"]
+    assert stats.deadline_hits == 1
+    assert stats.cancelled == 1
+
+
+async def test_first_drafts_waits_past_the_deadline_for_one_draft() -> None:
+    drafts = await first_drafts(drafters(0.15, 0.2), "Hi", k=2, deadline=0.01)
+    assert drafts == ["Draft 0"]
+
+
+async def test_first_drafts_raises_when_every_drafter_fails() -> None:
+    async def fail(agent: Agent, message: str) -> RunResultBase:
+        raise RuntimeError(agent.name)
+
+    stats = DraftStats()
+    with pytest.raises(RuntimeError):
+        await first_drafts(drafters(0.0, 0.0), "Hi", run=fail, stats=stats)
+    assert stats.failed == 2
+
+
+async def test_pipeline_picks_among_the_drafts() -> None:
+    picker = Agent(
+        name="sales_picker",
+        instructions="Pick the best email",
+        model=FakeModel(reply=replies("Draft 1")),
+    )
+    result = await SalesPipeline(drafters(0.0, 0.0, 0.0), picker).run("Hi")
+    assert result.drafts == ["Draft 0", "Draft 1", "Draft 2"]
+    assert result.best == "Draft 1"
+    assert result.usage.requests == 4
@@ -0,0 +1,59 @@
+import pytest
+from agents import Agent, FunctionTool, Runner, ToolCallOutputItem
+
+from sales_agent.fakes import FakeModel
+from sales_agent.render import (
+    HTML_TOOL_NAME,
+    build_html_tool,
+    markdown_to_html,
+    render_email,
+)
+
+
+def test_blocks_become_paragraphs_headings_and_lists() -> None:
+    text = "# Hello\n\nFirst line\nsecond line\n\n- one\n- two\n\n1. a\n2) b"
+    assert markdown_to_html(text) == (
+        "<h1>Hello</h1>"
+        "<p>First line<br>second line</p>"
+        "<ul><li>one</li><li>two</li></ul>"
+        "<ol><li>a</li><li>b</li></ol>"
+    )
+
+
+def test_inline_markup_and_escaping() -> None:
+    text = "**Save** *weeks* on [SOC2](https://example.com) & <audits>"
+    assert markdown_to_html(text) == (
+        "<p><strong>Save</strong> <em>weeks</em> on "
+        '<a href="https://example.com">SOC2</a> &amp; &lt;audits&gt;</p>'
+    )
+
+
+def test_snake_case_is_not_italic() -> None:
+    assert markdown_to_html("see audit_log_v2") == "<p>see audit_log_v2</p>"
+
+
+def test_layouts() -> None:
+    assert render_email("Hi", "bare") == "<p>Hi</p>"
+    page = render_email("Hi", "card")
+    assert page.startswith("<!DOCTYPE html>") and "<p>Hi</p>" in page
+    with pytest.raises(ValueError):
+        render_email("Hi", "fancy")
+
+
+async def test_html_tool_renders_locally() -> None:
+    tool = build_html_tool("bare")
+    assert isinstance(tool, FunctionTool)
+    assert tool.name == HTML_TOOL_NAME
+    agent = Agent(
+        name="Email Manager", instructions="Format", tools=[tool], model=FakeModel()
+    )
+    result = await Runner.run(agent, "Hi **there**")
+    outputs = [
+        item.output for item in result.new_items if isinstance(item, ToolCallOutputItem)
+    ]
+    assert outputs == ["<p>Hi <strong>there</strong></p>"]
+
+
+def test_html_tool_rejects_an_unknown_layout_up_front() -> None:
+    with pytest.raises(ValueError):
+        build_html_tool("fancy")
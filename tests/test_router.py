@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, AsyncIterator
+
+import pytest
+from agents import Agent, Model, ModelResponse, Runner
+
+from sales_agent.fakes import FakeModel
+from sales_agent.router import ModelRouter
+
+
+class DownModel(Model):
+    """A backend whose every call fails, like a provider outage."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        self.calls += 1
+        raise ConnectionError("provider down")
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        yield await self.get_response(*args, **kwargs)
+
+
+def agent(model: Model) -> Agent:
+    return Agent(name="Sales agent", instructions="Write an email", model=model)
+
+
+async def test_fails_over_to_the_next_backend() -> None:
+    down = DownModel()
+    router = ModelRouter(
+        {"down": down, "up": FakeModel(reply=lambda _: "Hello")},
+        hedge_percentile=None,
+        max_failures=2,
+        cooldown=60.0,
+    )
+    for _ in range(4):
+        result = await Runner.run(agent(router), "Hi")
+        assert result.final_output == "Hello"
+    # After two failures in a row the dead backend is skipped.
+    assert down.calls == 2
+    assert router.failovers == 2
+    assert not router.healthy("down")
+    assert router.ranked() == ["up", "down"]
+
+
+async def test_raises_when_every_backend_fails() -> None:
+    router = ModelRouter({"a": DownModel(), "b": DownModel()}, hedge_percentile=None)
+    with pytest.raises(ConnectionError):
+        await Runner.run(agent(router), "Hi")
+
+
+async def test_hedges_a_slow_backend() -> None:
+    router = ModelRouter(
+        {
+            "slow": FakeModel(5.0, reply=lambda _: "slow"),
+            "fast": FakeModel(0.01, reply=lambda _: "fast"),
+        },
+        hedge_after=0.05,
+    )
+    result = await asyncio.wait_for(Runner.run(agent(router), "Hi"), 1.0)
+    assert result.final_output == "fast"
+    assert router.hedges == 1
+
+
+async def test_streams_fail_over_before_the_first_event() -> None:
+    router = ModelRouter({"down": DownModel(), "up": FakeModel(reply=lambda _: "Hi")})
+    result = Runner.run_streamed(agent(router), "Hi")
+    async for _ in result.stream_events():
+        pass
+    assert result.final_output == "Hi"
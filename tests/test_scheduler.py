@@ -0,0 +1,131 @@
+import asyncio
+import time
+from typing import List
+
+import httpx
+import pytest
+
+from sales_agent.scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    ProviderGate,
+    Quota,
+    RateScheduler,
+    estimate_tokens,
+    parse_duration,
+    priority,
+    retry_after,
+)
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [("20ms", 0.02), ("1.5s", 1.5), ("6m0s", 360.0), ("2", 2.0), ("", None)],
+)
+def test_parse_duration(value: str, seconds: float) -> None:
+    assert parse_duration(value) == seconds
+
+
+def test_retry_after_prefers_milliseconds() -> None:
+    assert retry_after({"retry-after-ms": "250", "retry-after": "3"}) == 0.25
+    assert retry_after({"retry-after": "3"}) == 3.0
+    assert retry_after({}) is None
+
+
+def test_estimate_tokens_reads_max_tokens() -> None:
+    body = b'{"messages": "' + b"x" * 400 + b'", "max_tokens": 50}'
+    assert estimate_tokens(body) == len(body) // 4 + 50
+    assert estimate_tokens(b"{}", output_tokens=7) == 7
+
+
+def test_quota_holds_a_burst_then_refills() -> None:
+    quota = Quota(600, headroom=1.0, burst=1.0)
+    now = time.monotonic()
+    assert quota.wait(10, now) == 0
+    quota.take(10)
+    assert quota.wait(1, now) == pytest.approx(0.1, abs=0.01)
+
+
+def test_reported_limits_cap_the_bucket() -> None:
+    quota = Quota(600, headroom=1.0)
+    quota.observe(6000, remaining=0, reset=None)
+    assert quota.reported
+    assert quota.wait(1, time.monotonic()) > 0
+
+
+async def test_waiters_are_served_by_priority() -> None:
+    gate = ProviderGate("test", requests_per_minute=600, headroom=1.0, burst=0.1)
+    assert await gate.acquire(1) == 0.0
+    order: List[str] = []
+
+    async def call(name: str, level: int) -> None:
+        await gate.acquire(1, level)
+        order.append(name)
+
+    await asyncio.gather(
+        call("bulk 1", BACKGROUND),
+        call("bulk 2", BACKGROUND),
+        call("reply", INTERACTIVE),
+    )
+    assert order == ["reply", "bulk 1", "bulk 2"]
+    assert gate.queued == 3
+
+
+async def test_a_429_pauses_and_slows_down() -> None:
+    gate = ProviderGate("test", requests_per_minute=600)
+    before = gate.quotas["requests"].per_minute
+    gate.observe(429, {"retry-after": "2"})
+    assert gate.rate_limited == 1
+    assert gate.quotas["requests"].per_minute == before / 2
+    assert gate.paused_until > time.monotonic() + 1.5
+
+
+async def test_a_429_without_limits_starts_a_quota() -> None:
+    gate = ProviderGate("test")
+    gate.observe(429, {})
+    assert "requests" in gate.quotas
+
+
+def test_headers_set_the_limits() -> None:
+    gate = ProviderGate("test")
+    gate.observe(
+        200,
+        {
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-remaining-requests": "499",
+            "x-ratelimit-limit-tokens": "30000",
+        },
+    )
+    assert gate.quotas["requests"].limit == 500
+    assert gate.quotas["tokens"].limit == 30000
+
+
+def test_fixed_limits_ignore_the_provider() -> None:
+    gate = ProviderGate("test", requests_per_minute=600, adaptive=False)
+    gate.observe(429, {"retry-after": "2"})
+    assert gate.rate_limited == 1
+    assert gate.paused_until == 0.0
+
+
+async def test_transport_goes_through_the_gate() -> None:
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        status = 429 if calls == 1 else 200
+        return httpx.Response(status, headers={"retry-after-ms": "50"})
+
+    scheduler = RateScheduler({"https://api.example.com/v1/": (6000, None)})
+    transport = scheduler.transport(
+        httpx.MockTransport(handler), "https://api.example.com/v1"
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        with priority(INTERACTIVE):
+            first = await client.post("https://api.example.com/v1/chat", json={})
+            second = await client.post("https://api.example.com/v1/chat", json={})
+    assert (first.status_code, second.status_code) == (429, 200)
+    (stats,) = scheduler.stats()
+    assert stats["provider"] == "api.example.com"
+    assert (stats["sent"], stats["rate_limited"]) == (2, 1)
+    assert stats["waited"] >= 0.04
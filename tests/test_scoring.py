@@ -0,0 +1,101 @@
+from typing import Any, List, Sequence
+
+import pytest
+from agents import Agent, Usage
+
+from sales_agent.fakes import FakeModel
+
+np = pytest.importorskip("numpy")
+
+from sales_agent.scoring import (  # noqa: E402
+    FEATURES,
+    CombinedScorer,
+    EmbeddingScorer,
+    HeuristicScorer,
+    LocalPicker,
+    Scorer,
+)
+
+GOOD = (
+    "Hi Dana, your team spends weeks collecting SOC2 evidence by hand. ComplAI "
+    "connects to your cloud accounts and keeps your controls audit ready, so your "
+    "engineers can stay on the roadmap. Teams like yours cut audit prep from "
+    "months to weeks. Would you be open to a quick call on Thursday to see if it "
+    "fits? Best, Alice"
+)
+SPAMMY = (
+    "ACT NOW!!! FREE compliance, GUARANTEED results, limited time offer. Click "
+    "here for amazing cash savings! URGENT!"
+)
+
+
+class Fixed(Scorer):
+    def __init__(self, *scores: float) -> None:
+        self.scores = scores
+
+    def score(self, drafts: Sequence[str]) -> Any:
+        return np.array(self.scores[: len(drafts)])
+
+
+def test_heuristics_prefer_a_focused_email_with_a_call_to_action() -> None:
+    scorer = HeuristicScorer()
+    features = scorer.features([GOOD, SPAMMY])
+    assert features.shape == (2, len(FEATURES))
+    assert ((features >= 0) & (features <= 1)).all()
+    good, spammy = scorer.score([GOOD, SPAMMY])
+    assert good > spammy
+    assert scorer.score([]).shape == (0,)
+
+
+def test_weights_must_name_features() -> None:
+    with pytest.raises(ValueError):
+        HeuristicScorer({"tone": 1.0})
+    only_cta = HeuristicScorer({"cta": 1.0})
+    assert list(only_cta.score(["Book a demo", "Hello there"])) == [1.0, 0.0]
+
+
+def test_embedding_scorer_measures_similarity_to_examples() -> None:
+    def embed(texts: List[str]) -> Any:
+        return np.array([[text.count("SOC2"), text.count("!")] for text in texts])
+
+    scorer = EmbeddingScorer(embed, ["SOC2 SOC2"])
+    assert list(scorer.score(["SOC2 audits", "Wow!"])) == [1.0, 0.0]
+    with pytest.raises(ValueError):
+        EmbeddingScorer(embed, [])
+
+
+def test_combined_scorer_blends_weights() -> None:
+    combined = CombinedScorer([(Fixed(1.0, 0.0), 0.25), (Fixed(0.0, 1.0), 0.75)])
+    assert list(combined.score(["a", "b"])) == [0.25, 0.75]
+
+
+async def test_clear_winner_is_picked_locally() -> None:
+    picker = Agent(name="sales_picker", instructions="Pick", model=FakeModel())
+    local = LocalPicker(Fixed(0.2, 0.9, 0.5), picker)
+    assert local.rank(["a", "b", "c"]) == [1, 2, 0]
+    assert await local.pick(["a", "b", "c"]) == "b"
+    assert (local.local_picks, local.llm_picks) == (1, 0)
+
+
+async def test_close_calls_go_to_the_picker_with_a_shortlist() -> None:
+    prompts: List[str] = []
+
+    def choose(prompt: str) -> str:
+        prompts.append(prompt)
+        return "Draft C"
+
+    picker = Agent(
+        name="sales_picker", instructions="Pick", model=FakeModel(reply=choose)
+    )
+    local = LocalPicker(Fixed(0.2, 0.9, 0.89), picker)
+    usage = Usage()
+    drafts = ["Draft A", "Draft B", "Draft C"]
+    assert await local.pick(drafts, usage) == "Draft C"
+    assert local.llm_picks == 1
+    assert usage.requests == 1
+    assert "Draft B" in prompts[0] and "Draft A" not in prompts[0]
+
+
+async def test_no_drafts_is_an_error() -> None:
+    with pytest.raises(ValueError):
+        await LocalPicker().pick([])
@@ -0,0 +1,99 @@
+from typing import Callable, List
+
+import pytest
+from agents import Agent, Usage
+
+from sales_agent.emailer import StructuredEmailer
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import MailTransport
+from sales_agent.streaming import StreamingPipeline, match_draft, stream_text
+
+DRAFTS = [
+    f"Dear CEO,\n\nDraft {i} says ComplAI gets you through SOC2 in weeks, "
+    "with evidence collected from your cloud for you.\n\nBest,\nAlice"
+    for i in range(3)
+]
+
+
+def replies(text: str) -> Callable[[str], str]:
+    return lambda prompt: text
+
+
+def agent(name: str, reply: str, per_token: float = 0.0) -> Agent:
+    return Agent(
+        name=name,
+        instructions=name,
+        model=FakeModel(seconds_per_token=per_token, reply=replies(reply)),
+    )
+
+
+def test_match_draft_needs_a_unique_prefix() -> None:
+    assert match_draft("Dear CEO,", DRAFTS, min_chars=5) is None
+    assert match_draft("Dear  CEO,\nDraft 2 says", DRAFTS, min_chars=5) == 2
+    assert match_draft("Dear CEO, Draft 2", DRAFTS, min_chars=40) is None
+    assert match_draft("Hello", DRAFTS, min_chars=1) is None
+
+
+async def test_stream_text_stops_when_asked() -> None:
+    seen: List[str] = []
+
+    def on_text(text: str) -> bool:
+        seen.append(text)
+        return len(text) > 20
+
+    usage = Usage()
+    writer = agent("Writer", DRAFTS[0])
+    text, result, stopped = await stream_text(writer, "Hi", on_text, usage)
+    assert stopped and result is None
+    assert DRAFTS[0].startswith(text) and len(text) < len(DRAFTS[0])
+    assert usage.requests == 1 and usage.output_tokens == len(text) // 4
+    text, result, stopped = await stream_text(agent("Writer", DRAFTS[0]), "Hi")
+    assert not stopped and result is not None
+    assert text == DRAFTS[0]
+
+
+def pipeline(
+    subject_model: FakeModel, speculative_subjects: bool = True
+) -> StreamingPipeline:
+    subject_writer = Agent(name="Subject", instructions="Subject", model=subject_model)
+    return StreamingPipeline(
+        [agent(f"Sales agent {i}", draft) for i, draft in enumerate(DRAFTS)],
+        agent("sales_picker", DRAFTS[1], per_token=0.01),
+        StructuredEmailer(subject_writer=subject_writer),
+        speculative_subjects=speculative_subjects,
+        subject_after_chars=20,
+    )
+
+
+async def test_picks_early_and_sends_the_winner(
+    sendgrid: FakeSendGridServer, transport: MailTransport
+) -> None:
+    streaming = pipeline(FakeModel(reply=replies("SOC2 in weeks")))
+    result = await streaming.run("Hi")
+    assert result.best == DRAFTS[1]
+    assert streaming.early_picks == 1
+    assert streaming.speculative_hits == 1
+    assert list(result.timings) == ["drafts", "winner", "subject", "sent"]
+    (mail,) = sendgrid.mails
+    assert mail["subject"] == "SOC2 in weeks"
+    assert "Draft 1 says" in mail["content"][0]["value"]
+
+
+async def test_without_speculation_only_the_winner_gets_a_subject(
+    sendgrid: FakeSendGridServer, transport: MailTransport
+) -> None:
+    subject_model = FakeModel(reply=replies("SOC2 in weeks"))
+    streaming = pipeline(subject_model, speculative_subjects=False)
+    result = await streaming.run("Hi")
+    assert result.best == DRAFTS[1]
+    assert streaming.speculative_hits == 0
+    assert subject_model.usage.requests == 1
+    # Three drafts, the picker stopped early, and the winner's subject.
+    assert streaming.early_picks == 1
+    assert result.usage.requests == 5
+
+
+def test_needs_a_subject_writer() -> None:
+    emailer = StructuredEmailer(formatter=agent("Formatter", "{}"))
+    with pytest.raises(ValueError):
+        StreamingPipeline([], agent("sales_picker", ""), emailer)
@@ -0,0 +1,92 @@
+from typing import Any, Callable, Dict, List
+
+from agents import Agent
+
+from sales_agent.fakes import FakeModel, FakeSendGridServer
+from sales_agent.mail import MailTransport
+from sales_agent.structured import (
+    EmailDraft,
+    StructuredPipeline,
+    build_digest_picker,
+    digest_prompt,
+    structured_drafter,
+)
+
+
+def draft(score: int, subject: str = "SOC2 in weeks") -> EmailDraft:
+    return EmailDraft(
+        subject=subject,
+        greeting="Dear CEO,",
+        paragraphs=["ComplAI automates SOC2 evidence.", "  "],
+        cta="Can we talk on Tuesday?",
+        sign_off="Best,\nAlice",
+        self_score=score,
+    )
+
+
+def fields(score: int) -> Callable[[Dict[str, Any], str], Dict[str, Any]]:
+    return lambda schema, text: draft(score, f"Subject {score}").model_dump()
+
+
+def drafters(*scores: int) -> List[Agent]:
+    return [
+        structured_drafter(
+            Agent(
+                name=f"Sales agent {score}",
+                instructions="Write a cold sales email",
+                model=FakeModel(structured=fields(score)),
+            )
+        )
+        for score in scores
+    ]
+
+
+def test_body_skips_blank_parts() -> None:
+    assert str(draft(7)) == (
+        "Dear CEO,\n\nComplAI automates SOC2 evidence.\n\n"
+        "Can we talk on Tuesday?\n\nBest,\nAlice"
+    )
+
+
+def test_digest_numbers_each_draft() -> None:
+    prompt = digest_prompt([draft(7), draft(3)])
+    assert "Email 1:\nSubject: SOC2 in weeks" in prompt
+    assert "Self-score: 3/10" in prompt
+    assert draft(7).digest(words=2).splitlines()[1] == "Opening: ComplAI automates ..."
+
+
+def test_structured_drafter_returns_fields() -> None:
+    (agent,) = drafters(5)
+    assert agent.output_type is EmailDraft
+    assert isinstance(agent.instructions, str)
+    assert agent.instructions.startswith("Write a cold sales email")
+
+
+async def test_highest_self_score_wins_without_a_picker() -> None:
+    result = await StructuredPipeline(drafters(4, 9, 6)).run("Hi")
+    assert result.draft is not None and result.draft.subject == "Subject 9"
+    assert len(result.fields) == 3
+    assert result.usage.requests == 3
+
+
+async def test_digest_picker_replies_with_a_number() -> None:
+    picker = build_digest_picker(FakeModel(reply=lambda prompt: "Email 3"))
+    result = await StructuredPipeline(drafters(4, 9, 6), picker).run("Hi")
+    assert result.draft is not None and result.draft.subject == "Subject 6"
+    assert result.usage.requests == 4
+
+
+async def test_unreadable_pick_falls_back_to_the_self_score() -> None:
+    picker = build_digest_picker(FakeModel(reply=lambda prompt: "Email 7"))
+    result = await StructuredPipeline(drafters(4, 9), picker).run("Hi")
+    assert result.draft is not None and result.draft.subject == "Subject 9"
+
+
+async def test_sends_the_rendered_winner(
+    sendgrid: FakeSendGridServer, transport: MailTransport
+) -> None:
+    email = await StructuredPipeline(drafters(4, 9), send=True)("Hi")
+    assert email.subject == "Subject 9"
+    (mail,) = sendgrid.mails
+    assert mail["content"][0]["type"] == "text/html"
+    assert "<p>Can we talk on Tuesday?</p>" in mail["content"][0]["value"]